@@ -0,0 +1,50 @@
+"""
+Shared fixtures for the benchmark suite.
+
+The synthetic dataset is generated once per session at the scale set by the
+GREENHOUSE_BENCH_* environment variables (see synthetic_data.py).
+"""
+
+import base64
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+# Add src and benchmarks directories to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from synthetic_data import BENCH_DAYS, BENCH_END_DATE, write_synthetic_images, write_synthetic_logs
+
+
+@pytest.fixture(scope="session")
+def dataset_dir(tmp_path_factory):
+    """Generate the synthetic logs and images once per session."""
+    root = tmp_path_factory.mktemp("greenhouse_bench")
+    logger = GreenhouseDataLogger(log_directory=str(root / "logs"))
+    dates = write_synthetic_logs(logger)
+    image_count = write_synthetic_images(root / "images")
+    print(f"\nSynthetic dataset: {len(dates)} days of logs, {image_count} images in {root}")
+    return root
+
+
+@pytest.fixture(scope="session")
+def dataset_dates(dataset_dir):
+    """Dates covered by the synthetic logs, oldest first."""
+    return [BENCH_END_DATE - timedelta(days=offset) for offset in range(BENCH_DAYS - 1, -1, -1)]
+
+
+@pytest.fixture
+def data_logger(dataset_dir):
+    """Data logger reading the synthetic logs."""
+    return GreenhouseDataLogger(log_directory=str(dataset_dir / "logs"))
+
+
+@pytest.fixture(scope="session")
+def auth_headers():
+    """Basic authentication headers for the benchmark app."""
+    credentials = base64.b64encode(b'bench:bench').decode('utf-8')
+    return {'Authorization': f'Basic {credentials}'}
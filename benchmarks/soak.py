@@ -0,0 +1,256 @@
+"""
+Greenhouse Soak Test
+
+Drives a mock-mode GreenhouseManager on a SimulatedClock through many
+simulated days in minutes, to surface long-run problems:
+- Memory growth across day rollovers (tracemalloc)
+- Leaked file handles
+- Control ticks slowing down as the day's log grows
+- Bytes written to storage per simulated day
+
+Run directly for a report (exit status 1 if a limit is exceeded):
+
+    python benchmarks/soak.py --days 30
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_data_logger import LOG_WRITE_BYTES
+from greenhouse_manager.greenhouse_hardware_collection import RF_COMMAND_SECONDS
+from greenhouse_manager.greenhouse_manager import GreenhouseManager
+from greenhouse_manager.greenhouse_manager_settings import GreenhouseManagerSettings
+
+
+CONFIG_TEMPLATE = Path(__file__).parent.parent / "config" / "greenhouse_manager_settings.json"
+
+# Start of the simulated run (midnight, so every simulated day is complete)
+SOAK_START = datetime(2024, 5, 1)
+
+
+@dataclass
+class SoakLimits:
+    """Bounds a soak run must stay within."""
+
+    max_memory_growth_mb: float = 16.0
+    max_tick_p99_ms: float = 100.0
+    max_log_mb_written_per_day: float = 64.0
+    max_open_files_growth: int = 8
+
+
+@dataclass
+class SoakReport:
+    """Results of a soak run."""
+
+    simulated_days: int
+    ticks: int
+    wall_seconds: float
+    tick_p50_ms: float
+    tick_p99_ms: float
+    tick_max_ms: float
+    tick_p99_ms_by_hour: List[float]
+    memory_mb_by_day: List[float]
+    memory_growth_mb: float
+    peak_memory_mb: float
+    open_files_by_day: List[Optional[int]]
+    max_rows_in_memory: int
+    log_mb_written: float
+    log_mb_written_per_day: float
+    image_mb_stored: float
+    rf_commands_by_device: Dict[str, int]
+    violations: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        """Return the report as a JSON-serialisable dictionary."""
+        return asdict(self)
+
+
+def soak_settings(root: Path, tick_seconds: int) -> GreenhouseManagerSettings:
+    """
+    Build mock-mode settings from the template config, writing under root.
+
+    Args:
+        root: Directory for logs and images
+        tick_seconds: Simulated seconds between control ticks; the sensor is
+            read and logged on every tick
+
+    Returns:
+        Validated settings for the soak run
+    """
+    with open(CONFIG_TEMPLATE) as f:
+        config = json.load(f)
+
+    config["mock_mode"] = True
+    config["log_directory"] = str(root / "logs")
+    config["image_directory"] = str(root / "images")
+    config["sensor"]["read_interval_seconds"] = min(tick_seconds, 60)
+    config["data_logging"]["log_interval_seconds"] = tick_seconds
+    config["camera"].update({"backend": "mock", "width": 320, "height": 240})
+    config["metrics"]["enabled"] = False
+    # Simulated plant, so control decisions respond to the devices they switch
+    config["simulation"].update({"enabled": True, "seed": 0})
+    return GreenhouseManagerSettings(**config)
+
+
+def _open_file_count() -> Optional[int]:
+    """Number of open file descriptors, where the platform exposes it."""
+    fd_dir = Path("/proc/self/fd")
+    return len(os.listdir(fd_dir)) if fd_dir.exists() else None
+
+
+def _log_bytes_written() -> float:
+    """Total bytes written to log files so far, across all datasets."""
+    return sum(child.value for child in LOG_WRITE_BYTES._children.values())
+
+
+def _rf_command_counts() -> Dict[str, int]:
+    """RF commands sent so far, per device."""
+    return {labels[0]: child.count for labels, child in RF_COMMAND_SECONDS._children.items()}
+
+
+def run_soak(
+    days: int = 30,
+    tick_seconds: int = 60,
+    root: Optional[Path] = None,
+    limits: Optional[SoakLimits] = None,
+    quiet: bool = True
+) -> SoakReport:
+    """
+    Run the manager control loop over simulated days and check it against limits.
+
+    Args:
+        days: Number of simulated days
+        tick_seconds: Simulated seconds between control ticks
+        root: Directory for logs and images (a temporary directory if None)
+        limits: Bounds to check the run against (SoakLimits defaults if None)
+        quiet: Discard the manager's console output during the run
+
+    Returns:
+        SoakReport with measurements and any limit violations
+    """
+    if limits is None:
+        limits = SoakLimits()
+
+    with contextlib.ExitStack() as stack:
+        if root is None:
+            root = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="greenhouse_soak_")))
+        if quiet:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+
+        clock = SimulatedClock(SOAK_START)
+        manager = GreenhouseManager(
+            settings=soak_settings(root, tick_seconds),
+            clock=clock,
+            monitor_config=False
+        )
+        if manager.image_analysis_worker:
+            manager.image_analysis_worker.start()
+
+        ticks_per_day = 86400 // tick_seconds
+        tick_ms = np.empty(days * ticks_per_day)
+        memory_mb_by_day, open_files_by_day = [], []
+        max_rows = 0
+        log_bytes_start = _log_bytes_written()
+        rf_commands_start = _rf_command_counts()
+
+        tracemalloc.start()
+        wall_start = time.perf_counter()
+        try:
+            for day in range(days):
+                for tick in range(ticks_per_day):
+                    start = time.perf_counter()
+                    manager.run_control_loop()
+                    tick_ms[day * ticks_per_day + tick] = (time.perf_counter() - start) * 1000
+                    clock.advance(tick_seconds)
+
+                # Daily housekeeping the background threads would otherwise do
+                if manager.retention_engine:
+                    manager.retention_engine.run_once()
+                if manager.data_logger._current_dataframe is not None:
+                    max_rows = max(max_rows, len(manager.data_logger._current_dataframe))
+
+                gc.collect()
+                memory_mb_by_day.append(tracemalloc.get_traced_memory()[0] / 1024 / 1024)
+                open_files_by_day.append(_open_file_count())
+        finally:
+            wall_seconds = time.perf_counter() - wall_start
+            peak_memory_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+            manager.shutdown()
+
+        image_bytes = sum(f.stat().st_size for f in (root / "images").rglob("*.jpg"))
+
+    log_mb_written = (_log_bytes_written() - log_bytes_start) / 1024 / 1024
+    rf_commands = {
+        device: count - rf_commands_start.get(device, 0) for device, count in _rf_command_counts().items()
+    }
+    hours = (np.arange(len(tick_ms)) % ticks_per_day) * tick_seconds // 3600
+    report = SoakReport(
+        simulated_days=days,
+        ticks=len(tick_ms),
+        wall_seconds=round(wall_seconds, 2),
+        tick_p50_ms=float(np.percentile(tick_ms, 50)),
+        tick_p99_ms=float(np.percentile(tick_ms, 99)),
+        tick_max_ms=float(tick_ms.max()),
+        tick_p99_ms_by_hour=[float(np.percentile(tick_ms[hours == hour], 99)) for hour in range(24)],
+        memory_mb_by_day=[round(mb, 3) for mb in memory_mb_by_day],
+        # Growth is measured from the end of the first day, once caches have warmed up
+        memory_growth_mb=memory_mb_by_day[-1] - memory_mb_by_day[0],
+        peak_memory_mb=peak_memory_mb,
+        open_files_by_day=open_files_by_day,
+        max_rows_in_memory=max_rows,
+        log_mb_written=log_mb_written,
+        log_mb_written_per_day=log_mb_written / days,
+        image_mb_stored=image_bytes / 1024 / 1024,
+        rf_commands_by_device=rf_commands
+    )
+
+    if report.memory_growth_mb > limits.max_memory_growth_mb:
+        report.violations.append(f"memory grew by {report.memory_growth_mb:.1f} MB")
+    if report.tick_p99_ms > limits.max_tick_p99_ms:
+        report.violations.append(f"p99 tick latency {report.tick_p99_ms:.1f} ms")
+    if report.log_mb_written_per_day > limits.max_log_mb_written_per_day:
+        report.violations.append(f"{report.log_mb_written_per_day:.1f} MB of logs written per day")
+    if open_files_by_day[0] is not None and open_files_by_day[-1] - open_files_by_day[0] > limits.max_open_files_growth:
+        report.violations.append(f"open files grew from {open_files_by_day[0]} to {open_files_by_day[-1]}")
+    return report
+
+
+def main():
+    """Run a soak test from the command line and print its report as JSON."""
+    parser = argparse.ArgumentParser(description="Soak test the greenhouse manager in mock mode")
+    parser.add_argument("--days", type=int, default=int(os.environ.get("GREENHOUSE_SOAK_DAYS", "30")))
+    parser.add_argument("--tick-seconds", type=int, default=60)
+    parser.add_argument("--output", type=Path, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = run_soak(days=args.days, tick_seconds=args.tick_seconds)
+    text = json.dumps(report.to_dict(), indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+    if report.violations:
+        print(f"Soak test FAILED: {'; '.join(report.violations)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
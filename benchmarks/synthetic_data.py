@@ -0,0 +1,141 @@
+"""
+Synthetic Greenhouse Data
+
+Generates realistic sensor logs and camera image directories for benchmarks:
+- Diurnal temperature and humidity cycles with noise and slow weather drift
+- Device states derived from the same thresholds and schedules the manager uses
+- Camera captures named like real captures
+
+Scale is configured through environment variables so the same suite runs
+against one day of data or a full year at 5 second resolution.
+"""
+
+import os
+import shutil
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_image_catalog import capture_filename
+
+
+# Scale of the generated dataset
+BENCH_DAYS = int(os.environ.get("GREENHOUSE_BENCH_DAYS", "1"))
+BENCH_INTERVAL_SECONDS = int(os.environ.get("GREENHOUSE_BENCH_INTERVAL_SECONDS", "5"))
+BENCH_IMAGE_INTERVAL_MINUTES = int(os.environ.get("GREENHOUSE_BENCH_IMAGE_INTERVAL_MINUTES", "30"))
+
+# Last day of generated data (fixed so runs are comparable)
+BENCH_END_DATE = datetime(2024, 6, 30)
+
+
+def generate_day(date: datetime, interval_seconds: int = 5, seed: int = 0) -> pd.DataFrame:
+    """
+    Generate one day of sensor log rows in the data logger's schema.
+
+    Args:
+        date: Day to generate
+        interval_seconds: Time between readings
+        seed: Random seed (combined with the date so every day differs)
+
+    Returns:
+        DataFrame with the same columns as GreenhouseDataLogger.log_data writes
+    """
+    rng = np.random.default_rng(seed + date.toordinal())
+    start = datetime.combine(date.date(), datetime.min.time())
+    timestamps = pd.date_range(start, start + timedelta(days=1), freq=f"{interval_seconds}s", inclusive="left")
+    hours = (timestamps.hour + timestamps.minute / 60 + timestamps.second / 3600).to_numpy()
+
+    # Warmest mid-afternoon, with day-to-day weather and sensor noise
+    daily_offset = rng.normal(0, 2)
+    temperature = 22 + daily_offset + 7 * np.sin((hours - 9) / 24 * 2 * np.pi) + rng.normal(0, 0.2, len(hours))
+    humidity = np.clip(75 - 2.5 * (temperature - 22) + rng.normal(0, 1.0, len(hours)), 20, 100)
+    pressure = 1013 + np.cumsum(rng.normal(0, 0.01, len(hours)))
+
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "date": timestamps.strftime("%Y-%m-%d"),
+        "time_24hr": timestamps.strftime("%H:%M:%S"),
+        "temperature_celsius": temperature,
+        "humidity_percent": humidity,
+        "pressure_hpa": pressure,
+        "heater_state": temperature < 18,
+        "vent_fan_state": (temperature > 28) | (humidity > 85),
+        "grow_lights_state": (hours >= 6) & (hours < 22),
+        "stand_fan_state": (hours >= 8) & (hours < 20),
+    })
+
+
+def write_synthetic_logs(
+    data_logger: GreenhouseDataLogger,
+    days: int = BENCH_DAYS,
+    interval_seconds: int = BENCH_INTERVAL_SECONDS,
+    end_date: datetime = BENCH_END_DATE
+) -> List[datetime]:
+    """
+    Write daily sensor log files ending on end_date.
+
+    Args:
+        data_logger: Logger whose directory and format receive the files
+        days: Number of days to generate
+        interval_seconds: Time between readings
+        end_date: Last day of data
+
+    Returns:
+        Dates written, oldest first
+    """
+    dates = [end_date - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    for date in dates:
+        data_logger._write_log_file(generate_day(date, interval_seconds), data_logger._get_log_filename(date))
+    return dates
+
+
+def write_synthetic_images(
+    image_directory: Path,
+    days: int = BENCH_DAYS,
+    interval_minutes: int = BENCH_IMAGE_INTERVAL_MINUTES,
+    end_date: datetime = BENCH_END_DATE,
+    size: tuple = (320, 240)
+) -> int:
+    """
+    Populate an image directory with daytime captures.
+
+    One small JPEG is encoded and copied for every capture, since benchmarks
+    exercise listing and lookup rather than image decoding.
+
+    Args:
+        image_directory: Directory receiving the captures
+        days: Number of days to generate
+        interval_minutes: Time between captures
+        end_date: Last day of captures
+        size: Width and height of the generated frames
+
+    Returns:
+        Number of captures written
+    """
+    image_directory = Path(image_directory)
+    image_directory.mkdir(parents=True, exist_ok=True)
+    template = image_directory / "template.jpg"
+    pixels = np.random.default_rng(0).integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(template, "JPEG", quality=75)
+
+    count = 0
+    for offset in range(days - 1, -1, -1):
+        day = end_date - timedelta(days=offset)
+        capture_time = day.replace(hour=6, minute=0, second=0)
+        while capture_time.hour < 20:
+            image_path = image_directory / capture_filename(capture_time)
+            shutil.copyfile(template, image_path)
+            capture_time += timedelta(minutes=interval_minutes)
+            count += 1
+
+    template.unlink()
+    return count
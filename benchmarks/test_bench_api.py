@@ -0,0 +1,63 @@
+"""
+Benchmarks for the webserver API.
+
+Exercises every /api/v1 endpoint through the Flask test client against the
+synthetic dataset.
+"""
+
+import pytest
+
+from webserver.app import create_app
+from synthetic_data import BENCH_END_DATE
+
+
+@pytest.fixture(scope="module")
+def client(dataset_dir):
+    """Create a test client serving the synthetic dataset."""
+    app = create_app({
+        'TESTING': True,
+        'BASIC_AUTH_USERNAME': 'bench',
+        'BASIC_AUTH_PASSWORD': 'bench',
+        'LOG_DIRECTORY': str(dataset_dir / "logs"),
+        'IMAGE_DIRECTORY': str(dataset_dir / "images")
+    })
+
+    # /status reports the logger's in-memory day, so load the last day into it
+    from webserver.api import api_bp
+    api_bp.data_logger.log_data(22.0, 65.0, 1013.0, False, True, True, False,
+                                timestamp=BENCH_END_DATE.replace(hour=23, minute=59, second=59))
+    return app.test_client()
+
+
+DAY = BENCH_END_DATE.strftime('%Y-%m-%d')
+
+
+@pytest.mark.parametrize("url", [
+    "/api/v1/status",
+    f"/api/v1/history?day={DAY}",
+    f"/api/v1/statistics?day={DAY}",
+    "/api/v1/camera/latest",
+    f"/api/v1/camera/list?day={DAY}",
+    f"/api/v1/camera/image/greenhouse_{BENCH_END_DATE.strftime('%Y%m%d')}_120000.jpg",
+    f"/api/v1/duty?start={DAY}T00:00:00&end={DAY}T23:59:59",
+])
+def test_api_endpoint(benchmark, client, auth_headers, url):
+    """Benchmark a single-day API endpoint."""
+    response = benchmark(client.get, url, headers=auth_headers)
+    assert response.status_code == 200
+
+
+def test_api_history_range(benchmark, client, auth_headers, dataset_dates):
+    """Benchmark the history range endpoint over the full synthetic range."""
+    url = (f"/api/v1/history/range?start={dataset_dates[0].strftime('%Y-%m-%d')}"
+           f"&end={dataset_dates[-1].strftime('%Y-%m-%d')}")
+    response = benchmark(client.get, url, headers=auth_headers)
+    assert response.status_code == 200
+
+
+def test_api_energy_range(benchmark, client, auth_headers, dataset_dates):
+    """Benchmark the energy endpoint over the full synthetic range."""
+    url = (f"/api/v1/energy?start={dataset_dates[0].strftime('%Y-%m-%d')}"
+           f"&end={dataset_dates[-1].strftime('%Y-%m-%d')}")
+    response = benchmark(client.get, url, headers=auth_headers)
+    assert response.status_code == 200
@@ -0,0 +1,69 @@
+"""
+Benchmarks for greenhouse_data_logger module.
+
+Measures logging throughput, history queries and control backtests against
+the synthetic dataset.
+"""
+
+import itertools
+from datetime import timedelta
+
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from synthetic_data import BENCH_END_DATE
+
+
+# Rows logged per benchmark round
+LOG_BATCH_SIZE = 1000
+
+
+def test_log_data_throughput(benchmark, tmp_path):
+    """Benchmark logging a batch of readings into a fresh day."""
+    timestamps = [BENCH_END_DATE + timedelta(seconds=5 * i) for i in range(LOG_BATCH_SIZE)]
+    rounds = itertools.count()
+
+    def setup():
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path / f"round_{next(rounds)}"))
+        return (logger,), {}
+
+    def log_batch(logger):
+        for timestamp in timestamps:
+            logger.log_data(22.0, 65.0, 1013.0, False, True, True, False, timestamp=timestamp)
+
+    benchmark.extra_info["rows"] = LOG_BATCH_SIZE
+    benchmark.pedantic(log_batch, setup=setup, rounds=5)
+
+
+def test_get_data_for_date(benchmark, data_logger):
+    """Benchmark reading a single day of history."""
+    result = benchmark(data_logger.get_data_for_date, BENCH_END_DATE)
+    assert not result.empty
+
+
+def test_get_date_range_data(benchmark, data_logger, dataset_dates):
+    """Benchmark reading the full synthetic date range."""
+    result = benchmark(data_logger.get_date_range_data, dataset_dates[0], dataset_dates[-1])
+    benchmark.extra_info["rows"] = len(result)
+    assert not result.empty
+
+
+def test_get_date_range_data_week(benchmark, data_logger, dataset_dates):
+    """Benchmark reading the last week, the dashboard's common range view."""
+    start = dataset_dates[max(0, len(dataset_dates) - 7)]
+    result = benchmark(data_logger.get_date_range_data, start, dataset_dates[-1])
+    assert not result.empty
+
+
+def test_get_statistics(benchmark, data_logger):
+    """Benchmark computing daily statistics."""
+    stats = benchmark(data_logger.get_statistics, BENCH_END_DATE)
+    assert stats["record_count"] > 0
+
+
+def test_backtest(benchmark, data_logger, dataset_dates):
+    """Benchmark backtesting the template settings over the full synthetic range."""
+    from pathlib import Path
+    from greenhouse_manager.greenhouse_backtest import backtest_files
+
+    config = Path(__file__).parent.parent / "config" / "greenhouse_manager_settings.json"
+    results = benchmark(backtest_files, [config], data_logger, dataset_dates[0], dataset_dates[-1])
+    assert results[0].samples > 0
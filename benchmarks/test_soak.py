@@ -0,0 +1,16 @@
+"""
+Short soak run of the manager on a simulated clock.
+
+The full-length soak (30+ days) is run with `python build.py soak`.
+"""
+
+from soak import SoakLimits, run_soak
+
+
+def test_short_soak_within_limits(tmp_path):
+    """Test a two-day simulated run stays within the soak limits."""
+    report = run_soak(days=2, tick_seconds=300, root=tmp_path, limits=SoakLimits(max_tick_p99_ms=250.0))
+
+    assert report.ticks == 2 * 288
+    assert report.max_rows_in_memory == 288
+    assert report.violations == []
@@ -2,8 +2,10 @@ import subprocess
 import sys
 import os
 import shutil
+import glob
 
 VENV_DIR = ".venv"
+BENCHMARK_STORAGE = ".benchmarks"
 
 
 def run_command(command, cwd=None):
@@ -111,6 +113,46 @@ def run_webserver():
         sys.exit(1)
 
 
+def run_benchmarks():
+    """Runs the benchmark suite, comparing against the last saved run."""
+    print("\n--- Running Benchmarks ---")
+    python_executable = os.path.join(VENV_DIR, "Scripts" if sys.platform == "win32" else "bin", "python")
+
+    if not os.path.exists(python_executable):
+        print(f"Error: Python executable not found in venv at {python_executable}")
+        print("Please run 'python build.py build-env' first.")
+        sys.exit(1)
+
+    # Scale is set with GREENHOUSE_BENCH_DAYS (e.g. 365 for a year of 5 s data)
+    command = [
+        python_executable, "-m", "pytest", "benchmarks", "--no-cov",
+        "--benchmark-autosave", f"--benchmark-storage={BENCHMARK_STORAGE}",
+    ]
+
+    # Compare with the previous run once a baseline has been saved
+    if glob.glob(os.path.join(BENCHMARK_STORAGE, "**", "*.json"), recursive=True):
+        fail_threshold = os.environ.get("GREENHOUSE_BENCH_FAIL", "mean:20%")
+        command += ["--benchmark-compare", f"--benchmark-compare-fail={fail_threshold}"]
+    else:
+        print("No saved benchmark runs yet, this run becomes the baseline")
+
+    run_command(command)
+
+
+def run_soak():
+    """Runs the accelerated-clock soak test of the manager in mock mode."""
+    print("\n--- Running Soak Test ---")
+    python_executable = os.path.join(VENV_DIR, "Scripts" if sys.platform == "win32" else "bin", "python")
+
+    if not os.path.exists(python_executable):
+        print(f"Error: Python executable not found in venv at {python_executable}")
+        print("Please run 'python build.py build-env' first.")
+        sys.exit(1)
+
+    # Length is set with GREENHOUSE_SOAK_DAYS (defaults to 30 simulated days)
+    run_command([python_executable, os.path.join("benchmarks", "soak.py"), "--output", "soak_report.json"])
+
+
 def run_all():
     """Runs both the greenhouse manager and webserver (in separate processes would be ideal)."""
     print("\n--- Note: This will run greenhouse manager first ---")
@@ -127,6 +169,8 @@ if __name__ == "__main__":
         "run": run_all,
         "run-greenhouse": run_greenhouse,
         "run-webserver": run_webserver,
+        "benchmark": run_benchmarks,
+        "soak": run_soak,
     }
 
     # Default to 'build' if no arguments are provided
@@ -0,0 +1,480 @@
+"""
+Greenhouse Acquisition
+
+Oversampled, filtered sensor acquisition:
+- Several samples per read interval, taken as a burst or spread across the interval
+- Samples kept in a fixed-size NumPy ring buffer
+- Out-of-range readings and outliers (modified z-score) rejected before filtering
+- One filtered reading per interval (median, mean or exponential average) with
+  the min, max and standard deviation of the accepted samples
+
+Sampling and filtering run in a background thread; the control loop only picks
+up the latest published AcquisitionSummary and checks its age. Each read runs
+with a timeout, failed reads are retried with exponential backoff, and the I2C
+bus is reopened after repeated failures.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+from greenhouse_manager.greenhouse_hardware_collection import BME280Sensor
+from greenhouse_manager.greenhouse_manager_settings import SensorConfig
+from greenhouse_manager.greenhouse_metrics import REGISTRY
+
+
+SAMPLES_REJECTED = REGISTRY.counter(
+    "greenhouse_sensor_samples_rejected_total",
+    "Sensor samples discarded as implausible or outliers",
+    ["reason"]
+)
+SENSOR_READ_TIMEOUTS = REGISTRY.counter(
+    "greenhouse_sensor_read_timeouts_total", "Sensor reads abandoned after the read timeout"
+)
+SENSOR_BUS_REOPENS = REGISTRY.counter(
+    "greenhouse_sensor_bus_reopens_total", "Times the sensor bus was reopened after repeated failures"
+)
+SENSOR_READING_AGE = REGISTRY.gauge(
+    "greenhouse_sensor_reading_age_seconds", "Age of the latest filtered sensor reading"
+)
+
+# Channels read from the sensor, in ring buffer column order
+CHANNELS = ("temperature", "humidity", "pressure")
+
+# Sensor log column of each channel
+LOG_COLUMNS = {"temperature": "temperature_celsius", "humidity": "humidity_percent", "pressure": "pressure_hpa"}
+
+# BME280 operating ranges; anything outside is a bad read
+PLAUSIBLE_RANGES = {
+    "temperature": (-40.0, 85.0),
+    "humidity": (0.0, 100.0),
+    "pressure": (300.0, 1100.0),
+}
+
+# Intervals of samples the ring buffer holds
+RING_INTERVALS = 4
+
+# Scale factors making MAD and mean absolute deviation comparable to a standard deviation
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 0.7979
+
+
+class SampleRing:
+    """
+    Fixed-size ring buffer of timestamped sensor samples.
+
+    Attributes:
+        capacity: Maximum number of samples held; the oldest are overwritten
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._times = np.full(capacity, np.nan)
+        self._values = np.full((capacity, len(CHANNELS)), np.nan)
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, sample: Dict[str, float]):
+        """
+        Add a sample, overwriting the oldest one when full.
+
+        Args:
+            timestamp: Time of the sample in seconds
+            sample: Channel name to value
+        """
+        with self._lock:
+            self._times[self._next] = timestamp
+            self._values[self._next] = [sample[channel] for channel in CHANNELS]
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def window(self, since: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples taken after a point in time, oldest first.
+
+        Args:
+            since: Only samples with a later timestamp are returned
+
+        Returns:
+            Tuple of (timestamps, values with one column per channel)
+        """
+        with self._lock:
+            order = np.arange(self._next - self._size, self._next) % self.capacity
+            times, values = self._times[order], self._values[order]
+        selected = times > since
+        return times[selected], values[selected]
+
+
+def outlier_mask(values: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Flag outliers in each column by modified z-score.
+
+    Uses the median absolute deviation, falling back to the mean absolute
+    deviation when more than half the samples are identical.
+
+    Args:
+        values: Samples, one column per channel
+        threshold: Modified z-score above which a sample is an outlier (0 disables)
+
+    Returns:
+        Boolean array shaped like values, True for outliers
+    """
+    if threshold <= 0 or len(values) < 3:
+        return np.zeros(values.shape, dtype=bool)
+
+    deviation = np.abs(values - np.median(values, axis=0))
+    mad = np.median(deviation, axis=0)
+    mean_ad = deviation.mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(
+            mad > 0,
+            MAD_SCALE * deviation / mad,
+            MEAN_AD_SCALE * deviation / mean_ad
+        )
+    return np.nan_to_num(score, nan=0.0) > threshold
+
+
+def combine(values: np.ndarray, method: str, ema_alpha: float = 0.3) -> float:
+    """
+    Combine one channel's accepted samples into a single reading.
+
+    Args:
+        values: Samples, oldest first
+        method: 'median', 'mean' or 'ema'
+        ema_alpha: Weight of each new sample for 'ema'
+
+    Returns:
+        Filtered value
+    """
+    if method == "median":
+        return float(np.median(values))
+    if method == "mean":
+        return float(values.mean())
+    value = values[0]
+    for sample in values[1:]:
+        value += ema_alpha * (sample - value)
+    return float(value)
+
+
+@dataclass
+class ChannelSummary:
+    """Filtered value and spread of one channel over an interval."""
+
+    value: float
+    min: float
+    max: float
+    std: float
+
+
+@dataclass
+class AcquisitionSummary:
+    """Filtered reading for one read interval."""
+
+    timestamp: datetime
+    sequence: int
+    samples: int
+    rejected: int
+    channels: Dict[str, ChannelSummary] = field(default_factory=dict)
+
+    def reading(self) -> Dict[str, float]:
+        """Filtered values in the same form as BME280Sensor.read_data."""
+        return {channel: summary.value for channel, summary in self.channels.items()}
+
+    def log_fields(self) -> Dict[str, float]:
+        """Min, max and standard deviation columns for the sensor log."""
+        fields = {"sensor_samples": self.samples}
+        for channel, summary in self.channels.items():
+            fields[f"{LOG_COLUMNS[channel]}_min"] = summary.min
+            fields[f"{LOG_COLUMNS[channel]}_max"] = summary.max
+            fields[f"{LOG_COLUMNS[channel]}_std"] = summary.std
+        return fields
+
+
+def summarize(
+    values: np.ndarray,
+    timestamp: datetime,
+    config: SensorConfig,
+    sequence: int = 0
+) -> Optional[AcquisitionSummary]:
+    """
+    Reject outliers and filter an interval's samples into one summary.
+
+    Args:
+        values: Samples in the interval, one column per channel
+        timestamp: Time to stamp the summary with
+        config: Sensor settings holding the filter options
+        sequence: Sequence number of the summary
+
+    Returns:
+        AcquisitionSummary, or None if no samples were accepted
+    """
+    if len(values) == 0:
+        return None
+
+    outliers = outlier_mask(values, config.outlier_threshold)
+    summary = AcquisitionSummary(
+        timestamp=timestamp,
+        sequence=sequence,
+        samples=len(values),
+        rejected=int(np.count_nonzero(outliers.any(axis=1)))
+    )
+    for column, channel in enumerate(CHANNELS):
+        accepted = values[~outliers[:, column], column]
+        summary.channels[channel] = ChannelSummary(
+            value=combine(accepted, config.filter_method, config.ema_alpha),
+            min=float(accepted.min()),
+            max=float(accepted.max()),
+            std=float(accepted.std())
+        )
+    if summary.rejected:
+        SAMPLES_REJECTED.labels("outlier").inc(summary.rejected)
+    return summary
+
+
+def is_plausible(sample: Dict[str, float]) -> bool:
+    """Check every channel of a sample is a number within the sensor's range."""
+    for channel, (low, high) in PLAUSIBLE_RANGES.items():
+        value = sample.get(channel)
+        if value is None or not low <= value <= high:
+            return False
+    return True
+
+
+class SensorAcquisition:
+    """
+    Samples a sensor several times per read interval and publishes filtered readings.
+
+    poll() does whatever sampling and publishing is due at the clock's current
+    time. start() runs it in a background thread; without the thread the owner
+    calls poll() itself, which is how simulated-clock runs drive it.
+
+    Sensor calls run one at a time on a persistent daemon reader thread, so a
+    wedged bus costs at most read_timeout_seconds. While a call is stuck in the
+    driver, further reads are skipped (and counted as timeouts) and the bus is
+    only reopened once the stuck call has returned.
+
+    Attributes:
+        sensor: Sensor to sample
+        config: Sensor settings (read interval, samples per interval, filter)
+        clock: Time source
+        ring: Buffer of recent accepted samples
+    """
+
+    def __init__(self, sensor: BME280Sensor, config: SensorConfig, clock: Clock = SYSTEM_CLOCK):
+        self.sensor = sensor
+        self.config = config
+        self.clock = clock
+        self.ring = SampleRing(config.samples_per_interval * RING_INTERVALS)
+        self._latest: Optional[AcquisitionSummary] = None
+        self._sequence = 0
+        self._last_publish: Optional[float] = None
+        self._next_sample = 0.0
+        self._started_at = clock.time()
+        self._failures = 0
+        self._retry_at = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Sensor calls for the reader thread, the call left running after a timeout
+        # and whether a bus reopen is waiting for that call to return
+        self._calls: "queue.Queue[Optional[Tuple[Callable[[], Any], Future]]]" = queue.Queue()
+        self._reader: Optional[threading.Thread] = None
+        self._stuck_call: Optional[Future] = None
+        self._reopen_pending = False
+
+    @property
+    def running(self) -> bool:
+        """True while the background thread is sampling."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def sample_spacing(self) -> float:
+        """Seconds between samples in continuous mode."""
+        return self.config.read_interval_seconds / self.config.samples_per_interval
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Failed reads since the last successful one."""
+        return self._failures
+
+    def latest(self) -> Optional[AcquisitionSummary]:
+        """Most recent filtered reading, or None before the first one."""
+        return self._latest
+
+    def age_seconds(self) -> float:
+        """Seconds since the latest reading was published (since start-up if there is none)."""
+        published = self._latest.timestamp.timestamp() if self._latest is not None else self._started_at
+        return max(0.0, self.clock.time() - published)
+
+    def _read_calls(self):
+        """Reader thread: run queued sensor calls one at a time until stopped."""
+        while True:
+            item = self._calls.get()
+            if item is None:
+                break
+            function, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(function())
+            except Exception as e:
+                future.set_exception(e)
+
+    def _call_in_flight(self) -> bool:
+        """True while a call that timed out is still inside the driver."""
+        if self._stuck_call is not None and self._stuck_call.done():
+            self._stuck_call = None
+        return self._stuck_call is not None
+
+    def _call_with_timeout(self, function: Callable[[], Any]) -> Any:
+        """
+        Run a sensor call on the reader thread, giving up after the read timeout.
+
+        Args:
+            function: Sensor method to call
+
+        Returns:
+            The call's result, or None if it failed, timed out or was skipped
+            because an earlier call is still stuck
+        """
+        if self._call_in_flight():
+            SENSOR_READ_TIMEOUTS.inc()
+            return None
+        if self._reader is None or not self._reader.is_alive():
+            self._reader = threading.Thread(target=self._read_calls, name="sensor-read", daemon=True)
+            self._reader.start()
+
+        future: Future = Future()
+        self._calls.put((function, future))
+        try:
+            return future.result(self.config.read_timeout_seconds)
+        except TimeoutError:
+            # The call is stuck in the driver; nothing else touches the bus until it returns
+            self._stuck_call = future
+            SENSOR_READ_TIMEOUTS.inc()
+            print(f"Sensor call timed out after {self.config.read_timeout_seconds}s")
+        except Exception as e:
+            print(f"Error in sensor call: {e}")
+        return None
+
+    def _reopen_bus(self):
+        """Reopen the bus, or leave it pending while a timed-out call is still running."""
+        if self._call_in_flight():
+            self._reopen_pending = True
+            return
+        self._reopen_pending = False
+        SENSOR_BUS_REOPENS.inc()
+        print(f"Sensor failed {self._failures} reads in a row, reopening bus")
+        self._call_with_timeout(self.sensor.reopen)
+
+    def _record_failure(self):
+        """Back off after a failed read and reopen the bus after repeated failures."""
+        self._failures += 1
+        delay = min(
+            self.config.retry_backoff_seconds * 2 ** min(self._failures - 1, 20),
+            self.config.retry_backoff_max_seconds
+        )
+        self._retry_at = self.clock.time() + delay
+
+        if self._failures % self.config.reopen_after_failures == 0:
+            self._reopen_bus()
+
+    def _take_sample(self) -> bool:
+        """
+        Read the sensor once and keep the sample if it is plausible.
+
+        Returns:
+            True if a sample was added to the ring buffer
+        """
+        if self._reopen_pending:
+            self._reopen_bus()
+        sample = self._call_with_timeout(self.sensor.read_data)
+        if sample is not None and not is_plausible(sample):
+            SAMPLES_REJECTED.labels("implausible").inc()
+            sample = None
+        if sample is None:
+            self._record_failure()
+            return False
+
+        self._failures = 0
+        self.ring.append(self.clock.time(), sample)
+        return True
+
+    def _publish(self, now: float):
+        """Summarize the samples since the last publish and make them the latest reading."""
+        since = self._last_publish if self._last_publish is not None else -np.inf
+        _, values = self.ring.window(since)
+        self._last_publish = now
+        summary = summarize(values, self.clock.now(), self.config, self._sequence + 1)
+        if summary is not None:
+            self._sequence = summary.sequence
+            self._latest = summary
+
+    def poll(self) -> float:
+        """
+        Take any samples that are due and publish a reading at the end of each interval.
+
+        Returns:
+            Seconds until poll() next has work to do
+        """
+        now = self.clock.time()
+        publish_due = self._last_publish is None or now - self._last_publish >= self.config.read_interval_seconds
+        backing_off = now < self._retry_at
+
+        if self.config.sampling_mode == "burst":
+            if publish_due and not backing_off:
+                for _ in range(self.config.samples_per_interval):
+                    if not self._take_sample():
+                        break
+        elif now >= self._next_sample and not backing_off:
+            self._take_sample()
+            # Keep a steady cadence, but skip missed slots rather than catching up
+            self._next_sample += self.sample_spacing
+            if self._next_sample <= now:
+                self._next_sample = now + self.sample_spacing
+
+        if publish_due:
+            self._publish(now)
+
+        next_publish = self._last_publish + self.config.read_interval_seconds
+        if self.config.sampling_mode == "continuous":
+            next_publish = min(next_publish, max(self._next_sample, self._retry_at))
+        return max(0.0, next_publish - self.clock.time())
+
+    def _run_loop(self):
+        """Background loop sampling until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                wait = self.poll()
+            except Exception as e:
+                print(f"Error in sensor acquisition: {e}")
+                wait = self.sample_spacing
+            self._stop_event.wait(wait)
+
+    def start(self):
+        """Start sampling in a background thread."""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="sensor-acquisition", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and let the reader thread exit once its current call returns."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._reader is not None:
+            self._calls.put(None)
+            self._reader = None
@@ -0,0 +1,267 @@
+"""
+Greenhouse Backtest
+
+Replays historical sensor logs through candidate control settings:
+- Heater and vent fan hysteresis from GreenhouseManager.control_temperature
+- Device time schedules from control_scheduled_devices
+- Switch counts, time-weighted duty cycles and time out of band per settings file
+
+Control logic is evaluated as vectorized NumPy state machines over the whole
+history at once, so a year of 60 s data backtests in seconds.
+
+The replay is open loop: recorded temperatures are those produced by the
+settings in force at the time, so results show how candidate settings would
+have switched the devices against that history, not how the greenhouse
+would have responded. Input smoothing, minimum dwell times and the RF budget
+from greenhouse_control are not modelled, so switch counts are an upper bound.
+
+Usage:
+    python -m greenhouse_manager.greenhouse_backtest --start 2024-05-01 --end 2024-05-31 candidate_a.json candidate_b.json
+"""
+
+import argparse
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_manager_settings import GreenhouseManagerSettings, TimeSchedule
+
+
+# Samples further apart than this many median intervals are treated as gaps in the log
+GAP_FACTOR = 10
+
+
+def hysteresis(turn_on: np.ndarray, turn_off: np.ndarray, initial: bool = False) -> np.ndarray:
+    """
+    Evaluate an on/off state machine over a series of samples.
+
+    The state switches on where turn_on is set, off where turn_off is set, and
+    otherwise holds its previous value, matching the manager's control logic.
+
+    Args:
+        turn_on: Boolean array, True where the device would be switched on
+        turn_off: Boolean array, True where the device would be switched off
+        initial: State before the first sample
+
+    Returns:
+        Boolean array of device states after each sample
+    """
+    events = turn_on | turn_off
+    last_event = np.maximum.accumulate(np.where(events, np.arange(len(events)), -1))
+    return np.where(last_event >= 0, turn_on[np.maximum(last_event, 0)], initial)
+
+
+def schedule_mask(seconds_of_day: np.ndarray, schedule: TimeSchedule) -> np.ndarray:
+    """
+    Evaluate a time schedule for each sample, like GreenhouseManager.is_time_in_schedule.
+
+    Args:
+        seconds_of_day: Seconds since midnight for each sample
+        schedule: Schedule to evaluate
+
+    Returns:
+        Boolean array, True where the schedule is active
+    """
+    if not schedule.enabled:
+        return np.zeros(len(seconds_of_day), dtype=bool)
+
+    start = schedule.start_time.hour * 3600 + schedule.start_time.minute * 60 + schedule.start_time.second
+    end = schedule.end_time.hour * 3600 + schedule.end_time.minute * 60 + schedule.end_time.second
+    if start <= end:
+        return (seconds_of_day >= start) & (seconds_of_day <= end)
+    # Schedules that cross midnight
+    return (seconds_of_day >= start) | (seconds_of_day <= end)
+
+
+@dataclass
+class DeviceStats:
+    """Simulated behaviour of one device over the backtest period."""
+
+    switches: int
+    on_hours: float
+    duty_cycle: float
+
+
+@dataclass
+class BacktestResult:
+    """Outcome of replaying history through one set of control settings."""
+
+    name: str
+    samples: int
+    hours: float
+    devices: Dict[str, DeviceStats] = field(default_factory=dict)
+    temperature_out_of_band_hours: float = 0.0
+    temperature_out_of_band_fraction: float = 0.0
+    humidity_out_of_band_hours: float = 0.0
+
+    def to_row(self) -> Dict[str, float]:
+        """Flatten the result into a single table row."""
+        row = {
+            "settings": self.name,
+            "hours": round(self.hours, 1),
+            "temp_out_of_band_h": round(self.temperature_out_of_band_hours, 1),
+            "humidity_out_of_band_h": round(self.humidity_out_of_band_hours, 1),
+        }
+        for device, stats in self.devices.items():
+            row[f"{device}_switches"] = stats.switches
+            row[f"{device}_duty"] = round(stats.duty_cycle, 3)
+        return row
+
+
+def load_history(data_logger: GreenhouseDataLogger, start: datetime, end: datetime) -> Optional[pd.DataFrame]:
+    """
+    Load the sensor history for a date range, sorted by time.
+
+    Args:
+        data_logger: Logger to read from
+        start: First day (inclusive)
+        end: Last day (inclusive)
+
+    Returns:
+        DataFrame with timestamp, temperature and humidity columns, or None if no data
+    """
+    df = data_logger.get_date_range_data(start, end)
+    if df is None or df.empty:
+        return None
+    df = df[["timestamp", "temperature_celsius", "humidity_percent"]].dropna(subset=["temperature_celsius"])
+    return df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def sample_durations(timestamps: pd.Series) -> np.ndarray:
+    """
+    Time each sample's state is held until the next sample, in seconds.
+
+    The last sample gets the median interval, and gaps longer than GAP_FACTOR
+    median intervals are cut to one median interval so outages are not counted.
+
+    Args:
+        timestamps: Sorted sample timestamps
+
+    Returns:
+        Array of durations in seconds, one per sample
+    """
+    seconds = timestamps.to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9
+    durations = np.diff(seconds, append=np.nan)
+    median = np.nanmedian(durations) if len(durations) > 1 else 0.0
+    durations[-1] = median
+    return np.where(durations > GAP_FACTOR * median, median, durations)
+
+
+def backtest(settings: GreenhouseManagerSettings, history: pd.DataFrame, name: str = "settings") -> BacktestResult:
+    """
+    Replay history through a set of control settings.
+
+    Args:
+        settings: Candidate settings
+        history: History from load_history
+        name: Label for the result
+
+    Returns:
+        BacktestResult with per-device switch counts and duty cycles
+    """
+    temperature = history["temperature_celsius"].to_numpy(dtype=float)
+    humidity = history["humidity_percent"].to_numpy(dtype=float)
+    timestamps = history["timestamp"]
+    durations = sample_durations(timestamps)
+    total_seconds = float(durations.sum())
+    seconds_of_day = (timestamps.dt.hour * 3600 + timestamps.dt.minute * 60 + timestamps.dt.second).to_numpy()
+
+    control = settings.temperature_control
+    target, tolerance = control.target_temp_celsius, control.temp_tolerance_celsius
+    no_samples = np.zeros(len(temperature), dtype=bool)
+
+    heater = (hysteresis(temperature < target - tolerance, temperature > target)
+              if control.heater_enabled else no_samples)
+    vent_fan = (hysteresis(temperature > target + tolerance, temperature < target)
+                if control.vent_fan_enabled else no_samples)
+
+    # Every device with a role replays its own state; manual devices are never switched
+    states = {}
+    for device in settings.device_list():
+        if device.role == "heater":
+            states[device.id] = heater
+        elif device.role == "vent_fan":
+            states[device.id] = vent_fan
+        elif device.role == "schedule":
+            states[device.id] = schedule_mask(seconds_of_day, device.schedule)
+
+    result = BacktestResult(name=name, samples=len(temperature), hours=total_seconds / 3600)
+    for device, state in states.items():
+        on_seconds = float(durations[state].sum())
+        result.devices[device] = DeviceStats(
+            # The manager starts with every outlet off
+            switches=int(np.count_nonzero(np.diff(state.astype(np.int8), prepend=0))),
+            on_hours=on_seconds / 3600,
+            duty_cycle=on_seconds / total_seconds if total_seconds else 0.0
+        )
+
+    out_of_band = np.abs(temperature - target) > tolerance
+    result.temperature_out_of_band_hours = float(durations[out_of_band].sum()) / 3600
+    result.temperature_out_of_band_fraction = result.temperature_out_of_band_hours / result.hours if result.hours else 0.0
+
+    humidity_control = settings.humidity_control
+    humidity_out = np.abs(humidity - humidity_control.target_humidity_percent) > humidity_control.humidity_tolerance_percent
+    result.humidity_out_of_band_hours = float(durations[humidity_out].sum()) / 3600
+    return result
+
+
+def backtest_files(
+    config_paths: List[Path],
+    data_logger: GreenhouseDataLogger,
+    start: datetime,
+    end: datetime
+) -> List[BacktestResult]:
+    """
+    Backtest several settings files against the same history.
+
+    Args:
+        config_paths: Candidate settings JSON files
+        data_logger: Logger holding the history
+        start: First day (inclusive)
+        end: Last day (inclusive)
+
+    Returns:
+        One BacktestResult per settings file (empty if there is no history)
+    """
+    history = load_history(data_logger, start, end)
+    if history is None:
+        print(f"No history between {start:%Y-%m-%d} and {end:%Y-%m-%d}")
+        return []
+
+    results = []
+    for config_path in config_paths:
+        with open(config_path, 'r') as f:
+            settings = GreenhouseManagerSettings(**json.load(f))
+        results.append(backtest(settings, history, name=Path(config_path).stem))
+    return results
+
+
+def main():
+    """Backtest settings files from the command line and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Backtest control settings against historical logs")
+    parser.add_argument("configs", nargs="+", type=Path, help="Candidate settings JSON files")
+    parser.add_argument("--start", required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="Last day, YYYY-MM-DD")
+    parser.add_argument("--log-directory", default="data/logs", help="Directory holding the sensor logs")
+    parser.add_argument("--log-format", default="parquet", choices=["parquet", "feather"])
+    args = parser.parse_args()
+
+    data_logger = GreenhouseDataLogger(log_directory=args.log_directory, log_format=args.log_format)
+    results = backtest_files(
+        args.configs,
+        data_logger,
+        datetime.strptime(args.start, "%Y-%m-%d"),
+        datetime.strptime(args.end, "%Y-%m-%d")
+    )
+    if results:
+        print(pd.DataFrame([result.to_row() for result in results]).set_index("settings").T.to_string())
+
+
+if __name__ == "__main__":
+    main()
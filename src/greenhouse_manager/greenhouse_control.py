@@ -0,0 +1,309 @@
+"""
+Greenhouse Control
+
+Guards between control decisions and the RF outlets:
+- Exponential smoothing of the control input, so sensor noise does not
+  flip devices back and forth across a threshold
+- Minimum on and off dwell times per device to limit relay wear
+- A global token-bucket budget on RF transmissions
+- Periodic reassertion of each outlet's state on a jittered, backed-off
+  rotation within its own airtime budget
+
+Switches held back by a dwell time or the budget are counted in the
+greenhouse_rf_transmissions_avoided_total metric.
+"""
+
+import math
+import random
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+from greenhouse_manager.greenhouse_hardware_collection import RFOutlet
+from greenhouse_manager.greenhouse_manager_settings import Reassertion
+from greenhouse_manager.greenhouse_metrics import REGISTRY, Gauge
+
+if TYPE_CHECKING:
+    from greenhouse_manager.greenhouse_devices import Device
+
+
+RF_TRANSMISSIONS_AVOIDED = REGISTRY.counter(
+    "greenhouse_rf_transmissions_avoided_total",
+    "Outlet switches held back by a minimum dwell time or the RF budget",
+    ["device", "reason"]
+)
+RF_BUDGET_TOKENS = REGISTRY.gauge(
+    "greenhouse_rf_budget_tokens", "RF transmissions currently available in the budget"
+)
+RF_REASSERTIONS = REGISTRY.counter(
+    "greenhouse_rf_reassertions_total", "Outlet states re-sent by the reconciler", ["device"]
+)
+RF_REASSERTIONS_DEFERRED = REGISTRY.counter(
+    "greenhouse_rf_reassertions_deferred_total", "Due reassertions put off by the airtime budget"
+)
+
+# Reasons a switch was held back
+REASON_DWELL = "dwell"
+REASON_BUDGET = "budget"
+
+
+class ExponentialSmoother:
+    """
+    Exponential moving average for irregularly spaced samples.
+
+    The weight of each new sample depends on the time since the previous one,
+    so the response time stays the same if the read interval changes.
+
+    Attributes:
+        time_constant_seconds: Time for the average to cover ~63% of a step change
+            (0 passes samples through unchanged)
+        value: Current smoothed value, or None before the first sample
+    """
+
+    def __init__(self, time_constant_seconds: float = 0.0):
+        self.time_constant_seconds = time_constant_seconds
+        self.value: Optional[float] = None
+        self._last_time: Optional[float] = None
+
+    def update(self, sample: float, timestamp: float) -> float:
+        """
+        Add a sample and return the smoothed value.
+
+        Args:
+            sample: New reading
+            timestamp: Time of the reading in seconds
+
+        Returns:
+            Smoothed value
+        """
+        if self.value is None or self.time_constant_seconds <= 0:
+            self.value = sample
+        else:
+            elapsed = max(0.0, timestamp - self._last_time)
+            alpha = 1 - math.exp(-elapsed / self.time_constant_seconds)
+            self.value += alpha * (sample - self.value)
+        self._last_time = timestamp
+        return self.value
+
+    def reset(self):
+        """Forget the smoothed value."""
+        self.value = None
+        self._last_time = None
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Attributes:
+        rate_per_hour: Tokens added per hour
+        capacity: Maximum tokens held (the largest allowed burst)
+        clock: Time source
+        gauge: Optional gauge updated with the tokens left after each acquisition
+    """
+
+    def __init__(
+        self,
+        rate_per_hour: float,
+        capacity: int,
+        clock: Clock = SYSTEM_CLOCK,
+        gauge: Optional[Gauge] = RF_BUDGET_TOKENS
+    ):
+        self.rate_per_hour = rate_per_hour
+        self.capacity = capacity
+        self.clock = clock
+        self.gauge = gauge
+        self._tokens = float(capacity)
+        self._last_refill = clock.time()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock.time()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate_per_hour / 3600)
+        self._last_refill = now
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self) -> bool:
+        """
+        Take one token if available.
+
+        Returns:
+            True if a token was taken, False if the budget is exhausted
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            if self.gauge is not None:
+                self.gauge.set(self._tokens)
+            return True
+
+
+class SwitchController:
+    """
+    Switches outlets subject to minimum dwell times and an RF budget.
+
+    Attributes:
+        clock: Time source for dwell times
+        budget: Optional RF transmission budget shared by all outlets
+    """
+
+    def __init__(self, clock: Clock = SYSTEM_CLOCK, budget: Optional[TokenBucket] = None):
+        self.clock = clock
+        self.budget = budget
+        self._last_switch: Dict[str, float] = {}
+
+    def restore_switch_time(self, outlet: RFOutlet, switched_at: float):
+        """
+        Set when an outlet was last switched, e.g. from a state journal, so dwell times survive restarts.
+
+        Args:
+            outlet: Outlet
+            switched_at: Time of the last switch in seconds since the epoch
+        """
+        self._last_switch[outlet.name] = switched_at
+
+    def seconds_since_switch(self, outlet: RFOutlet) -> Optional[float]:
+        """Seconds since the controller last switched an outlet, or None if never."""
+        last = self._last_switch.get(outlet.name)
+        return None if last is None else self.clock.time() - last
+
+    def set_state(
+        self,
+        outlet: RFOutlet,
+        state: bool,
+        min_on_seconds: float = 0,
+        min_off_seconds: float = 0,
+        source: str = "manual"
+    ) -> bool:
+        """
+        Switch an outlet to a state if its dwell time and the RF budget allow.
+
+        Args:
+            outlet: Outlet to switch
+            state: Desired state (True for on)
+            min_on_seconds: Minimum time the outlet stays on once switched on
+            min_off_seconds: Minimum time the outlet stays off once switched off
+            source: What asked for the switch, passed on to the outlet
+
+        Returns:
+            True if a command was sent, False if the outlet was already in that
+            state or the switch was held back
+        """
+        if outlet.get_state() == state:
+            return False
+
+        # An outlet currently on must have been on for min_on_seconds, and vice versa
+        dwell = min_on_seconds if outlet.get_state() else min_off_seconds
+        elapsed = self.seconds_since_switch(outlet)
+        if elapsed is not None and elapsed < dwell:
+            RF_TRANSMISSIONS_AVOIDED.labels(outlet.name, REASON_DWELL).inc()
+            return False
+
+        if self.budget is not None and not self.budget.try_acquire():
+            RF_TRANSMISSIONS_AVOIDED.labels(outlet.name, REASON_BUDGET).inc()
+            return False
+
+        if state:
+            outlet.turn_on(source)
+        else:
+            outlet.turn_off(source)
+        self._last_switch[outlet.name] = self.clock.time()
+        return True
+
+
+class StateReconciler:
+    """
+    Re-sends the current state of each outlet, so a missed RF command is eventually corrected.
+
+    Each device is reasserted on its own jittered interval. The interval
+    starts at interval_seconds when the device switches and grows by
+    backoff_factor after every reassertion, up to max_interval_seconds. At
+    most one code is sent per call, never within min_gap_seconds of another
+    transmission seen by the reconciler, and only while the airtime budget
+    allows. Devices seen for the first time are spread over one interval.
+
+    Attributes:
+        settings: Reassertion settings
+        clock: Time source
+        budget: Airtime budget, in transmissions
+    """
+
+    def __init__(self, settings: Reassertion, clock: Clock = SYSTEM_CLOCK, rng: Optional[random.Random] = None):
+        self.settings = settings
+        self.clock = clock
+        self.budget = TokenBucket(
+            settings.max_airtime_seconds_per_hour / settings.airtime_per_code_seconds,
+            capacity=1,
+            clock=clock,
+            gauge=None
+        )
+        self._random = rng or random.Random()
+        self._states: Dict[str, bool] = {}
+        self._intervals: Dict[str, float] = {}
+        self._due: Dict[str, float] = {}
+        self._last_transmission = -math.inf
+
+    def _schedule(self, device_id: str, now: float, interval: float):
+        jitter = self.settings.jitter_fraction
+        self._intervals[device_id] = interval
+        self._due[device_id] = now + interval * self._random.uniform(1 - jitter, 1 + jitter)
+
+    def seconds_until_due(self, device_id: str) -> Optional[float]:
+        """Seconds until a device's next reassertion, or None if it is not tracked."""
+        due = self._due.get(device_id)
+        return None if due is None else due - self.clock.time()
+
+    def run(self, devices: Iterable["Device"]) -> Optional[str]:
+        """
+        Track switches and reassert the most overdue device, if any is due.
+
+        Args:
+            devices: Current devices
+
+        Returns:
+            Id of the device reasserted, or None
+        """
+        now = self.clock.time()
+        current: Dict[str, "Device"] = {}
+        for device in devices:
+            current[device.id] = device
+            state = device.get_state()
+            previous = self._states.get(device.id)
+            if previous is None:
+                self._intervals[device.id] = self.settings.interval_seconds
+                self._due[device.id] = now + self._random.uniform(0, self.settings.interval_seconds)
+            elif previous != state:
+                # Switched since the last call: that was a transmission, and the interval starts over
+                self._last_transmission = now
+                self._schedule(device.id, now, self.settings.interval_seconds)
+            self._states[device.id] = state
+
+        for device_id in set(self._states) - set(current):
+            del self._states[device_id], self._intervals[device_id], self._due[device_id]
+
+        if now - self._last_transmission < self.settings.min_gap_seconds:
+            return None
+        due = [(due_at, device_id) for device_id, due_at in self._due.items() if due_at <= now]
+        if not due:
+            return None
+        if not self.budget.try_acquire():
+            RF_REASSERTIONS_DEFERRED.inc()
+            return None
+
+        _, device_id = min(due)
+        current[device_id].outlet.reassert()
+        RF_REASSERTIONS.labels(device_id).inc()
+        self._last_transmission = now
+        self._schedule(
+            device_id, now,
+            min(self._intervals[device_id] * self.settings.backoff_factor, self.settings.max_interval_seconds)
+        )
+        return device_id
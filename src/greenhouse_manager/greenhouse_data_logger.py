@@ -4,14 +4,124 @@ Greenhouse Data Logger
 Class for managing greenhouse sensor and state data logging.
 Stores data in space-efficient binary formats (Parquet or Feather).
 Creates one log file per day.
+
+Device switches are kept in an append-only 'transitions' dataset, from which
+on-time and duty cycles are computed for any time window. Per-device energy
+totals are kept per day ('energy') and per month ('energy_monthly').
+
+In deadband mode a sensor sample is only written when a channel moves by its
+deadband, a device changes state or a heartbeat is due. Such files are marked
+in their metadata, and reads fill the gaps with the last logged values.
+
+Readings at the sensor rate can be spilled to a compact 'raw' dataset, which
+is kept separately for a short retention window.
+
+The append-only datasets ('channels', 'transitions' and 'raw') are written one
+segment file per batch under 'segments/', so an append costs the size of the
+batch rather than of the day so far. Reads combine a day's file with its
+segments, and the segments of finished days are merged into the day's file on
+flush and during log cleanup.
+
+With a staging directory on a RAM-backed filesystem (such as /run or /dev/shm),
+the current day's files are written there and checkpointed to the log
+directory periodically and on flush. Checkpoints are copied to a temporary
+file and renamed into place, so a power failure loses at most the data since
+the last checkpoint and never leaves a torn file. Staged files left by a
+process that did not shut down cleanly are promoted on the next checkpoint.
 """
 
+import math
 import os
-from datetime import datetime, timedelta
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+import numpy as np
 import pandas as pd
 
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+from greenhouse_manager.greenhouse_metrics import REGISTRY
+
+
+# Columns used to annotate other data (such as camera images) with conditions,
+# along with every '<device>_state' column in the log
+CONDITION_COLUMNS = [
+    "temperature_celsius",
+    "humidity_percent",
+    "pressure_hpa",
+    "heater_state",
+    "vent_fan_state",
+    "grow_lights_state",
+    "stand_fan_state"
+]
+
+
+def condition_columns(available: Sequence[str]) -> List[str]:
+    """
+    Condition columns present in a log, including any device state columns.
+
+    Args:
+        available: Column names of the log
+
+    Returns:
+        'timestamp' followed by the condition columns found in the log
+    """
+    state_columns = [c for c in available if c.endswith("_state") and c not in CONDITION_COLUMNS]
+    return ["timestamp"] + [c for c in CONDITION_COLUMNS if c in available] + state_columns
+
+# Long-format layout of the 'channels' dataset written for pluggable sensors
+CHANNEL_COLUMNS = ["timestamp", "sensor", "channel", "value"]
+
+# Buffered channel readings are written once this many rows or seconds have accumulated
+CHANNEL_FLUSH_ROWS = 500
+CHANNEL_FLUSH_SECONDS = 600
+
+# Append-only layout of the 'transitions' dataset of device switches
+TRANSITION_COLUMNS = ["timestamp", "device", "state", "source"]
+
+# Buffered transitions are written once this many rows or seconds have accumulated
+TRANSITION_FLUSH_ROWS = 100
+TRANSITION_FLUSH_SECONDS = 600
+
+# Days searched before a window for the state each device was in when it started
+TRANSITION_LOOKBACK_DAYS = 31
+
+# Per-device energy totals, one row per device in each daily or monthly file
+ENERGY_COLUMNS = ["device", "on_seconds", "energy_kwh", "cost"]
+
+# Sensor readings at the sensor rate, stored as float32
+RAW_COLUMNS = ["timestamp", "temperature_celsius", "humidity_percent", "pressure_hpa"]
+
+# Append-only datasets written as segment files, with the columns stored as categoricals
+SEGMENTED_DATASETS = {
+    "channels": ["sensor", "channel"],
+    "transitions": ["device", "source"],
+    "raw": [],
+}
+
+# Logging modes: a sample every log interval, or only on change (with heartbeats)
+MODE_INTERVAL = "interval"
+MODE_DEADBAND = "deadband"
+
+# Storage instrumentation
+LOG_WRITE_SECONDS = REGISTRY.histogram(
+    "greenhouse_log_write_seconds", "Time taken to write a log file", ["dataset"]
+)
+LOG_WRITE_BYTES = REGISTRY.counter(
+    "greenhouse_log_write_bytes_total", "Bytes written to log files", ["dataset"]
+)
+LOG_STAGED_BYTES = REGISTRY.counter(
+    "greenhouse_log_staged_bytes_total", "Bytes written to log files in the staging directory", ["dataset"]
+)
+LOG_WRITE_BYTES_TODAY = REGISTRY.gauge(
+    "greenhouse_log_write_bytes_today", "Bytes written to log files since midnight", ["storage"]
+)
+LOG_SAMPLES_SKIPPED = REGISTRY.counter(
+    "greenhouse_log_samples_skipped_total", "Samples not logged in deadband mode because nothing changed"
+)
+
 
 class GreenhouseDataLogger:
     """
@@ -19,15 +129,32 @@ class GreenhouseDataLogger:
 
     Attributes:
         log_directory: Directory path for storing log files
+        segment_directory: Directory holding the segments of the append-only datasets
         log_format: Format for log files ('parquet' or 'feather')
         max_log_days: Maximum number of days to retain log files
+        clock: Time source for default timestamps and log cleanup
+        mode: 'interval' to log every sample, 'deadband' to log only changes and heartbeats
+        deadbands: Change in each column that triggers a sample in deadband mode
+        heartbeat_seconds: Longest time between samples in deadband mode
+        log_interval_seconds: Interval between samples offered to log_data,
+            used to fill the gaps between deadband samples when reading
+        staging_directory: RAM-backed directory holding the current day's files
+            until they are checkpointed, or None to write to log_directory directly
+        checkpoint_interval_seconds: Interval between checkpoints of staged files
     """
 
     def __init__(
         self,
         log_directory: str = "data/logs",
         log_format: str = "parquet",
-        max_log_days: int = 365
+        max_log_days: int = 365,
+        clock: Clock = SYSTEM_CLOCK,
+        mode: str = MODE_INTERVAL,
+        deadbands: Optional[Dict[str, float]] = None,
+        heartbeat_seconds: float = 900,
+        log_interval_seconds: float = 60,
+        staging_directory: Optional[str] = None,
+        checkpoint_interval_seconds: float = 900
     ):
         """
         Initialize the data logger.
@@ -36,37 +163,234 @@ class GreenhouseDataLogger:
             log_directory: Directory for storing log files
             log_format: File format ('parquet' or 'feather')
             max_log_days: Days to keep old log files before cleanup
+            clock: Time source (defaults to the system clock)
+            mode: Logging mode ('interval' or 'deadband')
+            deadbands: Deadband per column for deadband mode
+            heartbeat_seconds: Longest time between samples in deadband mode
+            log_interval_seconds: Interval between samples offered to log_data
+            staging_directory: Directory for the current day's files until checkpointed
+            checkpoint_interval_seconds: Interval between checkpoints of staged files
         """
         self.log_directory = Path(log_directory)
+        self.segment_directory = self.log_directory / "segments"
         self.log_format = log_format.lower()
         self.max_log_days = max_log_days
+        self.clock = clock
+        self.mode = mode
+        self.deadbands = dict(deadbands or {})
+        self.heartbeat_seconds = heartbeat_seconds
+        self.log_interval_seconds = log_interval_seconds
+        self.staging_directory = Path(staging_directory) if staging_directory else None
+        self.checkpoint_interval_seconds = checkpoint_interval_seconds
 
         # Validate log format
         if self.log_format not in ["parquet", "feather"]:
             raise ValueError(f"Invalid log format: {log_format}. Must be 'parquet' or 'feather'")
+        if self.mode not in (MODE_INTERVAL, MODE_DEADBAND):
+            raise ValueError(f"Invalid logging mode: {mode}. Must be '{MODE_INTERVAL}' or '{MODE_DEADBAND}'")
 
         # Create log directory if it doesn't exist
         self.log_directory.mkdir(parents=True, exist_ok=True)
 
+        # Staged files by name with the modification time of the copy last checkpointed;
+        # staged files already older than their checkpoint need no promotion
+        self._checkpointed: Dict[str, int] = {}
+        self._checkpoint_lock = threading.Lock()
+        self._last_checkpoint = clock.time()
+        if self.staging_directory is not None:
+            self.staging_directory.mkdir(parents=True, exist_ok=True)
+            for staged_file in self.staging_directory.glob(f"greenhouse_*.{self.log_format}"):
+                log_file = self.log_directory / staged_file.name
+                staged_mtime = staged_file.stat().st_mtime_ns
+                if log_file.exists() and log_file.stat().st_mtime_ns >= staged_mtime:
+                    self._checkpointed[staged_file.name] = staged_mtime
+
+        # Bytes written today to the log directory ('persistent') and the staging directory ('staged')
+        self._write_day = None
+        self._bytes_written_today = {"persistent": 0, "staged": 0}
+        self._write_lock = threading.Lock()
+
         # Cache for current day's data
         self._current_date: Optional[datetime] = None
         self._current_dataframe: Optional[pd.DataFrame] = None
 
+        # Deadband mode: last record written and when the day's log was last saved
+        self._last_record: Optional[Dict[str, Any]] = None
+        self._last_save: Optional[datetime] = None
+
+        # Pluggable sensor readings waiting to be written to the channels dataset
+        self._channel_buffer: List[Tuple[datetime, str, str, float]] = []
+
+        # Last segment number written per (dataset, date); segments come from several threads
+        self._segment_numbers: Dict[Tuple[str, str], int] = {}
+        self._segment_lock = threading.Lock()
+
+        # Device transitions waiting to be written; switches can come from button threads
+        self._transition_buffer: List[Tuple[datetime, str, bool, str]] = []
+        self._transition_lock = threading.Lock()
+
+        # Small LRU cache of per-day condition columns, keyed by file path and mtime
+        self._conditions_cache: "OrderedDict[Path, Tuple[float, pd.DataFrame]]" = OrderedDict()
+        self._conditions_cache_size = 8
+
         print(f"GreenhouseDataLogger initialized: {self.log_directory} (format: {self.log_format})")
 
-    def _get_log_filename(self, date: datetime) -> Path:
+    def _get_log_filename(self, date: datetime, dataset: str = "log") -> Path:
         """
         Generate the log filename for a given date.
 
         Args:
             date: Date for the log file
+            dataset: Dataset name ('log' for raw sensor data, 'rollup' for rollups,
+                'image_metrics' for camera image metrics, 'channels' for pluggable sensors,
+                'transitions' for device switches, 'energy' and 'energy_monthly' for
+                energy totals, 'raw' for readings at the sensor rate)
 
         Returns:
-            Path object for the log file
+            Path object for the log file (the staged copy if there is one)
         """
         date_str = date.strftime("%Y-%m-%d")
         extension = self.log_format
-        return self.log_directory / f"greenhouse_log_{date_str}.{extension}"
+        filename = f"greenhouse_{dataset}_{date_str}.{extension}"
+        if self.staging_directory is not None and (self.staging_directory / filename).exists():
+            # A staged copy is never older than the checkpointed one
+            return self.staging_directory / filename
+        return self.log_directory / filename
+
+    def _read_log_file(self, log_file: Path) -> pd.DataFrame:
+        """
+        Read a log file in the configured format.
+
+        Args:
+            log_file: Path to the log file
+
+        Returns:
+            DataFrame with the file contents
+        """
+        if self.log_format == "parquet":
+            return pd.read_parquet(log_file)
+        return pd.read_feather(log_file)
+
+    def _write_log_file(self, df: pd.DataFrame, log_file: Path):
+        """
+        Write a DataFrame to a log file in the configured format.
+
+        With a staging directory, files of the current day (and files already
+        staged) are written there instead, replacing the staged copy atomically.
+
+        Args:
+            df: DataFrame to write
+            log_file: Destination path
+        """
+        dataset, date_str = log_file.stem.removeprefix("greenhouse_").rsplit('_', 1)
+        staged = self.staging_directory is not None and (
+            log_file.parent == self.staging_directory or date_str == self.clock.now().strftime("%Y-%m-%d")
+        )
+        with LOG_WRITE_SECONDS.labels(dataset).time():
+            if staged:
+                log_file = self.staging_directory / log_file.name
+                temp_file = log_file.with_name(f".{log_file.name}.tmp")
+                self._write_frame(df, temp_file)
+                os.replace(temp_file, log_file)
+            else:
+                self._write_frame(df, log_file)
+        size = log_file.stat().st_size
+        if staged:
+            LOG_STAGED_BYTES.labels(dataset).inc(size)
+        else:
+            LOG_WRITE_BYTES.labels(dataset).inc(size)
+        self._count_write("staged" if staged else "persistent", size)
+
+    def _write_frame(self, df: pd.DataFrame, path: Path):
+        """Write a DataFrame to a path in the configured format."""
+        if self.log_format == "parquet":
+            df.to_parquet(path, index=False, compression='snappy')
+        else:  # feather
+            df.reset_index(drop=True).to_feather(path)
+
+    def _count_write(self, storage: str, size: int):
+        """Add a write to today's byte count for 'persistent' or 'staged' storage."""
+        with self._write_lock:
+            today = self.clock.now().date()
+            if today != self._write_day:
+                if self._write_day is not None:
+                    print(f"Log writes on {self._write_day}: {self._bytes_written_today['persistent']} bytes "
+                          f"to storage, {self._bytes_written_today['staged']} bytes staged")
+                self._write_day = today
+                self._bytes_written_today = {"persistent": 0, "staged": 0}
+            self._bytes_written_today[storage] += size
+            for name, total in self._bytes_written_today.items():
+                LOG_WRITE_BYTES_TODAY.labels(name).set(total)
+
+    def bytes_written_today(self) -> Dict[str, int]:
+        """
+        Bytes written to log files since midnight.
+
+        Returns:
+            Dictionary with the bytes written to the log directory ('persistent',
+            including checkpoints) and to the staging directory ('staged')
+        """
+        with self._write_lock:
+            if self._write_day != self.clock.now().date():
+                return {"persistent": 0, "staged": 0}
+            return dict(self._bytes_written_today)
+
+    def checkpoint(self) -> int:
+        """
+        Copy staged files changed since their last checkpoint to the log directory.
+
+        Each file is copied to a temporary file, synced and renamed over the
+        previous checkpoint. Staged files of past days are removed once copied.
+
+        Returns:
+            Number of bytes written to the log directory
+        """
+        if self.staging_directory is None:
+            return 0
+        written = 0
+        with self._checkpoint_lock:
+            today = self.clock.now().strftime("%Y-%m-%d")
+            for staged_file in sorted(self.staging_directory.glob(f"greenhouse_*.{self.log_format}")):
+                log_file = self.log_directory / staged_file.name
+                temp_file = log_file.with_name(f".{log_file.name}.tmp")
+                try:
+                    staged_mtime = staged_file.stat().st_mtime_ns
+                    if self._checkpointed.get(staged_file.name) != staged_mtime:
+                        shutil.copyfile(staged_file, temp_file)
+                        with open(temp_file, "rb+") as f:
+                            os.fsync(f.fileno())
+                        os.replace(temp_file, log_file)
+                        self._checkpointed[staged_file.name] = staged_mtime
+                        size = log_file.stat().st_size
+                        LOG_WRITE_BYTES.labels(staged_file.stem.removeprefix("greenhouse_").rsplit('_', 1)[0]).inc(size)
+                        self._count_write("persistent", size)
+                        written += size
+                    if staged_file.stem.rsplit('_', 1)[1] < today:
+                        staged_file.unlink()
+                        self._checkpointed.pop(staged_file.name, None)
+                except Exception as e:
+                    print(f"Error checkpointing {staged_file}: {e}")
+            if written:
+                # Make the renames themselves durable
+                directory = os.open(self.log_directory, os.O_RDONLY)
+                try:
+                    os.fsync(directory)
+                finally:
+                    os.close(directory)
+            self._last_checkpoint = self.clock.time()
+        return written
+
+    def checkpoint_if_due(self) -> int:
+        """
+        Checkpoint staged files if checkpoint_interval_seconds have passed since the last checkpoint.
+
+        Returns:
+            Number of bytes written to the log directory
+        """
+        if (self.staging_directory is None or
+                self.clock.time() - self._last_checkpoint < self.checkpoint_interval_seconds):
+            return 0
+        return self.checkpoint()
 
     def _load_daily_log(self, date: datetime) -> pd.DataFrame:
         """
@@ -82,11 +406,7 @@ class GreenhouseDataLogger:
 
         if log_file.exists():
             try:
-                if self.log_format == "parquet":
-                    df = pd.read_parquet(log_file)
-                else:  # feather
-                    df = pd.read_feather(log_file)
-
+                df = self._read_log_file(log_file)
                 print(f"Loaded existing log file: {log_file} ({len(df)} records)")
                 return df
             except Exception as e:
@@ -107,11 +427,8 @@ class GreenhouseDataLogger:
         log_file = self._get_log_filename(date)
 
         try:
-            if self.log_format == "parquet":
-                df.to_parquet(log_file, index=False, compression='snappy')
-            else:  # feather
-                df.to_feather(log_file)
-
+            self._write_log_file(df, log_file)
+            self._last_save = self.clock.now()
             print(f"Saved log file: {log_file} ({len(df)} records)")
         except Exception as e:
             print(f"Error saving log file {log_file}: {e}")
@@ -120,6 +437,9 @@ class GreenhouseDataLogger:
         """
         Get the standard column names for log data.
 
+        Device state columns depend on the configured devices and are added
+        as records are logged.
+
         Returns:
             List of column names
         """
@@ -129,11 +449,7 @@ class GreenhouseDataLogger:
             "time_24hr",
             "temperature_celsius",
             "humidity_percent",
-            "pressure_hpa",
-            "heater_state",
-            "vent_fan_state",
-            "grow_lights_state",
-            "stand_fan_state"
+            "pressure_hpa"
         ]
 
     def log_data(
@@ -141,15 +457,20 @@ class GreenhouseDataLogger:
         temperature: float,
         humidity: float,
         pressure: float,
-        heater_state: bool,
-        vent_fan_state: bool,
-        grow_lights_state: bool,
-        stand_fan_state: bool,
-        timestamp: Optional[datetime] = None
-    ):
+        heater_state: Optional[bool] = None,
+        vent_fan_state: Optional[bool] = None,
+        grow_lights_state: Optional[bool] = None,
+        stand_fan_state: Optional[bool] = None,
+        timestamp: Optional[datetime] = None,
+        sensor_stats: Optional[Dict[str, float]] = None,
+        device_states: Optional[Dict[str, bool]] = None
+    ) -> bool:
         """
         Log greenhouse sensor readings and device states.
 
+        In deadband mode the sample is skipped unless it differs enough from
+        the last one logged.
+
         Args:
             temperature: Temperature in Celsius
             humidity: Humidity percentage
@@ -159,9 +480,16 @@ class GreenhouseDataLogger:
             grow_lights_state: True if grow lights are on
             stand_fan_state: True if stand fan is on
             timestamp: Optional timestamp (defaults to current time)
+            sensor_stats: Optional extra columns describing the reading, such as
+                the min, max and standard deviation of an oversampled interval
+            device_states: Optional states by device id, each logged as a
+                '<id>_state' column (takes precedence over the named states)
+
+        Returns:
+            True if the sample was logged
         """
         if timestamp is None:
-            timestamp = datetime.now()
+            timestamp = self.clock.now()
 
         # Create data record
         record = {
@@ -171,11 +499,20 @@ class GreenhouseDataLogger:
             "temperature_celsius": temperature,
             "humidity_percent": humidity,
             "pressure_hpa": pressure,
-            "heater_state": heater_state,
-            "vent_fan_state": vent_fan_state,
-            "grow_lights_state": grow_lights_state,
-            "stand_fan_state": stand_fan_state
         }
+        named_states = {
+            "heater": heater_state,
+            "vent_fan": vent_fan_state,
+            "grow_lights": grow_lights_state,
+            "stand_fan": stand_fan_state,
+        }
+        for device_id, state in named_states.items():
+            if state is not None:
+                record[f"{device_id}_state"] = state
+        for device_id, state in (device_states or {}).items():
+            record[f"{device_id}_state"] = state
+        if sensor_stats:
+            record.update(sensor_stats)
 
         # Check if we need to start a new day's log
         current_date = timestamp.date()
@@ -187,42 +524,739 @@ class GreenhouseDataLogger:
             # Load or create new day's DataFrame
             self._current_date = current_date
             self._current_dataframe = self._load_daily_log(timestamp)
+            self._last_record = None
+            if self.mode == MODE_DEADBAND:
+                # Stored in the file's metadata; readers fill the gaps between samples from it
+                self._current_dataframe.attrs.update(
+                    logging_mode=MODE_DEADBAND,
+                    log_interval_seconds=self.log_interval_seconds,
+                    heartbeat_seconds=self.heartbeat_seconds
+                )
+
+        if self.mode == MODE_DEADBAND and not self._sample_changed(record):
+            LOG_SAMPLES_SKIPPED.inc()
+            return False
+        self._last_record = record
 
         # Append new record to current DataFrame
+        attrs = self._current_dataframe.attrs
         new_row = pd.DataFrame([record])
         self._current_dataframe = pd.concat([self._current_dataframe, new_row], ignore_index=True)
+        self._current_dataframe.attrs = attrs
 
-        # Periodically save to disk (every 10 records to balance performance and data safety)
-        if len(self._current_dataframe) % 10 == 0:
+        # Periodically save to disk (every 10 records to balance performance and data safety);
+        # deadband samples are sparse, so they are also saved at least once a heartbeat
+        if (len(self._current_dataframe) % 10 == 0 or
+                (self.mode == MODE_DEADBAND and (self._last_save is None or
+                 (timestamp - self._last_save).total_seconds() >= self.heartbeat_seconds))):
             self._save_daily_log(self._current_dataframe, timestamp)
+        return True
+
+    def _sample_changed(self, record: Dict[str, Any]) -> bool:
+        """
+        Decide whether a deadband-mode sample differs enough from the last one logged.
+
+        Args:
+            record: Sample about to be logged
+
+        Returns:
+            True if the heartbeat is due, a device changed state or a column
+            moved by at least its deadband
+        """
+        last = self._last_record
+        if last is None:
+            return True
+        if (record["timestamp"] - last["timestamp"]).total_seconds() >= self.heartbeat_seconds:
+            return True
+        for column, value in record.items():
+            if column.endswith("_state") and last.get(column) != value:
+                return True
+        for column, band in self.deadbands.items():
+            value, previous = record.get(column), last.get(column)
+            if value is None or previous is None:
+                if value is not previous:
+                    return True
+                continue
+            if math.isnan(value) != math.isnan(previous) or abs(value - previous) >= band:
+                return True
+        return False
+
+    def _fill_steps(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fill the gaps between deadband-mode samples with the last logged values.
+
+        A row is added every log interval between consecutive samples, so the
+        result reads like an interval-mode log. Other logs are returned unchanged.
+
+        Args:
+            df: Log rows, with the file's metadata in df.attrs
+
+        Returns:
+            DataFrame of step-wise samples
+        """
+        if df.attrs.get("logging_mode") != MODE_DEADBAND or len(df) < 2:
+            return df
+        interval = float(df.attrs.get("log_interval_seconds", 60))
+        attrs = dict(df.attrs)
+
+        df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+        timestamps = pd.to_datetime(df["timestamp"])
+        gaps = (timestamps.shift(-1) - timestamps).dt.total_seconds().fillna(0).to_numpy()
+        # Samples fall on log intervals, so a gap of n intervals holds n - 1 skipped samples
+        repeats = np.maximum(np.floor(gaps / interval + 0.5).astype(int), 1)
+        if (repeats == 1).all():
+            return df
+
+        filled = df.loc[df.index.repeat(repeats)].reset_index(drop=True)
+        steps = np.arange(len(filled)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        filled["timestamp"] = (timestamps.iloc[np.repeat(np.arange(len(df)), repeats)].reset_index(drop=True)
+                               + pd.to_timedelta(steps * interval, unit="s"))
+        if "date" in filled.columns:
+            filled["date"] = filled["timestamp"].dt.strftime("%Y-%m-%d")
+        if "time_24hr" in filled.columns:
+            filled["time_24hr"] = filled["timestamp"].dt.strftime("%H:%M:%S")
+        filled.attrs = attrs
+        return filled
+
+    def log_image_metrics(
+        self,
+        filename: str,
+        canopy_fraction: float,
+        mean_luminance: float,
+        histogram_red: List[float],
+        histogram_green: List[float],
+        histogram_blue: List[float],
+        timestamp: Optional[datetime] = None
+    ):
+        """
+        Log metrics extracted from a camera capture.
+
+        Metrics are kept in their own daily 'image_metrics' dataset next to the
+        sensor log. Captures are infrequent, so each entry is written straight away.
+
+        Args:
+            filename: Filename of the analysed capture
+            canopy_fraction: Fraction of pixels classified as green canopy
+            mean_luminance: Mean luminance in [0, 1]
+            histogram_red: Normalised red channel histogram
+            histogram_green: Normalised green channel histogram
+            histogram_blue: Normalised blue channel histogram
+            timestamp: Optional timestamp (defaults to current time)
+        """
+        if timestamp is None:
+            timestamp = self.clock.now()
+
+        record = {
+            "timestamp": timestamp,
+            "date": timestamp.strftime("%Y-%m-%d"),
+            "time_24hr": timestamp.strftime("%H:%M:%S"),
+            "filename": filename,
+            "canopy_fraction": canopy_fraction,
+            "mean_luminance": mean_luminance,
+            "histogram_red": histogram_red,
+            "histogram_green": histogram_green,
+            "histogram_blue": histogram_blue
+        }
+
+        metrics_file = self._get_log_filename(timestamp, "image_metrics")
+        new_row = pd.DataFrame([record])
+        try:
+            if metrics_file.exists():
+                new_row = pd.concat([self._read_log_file(metrics_file), new_row], ignore_index=True)
+            self._write_log_file(new_row, metrics_file)
+        except Exception as e:
+            print(f"Error saving image metrics {metrics_file}: {e}")
+
+    def log_channel_readings(self, readings: Sequence[Tuple[datetime, str, str, float]]):
+        """
+        Log readings from pluggable sensors to the long-format 'channels' dataset.
+
+        Readings are buffered and appended to the day's segments in batches, so
+        frequent small reads do not write a file each time.
+
+        Args:
+            readings: (timestamp, sensor, channel, value) tuples
+        """
+        if not readings:
+            return
+        if self._channel_buffer and readings[0][0].date() != self._channel_buffer[0][0].date():
+            self._flush_channels()
+        self._channel_buffer.extend(readings)
+
+        oldest = self._channel_buffer[0][0]
+        if (len(self._channel_buffer) >= CHANNEL_FLUSH_ROWS or
+                (self.clock.now() - oldest).total_seconds() >= CHANNEL_FLUSH_SECONDS):
+            self._flush_channels()
+
+    def _channel_frame(self, readings: Sequence[Tuple[datetime, str, str, float]]) -> pd.DataFrame:
+        """Build a channels DataFrame with categorical sensor and channel columns."""
+        df = pd.DataFrame(list(readings), columns=CHANNEL_COLUMNS)
+        return df.astype({"timestamp": "datetime64[ns]", "sensor": "category", "channel": "category", "value": "float64"})
+
+    def _segment_files(self, date: datetime, dataset: str) -> List[Path]:
+        """
+        List a day's segment files of an append-only dataset.
+
+        Args:
+            date: Date of the segments
+            dataset: Dataset name
+
+        Returns:
+            Paths of the segments in the order they were written
+        """
+        pattern = f"greenhouse_{dataset}_{date.strftime('%Y-%m-%d')}_*.{self.log_format}"
+        return sorted(self.segment_directory.glob(pattern), key=lambda path: int(path.stem.rsplit('_', 1)[1]))
+
+    def _append_to_daily_files(self, df: pd.DataFrame, dataset: str):
+        """
+        Append rows to an append-only dataset as a new segment file per day.
+
+        Args:
+            df: Rows with a 'timestamp' column
+            dataset: Dataset name
+        """
+        for day, day_df in df.groupby(df["timestamp"].dt.normalize()):
+            try:
+                self._write_segment(day_df.reset_index(drop=True), day, dataset)
+            except Exception as e:
+                print(f"Error saving {dataset} segment for {day.strftime('%Y-%m-%d')}: {e}")
+
+    def _write_segment(self, df: pd.DataFrame, date: datetime, dataset: str):
+        """
+        Write rows to the next segment file of a day.
+
+        Segments are written once, so they go straight to the log directory,
+        through a temporary file renamed into place.
+
+        Args:
+            df: Rows of a single day
+            date: Date of the rows
+            dataset: Dataset name
+        """
+        date_str = date.strftime("%Y-%m-%d")
+        with self._segment_lock:
+            self.segment_directory.mkdir(parents=True, exist_ok=True)
+            key = (dataset, date_str)
+            if key not in self._segment_numbers:
+                written = self._segment_files(date, dataset)
+                self._segment_numbers[key] = int(written[-1].stem.rsplit('_', 1)[1]) if written else 0
+            self._segment_numbers[key] += 1
+            segment = self.segment_directory / f"greenhouse_{dataset}_{date_str}_{self._segment_numbers[key]:04d}.{self.log_format}"
+
+        temp_file = segment.with_name(f".{segment.name}.tmp")
+        with LOG_WRITE_SECONDS.labels(dataset).time():
+            self._write_frame(df, temp_file)
+            os.replace(temp_file, segment)
+        size = segment.stat().st_size
+        LOG_WRITE_BYTES.labels(dataset).inc(size)
+        self._count_write("persistent", size)
+
+    def _read_daily_dataset(self, date: datetime, dataset: str) -> Optional[pd.DataFrame]:
+        """
+        Read a day of an append-only dataset from the day's file and its segments.
+
+        Args:
+            date: Date to read
+            dataset: Dataset name
+
+        Returns:
+            DataFrame of the day's rows in the order they were written, or None if there are none
+        """
+        frames = []
+        for path in [self._get_log_filename(date, dataset)] + self._segment_files(date, dataset):
+            if not path.exists():
+                continue
+            try:
+                frames.append(self._read_log_file(path))
+            except Exception as e:
+                print(f"Error loading {dataset} {path}: {e}")
+        if not frames:
+            return None
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        return df.astype({column: "category" for column in SEGMENTED_DATASETS[dataset]})
+
+    def compact_segments(self) -> int:
+        """
+        Merge the segments of days before today into the days' files.
+
+        Segments are only removed once the day's file has been written; a day
+        whose file cannot be read is left as it is.
+
+        Returns:
+            Number of daily files written
+        """
+        if not self.segment_directory.exists():
+            return 0
+        today = self.clock.now().strftime("%Y-%m-%d")
+        days = set()
+        for segment in self.segment_directory.glob(f"greenhouse_*.{self.log_format}"):
+            dataset, date_str, _ = segment.stem.removeprefix("greenhouse_").rsplit('_', 2)
+            if dataset in SEGMENTED_DATASETS and date_str < today:
+                days.add((dataset, date_str))
+
+        merged = 0
+        for dataset, date_str in sorted(days):
+            date = datetime.strptime(date_str, "%Y-%m-%d")
+            log_file = self._get_log_filename(date, dataset)
+            segments = self._segment_files(date, dataset)
+            try:
+                frames = [self._read_log_file(path) for path in ([log_file] if log_file.exists() else []) + segments]
+                df = pd.concat(frames, ignore_index=True)
+                self._write_log_file(df.astype({column: "category" for column in SEGMENTED_DATASETS[dataset]}), log_file)
+            except Exception as e:
+                print(f"Error merging {dataset} segments for {date_str}: {e}")
+                continue
+            for segment in segments:
+                segment.unlink()
+            with self._segment_lock:
+                self._segment_numbers.pop((dataset, date_str), None)
+            merged += 1
+        return merged
+
+    def _flush_channels(self):
+        """Append buffered channel readings to their days' segments."""
+        if not self._channel_buffer:
+            return
+        df = self._channel_frame(self._channel_buffer)
+        self._channel_buffer = []
+        self._append_to_daily_files(df, "channels")
+
+    def get_channel_data(
+        self,
+        date: datetime,
+        sensors: Optional[Sequence[str]] = None,
+        channels: Optional[Sequence[str]] = None,
+        wide: bool = False
+    ) -> Optional[pd.DataFrame]:
+        """
+        Retrieve pluggable sensor readings for a day.
+
+        Args:
+            date: Date to retrieve
+            sensors: Only return these sensors (all if None)
+            channels: Only return these channels (all if None)
+            wide: Return one column per 'sensor.channel' indexed by timestamp
+                instead of the long (timestamp, sensor, channel, value) layout
+
+        Returns:
+            DataFrame of readings, or None if there are none
+        """
+        frames = []
+        stored = self._read_daily_dataset(date, "channels")
+        if stored is not None:
+            frames.append(stored)
+        buffered = [r for r in self._channel_buffer if r[0].date() == date.date()]
+        if buffered:
+            frames.append(self._channel_frame(buffered))
+        if not frames:
+            return None
+
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        if sensors is not None:
+            df = df[df["sensor"].isin(sensors)]
+        if channels is not None:
+            df = df[df["channel"].isin(channels)]
+        if df.empty:
+            return None
+        if not wide:
+            return df.astype({"sensor": str, "channel": str}).reset_index(drop=True)
+
+        df = df.assign(column=df["sensor"].astype(str) + "." + df["channel"].astype(str))
+        return df.pivot_table(index="timestamp", columns="column", values="value", aggfunc="mean")
+
+    def log_raw_readings(self, df: pd.DataFrame):
+        """
+        Append readings taken at the sensor rate to the 'raw' dataset.
+
+        Values are stored as float32 to keep the high-rate files compact.
+
+        Args:
+            df: Readings with a 'timestamp' column and one column per sensor channel
+        """
+        if df.empty:
+            return
+        df = df[RAW_COLUMNS].astype({column: "float32" for column in RAW_COLUMNS[1:]})
+        self._append_to_daily_files(df, "raw")
+
+    def cleanup_raw_readings(self, retention_days: int) -> int:
+        """
+        Remove 'raw' dataset files and segments older than their retention window.
+
+        Args:
+            retention_days: Days of raw readings to keep
+
+        Returns:
+            Number of files removed
+        """
+        cutoff_date = self.clock.now() - timedelta(days=retention_days)
+        removed_count = 0
+        pattern = f"greenhouse_raw_*.{self.log_format}"
+        for raw_file in [*self.log_directory.glob(pattern), *self.segment_directory.glob(pattern)]:
+            try:
+                # Daily files and segments both carry the date third (greenhouse_raw_YYYY-MM-DD[_N])
+                if datetime.strptime(raw_file.stem.split('_')[2], "%Y-%m-%d") < cutoff_date:
+                    raw_file.unlink()
+                    removed_count += 1
+            except Exception as e:
+                print(f"Error processing raw log file {raw_file}: {e}")
+        return removed_count
+
+    def log_transition(self, device: str, state: bool, source: str, timestamp: Optional[datetime] = None):
+        """
+        Log a device switching on or off to the 'transitions' dataset.
+
+        Transitions are buffered and appended to the day's segments in batches.
+
+        Args:
+            device: Device id
+            state: New state (True for on)
+            source: What asked for the switch (schedule, thermostat, button, api, ...)
+            timestamp: Optional timestamp (defaults to current time)
+        """
+        if timestamp is None:
+            timestamp = self.clock.now()
+        with self._transition_lock:
+            if self._transition_buffer and timestamp.date() != self._transition_buffer[0][0].date():
+                self._flush_transitions_locked()
+            self._transition_buffer.append((timestamp, device, bool(state), source))
+            if (len(self._transition_buffer) >= TRANSITION_FLUSH_ROWS or
+                    (self.clock.now() - self._transition_buffer[0][0]).total_seconds() >= TRANSITION_FLUSH_SECONDS):
+                self._flush_transitions_locked()
+
+    def _transition_frame(self, transitions: Sequence[Tuple[datetime, str, bool, str]]) -> pd.DataFrame:
+        """Build a transitions DataFrame with categorical device and source columns."""
+        df = pd.DataFrame(list(transitions), columns=TRANSITION_COLUMNS)
+        return df.astype({"timestamp": "datetime64[ns]", "device": "category", "state": "bool", "source": "category"})
+
+    def _flush_transitions_locked(self):
+        """Append buffered transitions to their days' segments (caller holds the transition lock)."""
+        if not self._transition_buffer:
+            return
+        df = self._transition_frame(self._transition_buffer)
+        self._transition_buffer = []
+        self._append_to_daily_files(df, "transitions")
+
+    def _transitions_for_day(self, day) -> Optional[pd.DataFrame]:
+        """A day's transitions from disk and the buffer, sorted by time, or None if there are none."""
+        frames = []
+        stored = self._read_daily_dataset(datetime.combine(day, time.min), "transitions")
+        if stored is not None:
+            frames.append(stored)
+        with self._transition_lock:
+            buffered = [t for t in self._transition_buffer if t[0].date() == day]
+        if buffered:
+            frames.append(self._transition_frame(buffered))
+        if not frames:
+            return None
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        df = df.astype({"device": str, "source": str})
+        return df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    def get_transitions(
+        self,
+        start: datetime,
+        end: datetime,
+        devices: Optional[Sequence[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Retrieve device transitions in a time window.
+
+        Args:
+            start: Start of the window (inclusive)
+            end: End of the window (exclusive)
+            devices: Only return these devices (all if None)
+
+        Returns:
+            DataFrame of (timestamp, device, state, source) sorted by time, or None if there are none
+        """
+        frames = []
+        day = start.date()
+        while day <= end.date():
+            df = self._transitions_for_day(day)
+            if df is not None:
+                frames.append(df)
+            day += timedelta(days=1)
+        if not frames:
+            return None
+
+        df = pd.concat(frames, ignore_index=True)
+        df = df[(df["timestamp"] >= start) & (df["timestamp"] < end)]
+        if devices is not None:
+            df = df[df["device"].isin(devices)]
+        return df.reset_index(drop=True) if not df.empty else None
+
+    def _states_before(self, start: datetime, wanted: Sequence[str]) -> Dict[str, bool]:
+        """
+        The state each device was in at a time, from the latest transition before it.
+
+        Searches back a day at a time until every wanted device is found (and at
+        least one day with transitions), for up to TRANSITION_LOOKBACK_DAYS.
+        """
+        states: Dict[str, bool] = {}
+        found_any = False
+        day = start.date()
+        for _ in range(TRANSITION_LOOKBACK_DAYS + 1):
+            df = self._transitions_for_day(day)
+            if df is not None:
+                df = df[df["timestamp"] < start]
+                if not df.empty:
+                    found_any = True
+                    latest = df.groupby("device", sort=False)["state"].last()
+                    for device, state in latest.items():
+                        states.setdefault(device, bool(state))
+            if found_any and set(wanted) <= set(states):
+                break
+            day -= timedelta(days=1)
+        return states
+
+    def get_duty_cycles(
+        self,
+        start: datetime,
+        end: datetime,
+        devices: Optional[Sequence[str]] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Time-weighted on-time of each device in a window, from its transitions.
+
+        The state at the start of the window comes from the latest earlier
+        transition. Time before a device's first known state, and time after
+        now, is not observed and is left out of its duty cycle.
+
+        Args:
+            start: Start of the window
+            end: End of the window
+            devices: Only report these devices (all with transitions if None)
+
+        Returns:
+            Dictionary mapping device id to 'on_seconds', 'observed_seconds',
+            'duty_percent' and 'switch_count' (changes of state within the window)
+        """
+        end = min(end, self.clock.now())
+        if end <= start:
+            return {}
+        window = self.get_transitions(start, end, devices)
+        in_window = list(window["device"].unique()) if window is not None else []
+        initial = self._states_before(start, list(devices) if devices is not None else in_window)
+        if devices is not None:
+            initial = {device: state for device, state in initial.items() if device in devices}
+
+        frames = [pd.DataFrame({
+            "timestamp": pd.Series([start] * len(initial), dtype="datetime64[ns]"),
+            "device": list(initial),
+            "state": list(initial.values()),
+            "initial": True,
+        })]
+        if window is not None:
+            frames.append(window[["timestamp", "device", "state"]].assign(initial=False))
+        events = pd.concat(frames, ignore_index=True)
+        if events.empty:
+            return {}
+        events = events.sort_values(["device", "timestamp"], kind="stable").reset_index(drop=True)
+
+        # Each event's state lasts until the device's next event, or the end of the window
+        by_device = events.groupby("device", sort=True)
+        until = by_device["timestamp"].shift(-1).fillna(pd.Timestamp(end))
+        seconds = (until - events["timestamp"]).dt.total_seconds()
+        state = events["state"].astype(bool)
+        changed = ~events["initial"] & (state != by_device["state"].shift().astype("boolean")).fillna(True)
+        if devices is None:
+            # A device's first transition ever is when it became known, not a switch
+            changed &= by_device.cumcount() > 0
+
+        summary = pd.DataFrame({
+            "on_seconds": seconds.where(state, 0.0),
+            "observed_seconds": seconds,
+            "switch_count": changed.astype(int),
+        }).groupby(events["device"], sort=True).sum()
+
+        return {
+            device: {
+                "on_seconds": float(row["on_seconds"]),
+                "observed_seconds": float(row["observed_seconds"]),
+                "duty_percent": (100.0 * row["on_seconds"] / row["observed_seconds"]
+                                 if row["observed_seconds"] > 0 else 0.0),
+                "switch_count": int(row["switch_count"]),
+            }
+            for device, row in summary.iterrows()
+        }
+
+    def save_energy_totals(self, date: datetime, totals: Dict[str, Sequence[float]]):
+        """
+        Write a day's energy totals, replacing any written earlier.
+
+        Args:
+            date: Day the totals are for
+            totals: Dictionary mapping device id to (on_seconds, energy_kwh, cost)
+        """
+        df = pd.DataFrame(
+            [(device, *values) for device, values in totals.items()], columns=ENERGY_COLUMNS
+        ).astype({"device": "category", "on_seconds": "float64", "energy_kwh": "float64", "cost": "float64"})
+        energy_file = self._get_log_filename(date, "energy")
+        try:
+            self._write_log_file(df, energy_file)
+        except Exception as e:
+            print(f"Error saving energy totals {energy_file}: {e}")
+
+    def _read_energy(self, date: datetime, dataset: str = "energy") -> Optional[pd.DataFrame]:
+        """A day's or month's energy totals, or None if none were written."""
+        energy_file = self._get_log_filename(date, dataset)
+        if not energy_file.exists():
+            return None
+        try:
+            return self._read_log_file(energy_file).astype({"device": str})
+        except Exception as e:
+            print(f"Error loading energy totals {energy_file}: {e}")
+            return None
+
+    def get_energy_totals(self, date: datetime) -> Dict[str, Tuple[float, float, float]]:
+        """
+        Read a day's energy totals.
+
+        Args:
+            date: Day to read
+
+        Returns:
+            Dictionary mapping device id to (on_seconds, energy_kwh, cost)
+        """
+        df = self._read_energy(date)
+        if df is None:
+            return {}
+        return {row.device: (row.on_seconds, row.energy_kwh, row.cost) for row in df.itertuples(index=False)}
+
+    def rollup_energy_month(self, month: datetime, replace: bool = True) -> bool:
+        """
+        Sum a month's daily energy totals into its monthly totals.
+
+        Monthly totals are kept when older logs are cleaned up, so energy over
+        long ranges stays available.
+
+        Args:
+            month: Any date in the month
+            replace: Whether to replace monthly totals already written
+
+        Returns:
+            True if monthly totals were written
+        """
+        first = datetime(month.year, month.month, 1)
+        monthly_file = self._get_log_filename(first, "energy_monthly")
+        if not replace and monthly_file.exists():
+            return False
+        days = []
+        day = first
+        while day.month == first.month:
+            df = self._read_energy(day)
+            if df is not None:
+                days.append(df)
+            day += timedelta(days=1)
+        if not days:
+            return False
+
+        totals = pd.concat(days, ignore_index=True).groupby("device", sort=True)[ENERGY_COLUMNS[1:]].sum()
+        totals = totals.reset_index().astype({"device": "category"})
+        self._write_log_file(totals, monthly_file)
+        print(f"Rolled up energy for {first.strftime('%Y-%m')} ({len(days)} days)")
+        return True
+
+    def get_energy(self, start_date: datetime, end_date: datetime) -> Dict[str, Dict[str, float]]:
+        """
+        Energy used by each device over a date range.
+
+        Whole months are read from their monthly totals where those exist, so
+        long ranges read about one file per month; the rest is read from the
+        daily totals.
+
+        Args:
+            start_date: First day of the range (inclusive)
+            end_date: Last day of the range (inclusive)
+
+        Returns:
+            Dictionary mapping device id to 'on_seconds', 'energy_kwh' and 'cost'
+        """
+        frames = []
+        day = datetime(start_date.year, start_date.month, start_date.day)
+        last = datetime(end_date.year, end_date.month, end_date.day)
+        while day <= last:
+            if day.day == 1:
+                next_month = (day + timedelta(days=32)).replace(day=1)
+                monthly = self._read_energy(day, "energy_monthly") if next_month - timedelta(days=1) <= last else None
+                if monthly is not None:
+                    frames.append(monthly)
+                    day = next_month
+                    continue
+            daily = self._read_energy(day)
+            if daily is not None:
+                frames.append(daily)
+            day += timedelta(days=1)
+        if not frames:
+            return {}
+
+        totals = pd.concat(frames, ignore_index=True).groupby("device", sort=True)[ENERGY_COLUMNS[1:]].sum()
+        return {
+            device: {column: float(value) for column, value in row.items()}
+            for device, row in totals.iterrows()
+        }
 
     def flush(self):
         """
         Force save of current data to disk.
         """
+        self._flush_channels()
+        with self._transition_lock:
+            self._flush_transitions_locked()
         if self._current_dataframe is not None and not self._current_dataframe.empty:
             timestamp = datetime.combine(self._current_date, datetime.min.time())
             self._save_daily_log(self._current_dataframe, timestamp)
             print("Data logger flushed to disk")
+        self.compact_segments()
+        self.checkpoint()
+
+    def buffered_bytes(self) -> int:
+        """
+        Memory held by data not yet written or cached from disk.
+
+        Returns:
+            Approximate size in bytes of the current day's log, buffered channel
+            readings and cached condition columns
+        """
+        total = 0
+        if self._current_dataframe is not None:
+            total += int(self._current_dataframe.memory_usage(deep=True).sum())
+        if self._channel_buffer:
+            total += int(self._channel_frame(self._channel_buffer).memory_usage(deep=True).sum())
+        with self._transition_lock:
+            if self._transition_buffer:
+                total += int(self._transition_frame(self._transition_buffer).memory_usage(deep=True).sum())
+        for _, df in self._conditions_cache.values():
+            total += int(df.memory_usage(deep=True).sum())
+        return total
 
-    def get_data_for_date(self, date: datetime) -> Optional[pd.DataFrame]:
+    def get_data_for_date(self, date: datetime, dataset: str = "log") -> Optional[pd.DataFrame]:
         """
         Retrieve log data for a specific date.
 
         Args:
             date: Date to retrieve data for
+            dataset: Dataset to read ('log' for sensor data, 'image_metrics' for image metrics,
+                'channels' for pluggable sensors, 'transitions' for device switches,
+                'raw' for readings at the sensor rate)
 
         Returns:
             DataFrame with data for the specified date, or None if not found
         """
-        log_file = self._get_log_filename(date)
+        if dataset in SEGMENTED_DATASETS:
+            df = self._read_daily_dataset(date, dataset)
+            if df is None:
+                print(f"No {dataset} data found for {date.strftime('%Y-%m-%d')}")
+            return df
+
+        log_file = self._get_log_filename(date, dataset)
+        if dataset == "log" and not log_file.exists():
+            # Older days may only be kept as rollups
+            log_file = self._get_log_filename(date, "rollup")
 
         if log_file.exists():
             try:
-                if self.log_format == "parquet":
-                    return pd.read_parquet(log_file)
-                else:  # feather
-                    return pd.read_feather(log_file)
+                return self._fill_steps(self._read_log_file(log_file))
             except Exception as e:
                 print(f"Error loading data for {date.strftime('%Y-%m-%d')}: {e}")
                 return None
@@ -230,6 +1264,107 @@ class GreenhouseDataLogger:
             print(f"No log file found for {date.strftime('%Y-%m-%d')}")
             return None
 
+    def _load_conditions(self, date: datetime) -> Optional[pd.DataFrame]:
+        """
+        Load the timestamp and condition columns for a day, sorted by timestamp.
+
+        Only the needed columns are read from disk, and results are cached until
+        the underlying file changes.
+
+        Args:
+            date: Date to load
+
+        Returns:
+            DataFrame with 'timestamp' and condition columns, or None if no data
+        """
+        if self._current_date == date.date() and self._current_dataframe is not None:
+            df = self._current_dataframe
+            return self._fill_steps(df)[condition_columns(df.columns)] if not df.empty else None
+
+        log_file = self._get_log_filename(date)
+        if not log_file.exists():
+            log_file = self._get_log_filename(date, "rollup")
+        if not log_file.exists():
+            return None
+
+        mtime = log_file.stat().st_mtime
+        cached = self._conditions_cache.get(log_file)
+        if cached is not None and cached[0] == mtime:
+            self._conditions_cache.move_to_end(log_file)
+            return cached[1]
+
+        try:
+            if self.log_format == "parquet":
+                import pyarrow.parquet as pq
+                available = pq.read_schema(log_file).names
+                df = pd.read_parquet(log_file, columns=condition_columns(available))
+            else:
+                df = pd.read_feather(log_file)
+                df = df[condition_columns(df.columns)]
+        except Exception as e:
+            print(f"Error loading conditions for {date.strftime('%Y-%m-%d')}: {e}")
+            return None
+
+        df = self._fill_steps(df.assign(timestamp=pd.to_datetime(df["timestamp"])))
+        if not df["timestamp"].is_monotonic_increasing:
+            df = df.sort_values("timestamp", kind="stable")
+        df = df.reset_index(drop=True)
+
+        self._conditions_cache[log_file] = (mtime, df)
+        if len(self._conditions_cache) > self._conditions_cache_size:
+            self._conditions_cache.popitem(last=False)
+        return df
+
+    def get_nearest_readings(
+        self,
+        timestamps: Sequence[datetime],
+        max_gap_seconds: float = 600
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Find the logged sample nearest to each of a list of timestamps.
+
+        Timestamps are grouped by day and matched in bulk with a binary search
+        over that day's sorted timestamp column.
+
+        Args:
+            timestamps: Timestamps to look up
+            max_gap_seconds: Maximum distance to the nearest sample; timestamps
+                further away than this get None
+
+        Returns:
+            List aligned with timestamps, holding the nearest sample's timestamp
+            and conditions, or None if there is no sample close enough
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(timestamps)
+        by_day: Dict[Any, List[int]] = {}
+        for i, ts in enumerate(timestamps):
+            by_day.setdefault(ts.date(), []).append(i)
+
+        max_gap_ns = int(max_gap_seconds * 1e9)
+        for day, indices in by_day.items():
+            df = self._load_conditions(datetime.combine(day, datetime.min.time()))
+            if df is None or df.empty:
+                continue
+
+            sample_ns = df["timestamp"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+            query_ns = np.array(
+                [np.datetime64(timestamps[i], "ns") for i in indices]
+            ).astype(np.int64)
+
+            # Compare the samples either side of each insertion point
+            right = np.clip(np.searchsorted(sample_ns, query_ns), 0, len(sample_ns) - 1)
+            left = np.clip(right - 1, 0, len(sample_ns) - 1)
+            nearest = np.where(
+                np.abs(sample_ns[left] - query_ns) <= np.abs(sample_ns[right] - query_ns), left, right
+            )
+            within = np.abs(sample_ns[nearest] - query_ns) <= max_gap_ns
+
+            rows = df.iloc[nearest].to_dict("records")
+            for i, row, ok in zip(indices, rows, within):
+                if ok:
+                    results[i] = row
+        return results
+
     def get_latest_reading(self) -> Optional[Dict[str, Any]]:
         """
         Get the most recent sensor reading from the current day's log.
@@ -245,14 +1380,18 @@ class GreenhouseDataLogger:
 
     def cleanup_old_logs(self):
         """
-        Remove log files older than max_log_days.
+        Merge the segments of finished days, then remove log files older than max_log_days.
         """
-        cutoff_date = datetime.now() - timedelta(days=self.max_log_days)
+        cutoff_date = self.clock.now() - timedelta(days=self.max_log_days)
         removed_count = 0
+        self.compact_segments()
 
-        # Iterate through log files
-        pattern = f"greenhouse_log_*.{self.log_format}"
+        # Iterate through log files of every dataset (raw logs, rollups, ...)
+        pattern = f"greenhouse_*.{self.log_format}"
         for log_file in self.log_directory.glob(pattern):
+            if log_file.stem.startswith("greenhouse_energy_monthly_"):
+                # A row per device per month; kept for long-range energy queries
+                continue
             try:
                 # Extract date from filename (format: greenhouse_log_YYYY-MM-DD.ext)
                 date_str = log_file.stem.split('_')[-1]
@@ -271,13 +1410,70 @@ class GreenhouseDataLogger:
         else:
             print("No old log files to remove")
 
-    def get_date_range_data(self, start_date: datetime, end_date: datetime) -> Optional[pd.DataFrame]:
+    def rollup_daily_log(self, date: datetime, interval_minutes: int = 15) -> int:
+        """
+        Replace a day's raw log with fixed-interval rollups.
+
+        Each rollup row holds the mean of every sensor channel for its bucket,
+        with '_min' and '_max' columns alongside, and the fraction of samples each
+        device was on. Rollups keep the raw column names so history queries work
+        unchanged.
+
+        Args:
+            date: Date of the raw log to roll up
+            interval_minutes: Bucket size in minutes
+
+        Returns:
+            Number of bytes reclaimed (0 if there was no raw log)
+        """
+        log_file = self._get_log_filename(date)
+        if not log_file.exists():
+            return 0
+
+        raw_size = log_file.stat().st_size
+        df = self._fill_steps(self._read_log_file(log_file))
+        rollup_file = self._get_log_filename(date, "rollup")
+
+        if not df.empty:
+            sensor_columns = ["temperature_celsius", "humidity_percent", "pressure_hpa"]
+            state_columns = [c for c in df.columns if c.endswith("_state")]
+
+            grouped = df.set_index(pd.to_datetime(df["timestamp"])).resample(f"{interval_minutes}min")
+            rollup = grouped[sensor_columns].mean()
+            for column in sensor_columns:
+                # Oversampled logs carry each interval's extremes; keep them through the rollup
+                min_column = f"{column}_min" if f"{column}_min" in df.columns else column
+                max_column = f"{column}_max" if f"{column}_max" in df.columns else column
+                rollup[f"{column}_min"] = grouped[min_column].min()
+                rollup[f"{column}_max"] = grouped[max_column].max()
+            for column in state_columns:
+                rollup[column] = grouped[column].mean()
+            rollup["sample_count"] = grouped["temperature_celsius"].count()
+
+            rollup = rollup[rollup["sample_count"] > 0].reset_index()
+            rollup.insert(1, "date", rollup["timestamp"].dt.strftime("%Y-%m-%d"))
+            rollup.insert(2, "time_24hr", rollup["timestamp"].dt.strftime("%H:%M:%S"))
+            self._write_log_file(rollup, rollup_file)
+
+        log_file.unlink()
+        rollup_size = rollup_file.stat().st_size if rollup_file.exists() else 0
+        print(f"Rolled up log file: {log_file} ({len(df)} records)")
+        return max(raw_size - rollup_size, 0)
+
+    def get_date_range_data(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        dataset: str = "log"
+    ) -> Optional[pd.DataFrame]:
         """
         Retrieve log data for a date range.
 
         Args:
             start_date: Start date (inclusive)
             end_date: End date (inclusive)
+            dataset: Dataset to read ('log' for sensor data, 'image_metrics' for image metrics,
+                'channels' for pluggable sensors, 'transitions' for device switches)
 
         Returns:
             Combined DataFrame with data for the date range, or None if no data
@@ -286,7 +1482,7 @@ class GreenhouseDataLogger:
         current_date = start_date
 
         while current_date <= end_date:
-            daily_data = self.get_data_for_date(current_date)
+            daily_data = self.get_data_for_date(current_date, dataset)
             if daily_data is not None and not daily_data.empty:
                 all_data.append(daily_data)
             current_date += timedelta(days=1)
@@ -301,6 +1497,10 @@ class GreenhouseDataLogger:
         """
         Calculate statistics for a specific date.
 
+        Device uptime is the time-weighted duty cycle from the day's
+        transitions; days logged without transitions fall back to the
+        fraction of samples each device was on.
+
         Args:
             date: Date to calculate statistics for
 
@@ -312,6 +1512,16 @@ class GreenhouseDataLogger:
         if data is None or data.empty:
             return None
 
+        day_start = datetime.combine(date.date(), time.min)
+        duty = self.get_duty_cycles(day_start, day_start + timedelta(days=1))
+        if duty:
+            device_uptime = {f"{device}_percent": cycle["duty_percent"] for device, cycle in duty.items()}
+        else:
+            device_uptime = {
+                f"{column[:-len('_state')]}_percent": (data[column].sum() / len(data)) * 100
+                for column in data.columns if column.endswith("_state")
+            }
+
         stats = {
             "date": date.strftime("%Y-%m-%d"),
             "record_count": len(data),
@@ -333,12 +1543,7 @@ class GreenhouseDataLogger:
                 "mean": data["pressure_hpa"].mean(),
                 "std": data["pressure_hpa"].std()
             },
-            "device_uptime": {
-                "heater_percent": (data["heater_state"].sum() / len(data)) * 100,
-                "vent_fan_percent": (data["vent_fan_state"].sum() / len(data)) * 100,
-                "grow_lights_percent": (data["grow_lights_state"].sum() / len(data)) * 100,
-                "stand_fan_percent": (data["stand_fan_state"].sum() / len(data)) * 100
-            }
+            "device_uptime": device_uptime
         }
 
         return stats
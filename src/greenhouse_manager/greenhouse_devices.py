@@ -0,0 +1,306 @@
+"""
+Greenhouse Devices
+
+Registry of the controllable devices configured in settings:
+- One RF outlet, and optionally a manual toggle button, per device
+- Lookups by device id, display name and GPIO pin (LED or button)
+- Devices grouped by role, so control iterates precomputed lists
+- Batch state snapshots and cleanup of every outlet and button
+- Reconfiguration that keeps the outlets of devices whose hardware is unchanged
+- Outlet states restored from, and every switch recorded in, an optional state journal
+- Every switch reported, with its source, to an optional transition listener
+"""
+
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional
+
+from greenhouse_manager.greenhouse_hardware_collection import RFOutlet, RFTransmitQueue, Button
+from greenhouse_manager.greenhouse_manager_settings import DeviceConfig, DEVICE_ROLES
+from greenhouse_manager.greenhouse_state_journal import DeviceStateJournal
+
+
+# Device settings that identify the outlet and button hardware; changing any of
+# them replaces the device's outlet, while other settings are updated in place
+HARDWARE_FIELDS = ("name", "rf_on_code", "rf_off_code", "led_gpio_pin", "button_gpio_pin")
+
+# What a device transition can come from: automatic control, people, safety
+# logic, configuration changes, or the state snapshot taken at startup
+TRANSITION_SOURCES = ("schedule", "thermostat", "button", "api", "failsafe", "config", "startup", "manual")
+
+
+@dataclass
+class Device:
+    """A configured device with its outlet and optional button."""
+
+    config: DeviceConfig
+    outlet: RFOutlet
+    button: Optional[Button] = None
+
+    @property
+    def id(self) -> str:
+        """Device id from the configuration."""
+        return self.config.id
+
+    @property
+    def role(self) -> str:
+        """Device role from the configuration."""
+        return self.config.role
+
+    def get_state(self) -> bool:
+        """Get the current state of the device's outlet."""
+        return self.outlet.get_state()
+
+
+@dataclass
+class _DeviceIndex:
+    """Devices by id, display name, GPIO pin (LED or button) and role."""
+
+    devices: Dict[str, Device] = field(default_factory=dict)
+    by_name: Dict[str, Device] = field(default_factory=dict)
+    by_gpio_pin: Dict[int, Device] = field(default_factory=dict)
+    by_role: Dict[str, List[Device]] = field(default_factory=lambda: {role: [] for role in DEVICE_ROLES})
+
+    def check(self, config: DeviceConfig):
+        """
+        Check a device can be indexed alongside those already indexed.
+
+        Args:
+            config: Device configuration
+
+        Raises:
+            ValueError: If the device has no id, or its id or a GPIO pin is already indexed
+        """
+        if config.id is None:
+            raise ValueError(f"Device '{config.name}' has no id")
+        if config.id in self.devices:
+            raise ValueError(f"Device id '{config.id}' is already registered")
+        pins = [config.led_gpio_pin] + ([config.button_gpio_pin] if config.button_gpio_pin is not None else [])
+        for pin in pins:
+            if pin in self.by_gpio_pin:
+                raise ValueError(f"GPIO pin {pin} is already used by device '{self.by_gpio_pin[pin].id}'")
+
+    def add(self, device: Device, config: Optional[DeviceConfig] = None):
+        """
+        Index a device.
+
+        Args:
+            device: Device to index
+            config: Configuration to index it under (the device's own if None)
+        """
+        config = config or device.config
+        self.devices[config.id] = device
+        self.by_name.setdefault(config.name, device)
+        self.by_gpio_pin[config.led_gpio_pin] = device
+        if config.button_gpio_pin is not None:
+            self.by_gpio_pin[config.button_gpio_pin] = device
+        self.by_role[config.role].append(device)
+
+
+class DeviceRegistry:
+    """
+    Outlets and buttons for a list of device configurations.
+
+    Devices keep the order of the configuration list. With a journal, new
+    outlets start in their journaled state rather than off, and every switch
+    is journaled.
+
+    Attributes:
+        mock_mode: If True, outlets and buttons simulate hardware
+        transmitter: Optional RF transmitter queue shared with other registries
+        journal: Optional device state journal
+        on_transition: Optional callback receiving (device id, state, source) after each switch
+    """
+
+    def __init__(
+        self,
+        configs: List[DeviceConfig],
+        mock_mode: bool = False,
+        transmitter: Optional[RFTransmitQueue] = None,
+        journal: Optional[DeviceStateJournal] = None
+    ):
+        self.mock_mode = mock_mode
+        self.transmitter = transmitter
+        self.journal = journal
+        self.on_transition: Optional[Callable[[str, bool, str], None]] = None
+        self._index = _DeviceIndex()
+
+        for config in configs:
+            self.add(config)
+
+    def add(self, config: DeviceConfig) -> Device:
+        """
+        Create the outlet and button for a device and index it.
+
+        Args:
+            config: Device configuration with an id
+
+        Returns:
+            The new device
+
+        Raises:
+            ValueError: If the id or a GPIO pin is already registered
+        """
+        self._index.check(config)
+        device = self._create(config)
+        self._index.add(device)
+        return device
+
+    def _create(self, config: DeviceConfig) -> Device:
+        """Create the outlet and button for a device, restoring its journaled state."""
+        outlet = RFOutlet(
+            name=config.name,
+            send_on_code=config.rf_on_code,
+            send_off_code=config.rf_off_code,
+            led_gpio_pin=config.led_gpio_pin,
+            mock_mode=self.mock_mode,
+            transmitter=self.transmitter
+        )
+        entry = self.journal.get(config.id) if self.journal is not None else None
+        if entry is not None:
+            outlet.restore_state(entry.state)
+        outlet.on_change = partial(self._switched, config.id)
+
+        button = None
+        if config.button_gpio_pin is not None:
+            button = Button(
+                name=f"{config.name} Button",
+                gpio_pin=config.button_gpio_pin,
+                callback=partial(outlet.toggle, "button"),
+                mock_mode=self.mock_mode
+            )
+
+        return Device(config=config, outlet=outlet, button=button)
+
+    def update(self, configs: List[DeviceConfig]) -> Dict[str, List[str]]:
+        """
+        Reconfigure the registry for a new list of devices.
+
+        Devices whose hardware settings are unchanged keep their outlet, button
+        and state. Removed devices, and devices whose hardware changed, are
+        switched off and released before any new outlet is created.
+
+        Args:
+            configs: New device configurations with ids
+
+        Returns:
+            Device ids by change: 'added', 'removed', 'replaced' and 'updated'
+
+        Raises:
+            ValueError: If an id or a GPIO pin is used twice; the registry keeps
+                its previous devices (less any already released)
+        """
+        wanted = {config.id: config for config in configs}
+        changes: Dict[str, List[str]] = {"added": [], "removed": [], "replaced": [], "updated": []}
+
+        kept: Dict[str, Device] = {}
+        for device_id, device in self._index.devices.items():
+            config = wanted.get(device_id)
+            if config is not None and all(
+                getattr(config, name) == getattr(device.config, name) for name in HARDWARE_FIELDS
+            ):
+                kept[device_id] = device
+                continue
+            changes["replaced" if config is not None else "removed"].append(device_id)
+            self._release(device)
+
+        # Build the new index aside and swap it in only once every device has been added
+        index = _DeviceIndex()
+        created: List[Device] = []
+        try:
+            for device_id, config in wanted.items():
+                index.check(config)
+                device = kept.get(device_id)
+                if device is None:
+                    device = self._create(config)
+                    created.append(device)
+                    if device_id not in changes["replaced"]:
+                        changes["added"].append(device_id)
+                elif device.config != config:
+                    changes["updated"].append(device_id)
+                index.add(device, config)
+        except Exception:
+            for device in created:
+                self._release(device)
+            raise
+
+        for device_id in changes["updated"]:
+            kept[device_id].config = wanted[device_id]
+        self._index = index
+        return changes
+
+    def _switched(self, device_id: str, state: bool, source: str):
+        """Record a switch in the journal and report it to the transition listener."""
+        if self.journal is not None:
+            self.journal.record(device_id, state)
+        if self.on_transition is not None:
+            self.on_transition(device_id, state, source)
+
+    def attach_journal(self, journal: Optional[DeviceStateJournal]):
+        """
+        Journal switches to a different journal, recording current states it does not match.
+
+        Args:
+            journal: New journal, or None to stop journaling
+        """
+        self.journal = journal
+        if journal is None:
+            return
+        for device_id, device in self._index.devices.items():
+            entry = journal.get(device_id)
+            if entry is None or entry.state != device.outlet.get_state():
+                journal.record(device_id, device.outlet.get_state())
+
+    def _release(self, device: Device):
+        """Switch a device off and free its GPIO pins."""
+        if device.outlet.get_state():
+            device.outlet.turn_off("config")
+        device.outlet.cleanup()
+        if device.button is not None:
+            device.button.cleanup()
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(self._index.devices.values())
+
+    def __len__(self) -> int:
+        return len(self._index.devices)
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self._index.devices
+
+    def get(self, device_id: str) -> Optional[Device]:
+        """Look up a device by id."""
+        return self._index.devices.get(device_id)
+
+    def outlet(self, device_id: str) -> Optional[RFOutlet]:
+        """Look up a device's outlet by id."""
+        device = self._index.devices.get(device_id)
+        return device.outlet if device is not None else None
+
+    def by_name(self, name: str) -> Optional[Device]:
+        """Look up a device by display name (the first one, if names repeat)."""
+        return self._index.by_name.get(name)
+
+    def by_gpio_pin(self, pin: int) -> Optional[Device]:
+        """Look up the device using a GPIO pin for its LED or button."""
+        return self._index.by_gpio_pin.get(pin)
+
+    def with_role(self, role: str) -> List[Device]:
+        """Devices with a role, in configuration order."""
+        return self._index.by_role.get(role, [])
+
+    def states(self) -> Dict[str, bool]:
+        """
+        Get the current on/off state of every device.
+
+        Returns:
+            Dictionary mapping device id to state
+        """
+        return {device_id: device.outlet.get_state() for device_id, device in self._index.devices.items()}
+
+    def cleanup(self):
+        """Clean up the GPIO resources of every outlet and button."""
+        for device in self._index.devices.values():
+            device.outlet.cleanup()
+            if device.button is not None:
+                device.button.cleanup()
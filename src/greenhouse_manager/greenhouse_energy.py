@@ -0,0 +1,155 @@
+"""
+Greenhouse Energy
+
+Energy and cost accounting per device:
+- Each device's power draw is the `watts` in its configuration
+- EnergyMeter advances cumulative energy counters as devices switch, and for
+  devices left on, on every control loop
+- The current day's totals are written to the 'energy' dataset periodically
+  and at midnight; each finished month is summed into 'energy_monthly'
+- Energy while the manager is not running is not counted
+"""
+
+import threading
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_metrics import REGISTRY
+
+
+DEVICE_ENERGY_WH = REGISTRY.counter(
+    "greenhouse_device_energy_watt_hours_total", "Energy used by each device", ["device"]
+)
+DEVICE_ENERGY_COST = REGISTRY.counter(
+    "greenhouse_device_energy_cost_total", "Cost of the energy used by each device", ["device"]
+)
+
+
+class EnergyMeter:
+    """
+    Cumulative energy counters for devices with a configured wattage.
+
+    A device's on-time is accrued up to each of its transitions and, while it
+    stays on, up to every update, splitting at midnight so each day's totals
+    only hold that day's energy. The day's totals are read back on creation,
+    so a restart or reload continues them.
+
+    Attributes:
+        data_logger: Data logger the totals are written to
+        watts: Power draw by device id
+        price_per_kwh: Price used to cost the energy
+        write_interval_seconds: Interval between writes of the day's totals
+        clock: Time source
+    """
+
+    def __init__(
+        self,
+        data_logger: GreenhouseDataLogger,
+        watts: Dict[str, float],
+        states: Dict[str, bool],
+        price_per_kwh: float = 0.0,
+        write_interval_seconds: float = 300,
+        clock: Clock = SYSTEM_CLOCK
+    ):
+        self.data_logger = data_logger
+        self.watts = watts
+        self.price_per_kwh = price_per_kwh
+        self.write_interval_seconds = write_interval_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+
+        now = clock.now()
+        self._day = now.date()
+        self._totals: Dict[str, List[float]] = {
+            device: list(values) for device, values in data_logger.get_energy_totals(now).items()
+        }
+        self._on_since: Dict[str, datetime] = {
+            device: now for device, state in states.items() if state and device in watts
+        }
+        self._last_write = clock.time()
+
+        # Roll up last month if the manager was not running when it ended
+        data_logger.rollup_energy_month(now.replace(day=1) - timedelta(days=1), replace=False)
+
+    def _accrue(self, device: str, until: datetime):
+        """Add a device's energy since it was last accrued."""
+        since = self._on_since.get(device)
+        if since is None or until <= since:
+            return
+        seconds = (until - since).total_seconds()
+        kwh = self.watts[device] * seconds / 3_600_000
+        totals = self._totals.setdefault(device, [0.0, 0.0, 0.0])
+        totals[0] += seconds
+        totals[1] += kwh
+        totals[2] += kwh * self.price_per_kwh
+        DEVICE_ENERGY_WH.labels(device).inc(kwh * 1000)
+        DEVICE_ENERGY_COST.labels(device).inc(kwh * self.price_per_kwh)
+        self._on_since[device] = until
+
+    def _write(self):
+        """Write the current day's totals."""
+        self.data_logger.save_energy_totals(datetime.combine(self._day, time.min), self._totals)
+        self._last_write = self.clock.time()
+
+    def _advance(self, now: datetime):
+        """Accrue devices that are on up to now, closing off each day passed at midnight."""
+        while now.date() > self._day:
+            midnight = datetime.combine(self._day + timedelta(days=1), time.min)
+            for device in list(self._on_since):
+                self._accrue(device, midnight)
+            self._write()
+            finished = self._day
+            self._day = midnight.date()
+            self._totals = {}
+            if self._day.month != finished.month:
+                self.data_logger.rollup_energy_month(datetime.combine(finished, time.min))
+        for device in list(self._on_since):
+            self._accrue(device, now)
+
+    def transition(self, device: str, state: bool, timestamp: Optional[datetime] = None):
+        """
+        Account for a device switching on or off.
+
+        Args:
+            device: Device id (ignored if it has no wattage)
+            state: New state (True for on)
+            timestamp: Time of the switch (defaults to now)
+        """
+        if device not in self.watts:
+            return
+        with self._lock:
+            now = self.clock.now() if timestamp is None else timestamp
+            self._advance(now)
+            if state:
+                self._on_since.setdefault(device, now)
+            else:
+                self._on_since.pop(device, None)
+
+    def update(self):
+        """Accrue devices left on, writing the day's totals when they are due."""
+        with self._lock:
+            self._advance(self.clock.now())
+            if self.clock.time() - self._last_write >= self.write_interval_seconds:
+                self._write()
+
+    def flush(self):
+        """Accrue devices left on and write the day's totals now."""
+        with self._lock:
+            self._advance(self.clock.now())
+            self._write()
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """
+        The current day's totals.
+
+        Returns:
+            Dictionary mapping device id to 'on_seconds', 'energy_kwh' and 'cost'
+        """
+        with self._lock:
+            self._advance(self.clock.now())
+            return {
+                device: dict(zip(("on_seconds", "energy_kwh", "cost"), values))
+                for device, values in self._totals.items()
+            }
@@ -4,16 +4,27 @@ Greenhouse Hardware Collection
 Module containing classes for different pieces of hardware used in the greenhouse:
 - BME280Sensor: Temperature, humidity, and pressure sensor
 - RFOutlet: RF-controlled power outlet for devices
+- RFTransmitQueue: One transmitter shared by outlets, sending one code at a time
 - Button: GPIO button for manual device control
+- Camera backends: warm Picamera2 session, raspistill subprocess, and synthetic mock frames
 
 Supports mock mode for testing without actual hardware.
 """
 
+import abc
 import os
+import queue
 import subprocess
+import threading
 import time
 import random
+from datetime import datetime
+from pathlib import Path
 from typing import Callable, Optional, Dict, Any
+import numpy as np
+from PIL import Image
+
+from greenhouse_manager.greenhouse_metrics import REGISTRY
 
 # Attempt to import RPi.GPIO and bme280, smbus2.
 # If not on a Raspberry Pi or in mock mode, these imports will be skipped or mocked.
@@ -160,6 +171,31 @@ except ImportError:
     smbus2 = type('MockSMBus2Module', (), {'SMBus': MockSMBus})
 
 
+# Picamera2 keeps a long-lived camera session; it is only available on Raspberry Pi OS
+try:
+    from picamera2 import Picamera2
+except ImportError:
+    Picamera2 = None
+
+
+# Hot-path instrumentation shared by all hardware instances
+SENSOR_READ_SECONDS = REGISTRY.histogram(
+    "greenhouse_sensor_read_seconds", "Time taken to read the environmental sensor"
+)
+SENSOR_READ_FAILURES = REGISTRY.counter(
+    "greenhouse_sensor_read_failures_total", "Sensor reads that returned no data"
+)
+RF_COMMAND_SECONDS = REGISTRY.histogram(
+    "greenhouse_rf_command_seconds", "Time taken to transmit an RF outlet command", ["device"]
+)
+RF_COMMAND_FAILURES = REGISTRY.counter(
+    "greenhouse_rf_command_failures_total", "RF outlet commands that failed to execute", ["device"]
+)
+RF_QUEUE_DEPTH = REGISTRY.gauge(
+    "greenhouse_rf_queue_depth", "RF codes waiting for the shared transmitter"
+)
+
+
 class RFOutlet:
     """
     RF-controlled power outlet for controlling greenhouse devices.
@@ -170,6 +206,10 @@ class RFOutlet:
         send_off_code: RF code to turn device off
         led_gpio_pin: GPIO pin number for LED indicator
         mock_mode: If True, simulates hardware without actual GPIO operations
+        transmitter: Optional queue shared with other outlets; codes are sent
+            immediately when not set
+        on_change: Optional callback receiving the new state and the source of
+            each switch that changes the state (repeated codes are not reported)
     """
 
     def __init__(
@@ -178,14 +218,19 @@ class RFOutlet:
         send_on_code: int,
         send_off_code: int,
         led_gpio_pin: int,
-        mock_mode: bool = False
+        mock_mode: bool = False,
+        transmitter: Optional["RFTransmitQueue"] = None
     ):
         self.name = name
         self.send_on_code = send_on_code
         self.send_off_code = send_off_code
         self.led_gpio_pin = led_gpio_pin
         self.mock_mode = mock_mode
+        self.transmitter = transmitter
+        self.on_change: Optional[Callable[[bool, str], None]] = None
         self._state = False  # Track device state
+        self._command_seconds = RF_COMMAND_SECONDS.labels(name)
+        self._command_failures = RF_COMMAND_FAILURES.labels(name)
 
         if not self.mock_mode:
             GPIO.setmode(GPIO.BCM)
@@ -193,7 +238,24 @@ class RFOutlet:
             GPIO.output(self.led_gpio_pin, GPIO.LOW)  # Ensure LED is off initially
 
     def _execute_rf_command(self, code: int):
-        """Execute RF command to control the outlet."""
+        """Execute RF command to control the outlet, through the shared transmitter if set."""
+        if self.transmitter is not None:
+            self.transmitter.submit(self, code)
+        else:
+            self.transmit(code)
+
+    def transmit(self, code: int):
+        """
+        Transmit a code now, timing the command; the outlet's state is unchanged.
+
+        Args:
+            code: RF code to send
+        """
+        with self._command_seconds.time():
+            self._transmit(code)
+
+    def _transmit(self, code: int):
+        """Send an RF code through codesend."""
         if self.mock_mode:
             print(f"MOCK: RFOutlet '{self.name}' executing codesend {code}")
         else:
@@ -205,34 +267,74 @@ class RFOutlet:
                 result = subprocess.run(command, capture_output=True, text=True, check=True)
                 print(f"RFOutlet '{self.name}' command output: {result.stdout.strip()}")
             except FileNotFoundError:
+                self._command_failures.inc()
                 print(f"Error: 'codesend' command not found. Make sure it's installed and in your PATH. (Attempted to run: {' '.join(command)})")
             except subprocess.CalledProcessError as e:
+                self._command_failures.inc()
                 print(f"Error executing RF command for '{self.name}': {e.stderr.strip()}")
             except Exception as e:
+                self._command_failures.inc()
                 print(f"An unexpected error occurred while executing RF command for '{self.name}': {e}")
 
-    def turn_on(self):
-        """Turn on the RF outlet and illuminate the LED."""
+    def turn_on(self, source: str = "manual"):
+        """
+        Turn on the RF outlet and illuminate the LED.
+
+        Args:
+            source: What asked for the switch, passed to on_change
+        """
         print(f"Turning ON {self.name}")
         self._execute_rf_command(self.send_on_code)
+        changed = self._state is not True
         self._state = True
         if not self.mock_mode:
             GPIO.output(self.led_gpio_pin, GPIO.HIGH)
+        if changed and self.on_change is not None:
+            self.on_change(True, source)
+
+    def turn_off(self, source: str = "manual"):
+        """
+        Turn off the RF outlet and turn off the LED.
 
-    def turn_off(self):
-        """Turn off the RF outlet and turn off the LED."""
+        Args:
+            source: What asked for the switch, passed to on_change
+        """
         print(f"Turning OFF {self.name}")
         self._execute_rf_command(self.send_off_code)
+        changed = self._state is not False
         self._state = False
         if not self.mock_mode:
             GPIO.output(self.led_gpio_pin, GPIO.LOW)
+        if changed and self.on_change is not None:
+            self.on_change(False, source)
+
+    def reassert(self):
+        """Re-send the code for the current state, in case the outlet missed it; the state is unchanged."""
+        print(f"Reasserting {'ON' if self._state else 'OFF'} to {self.name}")
+        self._execute_rf_command(self.send_on_code if self._state else self.send_off_code)
 
-    def toggle(self):
-        """Toggle the current state of the outlet."""
+    def toggle(self, source: str = "manual"):
+        """
+        Toggle the current state of the outlet.
+
+        Args:
+            source: What asked for the switch, passed to on_change
+        """
         if self._state:
-            self.turn_off()
+            self.turn_off(source)
         else:
-            self.turn_on()
+            self.turn_on(source)
+
+    def restore_state(self, state: bool):
+        """
+        Set the known state of the outlet without transmitting, e.g. from a state journal.
+
+        Args:
+            state: State the outlet was last switched to
+        """
+        self._state = state
+        if not self.mock_mode:
+            GPIO.output(self.led_gpio_pin, GPIO.HIGH if state else GPIO.LOW)
 
     def get_state(self) -> bool:
         """Get the current state of the outlet."""
@@ -244,6 +346,77 @@ class RFOutlet:
             GPIO.cleanup(self.led_gpio_pin)
 
 
+class RFTransmitQueue:
+    """
+    One RF transmitter shared by many outlets.
+
+    Codes are sent one at a time in submission order, so outlets in different
+    zones never key the transmitter at the same time. While the background
+    thread is not running, codes are sent by the caller under a lock.
+
+    Attributes:
+        gap_seconds: Pause after each transmission before the next one
+    """
+
+    def __init__(self, gap_seconds: float = 0.0):
+        self.gap_seconds = gap_seconds
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """True while the background transmit thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def pending(self) -> int:
+        """Number of codes waiting to be sent."""
+        return self._queue.qsize()
+
+    def submit(self, outlet: RFOutlet, code: int):
+        """
+        Queue a code for transmission.
+
+        Args:
+            outlet: Outlet the code belongs to
+            code: RF code to send
+        """
+        if not self.running:
+            self._send(outlet, code)
+            return
+        self._queue.put((outlet, code))
+        RF_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def _send(self, outlet: RFOutlet, code: int):
+        with self._lock:
+            outlet.transmit(code)
+            if self.gap_seconds > 0:
+                time.sleep(self.gap_seconds)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            self._send(*item)
+            RF_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def start(self):
+        """Start sending queued codes in the background."""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="rf-transmit", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Send the codes already queued, then stop the background thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+
 class BME280Sensor:
     """
     BME280 temperature, humidity, and pressure sensor.
@@ -264,14 +437,34 @@ class BME280Sensor:
         self.i2c_address = i2c_address
         self.mock_mode = mock_mode
         self.calibration_params = None
+        self.bus = None
 
-        if not self.mock_mode:
-            self.bus = smbus2.SMBus(self.i2c_bus_number)
-            self.calibration_params = bme280.load_calibration_params(self.bus, self.i2c_address)
-            print(f"BME280 Sensor initialized on bus {i2c_bus_number}, address {hex(i2c_address)}")
-        else:
+        # The bus is opened on the first read, so slow calibration loads happen
+        # on the acquisition thread rather than during manager start-up
+        if self.mock_mode:
             print("MOCK: BME280 Sensor initialized in mock mode.")
 
+    def open(self):
+        """Open the I2C bus and load the sensor's calibration parameters."""
+        if self.mock_mode or self.bus is not None:
+            return
+        bus = smbus2.SMBus(self.i2c_bus_number)
+        try:
+            self.calibration_params = bme280.load_calibration_params(bus, self.i2c_address)
+        except Exception:
+            bus.close()
+            raise
+        self.bus = bus
+        print(f"BME280 Sensor initialized on bus {self.i2c_bus_number}, address {hex(self.i2c_address)}")
+
+    def reopen(self):
+        """Close and reopen the I2C bus, e.g. after repeated failed reads."""
+        self.cleanup()
+        try:
+            self.open()
+        except Exception as e:
+            print(f"Error reopening BME280 bus: {e}")
+
     def read_data(self) -> Optional[Dict[str, float]]:
         """
         Read temperature, humidity, and pressure data from the sensor.
@@ -280,6 +473,14 @@ class BME280Sensor:
             Dictionary with 'temperature' (°C), 'pressure' (hPa), and 'humidity' (%)
             or None if reading fails.
         """
+        with SENSOR_READ_SECONDS.time():
+            data = self._sample()
+        if data is None:
+            SENSOR_READ_FAILURES.inc()
+        return data
+
+    def _sample(self) -> Optional[Dict[str, float]]:
+        """Take a single reading from the sensor (or generate one in mock mode)."""
         if self.mock_mode:
             # Return dummy data for mock mode with some variation
             return {
@@ -289,6 +490,7 @@ class BME280Sensor:
             }
         else:
             try:
+                self.open()
                 data = bme280.sample(self.bus, self.i2c_address, self.calibration_params)
                 return {
                     "temperature": data.temperature,
@@ -301,8 +503,12 @@ class BME280Sensor:
 
     def cleanup(self):
         """Close the I2C bus connection."""
-        if not self.mock_mode and hasattr(self, 'bus'):
-            self.bus.close()
+        if not self.mock_mode and self.bus is not None:
+            try:
+                self.bus.close()
+            except Exception as e:
+                print(f"Error closing BME280 bus: {e}")
+            self.bus = None
             print("BME280 Sensor bus closed.")
 
 
@@ -376,3 +582,198 @@ class Button:
             GPIO.remove_event_detect(self.gpio_pin)
             GPIO.cleanup(self.gpio_pin)
             print(f"Button '{self.name}' GPIO cleaned up")
+
+
+class Camera(abc.ABC):
+    """
+    Base class for camera capture backends.
+
+    Attributes:
+        width: Capture width in pixels
+        height: Capture height in pixels
+        quality: JPEG quality (1-100)
+    """
+
+    def __init__(self, width: int = 1920, height: int = 1080, quality: int = 85):
+        self.width = width
+        self.height = height
+        self.quality = quality
+
+    @abc.abstractmethod
+    def capture(self, output_path: Path) -> bool:
+        """
+        Capture a single JPEG image.
+
+        Args:
+            output_path: Destination path for the image
+
+        Returns:
+            True if the image was written
+        """
+
+    def cleanup(self):
+        """Release camera resources."""
+
+
+class Picamera2Camera(Camera):
+    """
+    Camera backend holding a warm Picamera2 session between captures.
+
+    The sensor is configured and auto-exposure settles once at start-up, so
+    each capture only reads the next frame instead of re-initialising the camera.
+    """
+
+    def __init__(self, width: int = 1920, height: int = 1080, quality: int = 85, warmup_ms: int = 1000):
+        super().__init__(width, height, quality)
+        if Picamera2 is None:
+            raise RuntimeError("picamera2 is not installed")
+
+        self._camera = Picamera2()
+        self._camera.configure(self._camera.create_still_configuration(main={"size": (width, height)}))
+        self._camera.options["quality"] = quality
+        self._camera.start()
+        time.sleep(warmup_ms / 1000)  # Let auto-exposure and white balance settle once
+        print(f"Picamera2 session started ({width}x{height})")
+
+    def capture(self, output_path: Path) -> bool:
+        """Capture a JPEG from the running session."""
+        try:
+            self._camera.capture_file(str(output_path))
+            return True
+        except Exception as e:
+            print(f"Error capturing image with Picamera2: {e}")
+            return False
+
+    def cleanup(self):
+        """Stop and close the camera session."""
+        self._camera.stop()
+        self._camera.close()
+        print("Picamera2 session closed")
+
+
+class RaspistillCamera(Camera):
+    """
+    Camera backend running one raspistill process per capture.
+
+    Used on legacy camera stacks where Picamera2 is unavailable. Every capture
+    re-initialises the sensor and waits warmup_ms for auto-exposure.
+    """
+
+    def __init__(self, width: int = 1920, height: int = 1080, quality: int = 85, warmup_ms: int = 1000):
+        super().__init__(width, height, quality)
+        self.warmup_ms = warmup_ms
+
+    def capture(self, output_path: Path) -> bool:
+        """Capture a JPEG by running raspistill."""
+        cmd = [
+            "raspistill",
+            "-o", str(output_path),
+            "-w", str(self.width),
+            "-h", str(self.height),
+            "-q", str(self.quality),
+            "-t", str(self.warmup_ms)
+        ]
+        try:
+            subprocess.run(cmd, check=True)
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"Error capturing image: {e}")
+        except FileNotFoundError:
+            print("raspistill not found. Ensure camera is enabled and raspistill is installed.")
+        return False
+
+
+class MockCamera(Camera):
+    """
+    Camera backend producing synthetic greenhouse frames.
+
+    Frames show a sky gradient, a soil bed and plants whose size grows over the
+    days, lit according to the time of day, with sensor noise on top. This lets
+    the capture, deduplication, analysis and retention pipeline run without a camera.
+    """
+
+    def __init__(self, width: int = 1920, height: int = 1080, quality: int = 85, clock: Callable[[], datetime] = datetime.now):
+        super().__init__(width, height, quality)
+        self.clock = clock
+        print("MOCK: Camera initialized in mock mode.")
+
+    def render_frame(self, when: datetime):
+        """
+        Render a synthetic frame for a point in time.
+
+        Args:
+            when: Time the frame represents
+
+        Returns:
+            uint8 array of shape (height, width, 3)
+        """
+        rows = np.linspace(0.0, 1.0, self.height, dtype=np.float32)[:, None]
+        cols = np.linspace(0.0, 1.0, self.width, dtype=np.float32)[None, :]
+
+        # Sky above, soil below the horizon
+        sky = np.stack([0.55 + 0.2 * rows, 0.7 + 0.1 * rows, 0.9 - 0.1 * rows], axis=-1)
+        soil = np.broadcast_to(np.array([0.35, 0.25, 0.15], dtype=np.float32), sky.shape)
+        frame = np.where((rows > 0.55)[..., None], soil, sky) * np.ones_like(cols)[..., None]
+
+        # Plants grow over a ~60 day cycle
+        growth = 0.05 + 0.12 * ((when.toordinal() % 60) / 60)
+        for centre in (0.2, 0.5, 0.8):
+            mask = ((cols - centre) / growth) ** 2 + ((rows - 0.6) / (growth * 1.5)) ** 2 <= 1.0
+            frame[mask] = (0.15, 0.55, 0.15)
+
+        # Daylight follows a sine curve between 06:00 and 20:00
+        hour = when.hour + when.minute / 60
+        daylight = max(0.15, float(np.sin(np.pi * (hour - 6) / 14))) if 6 <= hour <= 20 else 0.15
+
+        rng = np.random.default_rng(int(when.timestamp()))
+        noise = rng.normal(0.0, 0.01, frame.shape[:2]).astype(np.float32)[..., None]
+        return (np.clip(frame * daylight + noise, 0.0, 1.0) * 255).astype(np.uint8)
+
+    def capture(self, output_path: Path) -> bool:
+        """Write a synthetic JPEG frame."""
+        Image.fromarray(self.render_frame(self.clock())).save(output_path, "JPEG", quality=self.quality)
+        print(f"MOCK: Camera captured synthetic frame to {output_path}")
+        return True
+
+
+def create_camera(
+    backend: str = "auto",
+    width: int = 1920,
+    height: int = 1080,
+    quality: int = 85,
+    warmup_ms: int = 1000,
+    mock_mode: bool = False,
+    clock: Callable[[], datetime] = datetime.now
+) -> Camera:
+    """
+    Create a camera capture backend.
+
+    Args:
+        backend: 'auto', 'picamera2', 'raspistill' or 'mock'. 'auto' picks the
+            mock camera in mock mode, otherwise Picamera2 when installed and
+            raspistill as a fallback.
+        width: Capture width in pixels
+        height: Capture height in pixels
+        quality: JPEG quality
+        warmup_ms: Auto-exposure warm-up time in milliseconds
+        mock_mode: Whether the system runs in mock hardware mode
+        clock: Time source the mock camera renders its scene for
+
+    Returns:
+        Camera backend instance
+    """
+    if backend == "auto":
+        if mock_mode:
+            backend = "mock"
+        elif Picamera2 is not None:
+            backend = "picamera2"
+        else:
+            backend = "raspistill"
+
+    if backend == "mock":
+        return MockCamera(width, height, quality, clock)
+    if backend == "picamera2":
+        return Picamera2Camera(width, height, quality, warmup_ms)
+    if backend == "raspistill":
+        return RaspistillCamera(width, height, quality, warmup_ms)
+    raise ValueError(f"Invalid camera backend: {backend}")
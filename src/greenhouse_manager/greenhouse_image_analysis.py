@@ -0,0 +1,174 @@
+"""
+Greenhouse Image Analysis
+
+Post-capture analysis of camera images for growth tracking:
+- Green-pixel canopy fraction using the excess-green index
+- Mean luminance
+- Per-channel colour histograms
+
+Metrics are computed with vectorized NumPy on a downscaled frame in a
+background worker thread and logged as a time series by GreenhouseDataLogger.
+"""
+
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+from PIL import Image
+
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+
+
+def load_downscaled_rgb(image_path: Path, width: int = 160) -> np.ndarray:
+    """
+    Decode an image into a small RGB frame using JPEG draft mode.
+
+    Args:
+        image_path: Path to the image file
+        width: Width of the output frame in pixels (aspect ratio is preserved)
+
+    Returns:
+        Array of shape (height, width, 3) with float32 values in [0, 1]
+    """
+    with Image.open(image_path) as img:
+        height = max(1, round(img.height * width / img.width))
+        img.draft("RGB", (width, height))
+        rgb = img.convert("RGB").resize((width, height), Image.BILINEAR)
+        return np.asarray(rgb, dtype=np.float32) / 255.0
+
+
+def compute_image_metrics(
+    rgb: np.ndarray,
+    green_threshold: float = 0.05,
+    histogram_bins: int = 16
+) -> Dict[str, Any]:
+    """
+    Compute canopy and light metrics for a frame.
+
+    The canopy fraction is the share of pixels whose excess-green index
+    (2g - r - b on chromatic coordinates) exceeds green_threshold.
+
+    Args:
+        rgb: Frame from load_downscaled_rgb
+        green_threshold: Excess-green threshold for a pixel to count as canopy
+        histogram_bins: Number of bins per colour channel
+
+    Returns:
+        Dictionary with canopy_fraction, mean_luminance and per-channel
+        histograms (normalised to sum to 1)
+    """
+    pixels = rgb.reshape(-1, 3)
+    total = pixels.sum(axis=1)
+    chromatic = np.divide(pixels, total[:, None], out=np.zeros_like(pixels), where=total[:, None] > 0)
+    excess_green = 2 * chromatic[:, 1] - chromatic[:, 0] - chromatic[:, 2]
+
+    luminance = pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+    bins = np.minimum((pixels * histogram_bins).astype(np.intp), histogram_bins - 1)
+    histograms = {
+        channel: (np.bincount(bins[:, i], minlength=histogram_bins) / len(pixels)).tolist()
+        for i, channel in enumerate(("red", "green", "blue"))
+    }
+
+    return {
+        "canopy_fraction": float((excess_green > green_threshold).mean()),
+        "mean_luminance": float(luminance.mean()),
+        "histogram_red": histograms["red"],
+        "histogram_green": histograms["green"],
+        "histogram_blue": histograms["blue"],
+    }
+
+
+class ImageAnalysisWorker:
+    """
+    Background worker that analyses captures and logs their metrics.
+
+    Captures are queued by the control thread and processed one at a time,
+    so analysis never delays sensor reads or device control.
+
+    Attributes:
+        data_logger: Logger receiving the metrics time series
+        analysis_width: Width of the downscaled frame used for analysis
+        green_threshold: Excess-green threshold for canopy pixels
+    """
+
+    def __init__(
+        self,
+        data_logger: GreenhouseDataLogger,
+        analysis_width: int = 160,
+        green_threshold: float = 0.05,
+        max_queue_size: int = 16
+    ):
+        self.data_logger = data_logger
+        self.analysis_width = analysis_width
+        self.green_threshold = green_threshold
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, image_path: Path, capture_time: datetime) -> bool:
+        """
+        Queue a capture for analysis without blocking.
+
+        Args:
+            image_path: Path to the stored image
+            capture_time: Time the capture was taken
+
+        Returns:
+            True if queued, False if the queue is full and the capture was dropped
+        """
+        try:
+            self._queue.put_nowait((Path(image_path), capture_time))
+            return True
+        except queue.Full:
+            print(f"Image analysis queue full, skipping {image_path}")
+            return False
+
+    def analyze(self, image_path: Path, capture_time: datetime) -> Dict[str, Any]:
+        """
+        Analyse a capture and log its metrics.
+
+        Args:
+            image_path: Path to the stored image
+            capture_time: Time the capture was taken
+
+        Returns:
+            Dictionary of computed metrics
+        """
+        rgb = load_downscaled_rgb(image_path, self.analysis_width)
+        metrics = compute_image_metrics(rgb, self.green_threshold)
+        self.data_logger.log_image_metrics(
+            filename=image_path.name,
+            timestamp=capture_time,
+            **metrics
+        )
+        return metrics
+
+    def _run(self):
+        """Process queued captures until a stop sentinel is received."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            image_path, capture_time = item
+            try:
+                self.analyze(image_path, capture_time)
+            except Exception as e:
+                print(f"Error analysing image {image_path}: {e}")
+
+    def start(self):
+        """Start the background analysis thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="image-analysis", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Finish queued captures and stop the background thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
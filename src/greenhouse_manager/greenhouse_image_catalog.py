@@ -0,0 +1,275 @@
+"""
+Greenhouse Image Catalog
+
+Class for recording metadata about every camera capture.
+Stores one Parquet file per day alongside the images, so consumers can
+see what was captured and how it was stored without scanning image files.
+"""
+
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import pandas as pd
+
+
+# Directories (relative to the image directory) that may hold stored captures,
+# from full resolution to smallest
+IMAGE_STORAGE_DIRECTORIES = ("", "medium", "thumbnails")
+
+
+def capture_filename(capture_time: datetime, burst_index: int = 0) -> str:
+    """
+    Build the filename for a capture.
+
+    Args:
+        capture_time: Time of the capture
+        burst_index: Index of the frame within a burst (0 for single captures)
+
+    Returns:
+        Filename such as 'greenhouse_20240115_120000.jpg', with a '_bNN'
+        suffix for the second and later frames of a burst
+    """
+    suffix = f"_b{burst_index:02d}" if burst_index > 0 else ""
+    return f"greenhouse_{capture_time.strftime('%Y%m%d_%H%M%S')}{suffix}.jpg"
+
+
+def parse_capture_time(filename: str) -> Optional[datetime]:
+    """
+    Recover the capture time from a capture filename.
+
+    Args:
+        filename: Capture filename (with or without a burst suffix)
+
+    Returns:
+        Capture time, or None if the filename does not follow the capture naming scheme
+    """
+    try:
+        return datetime.strptime(Path(filename).stem[:26], "greenhouse_%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+
+
+class GreenhouseImageCatalog:
+    """
+    Manages the per-day catalog of camera captures.
+
+    Attributes:
+        image_directory: Directory containing the camera images
+        catalog_directory: Directory holding the daily catalog files
+    """
+
+    def __init__(self, image_directory: str = "data/images"):
+        """
+        Initialize the image catalog.
+
+        Args:
+            image_directory: Directory for camera images
+        """
+        self.image_directory = Path(image_directory)
+        self.catalog_directory = self.image_directory / "catalog"
+
+        # Cache for current day's entries, shared between the capture path and retention
+        self._current_date = None
+        self._current_dataframe: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    def _get_catalog_filename(self, date: datetime) -> Path:
+        """
+        Generate the catalog filename for a given date.
+
+        Args:
+            date: Date for the catalog file
+
+        Returns:
+            Path object for the catalog file
+        """
+        return self.catalog_directory / f"image_catalog_{date.strftime('%Y-%m-%d')}.parquet"
+
+    def _get_column_names(self) -> List[str]:
+        """
+        Get the standard column names for catalog entries.
+
+        Returns:
+            List of column names
+        """
+        return [
+            "timestamp",
+            "filename",
+            "decision",
+            "change_score",
+            "stored_path",
+            "size_bytes"
+        ]
+
+    def record(
+        self,
+        timestamp: datetime,
+        filename: str,
+        decision: str,
+        change_score: Optional[float] = None,
+        stored_path: Optional[Path] = None
+    ):
+        """
+        Record a capture in the catalog.
+
+        Args:
+            timestamp: Time of the capture
+            filename: Original capture filename
+            decision: Storage decision ('full', 'thumbnail' or 'skipped')
+            change_score: Change score against the reference frame, if computed
+            stored_path: Path of the stored file, or None if nothing was kept
+        """
+        size_bytes = 0
+        relative_path = None
+        if stored_path is not None and Path(stored_path).exists():
+            size_bytes = Path(stored_path).stat().st_size
+            relative_path = Path(stored_path).relative_to(self.image_directory).as_posix()
+
+        record = {
+            "timestamp": timestamp,
+            "filename": filename,
+            "decision": decision,
+            "change_score": change_score,
+            "stored_path": relative_path,
+            "size_bytes": size_bytes
+        }
+
+        with self._lock:
+            current_date = timestamp.date()
+            if self._current_date != current_date:
+                self._current_date = current_date
+                self._current_dataframe = self.get_entries_for_date(timestamp)
+
+            new_row = pd.DataFrame([record], columns=self._get_column_names())
+            if self._current_dataframe is None or self._current_dataframe.empty:
+                self._current_dataframe = new_row
+            else:
+                self._current_dataframe = pd.concat([self._current_dataframe, new_row], ignore_index=True)
+
+            # Captures are infrequent, so every entry is written straight away
+            self._save_locked(self._current_dataframe, timestamp)
+
+    def update_stored_paths(self, date: datetime, stored_paths: Dict[str, Optional[Path]]):
+        """
+        Update where captures are stored after they have been moved or removed.
+
+        Args:
+            date: Date of the captures
+            stored_paths: Mapping of capture filename to its new stored path (None if removed)
+        """
+        with self._lock:
+            entries = self.get_entries_for_date(date)
+            if entries.empty:
+                return
+
+            for filename, stored_path in stored_paths.items():
+                mask = entries["filename"] == filename
+                if not mask.any():
+                    continue
+                if stored_path is not None and Path(stored_path).exists():
+                    entries.loc[mask, "stored_path"] = Path(stored_path).relative_to(self.image_directory).as_posix()
+                    entries.loc[mask, "size_bytes"] = Path(stored_path).stat().st_size
+                else:
+                    entries.loc[mask, "stored_path"] = None
+                    entries.loc[mask, "size_bytes"] = 0
+
+            self._save_locked(entries, date)
+            if self._current_date == date.date():
+                self._current_dataframe = entries
+
+    def _save_locked(self, entries: pd.DataFrame, date: datetime):
+        """
+        Write a day's catalog entries (caller holds the lock).
+
+        Args:
+            entries: Every entry for the day
+            date: Date of the entries
+        """
+        try:
+            self.catalog_directory.mkdir(parents=True, exist_ok=True)
+            entries.to_parquet(self._get_catalog_filename(date), index=False, compression='snappy')
+        except Exception as e:
+            print(f"Error saving image catalog: {e}")
+
+    def get_entries_for_date(self, date: datetime) -> pd.DataFrame:
+        """
+        Retrieve catalog entries for a specific date.
+
+        Args:
+            date: Date to retrieve entries for
+
+        Returns:
+            DataFrame of entries, empty if none were recorded
+        """
+        catalog_file = self._get_catalog_filename(date)
+
+        if catalog_file.exists():
+            try:
+                return pd.read_parquet(catalog_file)
+            except Exception as e:
+                print(f"Error loading image catalog {catalog_file}: {e}")
+
+        return pd.DataFrame(columns=self._get_column_names())
+
+    def find_stored_images(self, date: datetime) -> List[Path]:
+        """
+        List the stored captures for a date across all storage directories.
+
+        Args:
+            date: Date to list captures for
+
+        Returns:
+            Paths of stored captures, ordered by capture time
+        """
+        pattern = f"greenhouse_{date.strftime('%Y%m%d')}_*.jpg"
+        images = []
+        for directory in IMAGE_STORAGE_DIRECTORIES:
+            images.extend((self.image_directory / directory).glob(pattern))
+        return sorted(images, key=lambda path: path.name)
+
+    def find_latest_original(self) -> Optional[Path]:
+        """
+        Find the newest full resolution capture, however old.
+
+        Only the originals directory is searched, so downscaled copies are never
+        returned and older tiers are not walked.
+
+        Returns:
+            Path of the newest original, or None if no original is kept
+        """
+        return max(self.image_directory.glob("greenhouse_*.jpg"), key=lambda path: path.name, default=None)
+
+    def resolve_image(self, filename: str) -> Optional[Path]:
+        """
+        Find where a capture is currently stored.
+
+        Args:
+            filename: Capture filename
+
+        Returns:
+            Path to the stored capture (largest available), or None if not stored
+        """
+        for directory in IMAGE_STORAGE_DIRECTORIES:
+            candidate = self.image_directory / directory / filename
+            if candidate.resolve().is_relative_to(self.image_directory.resolve()) and candidate.is_file():
+                return candidate
+        return None
+
+    def get_summary(self, date: datetime) -> Dict[str, Any]:
+        """
+        Summarise storage decisions for a specific date.
+
+        Args:
+            date: Date to summarise
+
+        Returns:
+            Dictionary with capture counts per decision and stored bytes
+        """
+        entries = self.get_entries_for_date(date)
+        return {
+            "date": date.strftime("%Y-%m-%d"),
+            "capture_count": len(entries),
+            "decisions": {k: int(v) for k, v in entries["decision"].value_counts().items()},
+            "stored_bytes": int(entries["size_bytes"].sum()) if not entries.empty else 0
+        }
@@ -0,0 +1,162 @@
+"""
+Greenhouse Image Processing
+
+Lightweight NumPy helpers for working with camera captures:
+- Decoding a capture into a small grayscale frame for comparison
+- Scoring the change between two frames
+- Suppressing near-duplicate frames by keeping them only as thumbnails (or not at all)
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+
+# Possible storage decisions for a capture
+DECISION_FULL = "full"
+DECISION_THUMBNAIL = "thumbnail"
+DECISION_SKIPPED = "skipped"
+
+
+def load_downscaled_gray(image_path: Path, size: int = 64) -> np.ndarray:
+    """
+    Decode an image into a small grayscale frame.
+
+    JPEG draft mode is used so the decoder scales the image down while decoding,
+    which avoids materialising the full resolution frame.
+
+    Args:
+        image_path: Path to the image file
+        size: Edge length of the square output frame in pixels
+
+    Returns:
+        Array of shape (size, size) with float32 values in [0, 1]
+    """
+    with Image.open(image_path) as img:
+        img.draft("L", (size * 2, size * 2))
+        gray = img.convert("L").resize((size, size), Image.BILINEAR)
+        return np.asarray(gray, dtype=np.float32) / 255.0
+
+
+def frame_change(previous: np.ndarray, current: np.ndarray) -> float:
+    """
+    Score the change between two downscaled frames.
+
+    Both frames are normalised to the same mean brightness first, so a small
+    global exposure shift does not count as change on its own.
+
+    Args:
+        previous: Reference frame from load_downscaled_gray
+        current: New frame from load_downscaled_gray
+
+    Returns:
+        Mean absolute pixel difference in [0, 1]
+    """
+    if previous.shape != current.shape:
+        return 1.0
+    diff = (current - current.mean()) - (previous - previous.mean())
+    return float(np.abs(diff).mean())
+
+
+def save_resized(image_path: Path, output_path: Path, width: int = 320, quality: int = 75) -> Path:
+    """
+    Save a reduced-size JPEG copy of an image.
+
+    Args:
+        image_path: Source image
+        output_path: Destination path for the resized copy
+        width: Output width in pixels (aspect ratio is preserved)
+        quality: JPEG quality of the output
+
+    Returns:
+        Path to the saved copy
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(image_path) as img:
+        height = max(1, round(img.height * width / img.width))
+        img.draft("RGB", (width, height))
+        img.convert("RGB").resize((width, height), Image.BILINEAR).save(
+            output_path, "JPEG", quality=quality
+        )
+    return output_path
+
+
+@dataclass
+class FrameDecision:
+    """Storage decision for a single capture."""
+
+    decision: str
+    change_score: Optional[float]
+    stored_path: Optional[Path]
+
+
+class NearDuplicateFilter:
+    """
+    Decides whether a new capture differs enough from the last kept frame.
+
+    Frames are compared against the last frame stored at full quality rather than
+    the immediately previous capture, so slow changes still accumulate until a
+    new full frame is kept.
+
+    Attributes:
+        change_threshold: Minimum change score for a frame to be kept at full quality
+        duplicate_action: 'thumbnail' to keep a thumbnail of duplicates, 'skip' to drop them
+        comparison_size: Edge length of the comparison frame in pixels
+        thumbnail_width: Width of thumbnails kept for duplicates
+    """
+
+    def __init__(
+        self,
+        change_threshold: float = 0.02,
+        duplicate_action: str = DECISION_THUMBNAIL,
+        comparison_size: int = 64,
+        thumbnail_width: int = 320
+    ):
+        if duplicate_action not in (DECISION_THUMBNAIL, "skip"):
+            raise ValueError(f"Invalid duplicate action: {duplicate_action}. Must be 'thumbnail' or 'skip'")
+
+        self.change_threshold = change_threshold
+        self.duplicate_action = duplicate_action
+        self.comparison_size = comparison_size
+        self.thumbnail_width = thumbnail_width
+        self._reference: Optional[np.ndarray] = None
+
+    def process(self, image_path: Path, thumbnail_directory: Path) -> FrameDecision:
+        """
+        Score a new capture and store or discard it accordingly.
+
+        Near-duplicates have their full resolution file removed, keeping only a
+        thumbnail in thumbnail_directory when duplicate_action is 'thumbnail'.
+
+        Args:
+            image_path: Path to the freshly captured image
+            thumbnail_directory: Directory for thumbnails of near-duplicate frames
+
+        Returns:
+            FrameDecision describing what was kept
+        """
+        frame = load_downscaled_gray(image_path, self.comparison_size)
+
+        if self._reference is None:
+            self._reference = frame
+            return FrameDecision(DECISION_FULL, None, image_path)
+
+        score = frame_change(self._reference, frame)
+        if score >= self.change_threshold:
+            self._reference = frame
+            return FrameDecision(DECISION_FULL, score, image_path)
+
+        if self.duplicate_action == DECISION_THUMBNAIL:
+            stored = save_resized(image_path, thumbnail_directory / image_path.name, self.thumbnail_width)
+            image_path.unlink()
+            return FrameDecision(DECISION_THUMBNAIL, score, stored)
+
+        image_path.unlink()
+        return FrameDecision(DECISION_SKIPPED, score, None)
+
+    def reset(self):
+        """Forget the reference frame so the next capture is always kept."""
+        self._reference = None
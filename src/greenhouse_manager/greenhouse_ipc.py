@@ -0,0 +1,301 @@
+"""
+Greenhouse IPC
+
+Local control channel between the webserver and the manager process:
+- Newline-delimited JSON requests and responses over a Unix domain socket
+- ControlServer dispatches each request to a named handler on a per-connection thread
+- ControlClient keeps one connection open and reconnects when the manager restarts
+- SettingsPersister writes accepted changes back to the settings file in the background
+
+Access is limited by the file permissions of the socket. A request is
+{"method": ..., "params": {...}} and the response is {"ok": true, "result": ...}
+or {"ok": false, "error": ...}.
+"""
+
+import json
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from greenhouse_manager.greenhouse_metrics import REGISTRY
+
+
+IPC_REQUEST_SECONDS = REGISTRY.histogram(
+    "greenhouse_ipc_request_seconds", "Time taken to handle a control channel request", ["method"]
+)
+IPC_REQUEST_FAILURES = REGISTRY.counter(
+    "greenhouse_ipc_request_failures_total", "Control channel requests that returned an error", ["method"]
+)
+
+# Requests larger than this are rejected, so a bad client cannot exhaust memory
+MAX_REQUEST_BYTES = 65536
+
+
+class ControlError(Exception):
+    """A control request was rejected by the manager."""
+
+
+class ControlUnavailable(ControlError):
+    """The manager's control socket could not be reached."""
+
+
+class ControlServer:
+    """
+    Serves control requests on a Unix domain socket.
+
+    Handlers receive the request's params as keyword arguments and return a
+    JSON-serialisable result. ValueError, KeyError and TypeError raised by a
+    handler are reported to the client as errors.
+
+    Attributes:
+        socket_path: Path of the socket
+        handlers: Handler by method name
+        socket_mode: File permissions applied to the socket
+    """
+
+    def __init__(self, socket_path: str, handlers: Dict[str, Callable[..., Any]], socket_mode: int = 0o660):
+        self.socket_path = Path(socket_path)
+        self.handlers = handlers
+        self.socket_mode = socket_mode
+        self._socket: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Dispatch one decoded request.
+
+        Args:
+            request: Request with 'method' and optional 'params'
+
+        Returns:
+            Response dictionary
+        """
+        method = request.get("method")
+        handler = self.handlers.get(method)
+        if handler is None:
+            return {"ok": False, "error": f"Unknown method: {method}"}
+
+        with IPC_REQUEST_SECONDS.labels(method).time():
+            try:
+                return {"ok": True, "result": handler(**(request.get("params") or {}))}
+            except (ValueError, KeyError, TypeError) as e:
+                IPC_REQUEST_FAILURES.labels(method).inc()
+                return {"ok": False, "error": str(e)}
+            except Exception as e:
+                IPC_REQUEST_FAILURES.labels(method).inc()
+                print(f"Error handling control request '{method}': {e}")
+                return {"ok": False, "error": f"Internal error: {e}"}
+
+    def _serve_connection(self, conn: socket.socket):
+        with conn, conn.makefile("rb") as reader:
+            while not self._stop_event.is_set():
+                line = reader.readline(MAX_REQUEST_BYTES + 1)
+                if not line:
+                    break
+                if len(line) > MAX_REQUEST_BYTES:
+                    conn.sendall(b'{"ok": false, "error": "Request too large"}\n')
+                    break
+                try:
+                    request = json.loads(line)
+                    response = self.handle(request) if isinstance(request, dict) else {
+                        "ok": False, "error": "Request must be a JSON object"
+                    }
+                except json.JSONDecodeError as e:
+                    response = {"ok": False, "error": f"Invalid JSON: {e}"}
+                try:
+                    conn.sendall(json.dumps(response, default=str).encode() + b"\n")
+                except OSError:
+                    break
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                conn, _ = self._socket.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve_connection, args=(conn,), name="control-conn", daemon=True).start()
+
+    def start(self):
+        """Bind the socket and start accepting connections in a background thread."""
+        if self._thread is not None:
+            return
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            # Left behind by a manager that did not shut down cleanly
+            self.socket_path.unlink()
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(str(self.socket_path))
+        os.chmod(self.socket_path, self.socket_mode)
+        self._socket.listen(8)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        print(f"Control channel listening on {self.socket_path}")
+
+    def stop(self):
+        """Stop accepting connections and remove the socket file."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        self._thread.join(timeout=5)
+        self._thread = None
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+
+class ControlClient:
+    """
+    Sends control requests to the manager.
+
+    One connection is kept open and shared by callers under a lock; it is
+    re-established once if the manager has restarted since the last request.
+
+    Attributes:
+        socket_path: Path of the manager's control socket
+        timeout: Seconds to wait for a response
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise ControlUnavailable(f"Manager control socket unavailable: {e}") from e
+        self._socket = sock
+        self._reader = sock.makefile("rb")
+
+    def _exchange(self, payload: bytes) -> bytes:
+        if self._socket is None:
+            self._connect()
+        self._socket.sendall(payload)
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionResetError("Manager closed the connection")
+        return line
+
+    def call(self, method: str, **params) -> Any:
+        """
+        Call a manager method.
+
+        Args:
+            method: Method name
+            **params: Method parameters
+
+        Returns:
+            The method's result
+
+        Raises:
+            ControlUnavailable: If the manager cannot be reached
+            ControlError: If the manager rejected the request
+        """
+        payload = json.dumps({"method": method, "params": params}).encode() + b"\n"
+        with self._lock:
+            try:
+                try:
+                    line = self._exchange(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The manager restarted since the last request; reconnect once
+                    self.close()
+                    line = self._exchange(payload)
+            except ControlUnavailable:
+                raise
+            except OSError as e:
+                self.close()
+                raise ControlUnavailable(f"Manager control request failed: {e}") from e
+
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise ControlError(response.get("error", "Unknown error"))
+        return response.get("result")
+
+    def close(self):
+        """Close the connection."""
+        if self._socket is not None:
+            try:
+                self._reader.close()
+                self._socket.close()
+            except OSError:
+                pass
+        self._socket = None
+        self._reader = None
+
+
+class SettingsPersister:
+    """
+    Writes setting changes back to the settings file in the background.
+
+    Changes made within delay_seconds of each other are written together.
+    Only the changed keys of the file are replaced, and the file is replaced
+    atomically so a reader never sees a partial write.
+
+    Attributes:
+        config_path: Settings JSON file
+        delay_seconds: Time to wait for further changes before writing
+    """
+
+    def __init__(self, config_path: str, delay_seconds: float = 2.0):
+        self.config_path = Path(config_path)
+        self.delay_seconds = delay_seconds
+        self._pending: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def update(self, changes: Dict[Tuple[str, ...], Any]):
+        """
+        Schedule changes to be written.
+
+        Args:
+            changes: New values by key path, e.g. {("temperature_control", "target_temp_celsius"): 22.0}
+        """
+        with self._lock:
+            self._pending.update(changes)
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write any pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            changes, self._pending = self._pending, {}
+            if not changes:
+                return
+            try:
+                with open(self.config_path, 'r') as f:
+                    config = json.load(f)
+                for path, value in changes.items():
+                    section = config
+                    for key in path[:-1]:
+                        section = section.setdefault(key, {})
+                    section[path[-1]] = value
+
+                temporary = self.config_path.with_name(f".{self.config_path.name}.{os.getpid()}.tmp")
+                with open(temporary, 'w') as f:
+                    json.dump(config, f, indent=2)
+                    f.write("\n")
+                os.replace(temporary, self.config_path)
+                print(f"Saved {len(changes)} setting change(s) to {self.config_path}")
+            except Exception as e:
+                print(f"Error saving settings to {self.config_path}: {e}")
+
@@ -3,41 +3,174 @@ Greenhouse Manager
 
 Main script for managing greenhouse operations including:
 - Continuous monitoring of temperature and humidity
-- Automatic control of heater and vent fan
-- Time-based scheduling of grow lights and stand fan
+- Automatic control of heater and vent fan devices
+- Time-based scheduling of devices with their own schedules
 - Scheduled camera captures
 - Data logging
 - Manual button control via GPIO interrupts
+- A Unix-socket control channel for setpoint changes, device overrides and captures
+- Device states journaled to disk, so restarts resume without re-sending RF codes
+- Slow, jittered reassertion of outlet states in case an RF command was missed
+- Optional capture of every sensor reading, logged as per-interval summaries
 """
 
 import os
 import sys
 import json
-import time
 import signal
-import subprocess
+import threading
 from datetime import datetime, time as dt_time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
-from greenhouse_manager_settings import GreenhouseManagerSettings, DeviceConfig, TimeSchedule
-from greenhouse_hardware_collection import BME280Sensor, RFOutlet, Button
-from greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_manager_settings import (
+    GreenhouseManagerSettings,
+    DeviceConfig,
+    TimeSchedule,
+    settings_diff
+)
+from greenhouse_manager.greenhouse_hardware_collection import BME280Sensor, RFOutlet, RFTransmitQueue, Camera, create_camera
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_energy import EnergyMeter
+from greenhouse_manager.greenhouse_raw_capture import RawCaptureBuffer
+from greenhouse_manager.greenhouse_image_catalog import GreenhouseImageCatalog, capture_filename
+from greenhouse_manager.greenhouse_image_processing import NearDuplicateFilter, DECISION_FULL
+from greenhouse_manager.greenhouse_image_analysis import ImageAnalysisWorker
+from greenhouse_manager.greenhouse_retention import RetentionEngine
+from greenhouse_manager.greenhouse_metrics import REGISTRY, MetricsServer
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+from greenhouse_manager.greenhouse_simulation import create_simulated_sensor, running_by_role
+from greenhouse_manager.greenhouse_acquisition import SENSOR_READING_AGE, SensorAcquisition
+from greenhouse_manager.greenhouse_sensors import SensorPoller, create_sensor_plugin
+from greenhouse_manager.greenhouse_control import ExponentialSmoother, StateReconciler, SwitchController, TokenBucket
+from greenhouse_manager.greenhouse_devices import DeviceRegistry
+from greenhouse_manager.greenhouse_ipc import ControlServer, SettingsPersister
+from greenhouse_manager.greenhouse_state_journal import DeviceStateJournal
+
+
+# Control loop instrumentation
+CONTROL_TICK_SECONDS = REGISTRY.histogram(
+    "greenhouse_control_tick_seconds", "Duration of a control loop iteration"
+)
+CAMERA_CAPTURE_SECONDS = REGISTRY.histogram(
+    "greenhouse_camera_capture_seconds", "Time taken to capture an image"
+)
+CAMERA_CAPTURES = REGISTRY.counter(
+    "greenhouse_camera_captures_total", "Images captured by the camera"
+)
+
+
+# Components rebuilt on a configuration reload, in build order, with the settings
+# (top-level fields or dotted paths) each depends on
+COMPONENT_SETTINGS = {
+    "sensor": ("mock_mode", "sensor", "simulation"),
+    "sensor_poller": ("mock_mode", "sensors"),
+    "state_journal": ("log_directory", "state_journal"),
+    "devices": (
+        "mock_mode", "devices", "heater", "vent_fan", "grow_lights", "stand_fan",
+        "grow_lights_schedule", "stand_fan_schedule"
+    ),
+    "control": ("temperature_control.smoothing_time_constant_seconds", "rf_budget"),
+    "reconciler": ("reassertion",),
+    "data_logger": ("log_directory", "data_logging"),
+    "raw_capture": ("raw_capture", "sensor.read_interval_seconds"),
+    "energy_meter": ("energy",),
+    "camera": ("mock_mode", "camera", "camera_schedule.enabled"),
+    "image_pipeline": ("image_directory", "camera_deduplication", "image_analysis"),
+    "retention": ("image_directory", "retention"),
+    "control_channel": ("control_channel",),
+}
+
+# Components holding a reference to another component are rebuilt along with it
+COMPONENT_DEPENDENCIES = {
+    "devices": ("state_journal",),
+    "raw_capture": ("data_logger",),
+    "energy_meter": ("devices", "data_logger"),
+    "image_pipeline": ("data_logger",),
+    "retention": ("data_logger", "image_pipeline"),
+}
+
+# Seconds without further file events before a changed configuration is reloaded
+CONFIG_RELOAD_DEBOUNCE_SECONDS = 1.0
+
+CONFIG_RELOADS = REGISTRY.counter(
+    "greenhouse_config_reloads_total", "Configuration reloads by result", ["result"]
+)
+
+# Setpoints that can be changed over the control channel, with their settings section
+SETPOINTS = {
+    "target_temp_celsius": "temperature_control",
+    "temp_tolerance_celsius": "temperature_control",
+    "target_humidity_percent": "humidity_control",
+    "humidity_tolerance_percent": "humidity_control",
+}
+
+
+def components_for_changes(changes: List[str]) -> List[str]:
+    """
+    Work out which components a set of settings changes requires rebuilding.
+
+    Args:
+        changes: Dotted paths of changed settings, from settings_diff
+
+    Returns:
+        Component names in build order
+    """
+    def affects(path: str, setting: str) -> bool:
+        return path == setting or path.startswith(setting + ".") or setting.startswith(path + ".")
+
+    components = set()
+    for component, settings in COMPONENT_SETTINGS.items():
+        if any(affects(path, setting) for path in changes for setting in settings):
+            components.add(component)
+        if any(dependency in components for dependency in COMPONENT_DEPENDENCIES.get(component, ())):
+            components.add(component)
+    return [component for component in COMPONENT_SETTINGS if component in components]
 
 
 class ConfigFileHandler(FileSystemEventHandler):
-    """Monitors configuration file for changes."""
+    """
+    Monitors configuration file for changes.
 
-    def __init__(self, config_path: str, callback):
+    Editors often write a file in several steps, so the callback runs once the
+    file has been quiet for debounce_seconds rather than on every event.
+    """
+
+    def __init__(self, config_path: str, callback, debounce_seconds: float = CONFIG_RELOAD_DEBOUNCE_SECONDS):
         self.config_path = Path(config_path).resolve()
         self.callback = callback
+        self.debounce_seconds = debounce_seconds
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def _changed(self, path: str):
+        if Path(path).resolve() != self.config_path:
+            return
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_seconds, self.callback)
+            self._timer.daemon = True
+            self._timer.start()
 
     def on_modified(self, event):
-        if Path(event.src_path).resolve() == self.config_path:
-            print(f"Configuration file modified: {event.src_path}")
-            self.callback()
+        self._changed(event.src_path)
+
+    def on_created(self, event):
+        self._changed(event.src_path)
+
+    def on_moved(self, event):
+        # Editors that save to a temporary file and rename it over the original
+        self._changed(event.dest_path)
+
+    def cancel(self):
+        """Drop a pending reload."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
 
 
 class GreenhouseManager:
@@ -47,56 +180,125 @@ class GreenhouseManager:
     Handles sensor monitoring, device control, scheduling, and data logging.
     """
 
-    def __init__(self, config_path: str = "config/greenhouse_manager_settings.json"):
+    def __init__(
+        self,
+        config_path: str = "config/greenhouse_manager_settings.json",
+        settings: Optional[GreenhouseManagerSettings] = None,
+        clock: Clock = SYSTEM_CLOCK,
+        monitor_config: bool = True,
+        transmitter: Optional[RFTransmitQueue] = None
+    ):
         """
         Initialize the greenhouse manager.
 
         Args:
             config_path: Path to the JSON configuration file
+            settings: Pre-validated settings to use instead of loading config_path
+            clock: Time source for control timing, schedules and timestamps
+            monitor_config: Watch config_path for changes and reload them
+            transmitter: RF transmitter queue shared with other managers in the
+                process (codes are sent directly when not set)
         """
         self.config_path = config_path
-        self.settings: Optional[GreenhouseManagerSettings] = None
+        self.settings: Optional[GreenhouseManagerSettings] = settings
+        self.clock = clock
+        self.transmitter = transmitter
         self.running = False
+        self.started = False
+
+        # Held by each control loop iteration and while a reload swaps components
+        self._lock = threading.RLock()
 
         # Hardware components
         self.sensor: Optional[BME280Sensor] = None
-        self.heater: Optional[RFOutlet] = None
-        self.vent_fan: Optional[RFOutlet] = None
-        self.grow_lights: Optional[RFOutlet] = None
-        self.stand_fan: Optional[RFOutlet] = None
+        self.sensor_acquisition: Optional[SensorAcquisition] = None
+        self.sensor_poller: Optional[SensorPoller] = None
 
-        # Buttons for manual control
-        self.heater_button: Optional[Button] = None
-        self.vent_fan_button: Optional[Button] = None
-        self.grow_lights_button: Optional[Button] = None
-        self.stand_fan_button: Optional[Button] = None
+        # Outlets and manual control buttons for every configured device
+        self.devices: Optional[DeviceRegistry] = None
+        self.state_journal: Optional[DeviceStateJournal] = None
+
+        # Smoothed control input, dwell times and RF budget
+        self.temperature_filter: Optional[ExponentialSmoother] = None
+        self.switch_controller: Optional[SwitchController] = None
+        self.reconciler: Optional[StateReconciler] = None
 
         # Data logger
         self.data_logger: Optional[GreenhouseDataLogger] = None
 
+        # Readings at the sensor rate, summarised per log interval
+        self.raw_capture: Optional[RawCaptureBuffer] = None
+
+        # Energy counters for devices with a wattage
+        self.energy_meter: Optional[EnergyMeter] = None
+
+        # Camera, capture catalog and near-duplicate suppression
+        self.camera: Optional[Camera] = None
+        self.image_catalog: Optional[GreenhouseImageCatalog] = None
+        self.duplicate_filter: Optional[NearDuplicateFilter] = None
+        self.image_analysis_worker: Optional[ImageAnalysisWorker] = None
+
+        # Background retention for images and logs
+        self.retention_engine: Optional[RetentionEngine] = None
+
+        # Manager-side metrics endpoint
+        self.metrics_server: Optional[MetricsServer] = None
+
+        # Control channel, manual overrides (device id -> state, expiry) and pending capture request
+        self.control_server: Optional[ControlServer] = None
+        self.settings_persister: Optional[SettingsPersister] = None
+        self.device_overrides: Dict[str, Tuple[bool, float]] = {}
+        self.capture_requested = False
+
+        # Frames of the burst in progress, its capture time and when the next frame is due
+        self.burst_frames: List[Path] = []
+        self.burst_capture_time: Optional[datetime] = None
+        self.next_burst_frame = 0.0
+
         # Timing tracking
         self.last_sensor_read = 0
+        self.last_sensor_sequence = 0
+        self.last_schedule_check = 0
+        self.sensor_stale = False
         self.last_log_write = 0
         self.last_camera_capture = 0
         self.last_log_cleanup = 0
 
         # Config file monitoring
         self.config_observer: Optional[Observer] = None
+        self.config_handler: Optional[ConfigFileHandler] = None
 
-        # Load initial configuration
-        self.load_configuration()
+        # Load initial configuration (changes made over the control channel are saved back to it)
+        if self.settings is None:
+            self.load_configuration()
+            self.settings_persister = SettingsPersister(
+                self.config_path, self.settings.control_channel.persist_delay_seconds
+            )
         self.initialize_hardware()
-        self.setup_config_monitoring()
+        if monitor_config:
+            self.setup_config_monitoring()
+
+    def read_configuration(self) -> GreenhouseManagerSettings:
+        """
+        Read and validate the configuration file without applying it.
+
+        Returns:
+            Validated settings
+
+        Raises:
+            OSError, ValueError: If the file cannot be read, parsed or validated
+        """
+        with open(self.config_path, 'r') as f:
+            config_data = json.load(f)
+
+        # Validate with Pydantic model
+        return GreenhouseManagerSettings(**config_data)
 
     def load_configuration(self):
         """Load and validate configuration from JSON file."""
         try:
             print(f"Loading configuration from: {self.config_path}")
-            with open(self.config_path, 'r') as f:
-                config_data = json.load(f)
-
-            # Validate with Pydantic model
-            self.settings = GreenhouseManagerSettings(**config_data)
+            self.settings = self.read_configuration()
             print("Configuration loaded and validated successfully")
 
         except FileNotFoundError:
@@ -113,111 +315,362 @@ class GreenhouseManager:
     def initialize_hardware(self):
         """Initialize all hardware components based on configuration."""
         print("Initializing hardware components...")
+        for component in COMPONENT_SETTINGS:
+            getattr(self, f"_init_{component}")()
 
-        mock_mode = self.settings.mock_mode
+        # Start the transitions of this run from the state every device is in
+        for device_id, state in self.devices.states().items():
+            self.log_transition(device_id, state, "startup")
+        print("Hardware initialization complete")
 
-        # Initialize sensor
-        self.sensor = BME280Sensor(
-            i2c_bus_number=self.settings.sensor.i2c_bus,
-            i2c_address=self.settings.sensor.i2c_address,
-            mock_mode=mock_mode
-        )
+    def _init_sensor(self):
+        """Create the sensor and its acquisition, replacing any existing ones."""
+        restart = self.sensor_acquisition is not None and self.sensor_acquisition.running
+        if self.sensor_acquisition is not None:
+            self.sensor_acquisition.stop()
+        if self.sensor is not None:
+            self.sensor.cleanup()
 
-        # Initialize devices
-        self.heater = RFOutlet(
-            name=self.settings.heater.name,
-            send_on_code=self.settings.heater.rf_on_code,
-            send_off_code=self.settings.heater.rf_off_code,
-            led_gpio_pin=self.settings.heater.led_gpio_pin,
-            mock_mode=mock_mode
-        )
+        # In mock mode, optionally a simulated plant driven by the devices
+        if self.settings.mock_mode and self.settings.simulation.enabled:
+            self.sensor = create_simulated_sensor(
+                self.settings.simulation,
+                running_devices=lambda: running_by_role(self.settings.device_list(), self.get_device_states()),
+                clock=self.clock
+            )
+        else:
+            self.sensor = BME280Sensor(
+                i2c_bus_number=self.settings.sensor.i2c_bus,
+                i2c_address=self.settings.sensor.i2c_address,
+                mock_mode=self.settings.mock_mode
+            )
 
-        self.vent_fan = RFOutlet(
-            name=self.settings.vent_fan.name,
-            send_on_code=self.settings.vent_fan.rf_on_code,
-            send_off_code=self.settings.vent_fan.rf_off_code,
-            led_gpio_pin=self.settings.vent_fan.led_gpio_pin,
-            mock_mode=mock_mode
+        # Oversampled, filtered readings from the sensor
+        self.sensor_acquisition = SensorAcquisition(self.sensor, self.settings.sensor, self.clock)
+        self.last_sensor_sequence = 0
+        if restart:
+            self.sensor_acquisition.start()
+
+    def _init_sensor_poller(self):
+        """Create the poller for the additional pluggable sensors, finishing any existing one."""
+        if self.sensor_poller is not None:
+            self.sensor_poller.shutdown()
+            if self.data_logger is not None:
+                self.log_channel_readings()
+
+        # Additional pluggable sensors, read concurrently on their own intervals
+        plugins = []
+        for sensor_config in self.settings.sensors:
+            if not sensor_config.enabled:
+                continue
+            try:
+                plugins.append(create_sensor_plugin(sensor_config, mock_mode=self.settings.mock_mode))
+            except Exception as e:
+                print(f"Error initializing sensor '{sensor_config.name}': {e}")
+        self.sensor_poller = SensorPoller(plugins, clock=self.clock)
+
+    def _init_state_journal(self):
+        """Open the device state journal, closing any existing one."""
+        if self.state_journal is not None:
+            self.state_journal.close()
+            self.state_journal = None
+
+        if self.settings.state_journal.enabled:
+            try:
+                self.state_journal = DeviceStateJournal(
+                    str(self.settings.state_journal_path()),
+                    capacity=self.settings.state_journal.capacity,
+                    clock=self.clock
+                )
+            except OSError as e:
+                print(f"Error opening device state journal, outlets will start OFF: {e}")
+
+    def _init_devices(self):
+        """Create the devices and their buttons, or reconfigure the existing registry."""
+        configs = self.settings.device_list()
+        if self.devices is not None and self.devices.mock_mode == self.settings.mock_mode:
+            self.devices.attach_journal(self.state_journal)
+            changes = self.devices.update(configs)
+            for change, device_ids in changes.items():
+                if device_ids:
+                    print(f"Devices {change}: {', '.join(device_ids)}")
+            # New outlets start from an assumed state, which the transitions record
+            for device_id in changes["added"] + changes["replaced"]:
+                self.log_transition(device_id, self.devices.get(device_id).get_state(), "config")
+        else:
+            if self.devices is not None:
+                self.devices.cleanup()
+            self.devices = DeviceRegistry(
+                configs,
+                mock_mode=self.settings.mock_mode,
+                transmitter=self.transmitter,
+                journal=self.state_journal
+            )
+            if self.state_journal is not None:
+                restored = [config.id for config in configs if self.state_journal.get(config.id) is not None]
+                if restored:
+                    print(f"Restored states of {len(restored)} devices from {self.state_journal.path}")
+        self.devices.on_transition = self.log_transition
+
+        # Free the journal slots of devices no longer configured
+        if self.state_journal is not None:
+            self.state_journal.retain(config.id for config in configs)
+
+    def _init_control(self):
+        """Create the control input smoothing and switch guards, keeping existing dwell times."""
+        self.temperature_filter = ExponentialSmoother(
+            self.settings.temperature_control.smoothing_time_constant_seconds
         )
+        rf_budget = self.settings.rf_budget
+        budget = (TokenBucket(rf_budget.max_transmissions_per_hour, rf_budget.burst, self.clock)
+                  if rf_budget.enabled else None)
+        if self.switch_controller is None:
+            self.switch_controller = SwitchController(clock=self.clock, budget=budget)
+            # Dwell times carry on from the switches made before a restart
+            if self.state_journal is not None:
+                for device in self.devices:
+                    entry = self.state_journal.get(device.id)
+                    if entry is not None:
+                        self.switch_controller.restore_switch_time(device.outlet, entry.changed_at)
+        else:
+            self.switch_controller.budget = budget
 
-        self.grow_lights = RFOutlet(
-            name=self.settings.grow_lights.name,
-            send_on_code=self.settings.grow_lights.rf_on_code,
-            send_off_code=self.settings.grow_lights.rf_off_code,
-            led_gpio_pin=self.settings.grow_lights.led_gpio_pin,
-            mock_mode=mock_mode
-        )
+    def _init_reconciler(self):
+        """Create the state reconciler, which starts a new rotation over the devices."""
+        self.reconciler = (StateReconciler(self.settings.reassertion, clock=self.clock)
+                           if self.settings.reassertion.enabled else None)
 
-        self.stand_fan = RFOutlet(
-            name=self.settings.stand_fan.name,
-            send_on_code=self.settings.stand_fan.rf_on_code,
-            send_off_code=self.settings.stand_fan.rf_off_code,
-            led_gpio_pin=self.settings.stand_fan.led_gpio_pin,
-            mock_mode=mock_mode
+    def _init_data_logger(self):
+        """Create the data logger, flushing any existing one."""
+        if self.data_logger is not None:
+            self.data_logger.flush()
+        self.data_logger = GreenhouseDataLogger(
+            log_directory=self.settings.log_directory,
+            log_format=self.settings.data_logging.log_format,
+            max_log_days=self.settings.data_logging.max_log_days,
+            clock=self.clock,
+            mode=self.settings.data_logging.mode,
+            deadbands=self.settings.data_logging.deadbands,
+            heartbeat_seconds=self.settings.data_logging.heartbeat_seconds,
+            log_interval_seconds=self.settings.data_logging.log_interval_seconds,
+            staging_directory=self.settings.data_logging.staging_directory,
+            checkpoint_interval_seconds=self.settings.data_logging.checkpoint_interval_seconds
         )
 
-        # Initialize buttons if configured
-        if self.settings.heater.button_gpio_pin is not None:
-            self.heater_button = Button(
-                name=f"{self.settings.heater.name} Button",
-                gpio_pin=self.settings.heater.button_gpio_pin,
-                callback=lambda: self.heater.toggle(),
-                mock_mode=mock_mode
+    def _init_raw_capture(self):
+        """Create the raw capture buffer, spilling any existing one first."""
+        if self.raw_capture is not None:
+            self.raw_capture.flush()
+            self.raw_capture = None
+
+        raw_capture = self.settings.raw_capture
+        if raw_capture.enabled:
+            self.raw_capture = RawCaptureBuffer(
+                capacity=-(-raw_capture.buffer_seconds // self.settings.sensor.read_interval_seconds),
+                data_logger=self.data_logger if raw_capture.spill else None,
+                spill_interval_seconds=raw_capture.spill_interval_seconds,
+                spill_retention_days=raw_capture.spill_retention_days,
+                clock=self.clock
             )
 
-        if self.settings.vent_fan.button_gpio_pin is not None:
-            self.vent_fan_button = Button(
-                name=f"{self.settings.vent_fan.name} Button",
-                gpio_pin=self.settings.vent_fan.button_gpio_pin,
-                callback=lambda: self.vent_fan.toggle(),
-                mock_mode=mock_mode
+    def _init_energy_meter(self):
+        """Create the energy meter, writing the totals of any existing one first."""
+        if self.energy_meter is not None:
+            self.energy_meter.flush()
+            self.energy_meter = None
+
+        watts = {device.id: device.config.watts for device in self.devices if device.config.watts is not None}
+        if self.settings.energy.enabled and watts:
+            self.energy_meter = EnergyMeter(
+                data_logger=self.data_logger,
+                watts=watts,
+                states=self.devices.states(),
+                price_per_kwh=self.settings.energy.price_per_kwh,
+                write_interval_seconds=self.settings.energy.write_interval_seconds,
+                clock=self.clock
             )
 
-        if self.settings.grow_lights.button_gpio_pin is not None:
-            self.grow_lights_button = Button(
-                name=f"{self.settings.grow_lights.name} Button",
-                gpio_pin=self.settings.grow_lights.button_gpio_pin,
-                callback=lambda: self.grow_lights.toggle(),
-                mock_mode=mock_mode
+    def _init_camera(self):
+        """Open the camera backend (kept open between captures), closing any existing one."""
+        self.burst_frames = []
+        if self.camera is not None:
+            self.camera.cleanup()
+            self.camera = None
+        if not self.settings.camera_schedule.enabled:
+            return
+
+        camera = self.settings.camera
+        try:
+            self.camera = create_camera(
+                backend=camera.backend,
+                width=camera.width,
+                height=camera.height,
+                quality=camera.quality,
+                warmup_ms=camera.warmup_ms,
+                mock_mode=self.settings.mock_mode,
+                clock=self.clock.now
+            )
+        except Exception as e:
+            print(f"Error initializing camera: {e}")
+
+    def _init_image_pipeline(self):
+        """Create the image catalog, near-duplicate suppression and post-capture analysis."""
+        if self.image_analysis_worker is not None:
+            self.image_analysis_worker.stop()
+            self.image_analysis_worker = None
+
+        self.image_catalog = GreenhouseImageCatalog(image_directory=self.settings.image_directory)
+        self.duplicate_filter = None
+        dedup = self.settings.camera_deduplication
+        if dedup.enabled:
+            self.duplicate_filter = NearDuplicateFilter(
+                change_threshold=dedup.change_threshold,
+                duplicate_action=dedup.duplicate_action,
+                comparison_size=dedup.comparison_size,
+                thumbnail_width=dedup.thumbnail_width
             )
 
-        if self.settings.stand_fan.button_gpio_pin is not None:
-            self.stand_fan_button = Button(
-                name=f"{self.settings.stand_fan.name} Button",
-                gpio_pin=self.settings.stand_fan.button_gpio_pin,
-                callback=lambda: self.stand_fan.toggle(),
-                mock_mode=mock_mode
+        if self.settings.image_analysis.enabled:
+            self.image_analysis_worker = ImageAnalysisWorker(
+                data_logger=self.data_logger,
+                analysis_width=self.settings.image_analysis.analysis_width,
+                green_threshold=self.settings.image_analysis.green_threshold
+            )
+            if self.started:
+                self.image_analysis_worker.start()
+
+    def _init_retention(self):
+        """Create the retention engine, stopping any existing one."""
+        if self.retention_engine is not None:
+            self.retention_engine.stop()
+            self.retention_engine = None
+
+        if self.settings.retention.enabled:
+            self.retention_engine = RetentionEngine(
+                settings=self.settings.retention,
+                image_directory=self.settings.image_directory,
+                data_logger=self.data_logger,
+                image_catalog=self.image_catalog,
+                clock=self.clock
             )
+            if self.started:
+                self.retention_engine.start()
+
+    def _init_control_channel(self):
+        """Start the control socket once the manager has started, replacing any existing one."""
+        if self.control_server is not None:
+            self.control_server.stop()
+            self.control_server = None
+        if self.settings_persister is not None:
+            self.settings_persister.delay_seconds = self.settings.control_channel.persist_delay_seconds
+
+        control = self.settings.control_channel
+        if self.started and control.enabled:
+            try:
+                self.control_server = ControlServer(control.socket_path, self.control_handlers(), control.socket_mode)
+                self.control_server.start()
+            except OSError as e:
+                print(f"Error starting control channel: {e}")
+                self.control_server = None
+
+    def get_device_states(self) -> Dict[str, bool]:
+        """
+        Get the current on/off state of every outlet.
 
-        # Initialize data logger
-        self.data_logger = GreenhouseDataLogger(
-            log_directory=self.settings.log_directory,
-            log_format=self.settings.data_logging.log_format,
-            max_log_days=self.settings.data_logging.max_log_days
-        )
+        Returns:
+            Dictionary mapping device id to state
+        """
+        return self.devices.states() if self.devices is not None else {}
 
-        print("Hardware initialization complete")
+    @property
+    def heater(self) -> Optional[RFOutlet]:
+        """Outlet of the device with id 'heater', if configured."""
+        return self.devices.outlet("heater") if self.devices is not None else None
+
+    @property
+    def vent_fan(self) -> Optional[RFOutlet]:
+        """Outlet of the device with id 'vent_fan', if configured."""
+        return self.devices.outlet("vent_fan") if self.devices is not None else None
+
+    @property
+    def grow_lights(self) -> Optional[RFOutlet]:
+        """Outlet of the device with id 'grow_lights', if configured."""
+        return self.devices.outlet("grow_lights") if self.devices is not None else None
+
+    @property
+    def stand_fan(self) -> Optional[RFOutlet]:
+        """Outlet of the device with id 'stand_fan', if configured."""
+        return self.devices.outlet("stand_fan") if self.devices is not None else None
+
+    def setup_config_monitoring(self, observer: Optional[Observer] = None):
+        """
+        Set up file system monitoring for configuration changes.
 
-    def setup_config_monitoring(self):
-        """Set up file system monitoring for configuration changes."""
+        Args:
+            observer: Running observer shared with other managers; a new one is
+                started (and stopped on shutdown) when not given
+        """
         config_dir = Path(self.config_path).parent
         event_handler = ConfigFileHandler(self.config_path, self.on_config_changed)
+        self.config_handler = event_handler
 
-        self.config_observer = Observer()
-        self.config_observer.schedule(event_handler, str(config_dir), recursive=False)
-        self.config_observer.start()
+        if observer is not None:
+            observer.schedule(event_handler, str(config_dir), recursive=False)
+        else:
+            self.config_observer = Observer()
+            self.config_observer.schedule(event_handler, str(config_dir), recursive=False)
+            self.config_observer.start()
         print("Configuration file monitoring started")
 
     def on_config_changed(self):
         """Callback when configuration file is modified."""
+        self.reload_configuration()
+
+    def reload_configuration(self) -> Optional[List[str]]:
+        """
+        Apply changes in the configuration file to the running manager.
+
+        The new settings are validated first and the current settings are kept
+        if that fails. Only components whose settings changed are rebuilt, and
+        the swap happens between control loop iterations.
+
+        Returns:
+            Dotted paths of the changed settings, or None if the reload failed
+        """
         print("Reloading configuration...")
         try:
-            self.load_configuration()
-            print("Configuration reloaded successfully")
-            # Note: Hardware reinitialization would require cleanup and restart
-            # For now, only settings that don't require hardware changes will take effect
+            new_settings = self.read_configuration()
         except Exception as e:
-            print(f"Error reloading configuration: {e}")
+            CONFIG_RELOADS.labels("failed").inc()
+            print(f"Error reloading configuration, keeping the current settings: {e}")
+            return None
+
+        with self._lock:
+            changes = settings_diff(self.settings, new_settings)
+            if not changes:
+                CONFIG_RELOADS.labels("unchanged").inc()
+                print("Configuration unchanged")
+                return changes
+
+            components = components_for_changes(changes)
+            old_settings = self.settings
+            self.settings = new_settings
+            try:
+                for component in components:
+                    getattr(self, f"_init_{component}")()
+            except Exception as e:
+                # Put the previous settings back and rebuild the same components from them
+                CONFIG_RELOADS.labels("failed").inc()
+                print(f"Error applying configuration, restoring the previous settings: {e}")
+                self.settings = old_settings
+                for component in components:
+                    getattr(self, f"_init_{component}")()
+                return None
+
+        CONFIG_RELOADS.labels("applied").inc()
+        print(f"Configuration reloaded: {', '.join(changes)} changed"
+              + (f"; rebuilt {', '.join(components)}" if components else ""))
+        return changes
 
     def is_time_in_schedule(self, schedule: TimeSchedule) -> bool:
         """
@@ -232,7 +685,7 @@ class GreenhouseManager:
         if not schedule.enabled:
             return False
 
-        current_time = datetime.now().time()
+        current_time = self.clock.now().time()
         start = schedule.start_time
         end = schedule.end_time
 
@@ -244,7 +697,7 @@ class GreenhouseManager:
 
     def control_temperature(self, temperature: float):
         """
-        Control heater and vent fan based on temperature.
+        Control heater and vent fan devices based on temperature.
 
         Args:
             temperature: Current temperature in Celsius
@@ -252,139 +705,460 @@ class GreenhouseManager:
         target = self.settings.temperature_control.target_temp_celsius
         tolerance = self.settings.temperature_control.temp_tolerance_celsius
 
-        # Control heater
+        # Control heaters
         if self.settings.temperature_control.heater_enabled:
-            if temperature < (target - tolerance):
-                if not self.heater.get_state():
-                    print(f"Temperature {temperature:.1f}°C below target, turning ON heater")
-                    self.heater.turn_on()
-            elif temperature > target:
-                if self.heater.get_state():
-                    print(f"Temperature {temperature:.1f}°C at target, turning OFF heater")
-                    self.heater.turn_off()
-
-        # Control vent fan
+            for device in self.devices.with_role("heater"):
+                if temperature < (target - tolerance):
+                    if self.switch_device(device.outlet, True, device.config, "thermostat"):
+                        print(f"Temperature {temperature:.1f}°C below target, turned ON {device.config.name}")
+                elif temperature > target:
+                    if self.switch_device(device.outlet, False, device.config, "thermostat"):
+                        print(f"Temperature {temperature:.1f}°C at target, turned OFF {device.config.name}")
+
+        # Control vent fans
         if self.settings.temperature_control.vent_fan_enabled:
-            if temperature > (target + tolerance):
-                if not self.vent_fan.get_state():
-                    print(f"Temperature {temperature:.1f}°C above target, turning ON vent fan")
-                    self.vent_fan.turn_on()
-            elif temperature < target:
-                if self.vent_fan.get_state():
-                    print(f"Temperature {temperature:.1f}°C at target, turning OFF vent fan")
-                    self.vent_fan.turn_off()
+            for device in self.devices.with_role("vent_fan"):
+                if temperature > (target + tolerance):
+                    if self.switch_device(device.outlet, True, device.config, "thermostat"):
+                        print(f"Temperature {temperature:.1f}°C above target, turned ON {device.config.name}")
+                elif temperature < target:
+                    if self.switch_device(device.outlet, False, device.config, "thermostat"):
+                        print(f"Temperature {temperature:.1f}°C at target, turned OFF {device.config.name}")
 
     def control_scheduled_devices(self):
-        """Control grow lights and stand fan based on time schedules."""
-        # Control grow lights
-        if self.is_time_in_schedule(self.settings.grow_lights_schedule):
-            if not self.grow_lights.get_state():
-                print("Grow lights schedule active, turning ON")
-                self.grow_lights.turn_on()
-        else:
-            if self.grow_lights.get_state():
-                print("Grow lights schedule inactive, turning OFF")
-                self.grow_lights.turn_off()
-
-        # Control stand fan
-        if self.is_time_in_schedule(self.settings.stand_fan_schedule):
-            if not self.stand_fan.get_state():
-                print("Stand fan schedule active, turning ON")
-                self.stand_fan.turn_on()
-        else:
-            if self.stand_fan.get_state():
-                print("Stand fan schedule inactive, turning OFF")
-                self.stand_fan.turn_off()
+        """Control devices with the schedule role based on their time schedules."""
+        for device in self.devices.with_role("schedule"):
+            if self.is_time_in_schedule(device.config.schedule):
+                if self.switch_device(device.outlet, True, device.config, "schedule"):
+                    print(f"{device.config.name} schedule active, turned ON")
+            else:
+                if self.switch_device(device.outlet, False, device.config, "schedule"):
+                    print(f"{device.config.name} schedule inactive, turned OFF")
 
-    def capture_image(self):
-        """Capture an image using the camera."""
-        if not self.settings.camera_schedule.enabled:
+    def log_transition(self, device_id: str, state: bool, source: str):
+        """
+        Log a device switching on or off to the transitions dataset and energy meter.
+
+        Args:
+            device_id: Device id
+            state: New state (True for on)
+            source: What asked for the switch (one of TRANSITION_SOURCES)
+        """
+        if self.data_logger is not None and self.settings.data_logging.enabled:
+            self.data_logger.log_transition(device_id, state, source)
+        if self.energy_meter is not None:
+            self.energy_meter.transition(device_id, state)
+
+    def log_channel_readings(self):
+        """Log readings collected from the additional sensors since the last call."""
+        readings = self.sensor_poller.drain()
+        if readings and self.settings.data_logging.enabled:
+            self.data_logger.log_channel_readings(readings)
+
+    def check_sensor_age(self):
+        """
+        Fail safe when the latest sensor reading is too old.
+
+        While readings are stale the heaters are switched off, bypassing their
+        dwell times, and temperature control resumes with the next fresh reading.
+        """
+        age = self.sensor_acquisition.age_seconds()
+        SENSOR_READING_AGE.set(age)
+
+        if age > self.settings.sensor.stale_after_seconds:
+            if not self.sensor_stale:
+                print(f"Sensor reading is {age:.0f}s old, turning heaters OFF until readings resume")
+                self.sensor_stale = True
+                self.temperature_filter.reset()
+            for device in self.devices.with_role("heater"):
+                if device.outlet.get_state():
+                    device.outlet.turn_off("failsafe")
+        elif self.sensor_stale:
+            print("Sensor readings resumed")
+            self.sensor_stale = False
+
+    def switch_device(self, outlet: RFOutlet, state: bool, device_config: DeviceConfig, source: str) -> bool:
+        """
+        Switch a device from automatic control, honouring dwell times and the RF budget.
+
+        Args:
+            outlet: Outlet to switch
+            state: Desired state (True for on)
+            device_config: Configuration holding the device's dwell times
+            source: Control logic asking for the switch ('thermostat' or 'schedule')
+
+        Returns:
+            True if the outlet was switched (False while a manual override is active)
+        """
+        if device_config.id in self.device_overrides:
+            return False
+        return self.switch_controller.set_state(
+            outlet,
+            state,
+            min_on_seconds=device_config.min_on_seconds,
+            min_off_seconds=device_config.min_off_seconds,
+            source=source
+        )
+
+    def control_handlers(self) -> Dict[str, Any]:
+        """Control channel methods by name."""
+        return {
+            "status": self.control_status,
+            "set_setpoints": self.set_setpoints,
+            "override_device": self.override_device,
+            "clear_override": self.clear_override,
+            "capture_now": self.request_capture,
+            "live_readings": self.live_readings,
+        }
+
+    def control_status(self) -> Dict[str, Any]:
+        """
+        Current reading, setpoints, device states and overrides.
+
+        Returns:
+            Status dictionary
+        """
+        with self._lock:
+            summary = self.sensor_acquisition.latest()
+            now = self.clock.time()
+            return {
+                "reading": summary.reading() if summary is not None else None,
+                "reading_age_seconds": self.sensor_acquisition.age_seconds(),
+                "setpoints": {
+                    name: getattr(getattr(self.settings, section), name) for name, section in SETPOINTS.items()
+                },
+                "devices": self.get_device_states(),
+                "overrides": {
+                    device_id: {"state": state, "expires_in_seconds": round(expires_at - now, 1)}
+                    for device_id, (state, expires_at) in self.device_overrides.items()
+                },
+            }
+
+    def set_setpoints(self, **setpoints) -> Dict[str, float]:
+        """
+        Change control setpoints and save them to the settings file in the background.
+
+        Args:
+            **setpoints: New values for any of the SETPOINTS
+
+        Returns:
+            The setpoints applied
+
+        Raises:
+            ValueError: If a setpoint is unknown or out of range
+        """
+        unknown = set(setpoints) - set(SETPOINTS)
+        if unknown or not setpoints:
+            raise ValueError(f"Setpoints must be among: {', '.join(SETPOINTS)}")
+
+        with self._lock:
+            sections = {}
+            for name, value in setpoints.items():
+                section = SETPOINTS[name]
+                current = sections.get(section, getattr(self.settings, section))
+                # Validate the section with the new value, raising ValueError if out of range
+                sections[section] = type(current).model_validate({**current.model_dump(), name: value})
+            self.settings = self.settings.model_copy(update=sections)
+
+        # Use the validated values, so "22" is applied and saved as 22.0
+        applied = {name: getattr(sections[SETPOINTS[name]], name) for name in setpoints}
+        print(f"Setpoints changed: {applied}")
+        if self.settings_persister is not None:
+            self.settings_persister.update({(SETPOINTS[name], name): value for name, value in applied.items()})
+        return applied
+
+    def live_readings(self, seconds: float = 300) -> Dict[str, Any]:
+        """
+        Readings at the sensor rate from the raw capture buffer.
+
+        Args:
+            seconds: How far back to go
+
+        Returns:
+            The sensor read interval and the readings, oldest first
+
+        Raises:
+            ValueError: If raw capture is disabled or seconds is out of range
+        """
+        raw_capture = self.raw_capture
+        if raw_capture is None:
+            raise ValueError("Raw capture is not enabled")
+        if not 0 < seconds <= self.settings.raw_capture.buffer_seconds:
+            raise ValueError(f"seconds must be between 0 and {self.settings.raw_capture.buffer_seconds}")
+
+        df = raw_capture.recent(seconds)
+        df["timestamp"] = df["timestamp"].map(lambda timestamp: timestamp.isoformat())
+        return {
+            "read_interval_seconds": self.settings.sensor.read_interval_seconds,
+            "readings": df.to_dict("records"),
+        }
+
+    def override_device(self, device: str, state: bool, duration_seconds: float) -> Dict[str, Any]:
+        """
+        Switch a device manually and hold it there, ignoring automatic control, until the override expires.
+
+        Args:
+            device: Device id
+            state: State to hold (True for on)
+            duration_seconds: How long the override lasts
+
+        Returns:
+            The override
+
+        Raises:
+            ValueError: If the device is unknown or the duration is out of range
+        """
+        registered = self.devices.get(device)
+        if registered is None:
+            raise ValueError(f"Unknown device: {device}")
+        if not 0 < duration_seconds <= self.settings.control_channel.max_override_seconds:
+            raise ValueError(
+                f"duration_seconds must be between 0 and {self.settings.control_channel.max_override_seconds}"
+            )
+
+        with self._lock:
+            if registered.outlet.get_state() != bool(state):
+                registered.outlet.turn_on("api") if state else registered.outlet.turn_off("api")
+            self.device_overrides[device] = (bool(state), self.clock.time() + duration_seconds)
+        print(f"{registered.config.name} held {'ON' if state else 'OFF'} for {duration_seconds:.0f}s")
+        return {"device": device, "state": bool(state), "duration_seconds": duration_seconds}
+
+    def clear_override(self, device: str) -> Dict[str, Any]:
+        """
+        Return a device to automatic control.
+
+        Args:
+            device: Device id
+
+        Returns:
+            Whether an override was removed
+        """
+        with self._lock:
+            cleared = self.device_overrides.pop(device, None) is not None
+        return {"device": device, "cleared": cleared}
+
+    def expire_overrides(self):
+        """Return devices whose override has expired to automatic control."""
+        now = self.clock.time()
+        for device_id, (_, expires_at) in list(self.device_overrides.items()):
+            if now >= expires_at:
+                del self.device_overrides[device_id]
+                print(f"Override of {device_id} expired, returning to automatic control")
+
+    def request_capture(self) -> Dict[str, bool]:
+        """
+        Capture an image on the next control loop iteration, whatever the camera schedule.
+
+        Returns:
+            Acknowledgement
+
+        Raises:
+            ValueError: If the camera is disabled
+        """
+        if self.camera is None:
+            raise ValueError("Camera is disabled")
+        self.capture_requested = True
+        return {"capture_requested": True}
+
+    def capture_image(self, force: bool = False):
+        """
+        Capture an image, or start a burst of images, using the camera.
+
+        Args:
+            force: Capture even outside the camera's active hours
+        """
+        if not self.settings.camera_schedule.enabled or self.camera is None:
             return
 
         # Check if we're within active hours
-        current_time = datetime.now().time()
-        if not (self.settings.camera_schedule.active_hours_start <= current_time <=
-                self.settings.camera_schedule.active_hours_end):
+        current_time = self.clock.now().time()
+        if not force and not (self.settings.camera_schedule.active_hours_start <= current_time <=
+                              self.settings.camera_schedule.active_hours_end):
+            return
+
+        # Let a burst in progress finish before starting another
+        if self.burst_frames:
             return
 
         # Ensure image directory exists
         image_dir = Path(self.settings.image_directory)
         image_dir.mkdir(parents=True, exist_ok=True)
 
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        image_path = image_dir / f"greenhouse_{timestamp}.jpg"
+        # Generate filenames with timestamp (burst frames get an index suffix)
+        capture_time = self.clock.now()
+        self.burst_frames = [
+            image_dir / capture_filename(capture_time, i)
+            for i in range(self.settings.camera_schedule.burst_count)
+        ]
+        self.burst_capture_time = capture_time
+        self.next_burst_frame = self.clock.time()
+        self.capture_burst_frames()
+
+    def capture_burst_frames(self):
+        """
+        Capture the frames of the burst in progress that are due.
 
-        try:
-            # Use raspistill for Raspberry Pi camera
-            # Adjust command based on your camera setup
-            if not self.settings.mock_mode:
-                cmd = [
-                    "raspistill",
-                    "-o", str(image_path),
-                    "-w", "1920",
-                    "-h", "1080",
-                    "-q", "85",
-                    "-t", "1000"  # 1 second timeout
-                ]
-                subprocess.run(cmd, check=True)
+        Frames are spaced burst_interval_ms apart across control loop iterations,
+        so the loop never sleeps between frames while holding the reload lock.
+        """
+        interval_seconds = self.settings.camera_schedule.burst_interval_ms / 1000
+        while self.burst_frames and self.clock.time() >= self.next_burst_frame:
+            image_path = self.burst_frames.pop(0)
+            try:
+                with CAMERA_CAPTURE_SECONDS.time():
+                    captured = self.camera.capture(image_path)
+            except Exception as e:
+                print(f"Error capturing image: {e}")
+                self.burst_frames = []
+                return
+            self.next_burst_frame = self.clock.time() + interval_seconds
+
+            if captured:
+                CAMERA_CAPTURES.inc()
                 print(f"Image captured: {image_path}")
-            else:
-                print(f"MOCK: Would capture image to {image_path}")
+                self.catalog_capture(image_path, self.burst_capture_time)
 
-        except subprocess.CalledProcessError as e:
-            print(f"Error capturing image: {e}")
-        except FileNotFoundError:
-            print("raspistill not found. Ensure camera is enabled and raspistill is installed.")
+    def catalog_capture(self, image_path: Path, capture_time: datetime):
+        """
+        Apply near-duplicate suppression to a capture and record it in the image catalog.
 
-    def run_control_loop(self):
-        """Main control loop for greenhouse management."""
-        current_time = time.time()
+        Args:
+            image_path: Path to the freshly captured image
+            capture_time: Time the capture was taken
+        """
+        decision, change_score, stored_path = DECISION_FULL, None, image_path
+
+        if self.duplicate_filter is not None:
+            try:
+                result = self.duplicate_filter.process(image_path, image_path.parent / "thumbnails")
+                decision, change_score, stored_path = result.decision, result.change_score, result.stored_path
+                if decision != DECISION_FULL:
+                    print(f"Near-duplicate capture ({change_score:.4f}), stored as: {decision}")
+            except Exception as e:
+                print(f"Error comparing capture {image_path}: {e}")
+
+        self.image_catalog.record(
+            timestamp=capture_time,
+            filename=image_path.name,
+            decision=decision,
+            change_score=change_score,
+            stored_path=stored_path
+        )
 
-        # Read sensor data
-        if current_time - self.last_sensor_read >= self.settings.sensor.read_interval_seconds:
-            sensor_data = self.sensor.read_data()
+        # Canopy and light metrics are computed off the control thread
+        if self.image_analysis_worker is not None and stored_path is not None:
+            self.image_analysis_worker.submit(stored_path, capture_time)
 
-            if sensor_data:
+    def run_control_loop(self):
+        """Main control loop for greenhouse management (holds the reload lock)."""
+        with self._lock:
+            current_time = self.clock.time()
+            self.expire_overrides()
+
+            # Pick up the latest filtered reading (sampled inline when the acquisition thread is not running)
+            if not self.sensor_acquisition.running:
+                self.sensor_acquisition.poll()
+            summary = self.sensor_acquisition.latest()
+            self.check_sensor_age()
+
+            if summary is not None and summary.sequence != self.last_sensor_sequence:
+                self.last_sensor_sequence = summary.sequence
+                sensor_data = summary.reading()
                 temperature = sensor_data['temperature']
                 humidity = sensor_data['humidity']
                 pressure = sensor_data['pressure']
 
                 print(f"Sensor: {temperature:.1f}°C, {humidity:.1f}%, {pressure:.1f}hPa")
 
-                # Control temperature
-                self.control_temperature(temperature)
+                # Control temperature on the smoothed reading
+                self.control_temperature(self.temperature_filter.update(temperature, current_time))
 
-                # Control scheduled devices
-                self.control_scheduled_devices()
+                # Keep every reading when capturing at the sensor rate
+                if self.raw_capture is not None:
+                    self.raw_capture.add(summary)
 
                 # Log data
                 if (self.settings.data_logging.enabled and
                     current_time - self.last_log_write >= self.settings.data_logging.log_interval_seconds):
 
+                    # With raw capture, the log interval's readings are summarised instead
+                    sensor_stats = summary.log_fields()
+                    interval = self.raw_capture.interval() if self.raw_capture is not None else None
+                    if interval is not None:
+                        sensor_data, sensor_stats = interval
                     self.data_logger.log_data(
-                        temperature=temperature,
-                        humidity=humidity,
-                        pressure=pressure,
-                        heater_state=self.heater.get_state(),
-                        vent_fan_state=self.vent_fan.get_state(),
-                        grow_lights_state=self.grow_lights.get_state(),
-                        stand_fan_state=self.stand_fan.get_state()
+                        temperature=sensor_data['temperature'],
+                        humidity=sensor_data['humidity'],
+                        pressure=sensor_data['pressure'],
+                        sensor_stats=sensor_stats,
+                        device_states=(self.devices.states()
+                                       if self.settings.data_logging.log_device_states else None)
                     )
                     self.last_log_write = current_time
 
-            self.last_sensor_read = current_time
+                self.last_sensor_read = current_time
 
-        # Capture images on schedule
-        if (self.settings.camera_schedule.enabled and
-            current_time - self.last_camera_capture >= self.settings.camera_schedule.interval_minutes * 60):
-            self.capture_image()
-            self.last_camera_capture = current_time
+            # Start reads of any additional sensors that are due and log finished ones
+            self.sensor_poller.poll()
+            self.log_channel_readings()
+
+            # Control scheduled devices, whether or not the sensor is responding
+            if current_time - self.last_schedule_check >= self.settings.sensor.read_interval_seconds:
+                self.control_scheduled_devices()
+                self.last_schedule_check = current_time
+
+            # Re-send one outlet's state if it is due, away from other transmissions
+            if self.reconciler is not None:
+                self.reconciler.run(self.devices)
+
+            # Accrue the energy of devices left on
+            if self.energy_meter is not None:
+                self.energy_meter.update()
+
+            # Continue a burst in progress, then capture images on schedule
+            self.capture_burst_frames()
+            camera_schedule = self.settings.camera_schedule
+            capture_interval = camera_schedule.interval_seconds or camera_schedule.interval_minutes * 60
+            if self.capture_requested:
+                self.capture_requested = False
+                self.capture_image(force=True)
+            elif (camera_schedule.enabled and
+                  current_time - self.last_camera_capture >= capture_interval):
+                self.capture_image()
+                self.last_camera_capture = current_time
+
+            # Copy staged log files to persistent storage when due
+            self.data_logger.checkpoint_if_due()
+
+            # Cleanup old logs (once per day)
+            if current_time - self.last_log_cleanup >= 86400:  # 24 hours
+                self.data_logger.cleanup_old_logs()
+                self.last_log_cleanup = current_time
+
+    def start(self, acquisition_thread: bool = True, metrics: bool = True):
+        """
+        Start the background workers and, if enabled, the control channel.
 
-        # Cleanup old logs (once per day)
-        if current_time - self.last_log_cleanup >= 86400:  # 24 hours
-            self.data_logger.cleanup_old_logs()
-            self.last_log_cleanup = current_time
+        Args:
+            acquisition_thread: Sample the sensor on its own thread (otherwise
+                run_control_loop samples it inline)
+            metrics: Start the metrics endpoint if enabled in settings
+        """
+        self.started = True
+        self._init_control_channel()
+        if self.retention_engine:
+            self.retention_engine.start()
+        if self.image_analysis_worker:
+            self.image_analysis_worker.start()
+        if self.sensor_acquisition and acquisition_thread:
+            self.sensor_acquisition.start()
+        if metrics and self.settings.metrics.enabled:
+            try:
+                self.metrics_server = MetricsServer(self.settings.metrics.host, self.settings.metrics.port)
+                self.metrics_server.start()
+            except OSError as e:
+                print(f"Error starting metrics endpoint: {e}")
+                self.metrics_server = None
 
     def run(self):
         """Start the greenhouse manager main loop."""
@@ -395,10 +1169,13 @@ class GreenhouseManager:
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
 
+        self.start()
+
         try:
             while self.running:
-                self.run_control_loop()
-                time.sleep(0.1)  # Small delay to prevent CPU spinning
+                with CONTROL_TICK_SECONDS.time():
+                    self.run_control_loop()
+                self.clock.sleep(0.1)  # Small delay to prevent CPU spinning
 
         except Exception as e:
             print(f"Error in main loop: {e}")
@@ -415,33 +1192,51 @@ class GreenhouseManager:
         """Clean up resources and shut down gracefully."""
         print("Shutting down Greenhouse Manager...")
 
-        # Flush data logger
+        # Stop taking control requests and save any pending setting changes
+        if self.control_server:
+            self.control_server.stop()
+        if self.settings_persister:
+            self.settings_persister.flush()
+
+        # Stop background retention before flushing logs
+        if self.sensor_acquisition:
+            self.sensor_acquisition.stop()
+        if self.retention_engine:
+            self.retention_engine.stop()
+        if self.image_analysis_worker:
+            self.image_analysis_worker.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+
+        # Finish reads of the additional sensors so their last readings are logged
+        if self.sensor_poller:
+            self.sensor_poller.shutdown()
+            if self.data_logger:
+                self.log_channel_readings()
+
+        # Flush energy totals, raw readings and the data logger
+        if self.energy_meter:
+            self.energy_meter.flush()
+        if self.raw_capture:
+            self.raw_capture.flush()
         if self.data_logger:
             self.data_logger.flush()
 
         # Clean up hardware
         if self.sensor:
             self.sensor.cleanup()
-        if self.heater:
-            self.heater.cleanup()
-        if self.vent_fan:
-            self.vent_fan.cleanup()
-        if self.grow_lights:
-            self.grow_lights.cleanup()
-        if self.stand_fan:
-            self.stand_fan.cleanup()
-
-        # Clean up buttons
-        if self.heater_button:
-            self.heater_button.cleanup()
-        if self.vent_fan_button:
-            self.vent_fan_button.cleanup()
-        if self.grow_lights_button:
-            self.grow_lights_button.cleanup()
-        if self.stand_fan_button:
-            self.stand_fan_button.cleanup()
+        if self.devices:
+            self.devices.cleanup()
+        if self.state_journal:
+            self.state_journal.close()
+
+        # Close the camera session
+        if self.camera:
+            self.camera.cleanup()
 
         # Stop config monitoring
+        if self.config_handler:
+            self.config_handler.cancel()
         if self.config_observer:
             self.config_observer.stop()
             self.config_observer.join()
@@ -5,8 +5,9 @@ Pydantic models for validating and managing greenhouse configuration settings.
 """
 
 from datetime import time
-from typing import List, Optional
-from pydantic import BaseModel, Field, field_validator
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class TemperatureControl(BaseModel):
@@ -32,6 +33,12 @@ class TemperatureControl(BaseModel):
         default=True,
         description="Enable/disable automatic vent fan control"
     )
+    smoothing_time_constant_seconds: float = Field(
+        default=0,
+        ge=0,
+        le=3600,
+        description="Time constant of the exponential average applied to temperature before control (0 disables)"
+    )
 
 
 class HumidityControl(BaseModel):
@@ -97,6 +104,43 @@ class CameraSchedule(BaseModel):
         default=time(20, 0),
         description="End time for camera captures (24hr format)"
     )
+    interval_seconds: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=86400,
+        description="Interval between captures in seconds; overrides interval_minutes for high-frequency capture"
+    )
+    burst_count: int = Field(
+        default=1,
+        ge=1,
+        le=30,
+        description="Number of frames captured back to back at each scheduled capture"
+    )
+    burst_interval_ms: int = Field(
+        default=0,
+        ge=0,
+        le=10000,
+        description="Delay between frames of a burst in milliseconds"
+    )
+
+
+class CameraConfig(BaseModel):
+    """Camera capture backend configuration."""
+
+    backend: str = Field(
+        default="auto",
+        pattern="^(auto|picamera2|raspistill|mock)$",
+        description="Capture backend (auto, picamera2, raspistill or mock)"
+    )
+    width: int = Field(default=1920, ge=64, le=4056, description="Capture width in pixels")
+    height: int = Field(default=1080, ge=64, le=3040, description="Capture height in pixels")
+    quality: int = Field(default=85, ge=1, le=100, description="JPEG quality")
+    warmup_ms: int = Field(
+        default=1000,
+        ge=0,
+        le=10000,
+        description="Auto-exposure warm-up in milliseconds (once per session for picamera2, per shot for raspistill)"
+    )
 
 
 class DataLogging(BaseModel):
@@ -122,11 +166,457 @@ class DataLogging(BaseModel):
         ge=1,
         description="Maximum number of days to keep log files"
     )
+    log_device_states: bool = Field(
+        default=True,
+        description="Also log each device's state with every sensor sample "
+                    "(switches are always logged to the transitions dataset)"
+    )
+    mode: str = Field(
+        default="interval",
+        pattern="^(interval|deadband)$",
+        description="'interval' logs every sample; 'deadband' logs a sample only when a channel "
+                    "moves by its deadband, a device changes state or the heartbeat is due"
+    )
+    deadbands: Dict[str, float] = Field(
+        default_factory=lambda: {"temperature_celsius": 0.2, "humidity_percent": 1.0, "pressure_hpa": 0.5},
+        description="Change in each logged column that triggers a sample in deadband mode"
+    )
+    heartbeat_seconds: int = Field(
+        default=900,
+        ge=1,
+        le=86400,
+        description="Longest time between samples in deadband mode"
+    )
+    staging_directory: Optional[str] = Field(
+        default=None,
+        description="RAM-backed directory (such as /run/greenhouse) holding the current day's log files "
+                    "until they are checkpointed to the log directory; unset to write to the log directory directly"
+    )
+    checkpoint_interval_seconds: int = Field(
+        default=900,
+        ge=10,
+        le=86400,
+        description="Interval between checkpoints of staged log files, the most data lost on power failure"
+    )
+
+    @field_validator('deadbands')
+    @classmethod
+    def validate_deadbands(cls, v):
+        """Validate that deadbands are not negative."""
+        if any(band < 0 for band in v.values()):
+            raise ValueError('deadbands must not be negative')
+        return v
+
+
+class RawCapture(BaseModel):
+    """High-rate capture of every filtered sensor reading between log samples."""
+
+    enabled: bool = Field(
+        default=False,
+        description="Keep every reading at the sensor rate and log each log interval "
+                    "as the mean, min, max and last of its readings"
+    )
+    buffer_seconds: int = Field(
+        default=3600,
+        ge=60,
+        le=86400,
+        description="Seconds of readings held in memory for live views"
+    )
+    spill: bool = Field(
+        default=False,
+        description="Also write every reading to the compact 'raw' dataset"
+    )
+    spill_interval_seconds: int = Field(
+        default=300,
+        ge=10,
+        le=3600,
+        description="Longest time readings are held before being written to the 'raw' dataset"
+    )
+    spill_retention_days: int = Field(
+        default=2,
+        ge=1,
+        le=30,
+        description="Days of readings kept in the 'raw' dataset"
+    )
+
+
+class Energy(BaseModel):
+    """Energy and cost accounting for devices with a configured power draw."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Enable/disable energy accounting"
+    )
+    price_per_kwh: float = Field(
+        default=0.0,
+        ge=0,
+        description="Electricity price per kWh, used to cost each day's energy"
+    )
+    write_interval_seconds: int = Field(
+        default=300,
+        ge=10,
+        le=3600,
+        description="Interval between writes of the current day's energy totals"
+    )
+
+
+class RetentionTier(BaseModel):
+    """Storage tier applied to camera images from a given age onwards."""
+
+    min_age_days: int = Field(
+        ...,
+        ge=1,
+        description="Age in days from which this tier applies"
+    )
+    resolution: str = Field(
+        ...,
+        pattern="^(medium|thumbnail|daily)$",
+        description="Stored resolution (medium, thumbnail, or daily for one thumbnail per day)"
+    )
+
+
+class Retention(BaseModel):
+    """Tiered retention settings for camera images and sensor logs."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Enable/disable the background retention engine"
+    )
+    image_tiers: List[RetentionTier] = Field(
+        default_factory=lambda: [
+            RetentionTier(min_age_days=7, resolution="medium"),
+            RetentionTier(min_age_days=90, resolution="daily"),
+        ],
+        description="Image tiers by age; images younger than the first tier stay at full resolution"
+    )
+    delete_images_after_days: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Delete images entirely after this many days (None keeps them)"
+    )
+    medium_width: int = Field(
+        default=960,
+        ge=16,
+        le=1920,
+        description="Width in pixels of medium resolution images"
+    )
+    thumbnail_width: int = Field(
+        default=320,
+        ge=16,
+        le=1920,
+        description="Width in pixels of thumbnail images"
+    )
+    raw_log_days: Optional[int] = Field(
+        default=90,
+        ge=1,
+        description="Replace raw sensor logs with rollups after this many days (None keeps raw logs)"
+    )
+    rollup_interval_minutes: int = Field(
+        default=15,
+        ge=1,
+        le=1440,
+        description="Bucket size in minutes for sensor log rollups"
+    )
+    run_interval_minutes: int = Field(
+        default=10,
+        ge=1,
+        le=1440,
+        description="Interval between incremental retention runs in minutes"
+    )
+    io_budget_mb_per_run: float = Field(
+        default=20.0,
+        gt=0,
+        description="Maximum megabytes read and written per retention run"
+    )
+
+    @field_validator('image_tiers')
+    @classmethod
+    def validate_tier_order(cls, v):
+        """Validate that tiers are ordered by increasing age."""
+        ages = [tier.min_age_days for tier in v]
+        if ages != sorted(set(ages)):
+            raise ValueError('image_tiers must have strictly increasing min_age_days')
+        return v
+
+
+class ImageDeduplication(BaseModel):
+    """Near-duplicate frame suppression for camera captures."""
+
+    enabled: bool = Field(
+        default=False,
+        description="Enable/disable near-duplicate frame suppression"
+    )
+    change_threshold: float = Field(
+        default=0.02,
+        ge=0,
+        le=1,
+        description="Minimum mean absolute change (0-1) from the last kept frame to keep a capture at full quality"
+    )
+    duplicate_action: str = Field(
+        default="thumbnail",
+        pattern="^(thumbnail|skip)$",
+        description="What to do with near-duplicate frames (thumbnail or skip)"
+    )
+    comparison_size: int = Field(
+        default=64,
+        ge=8,
+        le=512,
+        description="Edge length in pixels of the downscaled grayscale frame used for comparison"
+    )
+    thumbnail_width: int = Field(
+        default=320,
+        ge=16,
+        le=1920,
+        description="Width in pixels of thumbnails kept for near-duplicate frames"
+    )
+
+
+class ImageAnalysis(BaseModel):
+    """Post-capture canopy and light analysis settings."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Enable/disable canopy and light metrics for each capture"
+    )
+    analysis_width: int = Field(
+        default=160,
+        ge=16,
+        le=1920,
+        description="Width in pixels of the downscaled frame used for analysis"
+    )
+    green_threshold: float = Field(
+        default=0.05,
+        ge=-1,
+        le=2,
+        description="Excess-green index threshold for a pixel to count as canopy"
+    )
+
+
+class MetricsConfig(BaseModel):
+    """Manager-side metrics endpoint settings."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Enable/disable the /metrics endpoint of the manager process"
+    )
+    host: str = Field(
+        default="127.0.0.1",
+        description="Interface the metrics endpoint binds to"
+    )
+    port: int = Field(
+        default=9101,
+        ge=1,
+        le=65535,
+        description="Port of the metrics endpoint"
+    )
+
+
+class ControlChannel(BaseModel):
+    """Unix-domain-socket control channel used by the webserver to act on the manager."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Enable/disable the control socket of the manager process"
+    )
+    socket_path: str = Field(
+        default="data/greenhouse_manager.sock",
+        description="Path of the Unix domain socket"
+    )
+    socket_mode: int = Field(
+        default=0o660,
+        ge=0,
+        le=0o777,
+        description="File permissions of the socket, limiting which local users may connect"
+    )
+    max_override_seconds: int = Field(
+        default=86400,
+        ge=1,
+        description="Longest manual device override accepted"
+    )
+    persist_delay_seconds: float = Field(
+        default=2.0,
+        ge=0,
+        le=300,
+        description="Delay before setpoint changes are written back to the settings file, batching rapid changes"
+    )
+
+
+class StateJournal(BaseModel):
+    """Journal of device states, restored on restart instead of assuming every outlet is off."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Enable/disable the device state journal"
+    )
+    path: Optional[str] = Field(
+        default=None,
+        description="Journal file (defaults to device_states.journal in the log directory)"
+    )
+    capacity: int = Field(
+        default=64,
+        ge=1,
+        le=4096,
+        description="Number of devices the journal can hold"
+    )
+
+
+class RFBudget(BaseModel):
+    """Global limit on RF transmissions sent by automatic control."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Enable/disable the RF transmission budget"
+    )
+    max_transmissions_per_hour: float = Field(
+        default=120,
+        gt=0,
+        description="Sustained number of RF transmissions allowed per hour"
+    )
+    burst: int = Field(
+        default=20,
+        ge=1,
+        description="Maximum number of RF transmissions that can be sent back to back"
+    )
+
+
+class Reassertion(BaseModel):
+    """Periodic re-sending of each outlet's current state, in case an RF command was missed."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Enable/disable state reassertion"
+    )
+    interval_seconds: float = Field(
+        default=900,
+        ge=10,
+        description="Time between reassertions of a device after it switches"
+    )
+    max_interval_seconds: float = Field(
+        default=21600,
+        ge=10,
+        description="Longest time between reassertions of a device that has not switched"
+    )
+    backoff_factor: float = Field(
+        default=2.0,
+        ge=1.0,
+        le=10.0,
+        description="Factor the interval grows by after each reassertion without a switch"
+    )
+    jitter_fraction: float = Field(
+        default=0.25,
+        ge=0,
+        lt=1,
+        description="Random variation of each interval, so devices do not reassert in lockstep"
+    )
+    min_gap_seconds: float = Field(
+        default=5.0,
+        ge=0,
+        description="Minimum time between a reassertion and any other RF transmission of the manager"
+    )
+    max_airtime_seconds_per_hour: float = Field(
+        default=30.0,
+        gt=0,
+        description="Transmitter airtime reassertions may use per hour"
+    )
+    airtime_per_code_seconds: float = Field(
+        default=0.6,
+        gt=0,
+        description="Airtime of one codesend transmission, including its repeats"
+    )
+
+    @model_validator(mode='after')
+    def validate_intervals(self):
+        """Validate the interval cap is not below the base interval."""
+        if self.max_interval_seconds < self.interval_seconds:
+            raise ValueError('max_interval_seconds must be at least interval_seconds')
+        return self
+
+
+class SimulationConfig(BaseModel):
+    """Simulated greenhouse plant used in place of the mock sensor."""
+
+    enabled: bool = Field(
+        default=False,
+        description="In mock mode, read the sensor from a thermal model driven by the device states"
+    )
+    weather: str = Field(
+        default="spring",
+        pattern="^(spring|summer|autumn|winter)$",
+        description="Outside weather profile"
+    )
+    thermal_mass_kj_per_k: float = Field(
+        default=400.0,
+        gt=0,
+        description="Heat capacity of the air, benches, soil and pots in kJ/K"
+    )
+    envelope_ua_w_per_k: float = Field(
+        default=60.0,
+        gt=0,
+        description="Heat loss through the glazing per degree of inside/outside difference in W/K"
+    )
+    vent_fan_ua_w_per_k: float = Field(
+        default=250.0,
+        ge=0,
+        description="Extra heat exchange with outside air for each running vent fan in W/K"
+    )
+    heater_power_w: float = Field(default=1500.0, ge=0, description="Output of each heater role device in W")
+    grow_lights_power_w: float = Field(
+        default=300.0,
+        ge=0,
+        description="Heat from each schedule role device, simulated as grow lights, in W"
+    )
+    solar_gain_w: float = Field(
+        default=1200.0,
+        ge=0,
+        description="Peak solar heat gain at noon on a clear day in W"
+    )
+    temperature_noise_celsius: float = Field(
+        default=0.1,
+        ge=0,
+        description="Standard deviation of sensor temperature noise"
+    )
+    humidity_noise_percent: float = Field(
+        default=0.5,
+        ge=0,
+        description="Standard deviation of sensor humidity noise"
+    )
+    seed: Optional[int] = Field(
+        default=None,
+        description="Random seed for weather and sensor noise (None for a random run)"
+    )
+
+
+# Device roles: heater and vent_fan follow temperature control, schedule follows
+# the device's own schedule, manual devices are only switched by their button
+DEVICE_ROLES = ("heater", "vent_fan", "schedule", "manual")
+
+# Legacy top-level device fields, with the id, role and schedule field they map to
+LEGACY_DEVICES = (
+    ("heater", "heater", None),
+    ("vent_fan", "vent_fan", None),
+    ("grow_lights", "schedule", "grow_lights_schedule"),
+    ("stand_fan", "schedule", "stand_fan_schedule"),
+)
 
 
 class DeviceConfig(BaseModel):
     """Configuration for a controllable device."""
 
+    id: Optional[str] = Field(
+        default=None,
+        pattern="^[a-z][a-z0-9_]*$",
+        max_length=40,
+        description="Identifier used for lookups and the '<id>_state' log column (required in devices)"
+    )
+    role: str = Field(
+        default="manual",
+        pattern="^(heater|vent_fan|schedule|manual)$",
+        description="How the device is controlled (heater, vent_fan, schedule or manual)"
+    )
+    schedule: Optional[TimeSchedule] = Field(
+        default=None,
+        description="On period for devices with the schedule role"
+    )
     name: str = Field(..., description="Device name")
     rf_on_code: int = Field(..., description="RF code to turn device on")
     rf_off_code: int = Field(..., description="RF code to turn device off")
@@ -137,6 +627,24 @@ class DeviceConfig(BaseModel):
         le=27,
         description="GPIO pin for manual button control"
     )
+    min_on_seconds: int = Field(
+        default=0,
+        ge=0,
+        le=86400,
+        description="Minimum time the device stays on once switched on by automatic control"
+    )
+    min_off_seconds: int = Field(
+        default=0,
+        ge=0,
+        le=86400,
+        description="Minimum time the device stays off once switched off by automatic control"
+    )
+    watts: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=100000,
+        description="Power drawn while on, in watts (energy is only accounted for devices with a wattage)"
+    )
 
 
 class SensorConfig(BaseModel):
@@ -150,6 +658,77 @@ class SensorConfig(BaseModel):
         le=60,
         description="Interval between sensor readings in seconds"
     )
+    samples_per_interval: int = Field(
+        default=1,
+        ge=1,
+        le=64,
+        description="Sensor samples taken per read interval and combined into one filtered reading"
+    )
+    sampling_mode: str = Field(
+        default="burst",
+        pattern="^(burst|continuous)$",
+        description="Take the samples back to back at each interval (burst) or spread evenly across it (continuous)"
+    )
+    filter_method: str = Field(
+        default="median",
+        pattern="^(median|mean|ema)$",
+        description="How the samples of an interval are combined (median, mean or ema)"
+    )
+    ema_alpha: float = Field(
+        default=0.3,
+        gt=0,
+        le=1,
+        description="Weight of each new sample when filter_method is ema"
+    )
+    outlier_threshold: float = Field(
+        default=3.5,
+        ge=0,
+        description="Modified z-score above which a sample is rejected as an outlier (0 disables)"
+    )
+    read_timeout_seconds: float = Field(
+        default=2.0,
+        gt=0,
+        le=30,
+        description="Longest a single sensor read may take before it is abandoned"
+    )
+    retry_backoff_seconds: float = Field(
+        default=1.0,
+        gt=0,
+        description="Delay before retrying after a failed read, doubled on each consecutive failure"
+    )
+    retry_backoff_max_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        description="Upper limit on the retry delay"
+    )
+    reopen_after_failures: int = Field(
+        default=3,
+        ge=1,
+        description="Consecutive failed reads after which the I2C bus is closed and reopened"
+    )
+    stale_after_seconds: int = Field(
+        default=30,
+        ge=1,
+        description="Age after which the latest reading is stale and temperature control fails safe"
+    )
+
+
+class SensorPluginConfig(BaseModel):
+    """Additional sensor read through a sensor plugin."""
+
+    name: str = Field(..., min_length=1, description="Unique sensor name, used in the channels log")
+    kind: str = Field(..., description="Registered plugin kind (bme280, soil_moisture, scd4x, ...)")
+    enabled: bool = Field(default=True, description="Enable/disable this sensor")
+    interval_seconds: int = Field(
+        default=60,
+        ge=1,
+        le=3600,
+        description="Interval between reads of this sensor in seconds"
+    )
+    options: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Plugin-specific options such as i2c_bus, i2c_address or calibration values"
+    )
 
 
 class GreenhouseManagerSettings(BaseModel):
@@ -166,6 +745,10 @@ class GreenhouseManagerSettings(BaseModel):
         default_factory=SensorConfig,
         description="BME280 sensor configuration"
     )
+    sensors: List[SensorPluginConfig] = Field(
+        default_factory=list,
+        description="Additional sensors, logged to the channels dataset"
+    )
 
     # Temperature and humidity control
     temperature_control: TemperatureControl = Field(
@@ -177,25 +760,54 @@ class GreenhouseManagerSettings(BaseModel):
         description="Humidity control settings"
     )
 
-    # Device configurations
-    heater: DeviceConfig = Field(..., description="Heater device configuration")
-    vent_fan: DeviceConfig = Field(..., description="Vent fan device configuration")
-    grow_lights: DeviceConfig = Field(..., description="Grow lights device configuration")
-    stand_fan: DeviceConfig = Field(..., description="Stand fan device configuration")
+    # Device configurations (the four named fields are kept for existing configs)
+    devices: List[DeviceConfig] = Field(
+        default_factory=list,
+        description="Controllable devices, each with an id, role and optional schedule"
+    )
+    heater: Optional[DeviceConfig] = Field(default=None, description="Heater device configuration")
+    vent_fan: Optional[DeviceConfig] = Field(default=None, description="Vent fan device configuration")
+    grow_lights: Optional[DeviceConfig] = Field(default=None, description="Grow lights device configuration")
+    stand_fan: Optional[DeviceConfig] = Field(default=None, description="Stand fan device configuration")
+
+    rf_budget: RFBudget = Field(
+        default_factory=RFBudget,
+        description="Global RF transmission budget"
+    )
+    reassertion: Reassertion = Field(
+        default_factory=Reassertion,
+        description="Jittered, budgeted re-sending of outlet states"
+    )
+    state_journal: StateJournal = Field(
+        default_factory=StateJournal,
+        description="Device states and last transition times kept across restarts"
+    )
 
     # Time-based schedules
-    grow_lights_schedule: TimeSchedule = Field(
-        ...,
+    grow_lights_schedule: Optional[TimeSchedule] = Field(
+        default=None,
         description="Schedule for grow lights operation"
     )
-    stand_fan_schedule: TimeSchedule = Field(
-        ...,
+    stand_fan_schedule: Optional[TimeSchedule] = Field(
+        default=None,
         description="Schedule for stand fan operation"
     )
     camera_schedule: CameraSchedule = Field(
         default_factory=CameraSchedule,
         description="Camera capture schedule"
     )
+    camera: CameraConfig = Field(
+        default_factory=CameraConfig,
+        description="Camera capture backend configuration"
+    )
+    camera_deduplication: ImageDeduplication = Field(
+        default_factory=ImageDeduplication,
+        description="Near-duplicate frame suppression for camera captures"
+    )
+    image_analysis: ImageAnalysis = Field(
+        default_factory=ImageAnalysis,
+        description="Canopy and light metrics extracted from each capture"
+    )
 
     # Data logging
     data_logging: DataLogging = Field(
@@ -203,6 +815,39 @@ class GreenhouseManagerSettings(BaseModel):
         description="Data logging configuration"
     )
 
+    raw_capture: RawCapture = Field(
+        default_factory=RawCapture,
+        description="Readings at the sensor rate kept for live views and summarised per log interval"
+    )
+
+    # Energy accounting
+    energy: Energy = Field(
+        default_factory=Energy,
+        description="Energy and cost accounting per device"
+    )
+
+    # Retention
+    retention: Retention = Field(
+        default_factory=Retention,
+        description="Tiered retention for camera images and sensor logs"
+    )
+
+    # Mock-mode plant simulation
+    simulation: SimulationConfig = Field(
+        default_factory=SimulationConfig,
+        description="Thermal simulation used as the mock sensor"
+    )
+
+    # Instrumentation
+    metrics: MetricsConfig = Field(
+        default_factory=MetricsConfig,
+        description="Prometheus-style metrics endpoint"
+    )
+    control_channel: ControlChannel = Field(
+        default_factory=ControlChannel,
+        description="Control socket for setpoint changes, device overrides and captures"
+    )
+
     # File paths
     config_file_path: str = Field(
         default="config/greenhouse_manager_settings.json",
@@ -221,6 +866,63 @@ class GreenhouseManagerSettings(BaseModel):
         description="Directory for camera images"
     )
 
+    def device_list(self) -> List[DeviceConfig]:
+        """
+        Every configured device, the legacy named fields first.
+
+        Legacy fields get their field name as id, heater/vent_fan/schedule roles
+        and the matching top-level schedule.
+
+        Returns:
+            List of device configurations with ids and roles filled in
+        """
+        devices = []
+        for device_id, role, schedule_field in LEGACY_DEVICES:
+            device = getattr(self, device_id)
+            if device is None:
+                continue
+            update = {"id": device.id or device_id, "role": role}
+            if schedule_field is not None:
+                update["schedule"] = getattr(self, schedule_field)
+            devices.append(device.model_copy(update=update))
+        return devices + list(self.devices)
+
+    def state_journal_path(self) -> Path:
+        """Path of the device state journal."""
+        if self.state_journal.path is not None:
+            return Path(self.state_journal.path)
+        return Path(self.log_directory) / "device_states.journal"
+
+    @model_validator(mode='after')
+    def validate_devices(self):
+        """Validate device ids and GPIO pins are unique and scheduled devices have schedules."""
+        if any(device.id is None for device in self.devices):
+            raise ValueError('every entry in devices needs an id')
+
+        devices = self.device_list()
+        ids = [device.id for device in devices]
+        if len(ids) != len(set(ids)):
+            raise ValueError('device ids must be unique')
+
+        pins = [device.led_gpio_pin for device in devices]
+        pins += [device.button_gpio_pin for device in devices if device.button_gpio_pin is not None]
+        if len(pins) != len(set(pins)):
+            raise ValueError('device GPIO pins must be unique')
+
+        for device in devices:
+            if device.role == "schedule" and device.schedule is None:
+                raise ValueError(f"device '{device.id}' has the schedule role but no schedule")
+        return self
+
+    @field_validator('sensors')
+    @classmethod
+    def validate_unique_sensor_names(cls, v):
+        """Validate that additional sensors have unique names."""
+        names = [sensor.name for sensor in v]
+        if len(names) != len(set(names)):
+            raise ValueError('sensors must have unique names')
+        return v
+
     class Config:
         """Pydantic configuration."""
         json_schema_extra = {
@@ -249,3 +951,28 @@ class GreenhouseManagerSettings(BaseModel):
                 }
             }
         }
+
+
+def settings_diff(old: BaseModel, new: BaseModel) -> List[str]:
+    """
+    List the settings that differ between two settings models.
+
+    Nested models are compared field by field; lists and other values are
+    compared as a whole.
+
+    Args:
+        old: Settings currently in use
+        new: Replacement settings
+
+    Returns:
+        Sorted dotted paths of the changed fields, e.g. 'sensor.i2c_address'
+    """
+    def changed(before: Any, after: Any, prefix: str) -> List[str]:
+        if isinstance(before, dict) and isinstance(after, dict):
+            paths = []
+            for key in sorted(set(before) | set(after)):
+                paths += changed(before.get(key), after.get(key), f"{prefix}{key}.")
+            return paths
+        return [prefix[:-1]] if before != after else []
+
+    return changed(old.model_dump(), new.model_dump(), "")
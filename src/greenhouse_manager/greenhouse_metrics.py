@@ -0,0 +1,299 @@
+"""
+Greenhouse Metrics
+
+Lightweight instrumentation for the greenhouse services:
+- Counters, gauges and latency histograms with optional labels
+- A process-wide registry rendered in the Prometheus text exposition format
+- A small HTTP server exposing /metrics from the manager process
+
+Recording a sample is a dictionary lookup, a lock and a bisect, so metrics can be
+updated on the control loop hot path.
+"""
+
+import abc
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Default latency buckets in seconds, from 1 ms to 30 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    """Format a label set as '{name="value",...}' (empty string if there are no labels)."""
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value, keeping integers free of a trailing '.0'."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric(abc.ABC):
+    """
+    Base class for metrics with optional labels.
+
+    Attributes:
+        name: Metric name
+        documentation: Help text
+        labelnames: Names of the labels distinguishing child series
+    """
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _new_child(self) -> "_Metric":
+        """Create an unlabelled metric of the same type to hold one child series."""
+
+    def labels(self, *labelvalues) -> "_Metric":
+        """
+        Get the child series for a set of label values.
+
+        Keep the returned child around on hot paths to skip the lookup.
+
+        Args:
+            labelvalues: One value per label name, in order
+
+        Returns:
+            Child metric for those label values
+        """
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in labelvalues)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def render(self) -> List[str]:
+        """Render the metric and its child series in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        if self.labelnames:
+            with self._lock:
+                children = dict(self._children)
+            for labelvalues, child in sorted(children.items()):
+                lines.extend(child._render_samples(self.name, self.labelnames, labelvalues))
+        else:
+            lines.extend(self._render_samples(self.name, (), ()))
+        return lines
+
+    @abc.abstractmethod
+    def _render_samples(self, name: str, labelnames: Sequence[str], labelvalues: Sequence[str]) -> List[str]:
+        """Render this series' sample lines under the given name and labels."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0):
+        """Increase the counter by amount."""
+        with self._lock:
+            self.value += amount
+
+    def _render_samples(self, name, labelnames, labelvalues):
+        return [f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation)
+
+    def set(self, value: float):
+        """Set the gauge to value."""
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        """Increase the gauge by amount."""
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        """Decrease the gauge by amount."""
+        self.inc(-amount)
+
+    def _render_samples(self, name, labelnames, labelvalues):
+        return [f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(self.value)}"]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float):
+        """Record an observation."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Context manager observing the wall-clock duration of its block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _render_samples(self, name, labelnames, labelvalues):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.bucket_counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            bucket_labels = _format_labels(labelnames, labelvalues, 'le="' + le + '"')
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        labels = _format_labels(labelnames, labelvalues)
+        lines.append(f"{name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{labels} {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.metric_type}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format."""
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by all modules
+REGISTRY = MetricsRegistry()
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    """
+    Minimal HTTP server exposing a registry on /metrics.
+
+    Attributes:
+        host: Interface to bind to
+        port: Port to listen on
+        registry: Registry to expose
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9101, registry: MetricsRegistry = REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start serving in a background thread."""
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the journal
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        print(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
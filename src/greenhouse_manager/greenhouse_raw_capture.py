@@ -0,0 +1,164 @@
+"""
+Greenhouse Raw Capture
+
+High-rate capture of the filtered sensor readings between log samples:
+- Every reading at the sensor rate is kept in a bounded SampleRing for live views
+- Each log interval is logged as the mean, min, max and last of its readings,
+  in place of a single reading and its spread, so log rows keep their size
+- Optionally, readings are spilled in batches to a compact 'raw' dataset
+  (float32 values, one file per day) kept for a short retention window
+"""
+
+import math
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from greenhouse_manager.greenhouse_acquisition import CHANNELS, LOG_COLUMNS, AcquisitionSummary, SampleRing
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_metrics import REGISTRY
+
+
+RAW_READINGS_SPILLED = REGISTRY.counter(
+    "greenhouse_raw_readings_spilled_total", "Sensor-rate readings written to the raw dataset"
+)
+
+
+def ring_time(timestamp: datetime) -> float:
+    """Seconds for a naive local timestamp, converted back unchanged by pd.to_datetime(unit='s')."""
+    return timestamp.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RawCaptureBuffer:
+    """
+    Filtered readings at the sensor rate, aggregated per log interval.
+
+    Attributes:
+        ring: Readings held for live views; the oldest are overwritten
+        data_logger: Data logger readings are spilled to, or None to keep them in memory only
+        spill_interval_seconds: Longest time readings wait in the ring before being spilled
+        spill_retention_days: Days of spilled readings kept
+        clock: Time source
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        data_logger: Optional[GreenhouseDataLogger] = None,
+        spill_interval_seconds: float = 300,
+        spill_retention_days: int = 2,
+        clock: Clock = SYSTEM_CLOCK
+    ):
+        self.ring = SampleRing(capacity)
+        self.data_logger = data_logger
+        self.spill_interval_seconds = spill_interval_seconds
+        self.spill_retention_days = spill_retention_days
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._reset_interval()
+
+        # Ring time of the last reading spilled and the number added since
+        self._spilled_until = -math.inf
+        self._unspilled = 0
+        self._last_spill = clock.time()
+        self._pruned_day = None
+
+    def _reset_interval(self):
+        """Start aggregating a new log interval."""
+        self._readings = 0
+        self._samples = 0
+        self._sum = np.zeros(len(CHANNELS))
+        self._min = np.full(len(CHANNELS), np.inf)
+        self._max = np.full(len(CHANNELS), -np.inf)
+        self._last = np.full(len(CHANNELS), np.nan)
+
+    def add(self, summary: AcquisitionSummary):
+        """
+        Add a filtered reading, spilling the unspilled readings when they are due.
+
+        Args:
+            summary: Filtered reading for one read interval
+        """
+        reading = summary.reading()
+        values = np.array([reading[channel] for channel in CHANNELS])
+        with self._lock:
+            self.ring.append(ring_time(summary.timestamp), reading)
+            self._readings += 1
+            self._samples += summary.samples
+            self._sum += values
+            np.minimum(self._min, [summary.channels[channel].min for channel in CHANNELS], out=self._min)
+            np.maximum(self._max, [summary.channels[channel].max for channel in CHANNELS], out=self._max)
+            self._last = values
+            self._unspilled += 1
+
+            # Spill before the ring wraps round onto readings not yet written
+            if self.data_logger is not None and (
+                    self._unspilled >= self.ring.capacity // 2 or
+                    self.clock.time() - self._last_spill >= self.spill_interval_seconds):
+                self._spill_locked()
+
+    def interval(self) -> Optional[Tuple[Dict[str, float], Dict[str, float]]]:
+        """
+        Aggregate the readings added since the last call and start a new interval.
+
+        Returns:
+            Tuple of (mean value by channel, log columns holding the '_min', '_max'
+            and '_last' of each channel with the sample and reading counts), or
+            None if no readings were added
+        """
+        with self._lock:
+            if not self._readings:
+                return None
+            reading = dict(zip(CHANNELS, (self._sum / self._readings).tolist()))
+            fields = {"sensor_samples": self._samples, "sensor_readings": self._readings}
+            for column, channel in enumerate(CHANNELS):
+                fields[f"{LOG_COLUMNS[channel]}_min"] = float(self._min[column])
+                fields[f"{LOG_COLUMNS[channel]}_max"] = float(self._max[column])
+                fields[f"{LOG_COLUMNS[channel]}_last"] = float(self._last[column])
+            self._reset_interval()
+        return reading, fields
+
+    def recent(self, seconds: float) -> pd.DataFrame:
+        """
+        Readings from the last few seconds, oldest first.
+
+        Args:
+            seconds: How far back to go
+
+        Returns:
+            DataFrame with a timestamp column and one column per channel
+        """
+        return self._frame(*self.ring.window(ring_time(self.clock.now()) - seconds))
+
+    @staticmethod
+    def _frame(times: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+        """Build a readings DataFrame from ring timestamps and values."""
+        df = pd.DataFrame(values, columns=[LOG_COLUMNS[channel] for channel in CHANNELS])
+        df.insert(0, "timestamp", pd.to_datetime(np.round(times * 1000).astype(np.int64), unit="ms"))
+        return df
+
+    def _spill_locked(self):
+        """Write readings not yet spilled and prune old raw files once a day (caller holds the lock)."""
+        times, values = self.ring.window(self._spilled_until)
+        if len(times):
+            self.data_logger.log_raw_readings(self._frame(times, values))
+            self._spilled_until = times[-1]
+            RAW_READINGS_SPILLED.inc(len(times))
+        self._unspilled = 0
+        self._last_spill = self.clock.time()
+
+        today = self.clock.now().date()
+        if today != self._pruned_day:
+            self.data_logger.cleanup_raw_readings(self.spill_retention_days)
+            self._pruned_day = today
+
+    def flush(self):
+        """Spill the readings not yet written now."""
+        if self.data_logger is None:
+            return
+        with self._lock:
+            self._spill_locked()
@@ -0,0 +1,261 @@
+"""
+Greenhouse Retention
+
+Tiered retention engine for camera images and sensor logs:
+- Images move from full resolution to medium, thumbnail and one-frame-per-day tiers as they age
+- Raw daily sensor logs are replaced by fixed-interval rollups after a configurable age
+- Work runs incrementally in a background thread, bounded by an I/O budget per run
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, time as dt_time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+from greenhouse_manager.greenhouse_manager_settings import Retention
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_image_catalog import (
+    GreenhouseImageCatalog,
+    IMAGE_STORAGE_DIRECTORIES,
+    parse_capture_time
+)
+from greenhouse_manager.greenhouse_image_processing import save_resized
+
+
+# Storage tiers in order of decreasing resolution, and the directory holding each
+TIER_FULL = "full"
+TIER_MEDIUM = "medium"
+TIER_THUMBNAIL = "thumbnail"
+TIER_DAILY = "daily"
+TIER_RANK = {TIER_FULL: 0, TIER_MEDIUM: 1, TIER_THUMBNAIL: 2, TIER_DAILY: 3}
+TIER_DIRECTORY = dict(zip((TIER_FULL, TIER_MEDIUM, TIER_THUMBNAIL), IMAGE_STORAGE_DIRECTORIES))
+
+
+@dataclass
+class RetentionReport:
+    """Summary of a single retention run."""
+
+    bytes_reclaimed: int = 0
+    bytes_processed: int = 0
+    images_resized: int = 0
+    images_deleted: int = 0
+    logs_rolled_up: int = 0
+    pending: bool = False
+
+
+class RetentionEngine:
+    """
+    Applies tiered retention to camera images and sensor logs.
+
+    Each run processes the oldest eligible files first and stops once the bytes
+    read and written reach the I/O budget, leaving the rest for later runs.
+
+    Attributes:
+        settings: Retention settings
+        image_directory: Directory containing the camera images
+        data_logger: Data logger owning the sensor logs
+        image_catalog: Optional catalog kept in sync when images move
+        clock: Time source used to age files
+        total_bytes_reclaimed: Bytes reclaimed since the engine was created
+    """
+
+    def __init__(
+        self,
+        settings: Retention,
+        image_directory: str,
+        data_logger: GreenhouseDataLogger,
+        image_catalog: Optional[GreenhouseImageCatalog] = None,
+        clock: Clock = SYSTEM_CLOCK
+    ):
+        self.settings = settings
+        self.image_directory = Path(image_directory)
+        self.data_logger = data_logger
+        self.image_catalog = image_catalog
+        self.clock = clock
+        self.total_bytes_reclaimed = 0
+        self.last_report: Optional[RetentionReport] = None
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _tier_for_age(self, age: timedelta) -> str:
+        """Return the storage tier an image of the given age belongs in."""
+        tier = TIER_FULL
+        for retention_tier in self.settings.image_tiers:
+            if age >= timedelta(days=retention_tier.min_age_days):
+                tier = retention_tier.resolution
+        return tier
+
+    def _scan_images(self) -> List[Tuple[datetime, str, Path]]:
+        """
+        List stored images with their capture time and current tier, oldest first.
+
+        Returns:
+            List of (capture time, current tier, path) tuples
+        """
+        images = []
+        for tier, directory in TIER_DIRECTORY.items():
+            for image_path in (self.image_directory / directory).glob("greenhouse_*.jpg"):
+                captured = parse_capture_time(image_path.name)
+                if captured is None:
+                    continue
+                images.append((captured, tier, image_path))
+        images.sort(key=lambda item: item[0])
+        return images
+
+    def _plan_image_actions(self, now: datetime) -> List[Tuple[datetime, Path, Optional[str]]]:
+        """
+        Work out which images need to move to a smaller tier or be deleted.
+
+        Returns:
+            List of (capture time, path, target tier) tuples, oldest first;
+            a target tier of None means the image is deleted
+        """
+        actions = []
+        daily_groups: Dict[object, List[Tuple[datetime, str, Path]]] = {}
+        delete_after = self.settings.delete_images_after_days
+
+        for captured, tier, image_path in self._scan_images():
+            age = now - captured
+            if delete_after is not None and age >= timedelta(days=delete_after):
+                actions.append((captured, image_path, None))
+                continue
+
+            target = self._tier_for_age(age)
+            if target == TIER_DAILY:
+                daily_groups.setdefault(captured.date(), []).append((captured, tier, image_path))
+            elif TIER_RANK[target] > TIER_RANK[tier]:
+                actions.append((captured, image_path, target))
+
+        # Keep the frame closest to noon for each day, as a thumbnail
+        for day, group in daily_groups.items():
+            noon = datetime.combine(day, dt_time(12, 0))
+            keeper = min(group, key=lambda item: abs(item[0] - noon))
+            for captured, tier, image_path in group:
+                if image_path == keeper[2]:
+                    if TIER_RANK[tier] < TIER_RANK[TIER_THUMBNAIL]:
+                        actions.append((captured, image_path, TIER_THUMBNAIL))
+                else:
+                    actions.append((captured, image_path, None))
+
+        actions.sort(key=lambda item: item[0])
+        return actions
+
+    def _apply_image_action(self, image_path: Path, target: Optional[str]) -> Tuple[Optional[Path], int]:
+        """
+        Move an image to its target tier, or delete it.
+
+        Returns:
+            Tuple of (new path or None if deleted, bytes written)
+        """
+        if target is None:
+            image_path.unlink()
+            return None, 0
+
+        width = self.settings.medium_width if target == TIER_MEDIUM else self.settings.thumbnail_width
+        new_path = self.image_directory / TIER_DIRECTORY[target] / image_path.name
+        save_resized(image_path, new_path, width)
+        image_path.unlink()
+        return new_path, new_path.stat().st_size
+
+    def run_once(self, now: Optional[datetime] = None) -> RetentionReport:
+        """
+        Run one incremental retention pass within the I/O budget.
+
+        Args:
+            now: Reference time for ages (defaults to the engine's clock)
+
+        Returns:
+            RetentionReport describing the work done
+        """
+        if now is None:
+            now = self.clock.now()
+
+        report = RetentionReport()
+        budget = int(self.settings.io_budget_mb_per_run * 1024 * 1024)
+        catalog_updates: Dict[object, Dict[str, Optional[Path]]] = {}
+
+        # Sensor logs first: rollups are cheap and reclaim the most per byte read
+        if self.settings.raw_log_days is not None:
+            cutoff = (now - timedelta(days=self.settings.raw_log_days)).date()
+            for log_file in sorted(self.data_logger.log_directory.glob(f"greenhouse_log_*.{self.data_logger.log_format}")):
+                try:
+                    log_date = datetime.strptime(log_file.stem.split('_')[-1], "%Y-%m-%d")
+                except ValueError:
+                    continue
+                if log_date.date() >= cutoff:
+                    break
+                if report.bytes_processed >= budget:
+                    report.pending = True
+                    break
+                report.bytes_processed += log_file.stat().st_size
+                try:
+                    report.bytes_reclaimed += self.data_logger.rollup_daily_log(
+                        log_date, self.settings.rollup_interval_minutes
+                    )
+                    report.logs_rolled_up += 1
+                except Exception as e:
+                    print(f"Error rolling up log file {log_file}: {e}")
+
+        for captured, image_path, target in self._plan_image_actions(now):
+            if report.bytes_processed >= budget:
+                report.pending = True
+                break
+            try:
+                size_before = image_path.stat().st_size
+                new_path, written = self._apply_image_action(image_path, target)
+            except Exception as e:
+                print(f"Error applying retention to {image_path}: {e}")
+                continue
+
+            report.bytes_processed += size_before + written
+            report.bytes_reclaimed += size_before - written
+            if new_path is None:
+                report.images_deleted += 1
+            else:
+                report.images_resized += 1
+            catalog_updates.setdefault(captured.date(), {})[image_path.name] = new_path
+
+        if self.image_catalog is not None:
+            for day, stored_paths in catalog_updates.items():
+                self.image_catalog.update_stored_paths(datetime.combine(day, dt_time()), stored_paths)
+
+        self.total_bytes_reclaimed += report.bytes_reclaimed
+        self.last_report = report
+
+        if report.bytes_reclaimed > 0 or report.pending:
+            print(
+                f"Retention: reclaimed {report.bytes_reclaimed / 1024 / 1024:.1f} MB "
+                f"({report.images_resized} resized, {report.images_deleted} deleted, "
+                f"{report.logs_rolled_up} logs rolled up)"
+                + (", more work pending" if report.pending else "")
+            )
+        return report
+
+    def _run_loop(self):
+        """Background loop running retention passes until stopped."""
+        interval = self.settings.run_interval_minutes * 60
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error in retention run: {e}")
+            self._stop_event.wait(interval)
+
+    def start(self):
+        """Start running retention passes in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="retention", daemon=True)
+        self._thread.start()
+        print("Retention engine started")
+
+    def stop(self):
+        """Stop the background thread, waiting for the current pass to finish."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
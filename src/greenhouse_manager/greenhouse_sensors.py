@@ -0,0 +1,411 @@
+"""
+Greenhouse Sensors
+
+Pluggable sensors alongside the primary BME280 used for control:
+- SensorPlugin interface: a named sensor with its own channels and read interval
+- Built-in plugins for an additional BME280, capacitive soil moisture probes on
+  an ADS1115 ADC and a Sensirion SCD4x CO2 sensor
+- register_sensor_plugin() to add new kinds without changing the manager
+- SensorPoller reads due sensors concurrently on a thread pool, so a slow sensor
+  holds up neither the control loop nor the other sensors
+
+Readings are logged to the long-format 'channels' dataset (timestamp, sensor,
+channel, value), so adding sensors or channels needs no change to the log schema.
+"""
+
+import abc
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+from greenhouse_manager.greenhouse_hardware_collection import BME280Sensor
+from greenhouse_manager.greenhouse_manager_settings import SensorPluginConfig
+from greenhouse_manager.greenhouse_metrics import REGISTRY
+
+
+SENSOR_PLUGIN_READ_SECONDS = REGISTRY.histogram(
+    "greenhouse_sensor_plugin_read_seconds", "Time taken to read a pluggable sensor", ["sensor"]
+)
+SENSOR_PLUGIN_FAILURES = REGISTRY.counter(
+    "greenhouse_sensor_plugin_failures_total", "Pluggable sensor reads that returned no data", ["sensor"]
+)
+
+# A logged reading: (timestamp, sensor name, channel name, value)
+ChannelReading = Tuple[datetime, str, str, float]
+
+
+class SensorPlugin(abc.ABC):
+    """
+    Base class for pluggable sensors.
+
+    Subclasses set channels and implement read().
+
+    Attributes:
+        name: Unique sensor name, used as the 'sensor' column of the channels dataset
+        interval_seconds: Seconds between reads
+        mock_mode: If True, returns simulated readings
+        channels: Names of the values returned by read()
+    """
+
+    channels: Tuple[str, ...] = ()
+
+    def __init__(self, name: str, interval_seconds: int = 60, mock_mode: bool = False):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.mock_mode = mock_mode
+
+    @abc.abstractmethod
+    def read(self) -> Optional[Dict[str, float]]:
+        """
+        Read the sensor.
+
+        Returns:
+            Dictionary of channel name to value, or None if the read failed
+        """
+
+    def cleanup(self):
+        """Release any hardware resources."""
+
+
+# Registered plugin factories, keyed by the 'kind' used in settings
+SENSOR_PLUGINS: Dict[str, Callable[..., SensorPlugin]] = {}
+
+
+def register_sensor_plugin(kind: str):
+    """
+    Class decorator registering a SensorPlugin under a settings 'kind'.
+
+    Args:
+        kind: Name used in the 'kind' field of a sensors entry
+    """
+    def decorator(cls):
+        SENSOR_PLUGINS[kind] = cls
+        return cls
+    return decorator
+
+
+@register_sensor_plugin("bme280")
+class BME280Plugin(SensorPlugin):
+    """
+    Additional BME280 temperature, humidity and pressure sensor.
+
+    Attributes:
+        sensor: Underlying BME280Sensor
+    """
+
+    channels = ("temperature_celsius", "humidity_percent", "pressure_hpa")
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: int = 60,
+        mock_mode: bool = False,
+        i2c_bus: int = 1,
+        i2c_address: int = 0x77
+    ):
+        super().__init__(name, interval_seconds, mock_mode)
+        self.sensor = BME280Sensor(i2c_bus_number=i2c_bus, i2c_address=i2c_address, mock_mode=mock_mode)
+
+    def read(self) -> Optional[Dict[str, float]]:
+        data = self.sensor.read_data()
+        if data is None:
+            return None
+        return {
+            "temperature_celsius": data["temperature"],
+            "humidity_percent": data["humidity"],
+            "pressure_hpa": data["pressure"],
+        }
+
+    def cleanup(self):
+        self.sensor.cleanup()
+
+
+@register_sensor_plugin("soil_moisture")
+class SoilMoisturePlugin(SensorPlugin):
+    """
+    Capacitive soil moisture probes read through an ADS1115 ADC.
+
+    Each ADC input becomes a 'moisture_percent_<input>' channel, scaled
+    linearly between the raw readings of the probe in dry air and in water.
+
+    Attributes:
+        i2c_bus: I2C bus number
+        i2c_address: ADS1115 address (0x48-0x4B)
+        adc_inputs: ADS1115 inputs with a probe attached (0-3)
+        dry_raw: Raw reading of a probe in dry air
+        wet_raw: Raw reading of a probe in water
+    """
+
+    # ADS1115 registers and single-shot configuration: +/-4.096 V, 128 samples/s, comparator off
+    CONVERSION_REGISTER = 0x00
+    CONFIG_REGISTER = 0x01
+    CONFIG_BASE = 0x8000 | 0x0200 | 0x0100 | 0x0080 | 0x0003
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: int = 300,
+        mock_mode: bool = False,
+        i2c_bus: int = 1,
+        i2c_address: int = 0x48,
+        adc_inputs: Sequence[int] = (0,),
+        dry_raw: int = 17000,
+        wet_raw: int = 8000
+    ):
+        super().__init__(name, interval_seconds, mock_mode)
+        self.i2c_bus = i2c_bus
+        self.i2c_address = i2c_address
+        self.adc_inputs = list(adc_inputs)
+        self.dry_raw = dry_raw
+        self.wet_raw = wet_raw
+        self.channels = tuple(f"moisture_percent_{adc_input}" for adc_input in self.adc_inputs)
+        self.bus = None
+
+    def _read_raw(self, adc_input: int) -> int:
+        """Take a single-shot conversion of one ADC input against ground."""
+        if self.bus is None:
+            import smbus2
+            self.bus = smbus2.SMBus(self.i2c_bus)
+        config = self.CONFIG_BASE | ((0x4 + adc_input) << 12)
+        self.bus.write_i2c_block_data(self.i2c_address, self.CONFIG_REGISTER, [config >> 8, config & 0xFF])
+        time.sleep(0.01)  # One conversion at 128 samples/s
+        data = self.bus.read_i2c_block_data(self.i2c_address, self.CONVERSION_REGISTER, 2)
+        return int.from_bytes(bytes(data), "big", signed=True)
+
+    def to_percent(self, raw: int) -> float:
+        """Convert a raw reading to moisture in %, clipped to 0-100."""
+        percent = (self.dry_raw - raw) / (self.dry_raw - self.wet_raw) * 100
+        return min(100.0, max(0.0, percent))
+
+    def read(self) -> Optional[Dict[str, float]]:
+        if self.mock_mode:
+            return {channel: random.uniform(30.0, 70.0) for channel in self.channels}
+        try:
+            return {
+                channel: self.to_percent(self._read_raw(adc_input))
+                for channel, adc_input in zip(self.channels, self.adc_inputs)
+            }
+        except Exception as e:
+            print(f"Error reading soil moisture sensor '{self.name}': {e}")
+            return None
+
+    def cleanup(self):
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+
+
+@register_sensor_plugin("scd4x")
+class SCD4xPlugin(SensorPlugin):
+    """
+    Sensirion SCD40/SCD41 CO2, temperature and humidity sensor.
+
+    The sensor runs in periodic measurement mode, producing a new value every
+    five seconds; read() fetches the most recent one.
+
+    Attributes:
+        i2c_bus: I2C bus number
+        i2c_address: Sensor address (0x62)
+    """
+
+    channels = ("co2_ppm", "temperature_celsius", "humidity_percent")
+
+    START_PERIODIC_MEASUREMENT = 0x21B1
+    READ_MEASUREMENT = 0xEC05
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: int = 60,
+        mock_mode: bool = False,
+        i2c_bus: int = 1,
+        i2c_address: int = 0x62
+    ):
+        super().__init__(name, interval_seconds, mock_mode)
+        self.i2c_bus = i2c_bus
+        self.i2c_address = i2c_address
+        self.bus = None
+
+    @staticmethod
+    def crc8(data: bytes) -> int:
+        """Sensirion CRC-8 (polynomial 0x31, initial value 0xFF)."""
+        crc = 0xFF
+        for byte in data:
+            crc ^= byte
+            for _ in range(8):
+                crc = ((crc << 1) ^ 0x31) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        return crc
+
+    def _command(self, command: int, read_length: int = 0) -> bytes:
+        """Send a 16-bit command and optionally read a response."""
+        import smbus2
+        if self.bus is None:
+            self.bus = smbus2.SMBus(self.i2c_bus)
+            self._command(self.START_PERIODIC_MEASUREMENT)
+        self.bus.i2c_rdwr(smbus2.i2c_msg.write(self.i2c_address, [command >> 8, command & 0xFF]))
+        time.sleep(0.001)  # Command execution time
+        if not read_length:
+            return b""
+        response = smbus2.i2c_msg.read(self.i2c_address, read_length)
+        self.bus.i2c_rdwr(response)
+        return bytes(response)
+
+    def decode(self, response: bytes) -> Dict[str, float]:
+        """
+        Decode a read_measurement response.
+
+        Args:
+            response: Nine bytes: three big-endian words, each followed by its CRC
+
+        Returns:
+            Dictionary of channel name to value
+        """
+        words = []
+        for offset in range(0, 9, 3):
+            word = response[offset:offset + 2]
+            if self.crc8(word) != response[offset + 2]:
+                raise ValueError("CRC mismatch in SCD4x response")
+            words.append(int.from_bytes(word, "big"))
+        return {
+            "co2_ppm": float(words[0]),
+            "temperature_celsius": -45 + 175 * words[1] / 65535,
+            "humidity_percent": 100 * words[2] / 65535,
+        }
+
+    def read(self) -> Optional[Dict[str, float]]:
+        if self.mock_mode:
+            return {
+                "co2_ppm": random.uniform(400.0, 1200.0),
+                "temperature_celsius": random.uniform(18.0, 35.0),
+                "humidity_percent": random.uniform(40.0, 99.0),
+            }
+        try:
+            return self.decode(self._command(self.READ_MEASUREMENT, 9))
+        except Exception as e:
+            print(f"Error reading SCD4x sensor '{self.name}': {e}")
+            return None
+
+    def cleanup(self):
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+
+
+def create_sensor_plugin(config: SensorPluginConfig, mock_mode: bool = False) -> SensorPlugin:
+    """
+    Create a sensor plugin from its settings entry.
+
+    Args:
+        config: Sensor settings; options are passed to the plugin as keyword arguments
+        mock_mode: If True, the plugin returns simulated readings
+
+    Returns:
+        SensorPlugin instance
+
+    Raises:
+        ValueError: If no plugin is registered for the configured kind
+    """
+    factory = SENSOR_PLUGINS.get(config.kind)
+    if factory is None:
+        raise ValueError(f"Unknown sensor kind '{config.kind}'. Available: {', '.join(sorted(SENSOR_PLUGINS))}")
+    return factory(
+        name=config.name,
+        interval_seconds=config.interval_seconds,
+        mock_mode=mock_mode,
+        **config.options
+    )
+
+
+class SensorPoller:
+    """
+    Reads sensor plugins concurrently, each on its own interval.
+
+    poll() only submits reads that are due and not already running, so it
+    returns immediately; finished readings are collected with drain().
+
+    Attributes:
+        plugins: Sensors to read
+        clock: Time source for intervals and reading timestamps
+        latest: Most recent reading of each sensor, keyed by sensor name
+    """
+
+    def __init__(self, plugins: List[SensorPlugin], clock: Clock = SYSTEM_CLOCK, max_workers: int = 4):
+        self.plugins = plugins
+        self.clock = clock
+        self.latest: Dict[str, Dict[str, float]] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(plugins))),
+            thread_name_prefix="sensor-poll"
+        ) if plugins else None
+        self._next_read = {plugin.name: 0.0 for plugin in plugins}
+        self._in_flight: Dict[str, Future] = {}
+        self._pending: List[ChannelReading] = []
+        self._lock = threading.Lock()
+
+    def _read(self, plugin: SensorPlugin):
+        """Read one plugin on a pool thread and queue its channels."""
+        try:
+            with SENSOR_PLUGIN_READ_SECONDS.labels(plugin.name).time():
+                data = plugin.read()
+        except Exception as e:
+            print(f"Error reading sensor '{plugin.name}': {e}")
+            data = None
+
+        if not data:
+            SENSOR_PLUGIN_FAILURES.labels(plugin.name).inc()
+            return
+        timestamp = self.clock.now()
+        with self._lock:
+            self.latest[plugin.name] = data
+            self._pending.extend((timestamp, plugin.name, channel, value) for channel, value in data.items())
+
+    def poll(self) -> int:
+        """
+        Start reads for every sensor whose interval has elapsed.
+
+        Returns:
+            Number of reads started
+        """
+        if self._executor is None:
+            return 0
+
+        now = self.clock.time()
+        started = 0
+        for plugin in self.plugins:
+            future = self._in_flight.get(plugin.name)
+            if future is not None and not future.done():
+                continue
+            if now < self._next_read[plugin.name]:
+                continue
+            self._next_read[plugin.name] = now + plugin.interval_seconds
+            self._in_flight[plugin.name] = self._executor.submit(self._read, plugin)
+            started += 1
+        return started
+
+    def wait(self):
+        """Block until every running read has finished."""
+        for future in list(self._in_flight.values()):
+            future.result()
+
+    def drain(self) -> List[ChannelReading]:
+        """
+        Take the readings collected since the last call.
+
+        Returns:
+            List of (timestamp, sensor, channel, value) tuples
+        """
+        with self._lock:
+            readings, self._pending = self._pending, []
+        return readings
+
+    def shutdown(self):
+        """Wait for running reads, stop the pool and release the sensors."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for plugin in self.plugins:
+            plugin.cleanup()
@@ -0,0 +1,284 @@
+"""
+Greenhouse Simulation
+
+Physics-based plant model used as a mock hardware backend:
+- Lumped thermal model with thermal mass, envelope losses, solar gain and
+  heat from the heater and grow lights
+- Absolute-humidity model with plant transpiration and air exchange through
+  infiltration and the vent fan
+- Outside weather profiles with a daily temperature cycle, cloud cover and
+  day-to-day variation
+- A simulated BME280 sensor with noise, driven by the manager's devices: every
+  switched-on device counts towards its role (heater, vent_fan, schedule)
+
+The model advances in simulated time taken from a Clock, so combined with a
+SimulatedClock it runs far faster than real time.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+from greenhouse_manager.greenhouse_hardware_collection import BME280Sensor
+from greenhouse_manager.greenhouse_manager_settings import DeviceConfig, SimulationConfig
+
+
+# Longest integration step; the fastest time constant (vent fan) is several minutes
+MAX_STEP_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class WeatherProfile:
+    """Outside conditions for a season."""
+
+    mean_temp_celsius: float
+    daily_swing_celsius: float
+    mean_humidity_percent: float
+    sunrise_hour: float
+    sunset_hour: float
+    clear_sky_fraction: float  # Average share of peak solar gain reaching the greenhouse
+    day_to_day_std_celsius: float = 2.0
+
+
+WEATHER_PROFILES = {
+    "spring": WeatherProfile(12.0, 10.0, 70.0, 6.5, 19.5, 0.6),
+    "summer": WeatherProfile(22.0, 12.0, 60.0, 5.5, 21.0, 0.8),
+    "autumn": WeatherProfile(11.0, 8.0, 80.0, 7.0, 18.5, 0.5),
+    "winter": WeatherProfile(2.0, 6.0, 85.0, 8.0, 16.5, 0.35),
+}
+
+
+def running_by_role(devices: Sequence[DeviceConfig], states: Dict[str, bool]) -> Dict[str, int]:
+    """
+    Count the switched-on devices of each role.
+
+    Args:
+        devices: Device configurations with ids and roles, as from device_list()
+        states: Device id to on/off state
+
+    Returns:
+        Role to number of devices with that role that are on
+    """
+    running: Dict[str, int] = {}
+    for device in devices:
+        if states.get(device.id):
+            running[device.role] = running.get(device.role, 0) + 1
+    return running
+
+
+def saturation_vapor_density(temperature: float) -> float:
+    """
+    Water vapour density of saturated air (Magnus formula).
+
+    Args:
+        temperature: Air temperature in Celsius
+
+    Returns:
+        Saturation vapour density in g/m³
+    """
+    vapor_pressure_hpa = 6.112 * math.exp(17.62 * temperature / (243.12 + temperature))
+    return 216.7 * vapor_pressure_hpa / (273.15 + temperature)
+
+
+class OutsideWeather:
+    """
+    Outside temperature, humidity and sunlight over time.
+
+    Each day gets its own temperature offset and cloud cover, drawn from a
+    seeded generator so runs are reproducible.
+
+    Attributes:
+        profile: Seasonal weather profile
+    """
+
+    def __init__(self, profile: WeatherProfile, seed: Optional[int] = None):
+        self.profile = profile
+        self._seed = seed if seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+        self._days: Dict[int, Tuple[float, float]] = {}
+
+    def _day(self, when: datetime) -> Tuple[float, float]:
+        """Temperature offset and cloud factor for the day containing when."""
+        ordinal = when.toordinal()
+        if ordinal not in self._days:
+            rng = np.random.default_rng([self._seed, ordinal])
+            offset = rng.normal(0, self.profile.day_to_day_std_celsius)
+            sunshine = float(np.clip(rng.normal(self.profile.clear_sky_fraction, 0.25), 0.05, 1.0))
+            self._days[ordinal] = (offset, sunshine)
+        return self._days[ordinal]
+
+    def conditions(self, when: datetime) -> Tuple[float, float, float]:
+        """
+        Outside conditions at a point in time.
+
+        Args:
+            when: Time to evaluate
+
+        Returns:
+            Tuple of (temperature in Celsius, relative humidity in %, solar
+            fraction 0-1 of peak clear-sky gain)
+        """
+        profile = self.profile
+        hour = when.hour + when.minute / 60 + when.second / 3600
+        offset, sunshine = self._day(when)
+
+        # Coldest around sunrise, warmest mid-afternoon
+        temperature = (profile.mean_temp_celsius + offset
+                       + profile.daily_swing_celsius / 2 * math.cos(2 * math.pi * (hour - 15) / 24))
+
+        solar = 0.0
+        if profile.sunrise_hour < hour < profile.sunset_hour:
+            day_fraction = (hour - profile.sunrise_hour) / (profile.sunset_hour - profile.sunrise_hour)
+            solar = math.sin(math.pi * day_fraction) * sunshine
+
+        # Relative humidity falls as the air warms through the day
+        humidity = float(np.clip(
+            profile.mean_humidity_percent - 1.5 * (temperature - profile.mean_temp_celsius - offset),
+            15.0, 100.0
+        ))
+        return temperature, humidity, solar
+
+
+class GreenhouseThermalModel:
+    """
+    Lumped thermal and moisture model of the greenhouse.
+
+    Temperature follows C dT/dt = UA (T_out - T) + P_heat + P_lights + P_solar,
+    with each running vent fan adding to UA and to the air exchange rate. Devices
+    act through their role: heaters heat, vent fans ventilate and scheduled
+    devices are treated as grow lights. Moisture is tracked as absolute
+    humidity, so heating lowers relative humidity the way it does in a real
+    greenhouse.
+
+    Attributes:
+        config: Simulation settings
+        weather: Outside weather
+        time: Simulated time of the current state
+        temperature: Inside air temperature in Celsius
+        vapor_density: Inside absolute humidity in g/m³
+    """
+
+    VOLUME_M3 = 30.0
+    INFILTRATION_ACH = 0.5  # Air changes per hour with everything closed
+    VENT_FAN_ACH = 20.0
+    TRANSPIRATION_G_PER_HOUR = 120.0  # Plants in full light
+    EVAPORATION_G_PER_HOUR = 15.0  # Soil and pots, around the clock
+
+    def __init__(self, config: SimulationConfig, start: datetime, initial_temperature: Optional[float] = None):
+        self.config = config
+        self.weather = OutsideWeather(WEATHER_PROFILES[config.weather], config.seed)
+        self.time = start
+
+        outside_temp, outside_humidity, _ = self.weather.conditions(start)
+        self.temperature = outside_temp + 5.0 if initial_temperature is None else initial_temperature
+        self.vapor_density = saturation_vapor_density(outside_temp) * outside_humidity / 100
+
+    @property
+    def relative_humidity(self) -> float:
+        """Inside relative humidity in %."""
+        return min(100.0, 100 * self.vapor_density / saturation_vapor_density(self.temperature))
+
+    def _derivatives(self, when: datetime, running: Dict[str, int]) -> Tuple[float, float]:
+        """Rates of change of temperature (K/s) and vapour density (g/m³/s)."""
+        config = self.config
+        outside_temp, outside_humidity, solar = self.weather.conditions(when)
+        heaters = running.get("heater", 0)
+        vent_fans = running.get("vent_fan", 0)
+        lights = running.get("schedule", 0)
+
+        ua = config.envelope_ua_w_per_k + vent_fans * config.vent_fan_ua_w_per_k
+        power = (ua * (outside_temp - self.temperature) + solar * config.solar_gain_w
+                 + heaters * config.heater_power_w + lights * config.grow_lights_power_w)
+        temperature_rate = power / (config.thermal_mass_kj_per_k * 1000)
+
+        light = min(1.0, solar + 0.5 * lights)
+        source = (self.EVAPORATION_G_PER_HOUR + light * self.TRANSPIRATION_G_PER_HOUR) / 3600 / self.VOLUME_M3
+        air_changes = (self.INFILTRATION_ACH + vent_fans * self.VENT_FAN_ACH) / 3600
+        outside_density = saturation_vapor_density(outside_temp) * outside_humidity / 100
+        vapor_rate = source - air_changes * (self.vapor_density - outside_density)
+        return temperature_rate, vapor_rate
+
+    def advance_to(self, when: datetime, running: Dict[str, int]):
+        """
+        Integrate the model forward to a new time with fixed device states.
+
+        Args:
+            when: Simulated time to advance to (earlier times are ignored)
+            running: Role to number of switched-on devices with that role
+        """
+        remaining = (when - self.time).total_seconds()
+        if remaining <= 0:
+            return
+
+        steps = max(1, math.ceil(remaining / MAX_STEP_SECONDS))
+        dt = remaining / steps
+        for step in range(steps):
+            at = self.time.timestamp() + step * dt
+            temperature_rate, vapor_rate = self._derivatives(datetime.fromtimestamp(at), running)
+            self.temperature += temperature_rate * dt
+            self.vapor_density += vapor_rate * dt
+            # Excess moisture condenses on the glazing
+            self.vapor_density = min(self.vapor_density, saturation_vapor_density(self.temperature))
+        self.time = when
+
+
+class SimulatedSensor(BME280Sensor):
+    """
+    BME280 stand-in that reads from a GreenhouseThermalModel.
+
+    Each read advances the model to the current clock time with the devices
+    running since the previous read, then adds sensor noise.
+
+    Attributes:
+        model: Plant model being measured
+        clock: Time source the model follows
+        running_devices: Callable returning the number of switched-on devices per role
+    """
+
+    def __init__(
+        self,
+        model: GreenhouseThermalModel,
+        running_devices: Callable[[], Dict[str, int]],
+        clock: Clock = SYSTEM_CLOCK
+    ):
+        super().__init__(mock_mode=True)
+        self.model = model
+        self.running_devices = running_devices
+        self.clock = clock
+        self._rng = np.random.default_rng(model.config.seed)
+        print(f"MOCK: Simulated greenhouse sensor using '{model.config.weather}' weather")
+
+    def _sample(self) -> Optional[Dict[str, float]]:
+        """Advance the plant model and return a noisy reading."""
+        config = self.model.config
+        self.model.advance_to(self.clock.now(), self.running_devices())
+        return {
+            "temperature": self.model.temperature + self._rng.normal(0, config.temperature_noise_celsius),
+            "pressure": 1013.25 + self._rng.normal(0, 0.1),
+            "humidity": float(np.clip(
+                self.model.relative_humidity + self._rng.normal(0, config.humidity_noise_percent), 0, 100
+            )),
+        }
+
+
+def create_simulated_sensor(
+    config: SimulationConfig,
+    running_devices: Callable[[], Dict[str, int]],
+    clock: Clock = SYSTEM_CLOCK
+) -> SimulatedSensor:
+    """
+    Create a simulated sensor with a fresh plant model starting at the clock's time.
+
+    Args:
+        config: Simulation settings
+        running_devices: Callable returning the number of switched-on devices per
+            role, e.g. running_by_role() over the configured devices
+        clock: Time source the model follows
+
+    Returns:
+        SimulatedSensor instance
+    """
+    return SimulatedSensor(GreenhouseThermalModel(config, clock.now()), running_devices, clock)
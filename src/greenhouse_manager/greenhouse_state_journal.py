@@ -0,0 +1,232 @@
+"""
+Greenhouse State Journal
+
+Memory-mapped journal of device states kept across manager restarts:
+- One fixed-size record per device with its on/off state and last transition time
+- Each device owns two record slots written alternately, so a write torn by a
+  power cut leaves the previous record intact
+- Records carry a sequence number and a CRC; the newest valid record wins
+- Writes go straight to the mapped file, so a restart after a crash sees every
+  transition the manager made
+
+File layout: a 16-byte header (magic, version, capacity) followed by
+capacity * 2 records of 64 bytes.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+
+
+MAGIC = b"GHSJ"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x")
+# Device id, state, last transition time, sequence number, CRC32 of the preceding fields
+RECORD = struct.Struct("<40sB3xdQI")
+ID_BYTES = 40
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    """Last journaled state of a device."""
+
+    state: bool
+    changed_at: float
+    sequence: int = 0
+
+
+def pack_record(device_id: str, entry: JournalEntry) -> bytes:
+    """Encode a journal record, including its checksum."""
+    body = RECORD.pack(device_id.encode(), entry.state, entry.changed_at, entry.sequence, 0)[:-4]
+    return body + struct.pack("<I", zlib.crc32(body))
+
+
+def unpack_record(data: bytes) -> Optional[tuple]:
+    """
+    Decode a journal record.
+
+    Returns:
+        (device_id, JournalEntry), or None for an empty or corrupt record
+    """
+    raw_id, state, changed_at, sequence, crc = RECORD.unpack(data)
+    if not raw_id.strip(b"\0") or zlib.crc32(data[:-4]) != crc:
+        return None
+    return raw_id.rstrip(b"\0").decode(), JournalEntry(bool(state), changed_at, sequence)
+
+
+def read_journal(path: Path) -> Dict[str, JournalEntry]:
+    """
+    Read the newest valid record of every device in a journal file.
+
+    Args:
+        path: Journal file
+
+    Returns:
+        Dictionary mapping device id to entry (empty if the file is missing or not a journal)
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return {}
+    if len(data) < HEADER.size:
+        return {}
+    magic, version, _ = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        print(f"Ignoring unrecognised state journal {path}")
+        return {}
+
+    entries: Dict[str, JournalEntry] = {}
+    for offset in range(HEADER.size, len(data) - RECORD.size + 1, RECORD.size):
+        record = unpack_record(data[offset:offset + RECORD.size])
+        if record is None:
+            continue
+        device_id, entry = record
+        if device_id not in entries or entry.sequence > entries[device_id].sequence:
+            entries[device_id] = entry
+    return entries
+
+
+class DeviceStateJournal:
+    """
+    Device states and transition times persisted in a memory-mapped file.
+
+    Opening the journal reads any existing file and rewrites it compactly (via
+    a temporary file and os.replace) with room for `capacity` devices.
+
+    Attributes:
+        path: Journal file
+        capacity: Number of devices the journal can hold
+        clock: Time source for transition times
+    """
+
+    def __init__(self, path: str, capacity: int = 64, clock: Clock = SYSTEM_CLOCK):
+        self.path = Path(path)
+        self.capacity = capacity
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, JournalEntry] = {}
+        self._slots: Dict[str, int] = {}
+        self._halves: Dict[str, int] = {}
+        self._sequence = 0
+        self._map: Optional[mmap.mmap] = None
+
+        existing = read_journal(self.path)
+        if len(existing) > capacity:
+            print(f"State journal {self.path} holds {len(existing)} devices, keeping {capacity}")
+            existing = dict(list(existing.items())[:capacity])
+        self._create(existing)
+
+    def _create(self, entries: Dict[str, JournalEntry]):
+        """Write a fresh journal holding the given entries and map it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = bytearray(HEADER.size + self.capacity * 2 * RECORD.size)
+        HEADER.pack_into(data, 0, MAGIC, VERSION, self.capacity)
+        for slot, (device_id, entry) in enumerate(entries.items()):
+            offset = HEADER.size + slot * 2 * RECORD.size
+            data[offset:offset + RECORD.size] = pack_record(device_id, entry)
+            self._entries[device_id] = entry
+            self._slots[device_id] = slot
+            self._halves[device_id] = 0
+            self._sequence = max(self._sequence, entry.sequence)
+
+        temporary = self.path.with_name(f".{self.path.name}.tmp")
+        with open(temporary, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), len(data))
+
+    def _free_slot(self) -> Optional[int]:
+        used = set(self._slots.values())
+        return next((slot for slot in range(self.capacity) if slot not in used), None)
+
+    def get(self, device_id: str) -> Optional[JournalEntry]:
+        """Last journaled state of a device, or None if it has none."""
+        return self._entries.get(device_id)
+
+    def entries(self) -> Dict[str, JournalEntry]:
+        """Last journaled state of every device."""
+        return dict(self._entries)
+
+    def record(self, device_id: str, state: bool, changed_at: Optional[float] = None):
+        """
+        Journal a device's new state.
+
+        Args:
+            device_id: Device id (at most 40 bytes)
+            state: New state (True for on)
+            changed_at: Time of the transition (now if not given)
+
+        Raises:
+            ValueError: If the device id is too long
+        """
+        if len(device_id.encode()) > ID_BYTES:
+            raise ValueError(f"Device id '{device_id}' is longer than {ID_BYTES} bytes")
+        with self._lock:
+            if self._map is None:
+                return
+            slot = self._slots.get(device_id)
+            if slot is None:
+                slot = self._free_slot()
+                if slot is None:
+                    print(f"State journal {self.path} is full, not recording '{device_id}'")
+                    return
+                self._slots[device_id] = slot
+
+            self._sequence += 1
+            entry = JournalEntry(
+                state=bool(state),
+                changed_at=self.clock.time() if changed_at is None else changed_at,
+                sequence=self._sequence
+            )
+            # Overwrite the older of the device's two records
+            half = 1 - self._halves.get(device_id, 1)
+            offset = HEADER.size + (slot * 2 + half) * RECORD.size
+            self._map[offset:offset + RECORD.size] = pack_record(device_id, entry)
+            self._map.flush()
+            self._entries[device_id] = entry
+            self._halves[device_id] = half
+
+    def retain(self, device_ids: Iterable[str]) -> List[str]:
+        """
+        Forget every device not in a list, freeing its slot.
+
+        Args:
+            device_ids: Devices to keep
+
+        Returns:
+            Ids of the devices removed
+        """
+        keep = set(device_ids)
+        with self._lock:
+            if self._map is None:
+                return []
+            removed = [device_id for device_id in self._slots if device_id not in keep]
+            for device_id in removed:
+                offset = HEADER.size + self._slots.pop(device_id) * 2 * RECORD.size
+                self._map[offset:offset + 2 * RECORD.size] = bytes(2 * RECORD.size)
+                self._entries.pop(device_id, None)
+                self._halves.pop(device_id, None)
+            if removed:
+                self._map.flush()
+        return removed
+
+    def close(self):
+        """Flush and unmap the journal."""
+        with self._lock:
+            if self._map is None:
+                return
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+            self._map = None
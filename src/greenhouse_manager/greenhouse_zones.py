@@ -0,0 +1,311 @@
+"""
+Greenhouse Zones
+
+Runs several greenhouses (zones) in one manager process:
+- One settings file per zone, named after the file (config/north.json is zone 'north')
+- One control loop ticking every zone, one RF transmitter queue and one config file observer
+- Each zone keeps its own devices, controllers, sensor, control socket, state journal and log and image directories
+- A zone that fails to start, or keeps failing, is stopped without affecting the others
+- Memory held by each zone is reported in the greenhouse_zone_memory_bytes metric
+
+Zones sample their sensors inline on the shared loop rather than on their own
+threads. The metrics endpoint is started from the first zone's settings.
+
+Usage:
+    greenhouse-zones config/north.json config/south.json
+"""
+
+import argparse
+import json
+import signal
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from watchdog.observers import Observer
+
+from greenhouse_manager.greenhouse_clock import Clock, SYSTEM_CLOCK
+from greenhouse_manager.greenhouse_hardware_collection import RFTransmitQueue
+from greenhouse_manager.greenhouse_ipc import SettingsPersister
+from greenhouse_manager.greenhouse_manager import GreenhouseManager, CONTROL_TICK_SECONDS
+from greenhouse_manager.greenhouse_manager_settings import GreenhouseManagerSettings
+from greenhouse_manager.greenhouse_metrics import REGISTRY, MetricsServer
+
+
+ZONE_ERRORS = REGISTRY.counter(
+    "greenhouse_zone_errors_total", "Control loop iterations of a zone that raised an error", ["zone"]
+)
+ZONE_MEMORY_BYTES = REGISTRY.gauge(
+    "greenhouse_zone_memory_bytes", "Memory allocated by a zone at startup plus its buffered log data", ["zone"]
+)
+ZONES_RUNNING = REGISTRY.gauge(
+    "greenhouse_zones_running", "Zones currently being controlled"
+)
+
+# Seconds between updates of the per-zone memory gauge
+MEMORY_REPORT_INTERVAL_SECONDS = 60
+
+
+@dataclass
+class Zone:
+    """One greenhouse run by the zone manager."""
+
+    name: str
+    config_path: Path
+    manager: Optional[GreenhouseManager] = None
+    startup_bytes: int = 0
+    consecutive_errors: int = 0
+    error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        """True while the zone is being controlled."""
+        return self.manager is not None and self.error is None
+
+    def memory_bytes(self) -> int:
+        """Bytes allocated when the zone started plus its currently buffered log data."""
+        if self.manager is None:
+            return 0
+        return self.startup_bytes + self.manager.data_logger.buffered_bytes()
+
+
+def check_zone_settings(zone_settings: Dict[str, GreenhouseManagerSettings]):
+    """
+    Check zones do not share log, log staging or image directories, control sockets, state journals or GPIO pins.
+
+    Args:
+        zone_settings: Settings by zone name
+
+    Raises:
+        ValueError: If two zones would write to the same directory or file, or drive the same pin
+    """
+    files = {
+        "log directory": lambda settings: settings.log_directory,
+        "image directory": lambda settings: settings.image_directory,
+        "control socket": lambda settings: (
+            settings.control_channel.socket_path if settings.control_channel.enabled else None
+        ),
+        "state journal": lambda settings: (
+            settings.state_journal_path() if settings.state_journal.enabled else None
+        ),
+        "log staging directory": lambda settings: settings.data_logging.staging_directory,
+    }
+    for label, path_of in files.items():
+        owners: Dict[Path, str] = {}
+        for name, settings in zone_settings.items():
+            if path_of(settings) is None:
+                continue
+            path = Path(path_of(settings)).resolve()
+            if path in owners:
+                raise ValueError(f"Zones '{owners[path]}' and '{name}' share {label} {path}")
+            owners[path] = name
+
+    pins: Dict[int, str] = {}
+    for name, settings in zone_settings.items():
+        if settings.mock_mode:
+            continue
+        for device in settings.device_list():
+            for pin in (device.led_gpio_pin, device.button_gpio_pin):
+                if pin is None:
+                    continue
+                if pin in pins:
+                    raise ValueError(f"Zones '{pins[pin]}' and '{name}' both use GPIO pin {pin}")
+                pins[pin] = name
+
+
+class ZoneManager:
+    """
+    Runs several greenhouse zones on one loop.
+
+    Attributes:
+        zones: Zones by name, in the order of the settings files
+        clock: Time source shared by every zone
+        transmitter: RF transmitter queue shared by every zone's outlets
+        max_consecutive_errors: Failed iterations in a row after which a zone is stopped
+    """
+
+    def __init__(
+        self,
+        config_paths: List[str],
+        clock: Clock = SYSTEM_CLOCK,
+        monitor_config: bool = True,
+        max_consecutive_errors: int = 10
+    ):
+        self.clock = clock
+        self.max_consecutive_errors = max_consecutive_errors
+        self.transmitter = RFTransmitQueue()
+        self.running = False
+        self.last_memory_report = 0
+        self.metrics_server: Optional[MetricsServer] = None
+        self.config_observer: Optional[Observer] = None
+
+        self.zones: Dict[str, Zone] = {}
+        for config_path in config_paths:
+            name = Path(config_path).stem
+            if name in self.zones:
+                raise ValueError(f"Zone name '{name}' is used by more than one settings file")
+            self.zones[name] = Zone(name=name, config_path=Path(config_path))
+
+        zone_settings = {}
+        for zone in self.zones.values():
+            try:
+                with open(zone.config_path, 'r') as f:
+                    zone_settings[zone.name] = GreenhouseManagerSettings(**json.load(f))
+            except Exception as e:
+                zone.error = f"Configuration failed: {e}"
+                print(f"Zone '{zone.name}': {zone.error}")
+        check_zone_settings(zone_settings)
+
+        for name, settings in zone_settings.items():
+            self._start_zone(self.zones[name], settings)
+
+        if monitor_config:
+            self.config_observer = Observer()
+            for zone in self.zones.values():
+                if zone.running:
+                    zone.manager.setup_config_monitoring(self.config_observer)
+            self.config_observer.start()
+
+        ZONES_RUNNING.set(len(self.running_zones()))
+        self.report_memory()
+
+    def _start_zone(self, zone: Zone, settings: GreenhouseManagerSettings):
+        """Create a zone's manager, measuring the memory it allocates."""
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            zone.manager = GreenhouseManager(
+                config_path=str(zone.config_path),
+                settings=settings,
+                clock=self.clock,
+                monitor_config=False,
+                transmitter=self.transmitter
+            )
+            zone.manager.settings_persister = SettingsPersister(
+                str(zone.config_path), settings.control_channel.persist_delay_seconds
+            )
+        except Exception as e:
+            zone.error = f"Initialization failed: {e}"
+            print(f"Zone '{zone.name}': {zone.error}")
+        finally:
+            zone.startup_bytes = max(0, tracemalloc.get_traced_memory()[0] - before)
+            if not tracing:
+                tracemalloc.stop()
+
+    def running_zones(self) -> List[Zone]:
+        """Zones currently being controlled."""
+        return [zone for zone in self.zones.values() if zone.running]
+
+    def memory_report(self) -> Dict[str, int]:
+        """
+        Memory held by each running zone.
+
+        Returns:
+            Dictionary mapping zone name to bytes
+        """
+        return {zone.name: zone.memory_bytes() for zone in self.running_zones()}
+
+    def report_memory(self):
+        """Update the per-zone memory gauge."""
+        for name, memory in self.memory_report().items():
+            ZONE_MEMORY_BYTES.labels(name).set(memory)
+
+    def _stop_zone(self, zone: Zone, error: str):
+        """Stop a failing zone and release its hardware."""
+        zone.error = error
+        print(f"Zone '{zone.name}' stopped: {error}")
+        try:
+            zone.manager.shutdown()
+        except Exception as e:
+            print(f"Error shutting down zone '{zone.name}': {e}")
+        ZONES_RUNNING.set(len(self.running_zones()))
+
+    def run_control_loop(self):
+        """Run one control loop iteration of every running zone."""
+        for zone in self.running_zones():
+            try:
+                with CONTROL_TICK_SECONDS.time():
+                    zone.manager.run_control_loop()
+                zone.consecutive_errors = 0
+            except Exception as e:
+                ZONE_ERRORS.labels(zone.name).inc()
+                zone.consecutive_errors += 1
+                print(f"Error in zone '{zone.name}': {e}")
+                if zone.consecutive_errors >= self.max_consecutive_errors:
+                    self._stop_zone(zone, f"{zone.consecutive_errors} consecutive errors, last: {e}")
+
+        current_time = self.clock.time()
+        if current_time - self.last_memory_report >= MEMORY_REPORT_INTERVAL_SECONDS:
+            self.report_memory()
+            self.last_memory_report = current_time
+
+    def start(self):
+        """Start the shared transmitter, each zone's background workers and the metrics endpoint."""
+        self.transmitter.start()
+        for zone in self.running_zones():
+            zone.manager.start(acquisition_thread=False, metrics=False)
+
+        zones = self.running_zones()
+        if zones and zones[0].manager.settings.metrics.enabled:
+            metrics = zones[0].manager.settings.metrics
+            try:
+                self.metrics_server = MetricsServer(metrics.host, metrics.port)
+                self.metrics_server.start()
+            except OSError as e:
+                print(f"Error starting metrics endpoint: {e}")
+                self.metrics_server = None
+
+    def run(self):
+        """Run every zone until interrupted."""
+        print(f"Starting {len(self.running_zones())} of {len(self.zones)} greenhouse zones...")
+        self.running = True
+
+        signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGTERM, self.signal_handler)
+
+        self.start()
+        try:
+            while self.running:
+                self.run_control_loop()
+                self.clock.sleep(0.1)
+        finally:
+            self.shutdown()
+
+    def signal_handler(self, signum, frame):
+        """Handle shutdown signals gracefully."""
+        print(f"\nReceived signal {signum}, shutting down...")
+        self.running = False
+
+    def shutdown(self):
+        """Shut down every running zone, then the shared transmitter and observer."""
+        for zone in self.running_zones():
+            try:
+                zone.manager.shutdown()
+            except Exception as e:
+                print(f"Error shutting down zone '{zone.name}': {e}")
+
+        # Send any codes still queued by the zones
+        self.transmitter.stop()
+
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self.config_observer:
+            self.config_observer.stop()
+            self.config_observer.join()
+        print("All zones shut down")
+
+
+def main():
+    """Run the greenhouse zones given on the command line."""
+    parser = argparse.ArgumentParser(description="Run several greenhouse zones in one process")
+    parser.add_argument("configs", nargs="+", help="Settings JSON file per zone")
+    args = parser.parse_args()
+
+    ZoneManager(args.configs).run()
+
+
+if __name__ == "__main__":
+    main()
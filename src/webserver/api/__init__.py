@@ -1,7 +1,7 @@
 """
 Greenhouse API Module
 
-REST API endpoints for accessing greenhouse data.
+REST API endpoints for accessing greenhouse data and controlling the manager.
 """
 
 import os
@@ -10,12 +10,70 @@ from pathlib import Path
 from flask import Blueprint, jsonify, request, send_file
 from functools import wraps
 
+from greenhouse_manager.greenhouse_image_catalog import GreenhouseImageCatalog, parse_capture_time
+from greenhouse_manager.greenhouse_ipc import ControlError, ControlUnavailable
+
 
 # Create API blueprint
 api_bp = Blueprint('api', __name__)
 
-# Data logger will be attached by app.py
-data_logger = None
+# Data logger and manager control client will be attached by app.py
+api_bp.data_logger = None
+api_bp.control_client = None
+
+# Datasets that can be queried through the history endpoints
+HISTORY_DATASETS = ('log', 'image_metrics', 'channels', 'transitions', 'raw')
+
+
+def get_data_logger():
+    """Return the data logger attached to the blueprint by app.py."""
+    return api_bp.data_logger
+
+
+def call_manager(method, **params):
+    """
+    Call a method of the manager over its control socket.
+
+    Args:
+        method: Control method name
+        **params: Method parameters
+
+    Returns:
+        JSON response, with status 503 if the manager is not reachable and
+        400 if it rejected the request
+    """
+    if api_bp.control_client is None:
+        return jsonify({'error': 'Manager control channel not configured'}), 503
+    try:
+        result = api_bp.control_client.call(method, **params)
+    except ControlUnavailable as e:
+        return jsonify({'error': str(e)}), 503
+    except ControlError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'status': 'success', 'data': result})
+
+
+def records_to_json(df):
+    """
+    Convert a DataFrame into JSON-serialisable records.
+
+    Timestamps are converted to ISO format and array values (such as
+    histograms) to plain lists.
+
+    Args:
+        df: DataFrame to convert
+
+    Returns:
+        List of record dictionaries
+    """
+    records = df.to_dict('records')
+    for record in records:
+        for key, value in record.items():
+            if hasattr(value, 'isoformat'):
+                record[key] = value.isoformat()
+            elif hasattr(value, 'tolist'):
+                record[key] = value.tolist()
+    return records
 
 
 def requires_auth(f):
@@ -54,6 +112,7 @@ def get_status():
     Returns:
         JSON response with current greenhouse status
     """
+    data_logger = get_data_logger()
     if data_logger is None:
         return jsonify({'error': 'Data logger not initialized'}), 500
 
@@ -76,17 +135,22 @@ def get_status():
 @requires_auth
 def get_history():
     """
-    GET /api/v1/history?day=YYYY-MM-DD
+    GET /api/v1/history?day=YYYY-MM-DD&dataset=log
 
     Returns historical data for a given day.
     If no day is provided, returns data for today.
 
     Query Parameters:
         day: Date in YYYY-MM-DD format (optional, defaults to today)
+        dataset: 'log' for sensor data, 'image_metrics' for camera image
+            metrics, 'channels' for additional sensors, 'transitions' for
+            device switches or 'raw' for readings at the sensor rate
+            (optional, defaults to 'log')
 
     Returns:
         JSON response with historical data for the specified day
     """
+    data_logger = get_data_logger()
     if data_logger is None:
         return jsonify({'error': 'Data logger not initialized'}), 500
 
@@ -103,8 +167,14 @@ def get_history():
     else:
         date = datetime.now()
 
+    dataset = request.args.get('dataset', 'log')
+    if dataset not in HISTORY_DATASETS:
+        return jsonify({
+            'error': f"Invalid dataset. Use one of: {', '.join(HISTORY_DATASETS)}"
+        }), 400
+
     # Get data for the specified date
-    df = data_logger.get_data_for_date(date)
+    df = data_logger.get_data_for_date(date, dataset)
 
     if df is None or df.empty:
         return jsonify({
@@ -116,12 +186,7 @@ def get_history():
         })
 
     # Convert DataFrame to list of dictionaries
-    records = df.to_dict('records')
-
-    # Convert timestamps to ISO format
-    for record in records:
-        if 'timestamp' in record and record['timestamp']:
-            record['timestamp'] = record['timestamp'].isoformat()
+    records = records_to_json(df)
 
     return jsonify({
         'status': 'success',
@@ -137,17 +202,22 @@ def get_history():
 @requires_auth
 def get_history_range():
     """
-    GET /api/v1/history/range?start=YYYY-MM-DD&end=YYYY-MM-DD
+    GET /api/v1/history/range?start=YYYY-MM-DD&end=YYYY-MM-DD&dataset=log
 
     Returns historical data for a date range.
 
     Query Parameters:
         start: Start date in YYYY-MM-DD format (required)
         end: End date in YYYY-MM-DD format (required)
+        dataset: 'log' for sensor data, 'image_metrics' for camera image
+            metrics, 'channels' for additional sensors, 'transitions' for
+            device switches or 'raw' for readings at the sensor rate
+            (optional, defaults to 'log')
 
     Returns:
         JSON response with historical data for the date range
     """
+    data_logger = get_data_logger()
     if data_logger is None:
         return jsonify({'error': 'Data logger not initialized'}), 500
 
@@ -173,8 +243,14 @@ def get_history_range():
             'error': 'Start date must be before or equal to end date'
         }), 400
 
+    dataset = request.args.get('dataset', 'log')
+    if dataset not in HISTORY_DATASETS:
+        return jsonify({
+            'error': f"Invalid dataset. Use one of: {', '.join(HISTORY_DATASETS)}"
+        }), 400
+
     # Get data for the date range
-    df = data_logger.get_date_range_data(start_date, end_date)
+    df = data_logger.get_date_range_data(start_date, end_date, dataset)
 
     if df is None or df.empty:
         return jsonify({
@@ -187,12 +263,7 @@ def get_history_range():
         })
 
     # Convert DataFrame to list of dictionaries
-    records = df.to_dict('records')
-
-    # Convert timestamps to ISO format
-    for record in records:
-        if 'timestamp' in record and record['timestamp']:
-            record['timestamp'] = record['timestamp'].isoformat()
+    records = records_to_json(df)
 
     return jsonify({
         'status': 'success',
@@ -219,6 +290,7 @@ def get_statistics():
     Returns:
         JSON response with statistics (min, max, mean, std) for the day
     """
+    data_logger = get_data_logger()
     if data_logger is None:
         return jsonify({'error': 'Data logger not initialized'}), 500
 
@@ -249,6 +321,106 @@ def get_statistics():
     })
 
 
+@api_bp.route('/duty', methods=['GET'])
+@requires_auth
+def get_duty_cycles():
+    """
+    GET /api/v1/duty?start=ISO&end=ISO&device=heater
+
+    Returns the time-weighted on-time and duty cycle of each device, computed
+    from its logged transitions.
+
+    Query Parameters:
+        start: Start of the window as an ISO datetime (optional, defaults to midnight today)
+        end: End of the window as an ISO datetime (optional, defaults to now)
+        device: Device id to report; may be repeated (optional, defaults to all devices)
+
+    Returns:
+        JSON response with on_seconds, observed_seconds, duty_percent and
+        switch_count per device
+    """
+    data_logger = get_data_logger()
+    if data_logger is None:
+        return jsonify({'error': 'Data logger not initialized'}), 500
+
+    now = datetime.now()
+    try:
+        start = datetime.fromisoformat(request.args['start']) if 'start' in request.args else \
+            now.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = datetime.fromisoformat(request.args['end']) if 'end' in request.args else now
+    except ValueError:
+        return jsonify({
+            'error': 'Invalid datetime format. Use ISO format, e.g. 2024-01-01T06:00:00'
+        }), 400
+
+    if start >= end:
+        return jsonify({
+            'error': 'Start must be before end'
+        }), 400
+
+    devices = request.args.getlist('device') or None
+
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'devices': data_logger.get_duty_cycles(start, end, devices)
+        }
+    })
+
+
+@api_bp.route('/energy', methods=['GET'])
+@requires_auth
+def get_energy():
+    """
+    GET /api/v1/energy?start=YYYY-MM-DD&end=YYYY-MM-DD
+
+    Returns the energy used and its cost per device over a date range, read
+    from the daily and monthly totals written by the manager.
+
+    Query Parameters:
+        start: First day in YYYY-MM-DD format (optional, defaults to the first of this month)
+        end: Last day in YYYY-MM-DD format (optional, defaults to today)
+
+    Returns:
+        JSON response with on_seconds, energy_kwh and cost per device, and their totals
+    """
+    data_logger = get_data_logger()
+    if data_logger is None:
+        return jsonify({'error': 'Data logger not initialized'}), 500
+
+    today = datetime.now()
+    try:
+        start_date = datetime.strptime(request.args['start'], '%Y-%m-%d') if 'start' in request.args else \
+            today.replace(day=1)
+        end_date = datetime.strptime(request.args['end'], '%Y-%m-%d') if 'end' in request.args else today
+    except ValueError:
+        return jsonify({
+            'error': 'Invalid date format. Use YYYY-MM-DD'
+        }), 400
+
+    if start_date.date() > end_date.date():
+        return jsonify({
+            'error': 'Start date must be before or equal to end date'
+        }), 400
+
+    devices = data_logger.get_energy(start_date, end_date)
+
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
+            'devices': devices,
+            'total': {
+                'energy_kwh': sum(device['energy_kwh'] for device in devices.values()),
+                'cost': sum(device['cost'] for device in devices.values())
+            }
+        }
+    })
+
+
 @api_bp.route('/camera/latest', methods=['GET'])
 @requires_auth
 def get_latest_camera_image():
@@ -269,16 +441,14 @@ def get_latest_camera_image():
             'error': 'Image directory not found'
         }), 404
 
-    # Find the most recent image file
-    image_files = sorted(image_dir.glob('greenhouse_*.jpg'), reverse=True)
+    # Find the most recent full resolution image
+    latest_image = GreenhouseImageCatalog(str(image_dir)).find_latest_original()
 
-    if not image_files:
+    if latest_image is None:
         return jsonify({
             'error': 'No images available'
         }), 404
 
-    latest_image = image_files[0]
-
     return send_file(
         latest_image,
         mimetype='image/jpeg',
@@ -293,6 +463,8 @@ def list_camera_images():
     GET /api/v1/camera/list?day=YYYY-MM-DD
 
     Returns a list of available camera images for a given day.
+    Each image is annotated with the nearest logged sensor reading
+    (temperature, humidity, pressure and device states).
 
     Query Parameters:
         day: Date in YYYY-MM-DD format (optional, defaults to today)
@@ -322,18 +494,34 @@ def list_camera_images():
             'error': 'Image directory not found'
         }), 404
 
-    # Find images for the specified date
-    date_str = date.strftime('%Y%m%d')
-    pattern = f'greenhouse_{date_str}_*.jpg'
-    image_files = sorted(image_dir.glob(pattern))
+    # Find images for the specified date, including downscaled tiers
+    image_files = GreenhouseImageCatalog(str(image_dir)).find_stored_images(date)
+
+    capture_times = [
+        parse_capture_time(img_file.name) or datetime.fromtimestamp(img_file.stat().st_mtime)
+        for img_file in image_files
+    ]
+
+    # Annotate all images in one bulk lookup against the day's sensor log
+    data_logger = get_data_logger()
+    conditions = [None] * len(image_files)
+    if data_logger is not None and image_files:
+        conditions = data_logger.get_nearest_readings(capture_times)
 
     images = []
-    for img_file in image_files:
+    for img_file, capture_time, reading in zip(image_files, capture_times, conditions):
+        stat = img_file.stat()
+        if reading is not None:
+            reading = {
+                key: value.isoformat() if hasattr(value, 'isoformat') else value
+                for key, value in reading.items()
+            }
         images.append({
             'filename': img_file.name,
             'url': f'/api/v1/camera/image/{img_file.name}',
-            'timestamp': img_file.stat().st_mtime,
-            'size_bytes': img_file.stat().st_size
+            'timestamp': capture_time.timestamp(),
+            'size_bytes': stat.st_size,
+            'conditions': reading
         })
 
     return jsonify({
@@ -371,7 +559,9 @@ def get_camera_image(filename):
             'error': 'Invalid filename'
         }), 400
 
-    if not image_path.exists():
+    # Images may have been moved to a downscaled tier by retention
+    image_path = GreenhouseImageCatalog(str(image_dir)).resolve_image(filename)
+    if image_path is None:
         return jsonify({
             'error': 'Image not found'
         }), 404
@@ -381,3 +571,121 @@ def get_camera_image(filename):
         mimetype='image/jpeg',
         as_attachment=False
     )
+
+
+@api_bp.route('/control/status', methods=['GET'])
+@requires_auth
+def get_control_status():
+    """
+    GET /api/v1/control/status
+
+    Returns the manager's live state: latest reading, setpoints, device
+    states and active overrides.
+
+    Returns:
+        JSON response with the manager status
+    """
+    return call_manager('status')
+
+
+@api_bp.route('/control/live', methods=['GET'])
+@requires_auth
+def get_live_readings():
+    """
+    GET /api/v1/control/live
+
+    Returns the readings taken at the sensor rate over the last few seconds,
+    from the manager's raw capture buffer.
+
+    Query Parameters:
+        seconds: How far back to go (default: 300)
+
+    Returns:
+        JSON response with the sensor read interval and the readings
+    """
+    try:
+        seconds = float(request.args.get('seconds', 300))
+    except ValueError:
+        return jsonify({'error': 'seconds must be a number'}), 400
+    return call_manager('live_readings', seconds=seconds)
+
+
+@api_bp.route('/control/setpoints', methods=['POST'])
+@requires_auth
+def set_setpoints():
+    """
+    POST /api/v1/control/setpoints
+
+    Changes control setpoints. The manager applies them immediately and
+    saves them to its settings file.
+
+    Body:
+        JSON object with any of target_temp_celsius, temp_tolerance_celsius,
+        target_humidity_percent and humidity_tolerance_percent
+
+    Returns:
+        JSON response with the applied setpoints
+    """
+    setpoints = request.get_json(silent=True)
+    if not isinstance(setpoints, dict) or not setpoints:
+        return jsonify({'error': 'Request body must be a JSON object of setpoints'}), 400
+    return call_manager('set_setpoints', **setpoints)
+
+
+@api_bp.route('/control/devices/<device_id>/override', methods=['POST'])
+@requires_auth
+def override_device(device_id):
+    """
+    POST /api/v1/control/devices/<device_id>/override
+
+    Switches a device and holds it, ignoring automatic control, for a time.
+
+    Args:
+        device_id: Device id
+
+    Body:
+        state: true for on, false for off
+        duration_seconds: How long to hold the state
+
+    Returns:
+        JSON response with the override
+    """
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body.get('state'), bool):
+        return jsonify({'error': 'state must be true or false'}), 400
+    try:
+        duration_seconds = float(body.get('duration_seconds', 3600))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'duration_seconds must be a number'}), 400
+    return call_manager('override_device', device=device_id, state=body['state'], duration_seconds=duration_seconds)
+
+
+@api_bp.route('/control/devices/<device_id>/override', methods=['DELETE'])
+@requires_auth
+def clear_device_override(device_id):
+    """
+    DELETE /api/v1/control/devices/<device_id>/override
+
+    Returns a device to automatic control.
+
+    Args:
+        device_id: Device id
+
+    Returns:
+        JSON response saying whether an override was removed
+    """
+    return call_manager('clear_override', device=device_id)
+
+
+@api_bp.route('/control/capture', methods=['POST'])
+@requires_auth
+def capture_now():
+    """
+    POST /api/v1/control/capture
+
+    Asks the manager to capture an image on its next control loop iteration.
+
+    Returns:
+        JSON response acknowledging the request
+    """
+    return call_manager('capture_now')
@@ -7,8 +7,9 @@ Runs separately from greenhouse_manager.py on the Raspberry Pi.
 
 import os
 import sys
+import time
 from pathlib import Path
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, g
 from werkzeug.security import check_password_hash, generate_password_hash
 from functools import wraps
 from flask import request, Response
@@ -17,6 +18,14 @@ from flask import request, Response
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_ipc import ControlClient
+from greenhouse_manager.greenhouse_metrics import REGISTRY, CONTENT_TYPE
+
+
+# Request instrumentation
+API_REQUEST_SECONDS = REGISTRY.histogram(
+    "greenhouse_api_request_seconds", "Time taken to handle an HTTP request", ["endpoint", "method", "status"]
+)
 
 
 def create_app(config=None):
@@ -35,10 +44,14 @@ def create_app(config=None):
     app.config.update(
         SECRET_KEY=os.environ.get('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production'),
         LOG_DIRECTORY='data/logs',
+        # Staging directory of the manager's current-day log files, read for up-to-date history
+        LOG_STAGING_DIRECTORY=os.environ.get('GREENHOUSE_LOG_STAGING_DIRECTORY'),
         IMAGE_DIRECTORY='data/images',
         # Basic auth credentials (in production, load from config file)
         BASIC_AUTH_USERNAME=os.environ.get('GREENHOUSE_USERNAME', 'admin'),
         BASIC_AUTH_PASSWORD=os.environ.get('GREENHOUSE_PASSWORD', 'greenhouse'),
+        # Control socket of the manager process
+        MANAGER_SOCKET=os.environ.get('GREENHOUSE_MANAGER_SOCKET', 'data/greenhouse_manager.sock'),
     )
 
     # Apply custom config if provided
@@ -48,7 +61,8 @@ def create_app(config=None):
     # Initialize data logger
     data_logger = GreenhouseDataLogger(
         log_directory=app.config['LOG_DIRECTORY'],
-        log_format='parquet'
+        log_format='parquet',
+        staging_directory=app.config['LOG_STAGING_DIRECTORY']
     )
 
     def check_auth(username, password):
@@ -101,8 +115,30 @@ def create_app(config=None):
     # Register API blueprint
     from webserver.api import api_bp
     api_bp.data_logger = data_logger  # Attach data logger to blueprint
+    api_bp.control_client = ControlClient(app.config['MANAGER_SOCKET'])
     app.register_blueprint(api_bp, url_prefix='/api/v1')
 
+    @app.before_request
+    def start_request_timer():
+        """Record when the request started."""
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request_latency(response):
+        """Record request latency per endpoint."""
+        start = g.pop('request_start', None)
+        if start is not None:
+            API_REQUEST_SECONDS.labels(
+                request.endpoint or 'unmatched', request.method, response.status_code
+            ).observe(time.perf_counter() - start)
+        return response
+
+    # Metrics endpoint for Prometheus scraping (no auth required, like /health)
+    @app.route('/metrics')
+    def metrics():
+        """Expose service metrics in Prometheus text format."""
+        return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
     # Health check endpoint (no auth required)
     @app.route('/health')
     def health():
@@ -0,0 +1,278 @@
+"""
+Tests for greenhouse_acquisition module.
+
+Tests the sample ring buffer, outlier rejection, filtering and oversampled acquisition.
+"""
+
+import pytest
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_acquisition import (
+    SampleRing,
+    SensorAcquisition,
+    combine,
+    outlier_mask,
+    summarize
+)
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_hardware_collection import BME280Sensor
+from greenhouse_manager.greenhouse_manager_settings import SensorConfig
+
+
+START = datetime(2024, 5, 1, 12, 0)
+
+
+class ScriptedSensor(BME280Sensor):
+    """Mock sensor returning a fixed sequence of temperatures."""
+
+    def __init__(self, temperatures):
+        super().__init__(mock_mode=True)
+        self.temperatures = list(temperatures)
+        self.reads = 0
+        self.reopens = 0
+
+    def reopen(self):
+        self.reopens += 1
+
+    def _sample(self):
+        temperature = self.temperatures[self.reads % len(self.temperatures)]
+        self.reads += 1
+        if temperature is None:
+            return None
+        if temperature == "hang":
+            time.sleep(0.5)
+            return None
+        return {"temperature": temperature, "humidity": 60.0, "pressure": 1013.0}
+
+
+class BlockingSensor(ScriptedSensor):
+    """Mock sensor whose reads block until released."""
+
+    def __init__(self):
+        super().__init__([20.0])
+        self.release = threading.Event()
+
+    def _sample(self):
+        self.reads += 1
+        self.release.wait(5)
+        return None
+
+
+def sample(temperature: float) -> dict:
+    """Build a sensor sample with the given temperature."""
+    return {"temperature": temperature, "humidity": 60.0, "pressure": 1013.0}
+
+
+class TestSampleRing:
+    """Test cases for SampleRing class."""
+
+    def test_window_returns_samples_in_order(self):
+        """Test samples come back oldest first after the ring wraps."""
+        ring = SampleRing(3)
+        for t in range(5):
+            ring.append(float(t), sample(20.0 + t))
+
+        times, values = ring.window(-1)
+        assert len(ring) == 3
+        assert list(times) == [2.0, 3.0, 4.0]
+        assert list(values[:, 0]) == [22.0, 23.0, 24.0]
+
+    def test_window_since(self):
+        """Test only samples after the given time are returned."""
+        ring = SampleRing(8)
+        for t in range(5):
+            ring.append(float(t), sample(20.0))
+        times, _ = ring.window(2.0)
+        assert list(times) == [3.0, 4.0]
+
+
+class TestFiltering:
+    """Test cases for outlier rejection and filters."""
+
+    def test_spike_rejected(self):
+        """Test a single bad read is flagged as an outlier."""
+        values = np.array([[20.0], [20.1], [19.9], [20.0], [45.0]])
+        assert list(outlier_mask(values, 3.5)[:, 0]) == [False, False, False, False, True]
+
+    def test_identical_samples_fall_back_to_mean_deviation(self):
+        """Test a spike is still caught when most samples are identical."""
+        values = np.array([[20.0], [20.0], [20.0], [20.0], [30.0]])
+        assert outlier_mask(values, 3.5)[-1, 0]
+
+    def test_disabled_threshold(self):
+        """Test a zero threshold keeps every sample."""
+        values = np.array([[20.0], [20.0], [45.0]])
+        assert not outlier_mask(values, 0).any()
+
+    def test_combine_methods(self):
+        """Test median, mean and exponential filtering."""
+        values = np.array([20.0, 21.0, 25.0])
+        assert combine(values, "median") == 21.0
+        assert combine(values, "mean") == pytest.approx(22.0)
+        assert combine(values, "ema", ema_alpha=0.5) == pytest.approx(22.75)
+
+    def test_summary_statistics(self):
+        """Test a summary reports the spread of the accepted samples only."""
+        values = np.array([[t, 60.0, 1013.0] for t in (20.0, 20.2, 19.8, 20.0, 60.0)])
+        summary = summarize(values, START, SensorConfig())
+
+        temperature = summary.channels["temperature"]
+        assert summary.samples == 5
+        assert summary.rejected == 1
+        assert temperature.value == pytest.approx(20.0)
+        assert temperature.max == pytest.approx(20.2)
+        assert summary.log_fields()["temperature_celsius_std"] == pytest.approx(temperature.std)
+
+
+class TestSensorAcquisition:
+    """Test cases for SensorAcquisition class."""
+
+    def test_burst_filters_bad_read(self):
+        """Test a burst ignores a spike."""
+        clock = SimulatedClock(START)
+        sensor = ScriptedSensor([20.0, 20.1, 70.0, 19.9, 20.0, 20.05])
+        acquisition = SensorAcquisition(sensor, SensorConfig(samples_per_interval=6), clock)
+
+        acquisition.poll()
+        summary = acquisition.latest()
+        assert sensor.reads == 6
+        assert summary.rejected == 1
+        assert summary.reading()["temperature"] == pytest.approx(20.0, abs=0.1)
+
+    def test_implausible_reads_dropped(self):
+        """Test readings outside the sensor's range never reach the buffer."""
+        clock = SimulatedClock(START)
+        acquisition = SensorAcquisition(ScriptedSensor([20.0, 150.0]), SensorConfig(samples_per_interval=2), clock)
+        acquisition.poll()
+        assert acquisition.latest().samples == 1
+
+    def test_continuous_spreads_samples(self):
+        """Test continuous mode samples across the interval and publishes once per interval."""
+        clock = SimulatedClock(START)
+        sensor = ScriptedSensor([20.0])
+        config = SensorConfig(read_interval_seconds=10, samples_per_interval=5, sampling_mode="continuous")
+        acquisition = SensorAcquisition(sensor, config, clock)
+
+        acquisition.poll()
+        first = acquisition.latest()
+        for _ in range(10):
+            clock.advance(1)
+            acquisition.poll()
+
+        assert acquisition.latest().sequence == first.sequence + 1
+        assert acquisition.latest().samples == 5
+        assert sensor.reads == 6
+
+    def test_background_thread(self):
+        """Test the background thread publishes readings without polling."""
+        acquisition = SensorAcquisition(ScriptedSensor([21.0]), SensorConfig(samples_per_interval=3))
+        acquisition.start()
+        try:
+            for _ in range(100):
+                if acquisition.latest() is not None:
+                    break
+                time.sleep(0.01)
+        finally:
+            acquisition.stop()
+        assert acquisition.latest().reading()["temperature"] == 21.0
+        assert not acquisition.running
+
+
+
+class TestSensorAcquisitionFailures:
+    """Test cases for read timeouts, retry backoff and bus reopen."""
+
+    def test_backoff_doubles(self):
+        """Test failed reads are retried after exponentially growing delays."""
+        clock = SimulatedClock(START)
+        sensor = ScriptedSensor([None])
+        config = SensorConfig(
+            samples_per_interval=5, sampling_mode="continuous", retry_backoff_seconds=2, reopen_after_failures=10
+        )
+        acquisition = SensorAcquisition(sensor, config, clock)
+
+        attempts = []
+        for second in range(16):
+            reads = sensor.reads
+            acquisition.poll()
+            if sensor.reads > reads:
+                attempts.append(second)
+            clock.advance(1)
+        assert attempts == [0, 2, 6, 14]
+        assert acquisition.latest() is None
+
+    def test_bus_reopened_after_failures(self):
+        """Test the bus is reopened after repeated failures and reads recover."""
+        clock = SimulatedClock(START)
+        sensor = ScriptedSensor([None, None, 20.0])
+        config = SensorConfig(read_interval_seconds=1, retry_backoff_seconds=1, reopen_after_failures=2)
+        acquisition = SensorAcquisition(sensor, config, clock)
+
+        for _ in range(4):
+            acquisition.poll()
+            clock.advance(1)
+        assert sensor.reopens == 1
+        assert acquisition.consecutive_failures == 0
+        assert acquisition.latest().reading()["temperature"] == 20.0
+
+    def test_read_timeout(self):
+        """Test a hung read is abandoned after the read timeout."""
+        clock = SimulatedClock(START)
+        config = SensorConfig(read_timeout_seconds=0.05)
+        acquisition = SensorAcquisition(ScriptedSensor(["hang"]), config, clock)
+
+        started = time.perf_counter()
+        acquisition.poll()
+        assert time.perf_counter() - started < 0.4
+        assert acquisition.consecutive_failures == 1
+
+    def test_stuck_read_does_not_leak_threads(self):
+        """Test retries against a blocked sensor reuse one reader and defer the bus reopen."""
+        clock = SimulatedClock(START)
+        sensor = BlockingSensor()
+        config = SensorConfig(
+            read_interval_seconds=1, read_timeout_seconds=0.02, retry_backoff_seconds=1,
+            retry_backoff_max_seconds=1, reopen_after_failures=2
+        )
+        acquisition = SensorAcquisition(sensor, config, clock)
+
+        try:
+            acquisition.poll()
+            threads = threading.active_count()
+            for _ in range(10):
+                clock.advance(1)
+                acquisition.poll()
+            assert threading.active_count() == threads
+            assert acquisition.consecutive_failures == 11
+            assert sensor.reads == 1
+            assert sensor.reopens == 0
+
+            sensor.release.set()
+            for _ in range(100):
+                if sensor.reads > 1:
+                    break
+                time.sleep(0.01)
+                clock.advance(1)
+                acquisition.poll()
+            assert sensor.reads > 1
+            assert sensor.reopens >= 1
+        finally:
+            sensor.release.set()
+            acquisition.stop()
+
+    def test_age(self):
+        """Test the age of the latest reading follows the clock."""
+        clock = SimulatedClock(START)
+        acquisition = SensorAcquisition(ScriptedSensor([20.0]), SensorConfig(), clock)
+        acquisition.poll()
+        clock.advance(12)
+        assert acquisition.age_seconds() == 12
@@ -0,0 +1,136 @@
+"""
+Tests for greenhouse_backtest module.
+
+Tests the vectorized control state machines and backtest reports.
+"""
+
+import pytest
+import json
+import sys
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_backtest import (
+    backtest,
+    backtest_files,
+    hysteresis,
+    load_history,
+    schedule_mask
+)
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_manager_settings import DeviceConfig, TimeSchedule
+
+
+CONFIG_TEMPLATE = Path(__file__).parent.parent / "config" / "greenhouse_manager_settings.json"
+
+
+def load_settings(**temperature_control):
+    """Load the template settings with temperature control overrides."""
+    from greenhouse_manager.greenhouse_manager_settings import GreenhouseManagerSettings
+    with open(CONFIG_TEMPLATE) as f:
+        config = json.load(f)
+    config["temperature_control"].update(temperature_control)
+    return GreenhouseManagerSettings(**config)
+
+
+def make_history(temperatures, start=datetime(2024, 1, 15), interval_seconds=60):
+    """Build a history frame with one temperature per sample."""
+    return pd.DataFrame({
+        "timestamp": [start + timedelta(seconds=interval_seconds * i) for i in range(len(temperatures))],
+        "temperature_celsius": temperatures,
+        "humidity_percent": 65.0,
+    })
+
+
+class TestStateMachines:
+    """Test cases for vectorized control logic."""
+
+    def test_hysteresis_holds_between_thresholds(self):
+        """Test the state only changes on on/off events."""
+        on = np.array([False, True, False, False, False, True])
+        off = np.array([False, False, False, True, False, False])
+
+        assert hysteresis(on, off).tolist() == [False, True, True, False, False, True]
+        assert hysteresis(on, off, initial=True)[0]
+
+    def test_schedule_mask_crosses_midnight(self):
+        """Test schedules crossing midnight are active on both sides of it."""
+        seconds = np.array([1 * 3600, 12 * 3600, 23 * 3600])
+        schedule = TimeSchedule(enabled=True, start_time=time(22, 0), end_time=time(2, 0))
+
+        assert schedule_mask(seconds, schedule).tolist() == [True, False, True]
+
+    def test_disabled_schedule_is_off(self):
+        """Test disabled schedules never switch their device on."""
+        schedule = TimeSchedule(enabled=False, start_time=time(6, 0), end_time=time(20, 0))
+        assert not schedule_mask(np.array([12 * 3600]), schedule).any()
+
+
+class TestBacktest:
+    """Test cases for backtest reports."""
+
+    def test_heater_switches_and_duty_cycle(self):
+        """Test heater switches follow the manager's hysteresis."""
+        # Target 24 ± 2: on below 22, off above 24
+        history = make_history([21.0, 23.0, 23.0, 25.0, 23.0, 21.5, 27.0, 23.0])
+        result = backtest(load_settings(target_temp_celsius=24.0, temp_tolerance_celsius=2.0), history)
+
+        heater = result.devices["heater"]
+        assert heater.switches == 4
+        assert heater.duty_cycle == pytest.approx(4 / 8)
+        assert result.devices["vent_fan"].switches == 2
+
+    def test_wider_band_switches_less(self):
+        """Test a wider tolerance reduces switching on the same history."""
+        temperatures = 24 + 3 * np.sin(np.linspace(0, 20 * np.pi, 2000))
+        history = make_history(temperatures)
+
+        narrow = backtest(load_settings(temp_tolerance_celsius=1.0), history)
+        wide = backtest(load_settings(temp_tolerance_celsius=4.0), history)
+
+        assert wide.devices["heater"].switches < narrow.devices["heater"].switches
+        assert wide.temperature_out_of_band_hours < narrow.temperature_out_of_band_hours
+
+    def test_devices_replayed_by_role(self):
+        """Test devices from the devices list are replayed by role and manual devices are skipped."""
+        settings = load_settings()
+        settings.devices = [
+            DeviceConfig(id="heat_mat", name="Heat Mat", role="heater", rf_on_code=1, rf_off_code=2, led_gpio_pin=5),
+            DeviceConfig(id="spare", name="Spare", rf_on_code=3, rf_off_code=4, led_gpio_pin=6),
+        ]
+
+        result = backtest(settings, make_history([20.0, 25.0, 20.0]))
+
+        assert result.devices["heat_mat"].switches == result.devices["heater"].switches == 3
+        assert "spare" not in result.devices
+
+    def test_gaps_not_counted(self):
+        """Test long gaps in the log do not count towards on time."""
+        history = make_history([20.0] * 10)
+        history.loc[5:, "timestamp"] += timedelta(hours=6)
+
+        result = backtest(load_settings(), history)
+
+        assert result.hours == pytest.approx(10 / 60)
+        assert result.devices["heater"].duty_cycle == pytest.approx(1.0)
+
+    def test_backtest_files_from_logger(self, tmp_path):
+        """Test settings files are backtested against logged history."""
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path / "logs"))
+        start = datetime(2024, 1, 15)
+        for minute in range(30):
+            logger.log_data(20.0 + minute / 5, 60.0, 1000.0, False, False, False, False,
+                            timestamp=start + timedelta(minutes=minute))
+        logger.flush()
+
+        results = backtest_files([CONFIG_TEMPLATE, CONFIG_TEMPLATE], logger, start, start)
+
+        assert len(results) == 2
+        assert results[0].samples == 30
+        assert len(load_history(logger, start, start)) == 30
@@ -0,0 +1,239 @@
+"""
+Tests for greenhouse_control module.
+
+Tests input smoothing, minimum dwell times, the RF transmission budget and
+state reassertion.
+"""
+
+import pytest
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_control import (
+    ExponentialSmoother,
+    RF_TRANSMISSIONS_AVOIDED,
+    REASON_BUDGET,
+    REASON_DWELL,
+    RF_REASSERTIONS_DEFERRED,
+    StateReconciler,
+    SwitchController,
+    TokenBucket
+)
+from greenhouse_manager.greenhouse_devices import DeviceRegistry
+from greenhouse_manager.greenhouse_hardware_collection import RFOutlet
+from greenhouse_manager.greenhouse_manager_settings import DeviceConfig, Reassertion
+
+
+START = datetime(2024, 5, 1, 12, 0)
+
+
+@pytest.fixture
+def clock():
+    """Simulated clock starting at noon."""
+    return SimulatedClock(START)
+
+
+def mock_outlet(name: str) -> RFOutlet:
+    """Create a mock outlet with a unique name."""
+    return RFOutlet(name=name, send_on_code=1, send_off_code=2, led_gpio_pin=17, mock_mode=True)
+
+
+def mock_devices(count: int) -> DeviceRegistry:
+    """Create a registry of mock devices named rec_0, rec_1, ..."""
+    return DeviceRegistry([
+        DeviceConfig(id=f"rec_{i}", name=f"rec_{i}", rf_on_code=i, rf_off_code=i + 100, led_gpio_pin=i + 2)
+        for i in range(count)
+    ], mock_mode=True)
+
+
+def run_reconciler(reconciler: StateReconciler, devices: DeviceRegistry, clock, seconds: int) -> list:
+    """Call the reconciler every second, returning (elapsed seconds, device id) of each reassertion."""
+    sent = []
+    for elapsed in range(seconds):
+        device_id = reconciler.run(devices)
+        if device_id is not None:
+            sent.append((elapsed, device_id))
+        clock.advance(1)
+    return sent
+
+
+class TestExponentialSmoother:
+    """Test cases for ExponentialSmoother class."""
+
+    def test_first_sample_passes_through(self):
+        """Test the first sample initialises the average."""
+        smoother = ExponentialSmoother(60)
+        assert smoother.update(20.0, 0) == 20.0
+
+    def test_one_time_constant_covers_most_of_step(self):
+        """Test a step change is ~63% covered after one time constant."""
+        smoother = ExponentialSmoother(60)
+        smoother.update(20.0, 0)
+        assert smoother.update(30.0, 60) == pytest.approx(20.0 + 10.0 * 0.632, abs=0.01)
+
+    def test_short_spike_is_damped(self):
+        """Test a single noisy sample barely moves the average."""
+        smoother = ExponentialSmoother(60)
+        smoother.update(20.0, 0)
+        assert smoother.update(25.0, 5) < 20.5
+
+    def test_zero_time_constant_disables(self):
+        """Test a zero time constant returns raw samples."""
+        smoother = ExponentialSmoother(0)
+        smoother.update(20.0, 0)
+        assert smoother.update(25.0, 5) == 25.0
+
+    def test_reset(self):
+        """Test reset forgets the average."""
+        smoother = ExponentialSmoother(60)
+        smoother.update(20.0, 0)
+        smoother.reset()
+        assert smoother.update(30.0, 10) == 30.0
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket class."""
+
+    def test_burst_then_exhausted(self, clock):
+        """Test the bucket allows a burst up to its capacity."""
+        bucket = TokenBucket(rate_per_hour=60, capacity=3, clock=clock)
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_refills_over_time(self, clock):
+        """Test tokens are added at the configured rate."""
+        bucket = TokenBucket(rate_per_hour=60, capacity=3, clock=clock)
+        for _ in range(3):
+            bucket.try_acquire()
+        clock.advance(60)
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    def test_never_exceeds_capacity(self, clock):
+        """Test tokens stop accumulating at the capacity."""
+        bucket = TokenBucket(rate_per_hour=60, capacity=3, clock=clock)
+        clock.advance(86400)
+        assert bucket.tokens == 3
+
+
+class TestSwitchController:
+    """Test cases for SwitchController class."""
+
+    def test_switches_outlet(self, clock):
+        """Test a switch with no limits sends the command."""
+        outlet = mock_outlet("ctl_plain")
+        controller = SwitchController(clock)
+        assert controller.set_state(outlet, True)
+        assert outlet.get_state()
+
+    def test_no_command_when_already_in_state(self, clock):
+        """Test nothing is sent when the outlet is already in the requested state."""
+        outlet = mock_outlet("ctl_same")
+        controller = SwitchController(clock)
+        assert not controller.set_state(outlet, False)
+
+    def test_min_on_holds_device_on(self, clock):
+        """Test an outlet is not switched off before its minimum on time."""
+        outlet = mock_outlet("ctl_dwell")
+        controller = SwitchController(clock)
+        avoided = RF_TRANSMISSIONS_AVOIDED.labels("ctl_dwell", REASON_DWELL)
+        before = avoided.value
+
+        controller.set_state(outlet, True, min_on_seconds=300)
+        clock.advance(120)
+        assert not controller.set_state(outlet, False, min_on_seconds=300)
+        assert outlet.get_state()
+        assert avoided.value == before + 1
+
+        clock.advance(180)
+        assert controller.set_state(outlet, False, min_on_seconds=300)
+        assert not outlet.get_state()
+
+    def test_min_off_holds_device_off(self, clock):
+        """Test an outlet is not switched back on before its minimum off time."""
+        outlet = mock_outlet("ctl_min_off")
+        controller = SwitchController(clock)
+        controller.set_state(outlet, True)
+        controller.set_state(outlet, False, min_off_seconds=600)
+
+        clock.advance(300)
+        assert not controller.set_state(outlet, True, min_off_seconds=600)
+        clock.advance(300)
+        assert controller.set_state(outlet, True, min_off_seconds=600)
+
+    def test_budget_shared_across_outlets(self, clock):
+        """Test the RF budget limits switches across all outlets."""
+        controller = SwitchController(clock, TokenBucket(rate_per_hour=1, capacity=2, clock=clock))
+        outlets = [mock_outlet(f"ctl_budget_{i}") for i in range(3)]
+        avoided = RF_TRANSMISSIONS_AVOIDED.labels("ctl_budget_2", REASON_BUDGET)
+        before = avoided.value
+
+        assert [controller.set_state(outlet, True) for outlet in outlets] == [True, True, False]
+        assert not outlets[2].get_state()
+        assert avoided.value == before + 1
+
+
+class TestStateReconciler:
+    """Test cases for StateReconciler."""
+
+    def test_rotation_spread_out(self, clock):
+        """Test every device is reasserted once per interval, never two within the minimum gap."""
+        devices = mock_devices(4)
+        settings = Reassertion(
+            interval_seconds=60, backoff_factor=1.0, min_gap_seconds=5, jitter_fraction=0.2,
+            max_airtime_seconds_per_hour=600
+        )
+        reconciler = StateReconciler(settings, clock, rng=random.Random(1))
+
+        sent = run_reconciler(reconciler, devices, clock, 600)
+
+        times = [elapsed for elapsed, _ in sent]
+        assert all(later - earlier >= 5 for earlier, later in zip(times, times[1:]))
+        counts = [sum(1 for _, device_id in sent if device_id == f"rec_{i}") for i in range(4)]
+        assert all(8 <= count <= 12 for count in counts)
+
+    def test_backoff_while_unchanged(self, clock):
+        """Test the interval doubles after each reassertion up to the maximum."""
+        devices = mock_devices(1)
+        settings = Reassertion(
+            interval_seconds=60, max_interval_seconds=240, backoff_factor=2.0, min_gap_seconds=0, jitter_fraction=0
+        )
+        reconciler = StateReconciler(settings, clock, rng=random.Random(1))
+
+        times = [elapsed for elapsed, _ in run_reconciler(reconciler, devices, clock, 1200)]
+
+        assert [later - earlier for earlier, later in zip(times, times[1:])][:4] == [120, 240, 240, 240]
+
+    def test_switch_restarts_interval(self, clock):
+        """Test a switch counts as a transmission and resets the device's interval."""
+        devices = mock_devices(2)
+        settings = Reassertion(interval_seconds=60, max_interval_seconds=3600, min_gap_seconds=30, jitter_fraction=0)
+        reconciler = StateReconciler(settings, clock, rng=random.Random(1))
+        run_reconciler(reconciler, devices, clock, 2000)
+        assert reconciler.seconds_until_due("rec_0") > 60
+
+        devices.outlet("rec_0").turn_on()
+        assert reconciler.run(devices) is None
+        assert reconciler.seconds_until_due("rec_0") == 60
+
+        clock.advance(60)
+        assert reconciler.run(devices) == "rec_0"
+
+    def test_airtime_budget(self, clock):
+        """Test reassertions stop once the airtime budget is spent."""
+        devices = mock_devices(5)
+        settings = Reassertion(
+            interval_seconds=10, min_gap_seconds=0, max_airtime_seconds_per_hour=1.2, airtime_per_code_seconds=0.6
+        )
+        reconciler = StateReconciler(settings, clock, rng=random.Random(1))
+        deferred = RF_REASSERTIONS_DEFERRED.value
+
+        sent = run_reconciler(reconciler, devices, clock, 3600)
+
+        assert len(sent) <= 3
+        assert RF_REASSERTIONS_DEFERRED.value > deferred
@@ -0,0 +1,240 @@
+"""
+Tests for greenhouse_data_logger module.
+
+Tests deadband logging, heartbeats and the step-wise reconstruction of
+deadband logs on read, staging of the current day's files with
+checkpoints to the log directory, and the segments of append-only datasets.
+"""
+
+import math
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger, LOG_STAGED_BYTES, LOG_WRITE_BYTES
+
+
+START = datetime(2024, 5, 1, 0, 0)
+DEADBANDS = {"temperature_celsius": 0.2, "humidity_percent": 1.0, "pressure_hpa": 0.5}
+
+
+def deadband_logger(tmp_path, clock, **kwargs) -> GreenhouseDataLogger:
+    """Create a deadband-mode logger sampled every minute."""
+    return GreenhouseDataLogger(
+        log_directory=str(tmp_path), clock=clock, mode="deadband", deadbands=DEADBANDS,
+        heartbeat_seconds=900, log_interval_seconds=60, **kwargs
+    )
+
+
+def log_hour(logger, clock):
+    """Log an hour of steady readings with a temperature step at 00:30 and a heater switch at 00:40."""
+    logged = []
+    for minute in range(60):
+        temperature = 21.0 if minute >= 30 else 20.0 + 0.05 * (minute % 3)
+        logged.append(logger.log_data(
+            temperature, 65.0, 1013.0, timestamp=clock.now(), device_states={"heater": minute >= 40}
+        ))
+        clock.advance(60)
+    return logged
+
+
+class TestDeadbandLogging:
+    """Test cases for deadband logging mode."""
+
+    def test_only_changes_and_heartbeats_logged(self, tmp_path):
+        """Test samples are written on a deadband crossing, a device change or a due heartbeat."""
+        clock = SimulatedClock(START)
+        logger = deadband_logger(tmp_path, clock)
+
+        logged = log_hour(logger, clock)
+
+        assert [minute for minute, written in enumerate(logged) if written] == [0, 15, 30, 40, 55]
+
+    def test_reads_fill_steps(self, tmp_path):
+        """Test reads hold each logged value until the next sample, whatever the reader's mode."""
+        clock = SimulatedClock(START)
+        logger = deadband_logger(tmp_path, clock)
+        log_hour(logger, clock)
+        logger.flush()
+
+        reader = GreenhouseDataLogger(log_directory=str(tmp_path))
+        assert len(reader._read_log_file(tmp_path / "greenhouse_log_2024-05-01.parquet")) == 5
+        df = reader.get_data_for_date(START)
+
+        assert len(df) == 56
+        assert list(df["time_24hr"][:3]) == ["00:00:00", "00:01:00", "00:02:00"]
+        assert df["temperature_celsius"].iloc[29] == 20.0 and df["temperature_celsius"].iloc[35] == 21.0
+        assert not df["heater_state"].iloc[39] and df["heater_state"].iloc[40]
+
+        nearest = reader.get_nearest_readings([START + timedelta(minutes=27, seconds=10)], max_gap_seconds=60)
+        assert nearest[0]["temperature_celsius"] == 20.0
+
+    def test_interval_logs_unchanged(self, tmp_path):
+        """Test interval-mode logs are read back as written."""
+        clock = SimulatedClock(START)
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+        log_hour(logger, clock)
+        logger.flush()
+
+        assert len(logger.get_data_for_date(START)) == 60
+
+    def test_storage_drops_on_stable_day(self, tmp_path):
+        """Test a stable day takes several times less storage and write volume than interval logging."""
+        usage = {}
+        for mode in ("interval", "deadband"):
+            clock = SimulatedClock(START)
+            directory = tmp_path / mode
+            logger = deadband_logger(directory, clock) if mode == "deadband" else \
+                GreenhouseDataLogger(log_directory=str(directory), clock=clock)
+            written_before = LOG_WRITE_BYTES.labels("log").value
+            for minute in range(1440):
+                # A slow daily swing with sensor noise
+                temperature = 18.0 + 2.0 * math.sin(minute / 1440 * 2 * math.pi) + 0.03 * ((minute * 7) % 5 - 2)
+                logger.log_data(temperature, 70.0 + 0.1 * (minute % 4), 1012.0, timestamp=clock.now(),
+                                device_states={"heater": False})
+                clock.advance(60)
+            logger.flush()
+            usage[mode] = (
+                (directory / "greenhouse_log_2024-05-01.parquet").stat().st_size,
+                LOG_WRITE_BYTES.labels("log").value - written_before
+            )
+
+        assert usage["interval"][0] > 3 * usage["deadband"][0]
+        assert usage["interval"][1] > 3 * usage["deadband"][1]
+        reader = GreenhouseDataLogger(log_directory=str(tmp_path / "deadband"))
+        assert len(reader.get_data_for_date(START)) >= 1400
+
+
+def staging_logger(tmp_path, clock, checkpoint_interval_seconds=600) -> GreenhouseDataLogger:
+    """Create a logger staging its files in tmp_path/run and checkpointing them to tmp_path/logs."""
+    return GreenhouseDataLogger(
+        log_directory=str(tmp_path / "logs"), clock=clock, staging_directory=str(tmp_path / "run"),
+        checkpoint_interval_seconds=checkpoint_interval_seconds
+    )
+
+
+def log_minutes(logger, clock, minutes: int):
+    """Log a sample a minute, checkpointing when due."""
+    for minute in range(minutes):
+        logger.log_data(20.0 + 0.01 * minute, 65.0, 1013.0, timestamp=clock.now())
+        clock.advance(60)
+        logger.checkpoint_if_due()
+
+
+class TestStaging:
+    """Test cases for staging the current day's files."""
+
+    def test_checkpoints_on_cadence(self, tmp_path):
+        """Test the day's log is only copied to the log directory at checkpoints and on flush."""
+        clock = SimulatedClock(START)
+        logger = staging_logger(tmp_path, clock)
+        reader = GreenhouseDataLogger(log_directory=str(tmp_path / "logs"))
+
+        log_minutes(logger, clock, 25)
+
+        # Saved at 10 and 20 samples and checkpointed at 10 and 20 minutes
+        assert len(logger.get_data_for_date(START)) == 20
+        assert len(reader.get_data_for_date(START)) == 20
+        logger.flush()
+        assert len(reader.get_data_for_date(START)) == 25
+        assert list((tmp_path / "logs").glob(".*")) == []
+
+    def test_persistent_writes_reduced(self, tmp_path):
+        """Test hourly checkpoints write several times less to the log directory than saving every 10 samples."""
+        written = {}
+        for staged in (False, True):
+            clock = SimulatedClock(START)
+            directory = tmp_path / str(staged)
+            logger = staging_logger(directory, clock, 3600) if staged else \
+                GreenhouseDataLogger(log_directory=str(directory / "logs"), clock=clock)
+            written_before = LOG_WRITE_BYTES.labels("log").value
+            log_minutes(logger, clock, 360)
+            logger.flush()
+            written[staged] = LOG_WRITE_BYTES.labels("log").value - written_before
+
+        assert written[False] > 3 * written[True]
+        today = logger.bytes_written_today()
+        assert today["staged"] > 3 * today["persistent"] > 0
+
+    def test_crashed_staging_promoted(self, tmp_path):
+        """Test files staged by a process that did not flush are promoted by the next one."""
+        clock = SimulatedClock(START)
+        staged_before = LOG_STAGED_BYTES.labels("log").value
+        log_minutes(staging_logger(tmp_path, clock, 3600), clock, 10)
+        assert LOG_STAGED_BYTES.labels("log").value > staged_before
+        assert not (tmp_path / "logs" / "greenhouse_log_2024-05-01.parquet").exists()
+
+        restarted = staging_logger(tmp_path, clock, 3600)
+        assert restarted.checkpoint() > 0
+        assert restarted.checkpoint() == 0
+
+        reader = GreenhouseDataLogger(log_directory=str(tmp_path / "logs"))
+        assert len(reader.get_data_for_date(START)) == 10
+
+    def test_finished_days_unstaged(self, tmp_path):
+        """Test the previous day's staged file is checkpointed and removed after midnight."""
+        clock = SimulatedClock(START - timedelta(minutes=5))
+        logger = staging_logger(tmp_path, clock)
+
+        log_minutes(logger, clock, 15)
+        logger.checkpoint()
+
+        assert not (tmp_path / "run" / "greenhouse_log_2024-04-30.parquet").exists()
+        assert len(pd.read_parquet(tmp_path / "logs" / "greenhouse_log_2024-04-30.parquet")) == 5
+        assert (tmp_path / "run" / "greenhouse_log_2024-05-01.parquet").exists()
+
+
+def raw_batch(start: datetime, rows: int = 100) -> pd.DataFrame:
+    """Readings a second apart from start."""
+    return pd.DataFrame({
+        "timestamp": [start + timedelta(seconds=second) for second in range(rows)],
+        "temperature_celsius": 20.0, "humidity_percent": 65.0, "pressure_hpa": 1013.0
+    })
+
+
+class TestSegments:
+    """Test cases for the segments of append-only datasets."""
+
+    def test_appends_write_only_the_batch(self, tmp_path):
+        """Test each spill writes a segment of its own size however much of the day is already stored."""
+        clock = SimulatedClock(START + timedelta(hours=12))
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+
+        written = []
+        for batch in range(50):
+            before = LOG_WRITE_BYTES.labels("raw").value
+            logger.log_raw_readings(raw_batch(START + timedelta(minutes=batch * 2)))
+            written.append(LOG_WRITE_BYTES.labels("raw").value - before)
+
+        assert written[-1] < 1.5 * written[0]
+        assert len(list((tmp_path / "segments").glob("greenhouse_raw_2024-05-01_*.parquet"))) == 50
+        assert not (tmp_path / "greenhouse_raw_2024-05-01.parquet").exists()
+        raw = logger.get_data_for_date(START, "raw")
+        assert len(raw) == 5000 and raw["timestamp"].is_monotonic_increasing
+
+    def test_finished_days_merged(self, tmp_path):
+        """Test a finished day's segments are merged into its file, keeping categorical columns."""
+        clock = SimulatedClock(START + timedelta(hours=12))
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+        for hour in (1, 2):
+            logger.log_channel_readings([(START + timedelta(hours=hour), "soil", "moisture_percent_0", 40.0 + hour)])
+            logger.flush()
+        assert logger.compact_segments() == 0
+
+        clock.advance(86400)
+        logger.log_channel_readings([(clock.now(), "co2", "co2_ppm", 700.0)])
+        logger.flush()
+
+        assert sorted(path.name for path in (tmp_path / "segments").iterdir()) == [
+            "greenhouse_channels_2024-05-02_0001.parquet"
+        ]
+        stored = pd.read_parquet(tmp_path / "greenhouse_channels_2024-05-01.parquet")
+        assert list(stored["value"]) == [41.0, 42.0]
+        assert str(stored["sensor"].dtype) == "category"
+        assert len(logger.get_channel_data(clock.now())) == 1
@@ -0,0 +1,240 @@
+"""
+Tests for greenhouse_devices module.
+
+Tests device lookups, roles, batch states, the mapping of legacy device settings
+and the transition log with its duty cycles.
+"""
+
+import pytest
+import sys
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_devices import DeviceRegistry
+from greenhouse_manager.greenhouse_state_journal import DeviceStateJournal
+from greenhouse_manager.greenhouse_manager_settings import (
+    DeviceConfig,
+    GreenhouseManagerSettings,
+    HumidityControl,
+    TemperatureControl,
+    TimeSchedule
+)
+
+
+def device(device_id: str, pin: int, role: str = "manual", **kwargs) -> DeviceConfig:
+    """Create a device configuration on a given LED pin."""
+    return DeviceConfig(
+        id=device_id,
+        name=device_id.replace("_", " ").title(),
+        role=role,
+        rf_on_code=pin * 10,
+        rf_off_code=pin * 10 + 1,
+        led_gpio_pin=pin,
+        **kwargs
+    )
+
+
+def settings(**kwargs) -> GreenhouseManagerSettings:
+    """Create settings with only the given devices."""
+    return GreenhouseManagerSettings(
+        temperature_control=TemperatureControl(target_temp_celsius=24.0),
+        humidity_control=HumidityControl(target_humidity_percent=65.0),
+        **kwargs
+    )
+
+
+SCHEDULE = TimeSchedule(start_time=time(6, 0), end_time=time(20, 0))
+
+
+class TestDeviceRegistry:
+    """Test cases for DeviceRegistry."""
+
+    def test_lookups(self):
+        """Test devices are found by id, name and LED or button pin."""
+        registry = DeviceRegistry([
+            device("heater", 17, role="heater"),
+            device("heat_mat", 22, button_gpio_pin=27),
+        ], mock_mode=True)
+
+        assert len(registry) == 2
+        assert "heat_mat" in registry
+        assert registry.get("heater").role == "heater"
+        assert registry.by_name("Heat Mat").id == "heat_mat"
+        assert registry.by_gpio_pin(22).id == "heat_mat"
+        assert registry.by_gpio_pin(27).id == "heat_mat"
+        assert registry.by_gpio_pin(5) is None
+        assert registry.get("missing") is None
+
+    def test_roles_keep_configuration_order(self):
+        """Test devices are grouped by role in configuration order."""
+        registry = DeviceRegistry([
+            device("lights_a", 5, role="schedule", schedule=SCHEDULE),
+            device("heater", 6, role="heater"),
+            device("lights_b", 7, role="schedule", schedule=SCHEDULE),
+        ], mock_mode=True)
+
+        assert [d.id for d in registry.with_role("schedule")] == ["lights_a", "lights_b"]
+        assert [d.id for d in registry.with_role("vent_fan")] == []
+        assert [d.id for d in registry] == ["lights_a", "heater", "lights_b"]
+
+    def test_states_and_button_toggle(self):
+        """Test states are reported by id and a button press toggles its outlet."""
+        registry = DeviceRegistry([
+            device("heater", 17, role="heater"),
+            device("heat_mat", 22, button_gpio_pin=27),
+        ], mock_mode=True)
+
+        registry.get("heat_mat").button._handle_button_press(27)
+
+        assert registry.states() == {"heater": False, "heat_mat": True}
+
+    def test_transitions_reported_with_source(self):
+        """Test each switch is reported once with what asked for it."""
+        registry = DeviceRegistry([device("heat_mat", 22, button_gpio_pin=27)], mock_mode=True)
+        transitions = []
+        registry.on_transition = lambda *transition: transitions.append(transition)
+
+        registry.get("heat_mat").button._handle_button_press(27)
+        registry.outlet("heat_mat").turn_on("api")
+        registry.outlet("heat_mat").turn_off("schedule")
+
+        assert transitions == [("heat_mat", True, "button"), ("heat_mat", False, "schedule")]
+
+    def test_states_restored_from_journal(self, tmp_path):
+        """Test outlets start in their journaled state and switches are journaled."""
+        journal = DeviceStateJournal(str(tmp_path / "devices.journal"))
+        journal.record("heat_mat", True)
+
+        registry = DeviceRegistry([device("heater", 17), device("heat_mat", 22)], mock_mode=True, journal=journal)
+        assert registry.states() == {"heater": False, "heat_mat": True}
+
+        registry.outlet("heater").turn_on()
+        assert journal.get("heater").state is True
+        journal.close()
+
+    def test_duplicate_pin_rejected(self):
+        """Test two devices cannot share a GPIO pin."""
+        with pytest.raises(ValueError):
+            DeviceRegistry([device("a", 17), device("b", 18, button_gpio_pin=17)], mock_mode=True)
+
+    def test_failed_update_keeps_lookups(self):
+        """Test a rejected update leaves the existing devices indexed."""
+        registry = DeviceRegistry([device("a", 17, role="heater"), device("b", 18)], mock_mode=True)
+
+        with pytest.raises(ValueError, match="GPIO pin 17"):
+            registry.update([device("a", 17, role="heater"), device("c", 19, button_gpio_pin=17)])
+
+        assert len(registry) == 2
+        assert registry.by_gpio_pin(17).id == "a"
+        assert [d.id for d in registry.with_role("heater")] == ["a"]
+        assert "c" not in registry
+
+
+class TestDeviceSettings:
+    """Test cases for the device list in settings."""
+
+    def test_legacy_fields_mapped_to_devices(self):
+        """Test the four named device fields become devices with matching ids and roles."""
+        config = settings(
+            heater=DeviceConfig(name="Heater", rf_on_code=1, rf_off_code=2, led_gpio_pin=17),
+            grow_lights=DeviceConfig(name="Lights", rf_on_code=3, rf_off_code=4, led_gpio_pin=19),
+            grow_lights_schedule=SCHEDULE,
+            devices=[device("heat_mat", 22)]
+        )
+
+        devices = config.device_list()
+
+        assert [(d.id, d.role) for d in devices] == [
+            ("heater", "heater"), ("grow_lights", "schedule"), ("heat_mat", "manual")
+        ]
+        assert devices[1].schedule == SCHEDULE
+
+    def test_device_list_entries_need_ids(self):
+        """Test entries of devices must have an id."""
+        with pytest.raises(ValueError):
+            settings(devices=[DeviceConfig(name="Mat", rf_on_code=1, rf_off_code=2, led_gpio_pin=22)])
+
+    def test_duplicate_ids_rejected(self):
+        """Test a device id cannot repeat a legacy device field."""
+        with pytest.raises(ValueError):
+            settings(
+                heater=DeviceConfig(name="Heater", rf_on_code=1, rf_off_code=2, led_gpio_pin=17),
+                devices=[device("heater", 22, role="heater")]
+            )
+
+    def test_duplicate_pins_rejected(self):
+        """Test two devices cannot share a GPIO pin."""
+        with pytest.raises(ValueError):
+            settings(devices=[device("a", 22), device("b", 22)])
+
+    def test_scheduled_device_needs_schedule(self):
+        """Test devices with the schedule role must have a schedule."""
+        with pytest.raises(ValueError):
+            settings(devices=[device("lights", 22, role="schedule")])
+
+
+START = datetime(2024, 5, 1, 0, 0)
+
+
+class TestTransitionLog:
+    """Test cases for the transitions dataset and duty cycles computed from it."""
+
+    def test_duty_exact_with_irregular_switching(self, tmp_path):
+        """Test on-time is exact however far apart the switches are."""
+        clock = SimulatedClock(START + timedelta(days=1))
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+        for offset, state in [(0, True), (37, False), (1000, True), (1013.5, True), (3000, False)]:
+            logger.log_transition("heater", state, "thermostat", START + timedelta(seconds=offset))
+        logger.log_transition("vent_fan", True, "schedule", START + timedelta(seconds=600))
+
+        duty = logger.get_duty_cycles(START, START + timedelta(hours=1))
+
+        assert duty["heater"]["on_seconds"] == 37 + 2000
+        assert duty["heater"]["observed_seconds"] == 3600
+        assert duty["heater"]["switch_count"] == 3
+        # The vent fan's state is unknown until its first transition
+        assert duty["vent_fan"] == {
+            "on_seconds": 3000.0, "observed_seconds": 3000.0, "duty_percent": 100.0, "switch_count": 0
+        }
+
+    def test_state_carried_into_later_windows(self, tmp_path):
+        """Test a window starts in the state left by the last transition before it, days earlier."""
+        clock = SimulatedClock(START + timedelta(days=3, hours=12))
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+        logger.log_transition("heater", True, "startup", START)
+        logger.log_transition("lights", False, "startup", START)
+        logger.flush()
+        logger.log_transition("lights", True, "schedule", START + timedelta(days=3, hours=6))
+
+        assert (tmp_path / "greenhouse_transitions_2024-05-01.parquet").exists()
+        day = START + timedelta(days=3)
+        duty = logger.get_duty_cycles(day, day + timedelta(days=1))
+
+        # The window is cut off at the current time
+        assert duty["heater"] == {
+            "on_seconds": 43200.0, "observed_seconds": 43200.0, "duty_percent": 100.0, "switch_count": 0
+        }
+        assert duty["lights"]["on_seconds"] == 21600
+        assert duty["lights"]["switch_count"] == 1
+        assert list(logger.get_duty_cycles(day, day + timedelta(days=1), devices=["lights"])) == ["lights"]
+
+    def test_transitions_queryable(self, tmp_path):
+        """Test transitions are read back from disk and the buffer with categorical columns on disk."""
+        clock = SimulatedClock(START + timedelta(hours=1))
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+        logger.log_transition("heater", True, "thermostat", START)
+        logger.flush()
+        logger.log_transition("heater", False, "api", START + timedelta(minutes=5))
+
+        transitions = logger.get_transitions(START, START + timedelta(hours=1))
+
+        assert list(transitions["source"]) == ["thermostat", "api"]
+        assert list(transitions["state"]) == [True, False]
+        stored = logger.get_data_for_date(START, "transitions")
+        assert str(stored["device"].dtype) == "category"
+        assert logger.get_transitions(START, START + timedelta(hours=1), devices=["vent_fan"]) is None
@@ -0,0 +1,106 @@
+"""
+Tests for greenhouse_energy module.
+
+Tests energy counters, day and month rollups and range queries over them.
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_energy import DEVICE_ENERGY_WH, EnergyMeter
+
+
+@pytest.fixture
+def clock():
+    """Simulated clock at 22:00 on the last day of a month."""
+    return SimulatedClock(datetime(2024, 1, 31, 22, 0))
+
+
+class TestEnergyMeter:
+    """Test cases for EnergyMeter."""
+
+    def test_energy_accrued_between_transitions(self, tmp_path, clock):
+        """Test on-time is costed at each device's wattage, and devices without one are ignored."""
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+        meter = EnergyMeter(logger, {"heater": 1500.0, "lights": 300.0}, {"lights": True},
+                            price_per_kwh=0.5, clock=clock)
+        counted_before = DEVICE_ENERGY_WH.labels("heater").value
+
+        meter.transition("heater", True)
+        clock.advance(1200)
+        meter.transition("heater", False)
+        meter.transition("vent_fan", True)
+        clock.advance(600)
+        totals = meter.totals()
+
+        assert totals["heater"] == {"on_seconds": 1200.0, "energy_kwh": 0.5, "cost": 0.25}
+        assert totals["lights"]["energy_kwh"] == pytest.approx(0.15)
+        assert "vent_fan" not in totals
+        assert DEVICE_ENERGY_WH.labels("heater").value - counted_before == pytest.approx(500)
+
+    def test_days_split_at_midnight_and_months_rolled_up(self, tmp_path, clock):
+        """Test a device left on over midnight is split between days, and a finished month is summed."""
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+        meter = EnergyMeter(logger, {"heater": 1000.0}, {"heater": True}, clock=clock)
+
+        clock.advance(3 * 3600)
+        meter.update()
+        meter.flush()
+
+        assert logger.get_energy_totals(datetime(2024, 1, 31))["heater"][1] == pytest.approx(2.0)
+        assert logger.get_energy_totals(datetime(2024, 2, 1))["heater"][1] == pytest.approx(1.0)
+        assert (tmp_path / "greenhouse_energy_monthly_2024-01-01.parquet").exists()
+
+    def test_day_continued_after_restart(self, tmp_path, clock):
+        """Test a new meter carries on from the totals written for the day."""
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+        meter = EnergyMeter(logger, {"heater": 1000.0}, {"heater": True}, clock=clock)
+        clock.advance(1800)
+        meter.flush()
+
+        restarted = EnergyMeter(logger, {"heater": 1000.0}, {"heater": True}, clock=clock)
+        clock.advance(1800)
+
+        assert restarted.totals()["heater"]["energy_kwh"] == pytest.approx(1.0)
+
+
+class TestEnergyQueries:
+    """Test cases for energy range queries on the data logger."""
+
+    def test_range_uses_monthly_totals(self, tmp_path):
+        """Test whole months come from their monthly totals and the rest from daily totals."""
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path))
+        day = datetime(2024, 1, 1)
+        while day < datetime(2024, 2, 3):
+            logger.save_energy_totals(day, {"heater": (3600.0, 1.5, 0.45)})
+            day += timedelta(days=1)
+        assert logger.rollup_energy_month(datetime(2024, 1, 15))
+
+        # Later changes to January's daily totals are not read once it is rolled up
+        logger.save_energy_totals(datetime(2024, 1, 10), {"heater": (0.0, 100.0, 0.0)})
+        energy = logger.get_energy(datetime(2024, 1, 1), datetime(2024, 2, 2))
+
+        assert energy["heater"]["energy_kwh"] == pytest.approx(33 * 1.5)
+        assert energy["heater"]["on_seconds"] == 33 * 3600
+        # A partial month is read from its daily totals
+        assert logger.get_energy(datetime(2024, 1, 10), datetime(2024, 1, 10))["heater"]["energy_kwh"] == 100.0
+
+    def test_monthly_totals_survive_cleanup(self, tmp_path):
+        """Test old daily files are cleaned up while monthly totals are kept."""
+        clock = SimulatedClock(datetime(2025, 6, 1))
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), max_log_days=30, clock=clock)
+        logger.save_energy_totals(datetime(2024, 1, 1), {"heater": (3600.0, 1.5, 0.45)})
+        logger.rollup_energy_month(datetime(2024, 1, 1))
+
+        logger.cleanup_old_logs()
+
+        assert logger.get_energy_totals(datetime(2024, 1, 1)) == {}
+        assert logger.get_energy(datetime(2024, 1, 1), datetime(2024, 1, 31))["heater"]["cost"] == 0.45
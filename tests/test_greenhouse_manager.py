@@ -1,14 +1,18 @@
 """
 Tests for greenhouse_manager module.
 
-Tests manager settings and configuration.
+Tests manager settings, configuration and clock injection.
 """
 
 import pytest
 import json
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
-from datetime import time
+from datetime import datetime, time, timedelta
+from time import sleep
 
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -19,10 +23,19 @@ from greenhouse_manager.greenhouse_manager_settings import (
     HumidityControl,
     TimeSchedule,
     CameraSchedule,
+    ControlChannel,
     DataLogging,
     DeviceConfig,
-    SensorConfig
+    SensorConfig,
+    RawCapture,
+    RFBudget,
+    SensorPluginConfig,
+    settings_diff
 )
+from greenhouse_manager.greenhouse_manager import GreenhouseManager, ConfigFileHandler, components_for_changes
+from greenhouse_manager.greenhouse_clock import Clock, SimulatedClock
+from greenhouse_manager.greenhouse_hardware_collection import RFOutlet
+from greenhouse_manager.greenhouse_ipc import ControlClient
 
 
 class TestTemperatureControl:
@@ -163,6 +176,16 @@ class TestDataLogging:
         logging = DataLogging(log_format="feather")
         assert logging.log_format == "feather"
 
+    def test_deadband_mode(self):
+        """Test deadband mode settings and rejection of negative deadbands."""
+        logging = DataLogging(mode="deadband", deadbands={"temperature_celsius": 0.5})
+        assert logging.heartbeat_seconds == 900
+
+        with pytest.raises(Exception):
+            DataLogging(mode="on_change")
+        with pytest.raises(Exception):
+            DataLogging(deadbands={"temperature_celsius": -0.1})
+
 
 class TestDeviceConfig:
     """Test cases for DeviceConfig model."""
@@ -304,3 +327,650 @@ class TestGreenhouseManagerSettings:
         assert settings.mock_mode is False  # Default
         assert settings.log_directory == "data/logs"  # Default
         assert settings.data_logging.log_format == "parquet"  # Default
+
+
+def mock_settings(tmp_path, **overrides) -> GreenhouseManagerSettings:
+    """Create mock-mode settings writing under tmp_path."""
+    config = dict(
+        mock_mode=True,
+        temperature_control=TemperatureControl(target_temp_celsius=24.0, temp_tolerance_celsius=2.0),
+        humidity_control=HumidityControl(target_humidity_percent=65.0),
+        heater=DeviceConfig(name="Heater", rf_on_code=111, rf_off_code=222, led_gpio_pin=17),
+        vent_fan=DeviceConfig(name="Vent", rf_on_code=111, rf_off_code=222, led_gpio_pin=18),
+        grow_lights=DeviceConfig(name="Lights", rf_on_code=111, rf_off_code=222, led_gpio_pin=19),
+        stand_fan=DeviceConfig(name="Fan", rf_on_code=111, rf_off_code=222, led_gpio_pin=20),
+        grow_lights_schedule=TimeSchedule(enabled=True, start_time=time(6, 0), end_time=time(20, 0)),
+        stand_fan_schedule=TimeSchedule(enabled=True, start_time=time(8, 0), end_time=time(22, 0)),
+        camera_schedule=CameraSchedule(enabled=False),
+        log_directory=str(tmp_path / "logs"),
+        image_directory=str(tmp_path / "images")
+    )
+    config.update(overrides)
+    return GreenhouseManagerSettings(**config)
+
+
+class TestClock:
+    """Test cases for clock implementations."""
+
+    def test_simulated_clock_advances(self):
+        """Test the simulated clock only moves when advanced or slept."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+
+        assert clock.now() == datetime(2024, 1, 1, 12, 0)
+        clock.sleep(90)
+        clock.advance(30)
+
+        assert clock.now() == datetime(2024, 1, 1, 12, 2)
+        assert clock.time() == datetime(2024, 1, 1, 12, 2).timestamp()
+        assert clock.elapsed == timedelta(minutes=2)
+
+    def test_clocks_must_tell_time(self):
+        """Test a clock without now, time and sleep cannot be created."""
+        with pytest.raises(TypeError, match="now"):
+            Clock()
+
+
+class TestGreenhouseManagerClock:
+    """Test cases for running the manager on an injected clock."""
+
+    def test_manager_from_settings(self, tmp_path):
+        """Test the manager can be built from settings without a config file."""
+        manager = GreenhouseManager(settings=mock_settings(tmp_path), monitor_config=False)
+
+        assert manager.config_observer is None
+        assert manager.data_logger.clock is manager.clock
+        manager.shutdown()
+
+    def test_schedules_follow_clock(self, tmp_path):
+        """Test schedules and log timestamps use simulated time."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 5, 0))
+        manager = GreenhouseManager(settings=mock_settings(tmp_path), clock=clock, monitor_config=False)
+
+        manager.control_scheduled_devices()
+        assert manager.grow_lights.get_state() is False
+
+        clock.advance(2 * 3600)
+        manager.control_scheduled_devices()
+        assert manager.grow_lights.get_state() is True
+
+        manager.run_control_loop()
+        manager.shutdown()
+        assert manager.data_logger.get_data_for_date(clock.now())["timestamp"].iloc[0] == clock.now()
+
+
+class TestGreenhouseManagerSwitching:
+    """Test cases for dwell times and the RF budget in manager control."""
+
+    def test_heater_dwell_time(self, tmp_path):
+        """Test the heater stays on for its minimum on time despite the temperature."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        heater = DeviceConfig(name="Heater", rf_on_code=111, rf_off_code=222, led_gpio_pin=17, min_on_seconds=300)
+        manager = GreenhouseManager(settings=mock_settings(tmp_path, heater=heater), clock=clock, monitor_config=False)
+
+        manager.control_temperature(20.0)
+        assert manager.heater.get_state() is True
+
+        clock.advance(60)
+        manager.control_temperature(25.0)
+        assert manager.heater.get_state() is True
+
+        clock.advance(240)
+        manager.control_temperature(25.0)
+        assert manager.heater.get_state() is False
+        manager.shutdown()
+
+    def test_rf_budget_limits_switches(self, tmp_path):
+        """Test automatic control stops switching once the RF budget is spent."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        settings = mock_settings(tmp_path, rf_budget=RFBudget(max_transmissions_per_hour=1, burst=2))
+        manager = GreenhouseManager(settings=settings, clock=clock, monitor_config=False)
+
+        manager.control_scheduled_devices()
+        manager.control_temperature(20.0)
+        assert manager.grow_lights.get_state() is True
+        assert manager.stand_fan.get_state() is True
+        assert manager.heater.get_state() is False
+        manager.shutdown()
+
+
+    def test_states_reasserted_in_control_loop(self, tmp_path, monkeypatch):
+        """Test the control loop re-sends outlet states slowly, one at a time."""
+        reasserted = []
+        monkeypatch.setattr(RFOutlet, "reassert", lambda outlet: reasserted.append(clock.time()))
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        manager = GreenhouseManager(settings=mock_settings(tmp_path), clock=clock, monitor_config=False)
+
+        for _ in range(720):
+            manager.run_control_loop()
+            clock.advance(10)
+        manager.shutdown()
+
+        # Four devices over two hours, within the default airtime budget of 50 codes an hour
+        assert 4 <= len(reasserted) <= 100
+        gaps = [later - earlier for earlier, later in zip(reasserted, reasserted[1:])]
+        assert min(gaps) >= manager.settings.reassertion.min_gap_seconds
+
+
+class TestGreenhouseManagerDevices:
+    """Test cases for the device registry in manager control, logging and shutdown."""
+
+    def test_many_devices_controlled_by_role(self, tmp_path):
+        """Test every device with a role is controlled and logged in its own column."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        lights = TimeSchedule(enabled=True, start_time=time(6, 0), end_time=time(20, 0))
+        devices = [
+            DeviceConfig(id=f"lights_{i}", name=f"Lights {i}", role="schedule", schedule=lights,
+                         rf_on_code=1000 + i, rf_off_code=2000 + i, led_gpio_pin=i)
+            for i in range(2, 14)
+        ] + [
+            DeviceConfig(id="heat_mat", name="Heat Mat", role="heater",
+                         rf_on_code=3000, rf_off_code=3001, led_gpio_pin=21),
+            DeviceConfig(id="spare", name="Spare", rf_on_code=3002, rf_off_code=3003, led_gpio_pin=22),
+        ]
+        manager = GreenhouseManager(settings=mock_settings(tmp_path, devices=devices), clock=clock, monitor_config=False)
+
+        manager.control_scheduled_devices()
+        manager.control_temperature(18.0)
+        states = manager.get_device_states()
+
+        assert len(states) == 18
+        assert all(states[f"lights_{i}"] for i in range(2, 14))
+        assert states["heater"] and states["heat_mat"]
+        assert not states["spare"]
+
+        manager.run_control_loop()
+        states = manager.get_device_states()
+        manager.shutdown()
+        df = manager.data_logger.get_data_for_date(clock.now())
+        assert {column[:-len("_state")] for column in df.columns if column.endswith("_state")} == set(states)
+        assert df["heat_mat_state"].iloc[0] == states["heat_mat"]
+        assert not df["spare_state"].iloc[0]
+
+    def test_transitions_logged_with_source(self, tmp_path):
+        """Test every switch is logged once with what asked for it, after a startup snapshot."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        heater = DeviceConfig(name="Heater", rf_on_code=111, rf_off_code=222, led_gpio_pin=17, button_gpio_pin=23)
+        manager = GreenhouseManager(settings=mock_settings(tmp_path, heater=heater), clock=clock, monitor_config=False)
+
+        manager.control_scheduled_devices()
+        manager.control_temperature(20.0)
+        clock.advance(60)
+        manager.devices.get("heater").button._handle_button_press(23)
+        manager.override_device("vent_fan", True, duration_seconds=600)
+        manager.control_temperature(20.0)
+        manager.shutdown()
+
+        transitions = manager.data_logger.get_transitions(datetime(2024, 1, 1), clock.now() + timedelta(seconds=1))
+        rows = list(transitions[["device", "state", "source"]].itertuples(index=False, name=None))
+        assert rows[:4] == [(device_id, False, "startup") for device_id in manager.get_device_states()]
+        assert rows[4:] == [
+            ("grow_lights", True, "schedule"),
+            ("stand_fan", True, "schedule"),
+            ("heater", True, "thermostat"),
+            ("heater", False, "button"),
+            ("vent_fan", True, "api"),
+            ("heater", True, "thermostat"),
+        ]
+        duty = manager.data_logger.get_duty_cycles(datetime(2024, 1, 1, 12, 0), clock.now())
+        assert duty["heater"]["on_seconds"] == 60
+        assert duty["grow_lights"]["duty_percent"] == 100
+
+    def test_energy_metered_from_transitions(self, tmp_path):
+        """Test devices with a wattage are metered as they switch and the day's totals are written."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        heater = DeviceConfig(name="Heater", rf_on_code=111, rf_off_code=222, led_gpio_pin=17, watts=2000)
+        manager = GreenhouseManager(settings=mock_settings(tmp_path, heater=heater), clock=clock, monitor_config=False)
+
+        manager.control_temperature(20.0)
+        clock.advance(900)
+        manager.control_temperature(25.0)
+        clock.advance(900)
+        manager.shutdown()
+
+        assert list(manager.energy_meter.watts) == ["heater"]
+        assert manager.data_logger.get_energy(clock.now(), clock.now()) == {
+            "heater": {"on_seconds": 900.0, "energy_kwh": 0.5, "cost": 0.0}
+        }
+
+    def test_raw_capture_summarises_log_interval(self, tmp_path):
+        """Test every reading is kept and spilled, and each log interval is logged as a summary of its readings."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        settings = mock_settings(tmp_path, raw_capture=RawCapture(enabled=True, buffer_seconds=300, spill=True))
+        manager = GreenhouseManager(settings=settings, clock=clock, monitor_config=False)
+
+        for _ in range(24):
+            manager.run_control_loop()
+            clock.advance(5)
+        live = manager.live_readings(60)
+        manager.shutdown()
+
+        assert manager.raw_capture.ring.capacity == 60
+        # Readings from 12:01:05 to 12:01:55, the last minute before 12:02:00
+        assert live["read_interval_seconds"] == 5 and len(live["readings"]) == 11
+        log = manager.data_logger.get_data_for_date(clock.now())
+        assert list(log["sensor_readings"]) == [1, 12]
+        assert "temperature_celsius_last" in log.columns and "temperature_celsius_std" not in log.columns
+        assert (log["temperature_celsius_min"] <= log["temperature_celsius"]).all()
+        assert len(manager.data_logger.get_data_for_date(clock.now(), "raw")) == 24
+        with pytest.raises(ValueError):
+            manager.live_readings(600)
+
+    def test_devices_list_without_legacy_fields(self, tmp_path):
+        """Test a configuration using only the devices list."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        devices = [DeviceConfig(id="vent", name="Vent", role="vent_fan", rf_on_code=1, rf_off_code=2, led_gpio_pin=5)]
+        settings = mock_settings(
+            tmp_path, devices=devices, heater=None, vent_fan=None, grow_lights=None, stand_fan=None,
+            grow_lights_schedule=None, stand_fan_schedule=None
+        )
+        manager = GreenhouseManager(settings=settings, clock=clock, monitor_config=False)
+
+        manager.control_temperature(30.0)
+        manager.control_scheduled_devices()
+
+        assert manager.heater is None
+        assert manager.get_device_states() == {"vent": True}
+        manager.shutdown()
+
+
+def write_config(tmp_path, settings: GreenhouseManagerSettings) -> str:
+    """Write settings to a config file and return its path."""
+    path = tmp_path / "settings.json"
+    path.write_text(settings.model_dump_json())
+    return str(path)
+
+
+class TestGreenhouseManagerReload:
+    """Test cases for diff-based configuration reloads."""
+
+    def test_settings_diff(self, tmp_path):
+        """Test the diff lists nested changes as dotted paths."""
+        old = mock_settings(tmp_path)
+        new = mock_settings(tmp_path, sensor=SensorConfig(i2c_address=0x77), stand_fan=None)
+
+        assert settings_diff(old, new) == ["sensor.i2c_address", "stand_fan"]
+        assert settings_diff(old, mock_settings(tmp_path)) == []
+
+    def test_components_for_changes(self):
+        """Test changes map to the components that use them, plus dependent components."""
+        assert components_for_changes(["temperature_control.target_temp_celsius"]) == []
+        assert components_for_changes(["temperature_control.smoothing_time_constant_seconds"]) == ["control"]
+        assert components_for_changes(["data_logging.log_format"]) == [
+            "data_logger", "raw_capture", "energy_meter", "image_pipeline", "retention"
+        ]
+        assert components_for_changes(["sensor.read_interval_seconds"]) == ["sensor", "raw_capture"]
+        assert components_for_changes(["heater"]) == ["devices", "energy_meter"]
+        assert components_for_changes(["energy.price_per_kwh"]) == ["energy_meter"]
+
+    def test_invalid_config_keeps_current_settings(self, tmp_path):
+        """Test a config that fails validation is ignored and the manager keeps running."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        path = write_config(tmp_path, mock_settings(tmp_path))
+        manager = GreenhouseManager(config_path=path, clock=clock, monitor_config=False)
+        settings = manager.settings
+
+        Path(path).write_text('{"mock_mode": true}')
+
+        assert manager.reload_configuration() is None
+        assert manager.settings is settings
+        manager.run_control_loop()
+        manager.shutdown()
+
+    def test_only_changed_components_rebuilt(self, tmp_path):
+        """Test a control target change swaps settings without rebuilding hardware."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        settings = mock_settings(tmp_path)
+        path = write_config(tmp_path, settings)
+        manager = GreenhouseManager(config_path=path, clock=clock, monitor_config=False)
+        data_logger, sensor, devices = manager.data_logger, manager.sensor, manager.devices
+
+        settings.temperature_control.target_temp_celsius = 20.0
+        write_config(tmp_path, settings)
+
+        assert manager.reload_configuration() == ["temperature_control.target_temp_celsius"]
+        assert manager.settings.temperature_control.target_temp_celsius == 20.0
+        assert manager.data_logger is data_logger
+        assert manager.sensor is sensor
+        assert manager.devices is devices
+        assert manager.reload_configuration() == []
+        manager.shutdown()
+
+    def test_changed_device_replaced_others_kept(self, tmp_path):
+        """Test a changed RF code replaces only that device's outlet, switching the old one off."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        settings = mock_settings(tmp_path)
+        path = write_config(tmp_path, settings)
+        manager = GreenhouseManager(config_path=path, clock=clock, monitor_config=False)
+        manager.control_scheduled_devices()
+        manager.control_temperature(18.0)
+        old_heater, grow_lights = manager.heater, manager.grow_lights
+
+        settings.heater.rf_on_code = 999
+        settings.grow_lights_schedule.end_time = time(21, 0)
+        write_config(tmp_path, settings)
+        manager.reload_configuration()
+
+        assert manager.heater is not old_heater
+        assert old_heater.get_state() is False
+        assert manager.heater.send_on_code == 999
+        assert manager.grow_lights is grow_lights
+        assert grow_lights.get_state() is True
+        assert manager.devices.get("grow_lights").config.schedule.end_time == time(21, 0)
+        manager.shutdown()
+
+    def test_log_format_change_rebuilds_logger(self, tmp_path):
+        """Test changing the log format flushes the old logger and writes with the new one."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        settings = mock_settings(tmp_path)
+        path = write_config(tmp_path, settings)
+        manager = GreenhouseManager(config_path=path, clock=clock, monitor_config=False)
+        manager.run_control_loop()
+
+        settings.data_logging.log_format = "feather"
+        write_config(tmp_path, settings)
+        manager.reload_configuration()
+        clock.advance(60)
+        manager.run_control_loop()
+        manager.shutdown()
+
+        assert manager.data_logger.log_format == "feather"
+        assert manager.retention_engine.data_logger is manager.data_logger
+        assert len(list((tmp_path / "logs").glob("greenhouse_log_*.parquet"))) == 1
+        assert len(list((tmp_path / "logs").glob("greenhouse_log_*.feather"))) == 1
+
+    def test_file_events_debounced(self, tmp_path):
+        """Test a burst of file events triggers a single reload."""
+        calls = []
+        path = tmp_path / "settings.json"
+        handler = ConfigFileHandler(str(path), lambda: calls.append(1), debounce_seconds=0.05)
+
+        class Event:
+            src_path = str(path)
+            dest_path = str(path)
+
+        for _ in range(5):
+            handler.on_modified(Event())
+        handler.on_moved(Event())
+        sleep(0.2)
+
+        assert calls == [1]
+
+
+class TestGreenhouseManagerControlChannel:
+    """Test cases for the requests served over the control channel."""
+
+    def test_override_holds_device_until_expiry(self, tmp_path):
+        """Test an overridden device ignores automatic control until the override expires."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        manager = GreenhouseManager(settings=mock_settings(tmp_path), clock=clock, monitor_config=False)
+
+        manager.override_device("heater", True, duration_seconds=600)
+        manager.control_temperature(30.0)
+        assert manager.heater.get_state() is True
+        assert manager.control_status()["overrides"]["heater"] == {"state": True, "expires_in_seconds": 600.0}
+
+        clock.advance(600)
+        manager.expire_overrides()
+        manager.control_temperature(30.0)
+        assert manager.heater.get_state() is False
+        assert manager.device_overrides == {}
+        manager.shutdown()
+
+    def test_override_rejects_unknown_device_and_duration(self, tmp_path):
+        """Test overrides need a registered device and a duration within the limit."""
+        manager = GreenhouseManager(settings=mock_settings(tmp_path), monitor_config=False)
+
+        with pytest.raises(ValueError):
+            manager.override_device("greenhouse_door", True, duration_seconds=60)
+        with pytest.raises(ValueError):
+            manager.override_device("heater", True, duration_seconds=10 ** 6)
+        assert manager.clear_override("heater") == {"device": "heater", "cleared": False}
+        manager.shutdown()
+
+    def test_setpoints_applied_and_saved(self, tmp_path):
+        """Test new setpoints take effect immediately and are written to the settings file."""
+        path = write_config(tmp_path, mock_settings(tmp_path))
+        manager = GreenhouseManager(config_path=path, monitor_config=False)
+
+        manager.set_setpoints(target_temp_celsius=18.5, humidity_tolerance_percent=4.0)
+        assert manager.settings.temperature_control.target_temp_celsius == 18.5
+        assert manager.settings.humidity_control.humidity_tolerance_percent == 4.0
+
+        manager.shutdown()
+        saved = json.loads(Path(path).read_text())
+        assert saved["temperature_control"]["target_temp_celsius"] == 18.5
+        assert saved["humidity_control"]["humidity_tolerance_percent"] == 4.0
+
+    def test_setpoints_saved_as_validated_values(self, tmp_path):
+        """Test setpoints given as strings are applied and saved as numbers."""
+        path = write_config(tmp_path, mock_settings(tmp_path))
+        manager = GreenhouseManager(config_path=path, monitor_config=False)
+
+        assert manager.set_setpoints(target_temp_celsius="22") == {"target_temp_celsius": 22.0}
+
+        manager.shutdown()
+        saved = json.loads(Path(path).read_text())
+        assert saved["temperature_control"]["target_temp_celsius"] == 22.0
+        assert isinstance(saved["temperature_control"]["target_temp_celsius"], float)
+
+    def test_invalid_setpoints_rejected(self, tmp_path):
+        """Test unknown or out-of-range setpoints leave the settings unchanged."""
+        manager = GreenhouseManager(settings=mock_settings(tmp_path), monitor_config=False)
+        settings = manager.settings
+
+        with pytest.raises(ValueError):
+            manager.set_setpoints(target_temp_celsius=80.0)
+        with pytest.raises(ValueError):
+            manager.set_setpoints(log_directory="/tmp")
+        assert manager.settings is settings
+        manager.shutdown()
+
+    def test_capture_now_ignores_active_hours(self, tmp_path):
+        """Test a requested capture is taken on the next loop even outside the camera's hours."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 23, 0))
+        settings = mock_settings(tmp_path, camera_schedule=CameraSchedule(enabled=True))
+        manager = GreenhouseManager(settings=settings, clock=clock, monitor_config=False)
+        manager.run_control_loop()
+        assert list(Path(settings.image_directory).glob("*.jpg")) == []
+
+        manager.request_capture()
+        manager.run_control_loop()
+
+        assert manager.capture_requested is False
+        assert len(list(Path(settings.image_directory).glob("*.jpg"))) == 1
+        manager.shutdown()
+
+    def test_burst_frames_spread_across_loops(self, tmp_path):
+        """Test burst frames are taken on later loop iterations instead of sleeping between them."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        settings = mock_settings(tmp_path, camera_schedule=CameraSchedule(
+            enabled=True, burst_count=3, burst_interval_ms=500
+        ))
+        manager = GreenhouseManager(settings=settings, clock=clock, monitor_config=False)
+        image_dir = Path(settings.image_directory)
+
+        manager.run_control_loop()
+        assert len(list(image_dir.glob("*.jpg"))) == 1
+        assert len(manager.burst_frames) == 2
+
+        manager.run_control_loop()
+        assert len(list(image_dir.glob("*.jpg"))) == 1
+
+        clock.advance(0.5)
+        manager.run_control_loop()
+        clock.advance(0.5)
+        manager.run_control_loop()
+
+        assert manager.burst_frames == []
+        entries = manager.image_catalog.get_entries_for_date(clock.now())
+        assert len(entries) == 3
+        assert entries["timestamp"].nunique() == 1
+        manager.shutdown()
+
+    def test_capture_now_needs_camera(self, tmp_path):
+        """Test a capture cannot be requested while the camera is disabled."""
+        manager = GreenhouseManager(settings=mock_settings(tmp_path), monitor_config=False)
+
+        with pytest.raises(ValueError):
+            manager.request_capture()
+        manager.shutdown()
+
+    def test_status_over_socket(self, tmp_path):
+        """Test the webserver-side client reaches the started manager."""
+        socket_directory = tempfile.mkdtemp(prefix="gh")
+        socket_path = os.path.join(socket_directory, "manager.sock")
+        settings = mock_settings(tmp_path, control_channel=ControlChannel(socket_path=socket_path))
+        manager = GreenhouseManager(settings=settings, monitor_config=False)
+        manager.start(acquisition_thread=False, metrics=False)
+        client = ControlClient(socket_path)
+        try:
+            client.call("override_device", device="vent_fan", state=True, duration_seconds=60)
+            status = client.call("status")
+            assert status["devices"]["vent_fan"] is True
+            assert status["setpoints"]["target_temp_celsius"] == 24.0
+        finally:
+            client.close()
+            manager.shutdown()
+            shutil.rmtree(socket_directory, ignore_errors=True)
+
+        assert not os.path.exists(socket_path)
+
+
+class TestGreenhouseManagerStateJournal:
+    """Test cases for resuming device states after a restart."""
+
+    def test_restart_resumes_without_rf_commands(self, tmp_path, monkeypatch):
+        """Test a restarted manager knows which outlets are on and does not re-send their codes."""
+        sent = []
+        monkeypatch.setattr(RFOutlet, "transmit", lambda outlet, code: sent.append((outlet.name, code)))
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        manager = GreenhouseManager(settings=mock_settings(tmp_path), clock=clock, monitor_config=False)
+        manager.control_scheduled_devices()
+        manager.shutdown()
+        assert len(sent) == 2
+
+        clock.advance(60)
+        restarted = GreenhouseManager(settings=mock_settings(tmp_path), clock=clock, monitor_config=False)
+        assert restarted.grow_lights.get_state() is True
+        assert restarted.stand_fan.get_state() is True
+
+        restarted.control_scheduled_devices()
+        assert len(sent) == 2
+
+        # Outside the lights' schedule only the lights are switched
+        clock.advance(9 * 3600)
+        restarted.control_scheduled_devices()
+        assert sent[2:] == [("Lights", 222)]
+        restarted.shutdown()
+
+    def test_dwell_time_survives_restart(self, tmp_path):
+        """Test a minimum on time started before a restart is still honoured after it."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        heater = DeviceConfig(name="Heater", rf_on_code=111, rf_off_code=222, led_gpio_pin=17, min_on_seconds=300)
+        manager = GreenhouseManager(settings=mock_settings(tmp_path, heater=heater), clock=clock, monitor_config=False)
+        manager.control_temperature(20.0)
+        manager.shutdown()
+
+        clock.advance(60)
+        restarted = GreenhouseManager(settings=mock_settings(tmp_path, heater=heater), clock=clock, monitor_config=False)
+        restarted.control_temperature(25.0)
+        assert restarted.heater.get_state() is True
+
+        clock.advance(240)
+        restarted.control_temperature(25.0)
+        assert restarted.heater.get_state() is False
+        restarted.shutdown()
+
+    def test_removed_devices_forgotten(self, tmp_path):
+        """Test devices dropped from settings are removed from the journal."""
+        manager = GreenhouseManager(settings=mock_settings(tmp_path), monitor_config=False)
+        manager.stand_fan.turn_on()
+        manager.shutdown()
+
+        restarted = GreenhouseManager(settings=mock_settings(tmp_path, stand_fan=None), monitor_config=False)
+        assert restarted.state_journal.get("stand_fan") is None
+        restarted.shutdown()
+
+
+class TestGreenhouseManagerAcquisition:
+    """Test cases for oversampled sensor readings in the control loop."""
+
+    def test_logs_interval_statistics(self, tmp_path):
+        """Test each log row carries the spread of the oversampled interval."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        settings = mock_settings(tmp_path, sensor=SensorConfig(samples_per_interval=8))
+        manager = GreenhouseManager(settings=settings, clock=clock, monitor_config=False)
+
+        manager.run_control_loop()
+        manager.shutdown()
+        row = manager.data_logger.get_data_for_date(clock.now()).iloc[0]
+        assert row["sensor_samples"] == 8
+        assert row["temperature_celsius_min"] <= row["temperature_celsius"] <= row["temperature_celsius_max"]
+        assert row["temperature_celsius_std"] > 0
+
+    def test_new_reading_once_per_interval(self, tmp_path):
+        """Test control only acts on a reading once per read interval."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        manager = GreenhouseManager(settings=mock_settings(tmp_path), clock=clock, monitor_config=False)
+
+        manager.run_control_loop()
+        first = manager.last_sensor_sequence
+        clock.advance(1)
+        manager.run_control_loop()
+        assert manager.last_sensor_sequence == first
+
+        clock.advance(manager.settings.sensor.read_interval_seconds)
+        manager.run_control_loop()
+        assert manager.last_sensor_sequence == first + 1
+        manager.shutdown()
+
+    def test_stale_sensor_turns_heater_off(self, tmp_path, monkeypatch):
+        """Test the heater is switched off once readings go stale, while schedules keep running."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        heater = DeviceConfig(name="Heater", rf_on_code=111, rf_off_code=222, led_gpio_pin=17, min_on_seconds=600)
+        manager = GreenhouseManager(settings=mock_settings(tmp_path, heater=heater), clock=clock, monitor_config=False)
+        manager.run_control_loop()
+        manager.control_temperature(15.0)
+        assert manager.heater.get_state() is True
+
+        monkeypatch.setattr(manager.sensor, "_sample", lambda: None)
+        for _ in range(8):
+            clock.advance(5)
+            manager.run_control_loop()
+
+        assert manager.sensor_stale is True
+        assert manager.heater.get_state() is False
+        assert manager.grow_lights.get_state() is True
+        manager.shutdown()
+
+
+class TestGreenhouseManagerSensors:
+    """Test cases for additional pluggable sensors."""
+
+    def test_additional_sensors_logged(self, tmp_path):
+        """Test readings of additional sensors end up in the channels dataset."""
+        clock = SimulatedClock(datetime(2024, 1, 1, 12, 0))
+        settings = mock_settings(tmp_path, sensors=[
+            SensorPluginConfig(name="soil_bed_1", kind="soil_moisture", options={"adc_inputs": [0, 1]}),
+            SensorPluginConfig(name="co2", kind="scd4x", interval_seconds=30),
+            SensorPluginConfig(name="north_end", kind="bme280", enabled=False),
+        ])
+        manager = GreenhouseManager(settings=settings, clock=clock, monitor_config=False)
+
+        for _ in range(4):
+            manager.run_control_loop()
+            clock.advance(30)
+        manager.shutdown()
+
+        df = manager.data_logger.get_channel_data(clock.now())
+        assert set(df["sensor"]) == {"soil_bed_1", "co2"}
+        assert (df["channel"] == "co2_ppm").sum() == 4
+        assert (df["sensor"] == "soil_bed_1").sum() == 4  # two inputs, read every 60 s
+
+    def test_duplicate_sensor_names_rejected(self, tmp_path):
+        """Test additional sensors must have unique names."""
+        with pytest.raises(ValueError):
+            mock_settings(tmp_path, sensors=[
+                SensorPluginConfig(name="soil", kind="soil_moisture"),
+                SensorPluginConfig(name="soil", kind="soil_moisture"),
+            ])
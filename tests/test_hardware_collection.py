@@ -7,12 +7,22 @@ Tests hardware classes with mock mode enabled.
 import pytest
 import os
 import sys
+import threading
 from pathlib import Path
 
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from greenhouse_manager.greenhouse_hardware_collection import BME280Sensor, RFOutlet, Button
+from greenhouse_manager.greenhouse_hardware_collection import (
+    BME280Sensor,
+    RFOutlet,
+    RFTransmitQueue,
+    Button,
+    Camera,
+    MockCamera,
+    RaspistillCamera,
+    create_camera
+)
 
 
 class TestBME280Sensor:
@@ -25,6 +35,16 @@ class TestBME280Sensor:
         assert sensor.i2c_bus_number == 1
         assert sensor.i2c_address == 0x76
 
+    def test_sensor_read_latency_recorded(self):
+        """Test sensor reads are recorded in the latency histogram."""
+        from greenhouse_manager.greenhouse_hardware_collection import SENSOR_READ_SECONDS
+        sensor = BME280Sensor(mock_mode=True)
+        count = SENSOR_READ_SECONDS.count
+
+        sensor.read_data()
+
+        assert SENSOR_READ_SECONDS.count == count + 1
+
     def test_sensor_read_data_mock_mode(self):
         """Test reading sensor data in mock mode."""
         sensor = BME280Sensor(mock_mode=True)
@@ -132,6 +152,52 @@ class TestRFOutlet:
         outlet.cleanup()
 
 
+class TestRFTransmitQueue:
+    """Test cases for the shared RF transmitter queue."""
+
+    def test_codes_sent_in_order_from_many_threads(self):
+        """Test codes submitted concurrently are sent one at a time, in order per outlet."""
+        transmitter = RFTransmitQueue()
+        sent = []
+        active = []
+
+        def record(outlet, code):
+            active.append(code)
+            assert len(active) == 1  # never two transmissions at once
+            sent.append((outlet.name, code))
+            active.pop()
+
+        outlets = [RFOutlet(f"Outlet {i}", 100 * i, 100 * i + 1, 17, mock_mode=True, transmitter=transmitter)
+                   for i in range(4)]
+        for outlet in outlets:
+            outlet.transmit = lambda code, outlet=outlet: record(outlet, code)
+
+        transmitter.start()
+        threads = [threading.Thread(target=lambda o=o: [o.toggle() for _ in range(10)]) for o in outlets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        transmitter.stop()
+
+        assert len(sent) == 40
+        assert transmitter.pending() == 0
+        for i, outlet in enumerate(outlets):
+            assert [code for name, code in sent if name == outlet.name] == [100 * i, 100 * i + 1] * 5
+
+    def test_sends_inline_when_not_started(self):
+        """Test codes are sent by the caller while the queue is not running."""
+        transmitter = RFTransmitQueue()
+        outlet = RFOutlet("Heater", 111, 112, 17, mock_mode=True, transmitter=transmitter)
+        sent = []
+        outlet.transmit = sent.append
+
+        outlet.turn_on()
+
+        assert sent == [111]
+        assert outlet.get_state() is True
+
+
 class TestButton:
     """Test cases for Button class."""
 
@@ -201,6 +267,51 @@ class TestButton:
         button.cleanup()
 
 
+class TestCamera:
+    """Test cases for camera backends."""
+
+    def test_mock_camera_capture(self, tmp_path):
+        """Test the mock camera writes a synthetic JPEG at the configured size."""
+        from PIL import Image
+
+        camera = MockCamera(width=320, height=240)
+        output = tmp_path / "frame.jpg"
+
+        assert camera.capture(output) is True
+        with Image.open(output) as img:
+            assert img.size == (320, 240)
+
+    def test_camera_backends_must_capture(self):
+        """Test a camera backend without a capture method cannot be created."""
+        with pytest.raises(TypeError, match="capture"):
+            Camera()
+
+    def test_mock_frames_follow_daylight(self):
+        """Test synthetic frames are darker at night than at noon."""
+        from datetime import datetime
+
+        camera = MockCamera(width=64, height=48)
+        noon = camera.render_frame(datetime(2024, 6, 1, 13, 0))
+        night = camera.render_frame(datetime(2024, 6, 1, 23, 0))
+
+        assert noon.mean() > night.mean()
+
+    def test_create_camera_auto_mock(self):
+        """Test the auto backend picks the mock camera in mock mode."""
+        assert isinstance(create_camera("auto", mock_mode=True), MockCamera)
+
+    def test_create_camera_raspistill(self):
+        """Test the raspistill backend keeps the configured warm-up."""
+        camera = create_camera("raspistill", warmup_ms=200)
+        assert isinstance(camera, RaspistillCamera)
+        assert camera.warmup_ms == 200
+
+    def test_create_camera_invalid_backend(self):
+        """Test unknown backends are rejected."""
+        with pytest.raises(ValueError):
+            create_camera("webcam")
+
+
 class TestHardwareIntegration:
     """Integration tests for hardware components."""
 
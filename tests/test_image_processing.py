@@ -0,0 +1,208 @@
+"""
+Tests for greenhouse_image_processing, greenhouse_image_catalog and
+greenhouse_image_analysis modules.
+
+Tests near-duplicate frame suppression, the capture catalog and image metrics.
+"""
+
+import pytest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_image_processing import (
+    NearDuplicateFilter,
+    load_downscaled_gray,
+    frame_change,
+    DECISION_FULL,
+    DECISION_THUMBNAIL,
+    DECISION_SKIPPED
+)
+from greenhouse_manager.greenhouse_image_catalog import (
+    GreenhouseImageCatalog,
+    capture_filename,
+    parse_capture_time
+)
+from greenhouse_manager.greenhouse_image_analysis import (
+    ImageAnalysisWorker,
+    compute_image_metrics,
+    load_downscaled_rgb
+)
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+
+
+def write_frame(path: Path, value: int, square: bool = False) -> Path:
+    """Write a flat test frame, optionally with a bright square in the middle."""
+    pixels = np.full((240, 320, 3), value, dtype=np.uint8)
+    if square:
+        pixels[60:180, 80:240] = 255
+    Image.fromarray(pixels).save(path, "JPEG")
+    return path
+
+
+class TestFrameComparison:
+    """Test cases for frame comparison helpers."""
+
+    def test_load_downscaled_gray_shape(self, tmp_path):
+        """Test frames are decoded to the requested size in [0, 1]."""
+        frame = load_downscaled_gray(write_frame(tmp_path / "a.jpg", 128), size=32)
+
+        assert frame.shape == (32, 32)
+        assert 0.0 <= frame.min() <= frame.max() <= 1.0
+
+    def test_identical_frames_have_no_change(self, tmp_path):
+        """Test identical frames score zero change."""
+        a = load_downscaled_gray(write_frame(tmp_path / "a.jpg", 100, square=True))
+        b = load_downscaled_gray(write_frame(tmp_path / "b.jpg", 100, square=True))
+
+        assert frame_change(a, b) == pytest.approx(0.0, abs=1e-3)
+
+    def test_global_brightness_shift_ignored(self, tmp_path):
+        """Test a uniform exposure shift is not counted as change."""
+        a = load_downscaled_gray(write_frame(tmp_path / "a.jpg", 80))
+        b = load_downscaled_gray(write_frame(tmp_path / "b.jpg", 120))
+
+        assert frame_change(a, b) < 0.01
+
+    def test_structural_change_detected(self, tmp_path):
+        """Test new content in the frame is scored as change."""
+        a = load_downscaled_gray(write_frame(tmp_path / "a.jpg", 50))
+        b = load_downscaled_gray(write_frame(tmp_path / "b.jpg", 50, square=True))
+
+        assert frame_change(a, b) > 0.1
+
+
+class TestNearDuplicateFilter:
+    """Test cases for NearDuplicateFilter class."""
+
+    def test_first_frame_kept(self, tmp_path):
+        """Test the first capture is always kept at full quality."""
+        dedup = NearDuplicateFilter()
+        result = dedup.process(write_frame(tmp_path / "a.jpg", 50), tmp_path / "thumbnails")
+
+        assert result.decision == DECISION_FULL
+        assert (tmp_path / "a.jpg").exists()
+
+    def test_duplicate_kept_as_thumbnail(self, tmp_path):
+        """Test near-duplicates are replaced by a thumbnail."""
+        dedup = NearDuplicateFilter(thumbnail_width=64)
+        dedup.process(write_frame(tmp_path / "a.jpg", 50), tmp_path / "thumbnails")
+        result = dedup.process(write_frame(tmp_path / "b.jpg", 50), tmp_path / "thumbnails")
+
+        assert result.decision == DECISION_THUMBNAIL
+        assert not (tmp_path / "b.jpg").exists()
+        with Image.open(result.stored_path) as thumb:
+            assert thumb.width == 64
+
+    def test_duplicate_skipped(self, tmp_path):
+        """Test near-duplicates are dropped when duplicate_action is 'skip'."""
+        dedup = NearDuplicateFilter(duplicate_action="skip")
+        dedup.process(write_frame(tmp_path / "a.jpg", 50), tmp_path / "thumbnails")
+        result = dedup.process(write_frame(tmp_path / "b.jpg", 50), tmp_path / "thumbnails")
+
+        assert result.decision == DECISION_SKIPPED
+        assert result.stored_path is None
+        assert not (tmp_path / "b.jpg").exists()
+
+    def test_changed_frame_kept(self, tmp_path):
+        """Test frames above the change threshold are kept."""
+        dedup = NearDuplicateFilter()
+        dedup.process(write_frame(tmp_path / "a.jpg", 50), tmp_path / "thumbnails")
+        result = dedup.process(write_frame(tmp_path / "b.jpg", 50, square=True), tmp_path / "thumbnails")
+
+        assert result.decision == DECISION_FULL
+        assert result.change_score > dedup.change_threshold
+
+    def test_invalid_duplicate_action(self):
+        """Test invalid duplicate actions are rejected."""
+        with pytest.raises(ValueError):
+            NearDuplicateFilter(duplicate_action="delete")
+
+
+class TestGreenhouseImageCatalog:
+    """Test cases for GreenhouseImageCatalog class."""
+
+    def test_record_and_summary(self, tmp_path):
+        """Test captures are recorded and summarised per day."""
+        catalog = GreenhouseImageCatalog(image_directory=str(tmp_path))
+        image = write_frame(tmp_path / "greenhouse_20240115_120000.jpg", 50)
+        timestamp = datetime(2024, 1, 15, 12, 0, 0)
+
+        catalog.record(timestamp, image.name, DECISION_FULL, None, image)
+        catalog.record(timestamp, "greenhouse_20240115_123000.jpg", DECISION_SKIPPED, 0.001, None)
+
+        entries = catalog.get_entries_for_date(timestamp)
+        assert list(entries["decision"]) == [DECISION_FULL, DECISION_SKIPPED]
+        assert entries["stored_path"].iloc[0] == image.name
+
+        summary = catalog.get_summary(timestamp)
+        assert summary["capture_count"] == 2
+        assert summary["decisions"] == {DECISION_FULL: 1, DECISION_SKIPPED: 1}
+        assert summary["stored_bytes"] == image.stat().st_size
+
+    def test_capture_filenames_round_trip(self):
+        """Test capture times survive the filename scheme, including bursts."""
+        timestamp = datetime(2024, 1, 15, 12, 30, 5)
+
+        assert capture_filename(timestamp) == "greenhouse_20240115_123005.jpg"
+        assert capture_filename(timestamp, 2) == "greenhouse_20240115_123005_b02.jpg"
+        assert parse_capture_time(capture_filename(timestamp, 2)) == timestamp
+        assert parse_capture_time("holiday.jpg") is None
+
+    def test_empty_day(self, tmp_path):
+        """Test a day without captures returns an empty catalog."""
+        catalog = GreenhouseImageCatalog(image_directory=str(tmp_path))
+        assert catalog.get_entries_for_date(datetime(2024, 1, 1)).empty
+
+
+class TestImageAnalysis:
+    """Test cases for canopy and light metrics."""
+
+    def test_all_green_frame(self):
+        """Test a pure green frame is fully canopy."""
+        rgb = np.zeros((10, 10, 3), dtype=np.float32)
+        rgb[..., 1] = 0.6
+
+        metrics = compute_image_metrics(rgb)
+
+        assert metrics["canopy_fraction"] == pytest.approx(1.0)
+        assert metrics["mean_luminance"] == pytest.approx(0.587 * 0.6, rel=1e-4)
+
+    def test_partial_canopy(self):
+        """Test the canopy fraction counts only green pixels."""
+        rgb = np.full((10, 10, 3), 0.5, dtype=np.float32)
+        rgb[:5, :, 1] = 0.9
+
+        assert compute_image_metrics(rgb)["canopy_fraction"] == pytest.approx(0.5)
+
+    def test_histograms_normalised(self):
+        """Test histograms have the requested bins and sum to one."""
+        rgb = np.random.default_rng(1).random((20, 20, 3), dtype=np.float32)
+
+        metrics = compute_image_metrics(rgb, histogram_bins=8)
+
+        for channel in ("histogram_red", "histogram_green", "histogram_blue"):
+            assert len(metrics[channel]) == 8
+            assert sum(metrics[channel]) == pytest.approx(1.0)
+
+    def test_worker_logs_metrics(self, tmp_path):
+        """Test the background worker logs metrics as a time series."""
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path / "logs"))
+        image = write_frame(tmp_path / "greenhouse_20240115_120000.jpg", 100)
+        timestamp = datetime(2024, 1, 15, 12, 0, 0)
+
+        worker = ImageAnalysisWorker(logger, analysis_width=32)
+        worker.start()
+        assert worker.submit(image, timestamp) is True
+        worker.stop()
+
+        data = logger.get_data_for_date(timestamp, "image_metrics")
+        assert len(data) == 1
+        assert data["filename"].iloc[0] == image.name
+        assert load_downscaled_rgb(image, 32).shape == (24, 32, 3)
@@ -0,0 +1,159 @@
+"""
+Tests for greenhouse_ipc module.
+
+Tests the control socket round trip, error reporting, reconnection and
+background saving of setting changes.
+"""
+
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_ipc import (
+    ControlClient,
+    ControlError,
+    ControlServer,
+    ControlUnavailable,
+    SettingsPersister
+)
+
+
+@pytest.fixture
+def socket_path():
+    """Short socket path (Unix socket paths are limited to about 100 characters)."""
+    directory = tempfile.mkdtemp(prefix="gh")
+    yield os.path.join(directory, "manager.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def handlers():
+    """Handlers echoing their parameters, and one rejecting every request."""
+    def reject(**params):
+        raise ValueError("rejected")
+    return {"echo": lambda **params: params, "reject": reject}
+
+
+class TestControlChannel:
+    """Test cases for ControlServer and ControlClient."""
+
+    def test_round_trip(self, socket_path):
+        """Test a request reaches its handler and the result comes back."""
+        server = ControlServer(socket_path, handlers(), socket_mode=0o600)
+        server.start()
+        client = ControlClient(socket_path)
+        try:
+            assert client.call("echo", value=1.5, name="heater") == {"value": 1.5, "name": "heater"}
+            assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+        finally:
+            client.close()
+            server.stop()
+
+        assert not os.path.exists(socket_path)
+
+    def test_errors_reported(self, socket_path):
+        """Test rejected requests, unknown methods and bad parameters raise ControlError."""
+        server = ControlServer(socket_path, handlers())
+        server.start()
+        client = ControlClient(socket_path)
+        try:
+            with pytest.raises(ControlError, match="rejected"):
+                client.call("reject")
+            with pytest.raises(ControlError, match="Unknown method"):
+                client.call("missing")
+            # The connection stays usable after an error
+            assert client.call("echo") == {}
+        finally:
+            client.close()
+            server.stop()
+
+    def test_unavailable_without_server(self, socket_path):
+        """Test calls fail with ControlUnavailable when the manager is not running."""
+        with pytest.raises(ControlUnavailable):
+            ControlClient(socket_path).call("echo")
+
+    def test_reconnects_after_server_restart(self, socket_path):
+        """Test the client reconnects once the manager has restarted."""
+        server = ControlServer(socket_path, handlers())
+        server.start()
+        client = ControlClient(socket_path)
+        try:
+            assert client.call("echo", n=1) == {"n": 1}
+            server.stop()
+
+            server = ControlServer(socket_path, handlers())
+            server.start()
+            assert client.call("echo", n=2) == {"n": 2}
+        finally:
+            client.close()
+            server.stop()
+
+    def test_stale_socket_replaced(self, socket_path):
+        """Test a socket file left by a crashed manager does not stop the server starting."""
+        Path(socket_path).touch()
+        server = ControlServer(socket_path, handlers())
+        server.start()
+        try:
+            assert ControlClient(socket_path).call("echo", ok=True) == {"ok": True}
+        finally:
+            server.stop()
+
+    def test_request_latency(self, socket_path):
+        """Test a request on an open connection completes within a few milliseconds."""
+        server = ControlServer(socket_path, handlers())
+        server.start()
+        client = ControlClient(socket_path)
+        try:
+            client.call("echo")
+            started = time.perf_counter()
+            for _ in range(100):
+                client.call("echo", value=1)
+            assert (time.perf_counter() - started) / 100 < 0.01
+        finally:
+            client.close()
+            server.stop()
+
+
+class TestSettingsPersister:
+    """Test cases for SettingsPersister."""
+
+    def test_changes_batched_into_settings_file(self, tmp_path):
+        """Test pending changes are written together, keeping the rest of the file."""
+        path = tmp_path / "settings.json"
+        path.write_text(json.dumps({"mock_mode": True, "temperature_control": {"target_temp_celsius": 24.0}}))
+        persister = SettingsPersister(str(path), delay_seconds=60)
+
+        persister.update({("temperature_control", "target_temp_celsius"): 21.0})
+        persister.update({("humidity_control", "target_humidity_percent"): 70.0})
+        assert json.loads(path.read_text())["temperature_control"]["target_temp_celsius"] == 24.0
+
+        persister.flush()
+
+        assert json.loads(path.read_text()) == {
+            "mock_mode": True,
+            "temperature_control": {"target_temp_celsius": 21.0},
+            "humidity_control": {"target_humidity_percent": 70.0},
+        }
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_written_after_delay(self, tmp_path):
+        """Test changes are written in the background once the delay has passed."""
+        path = tmp_path / "settings.json"
+        path.write_text("{}")
+        persister = SettingsPersister(str(path), delay_seconds=0.05)
+
+        persister.update({("humidity_control", "humidity_tolerance_percent"): 5.0})
+        deadline = time.monotonic() + 5
+        while "humidity_control" not in json.loads(path.read_text()) and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        assert json.loads(path.read_text()) == {"humidity_control": {"humidity_tolerance_percent": 5.0}}
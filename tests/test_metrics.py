@@ -0,0 +1,109 @@
+"""
+Tests for greenhouse_metrics module.
+
+Tests counters, gauges, histograms and the Prometheus text rendering.
+"""
+
+import pytest
+import sys
+import urllib.request
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_metrics import MetricsRegistry, MetricsServer, _Metric
+
+
+@pytest.fixture
+def registry():
+    """Create an empty metrics registry."""
+    return MetricsRegistry()
+
+
+class TestMetrics:
+    """Test cases for metric types."""
+
+    def test_counter_renders_value(self, registry):
+        """Test counters accumulate and render without a trailing .0."""
+        counter = registry.counter("test_events_total", "Events")
+        counter.inc()
+        counter.inc(2)
+
+        text = registry.render()
+        assert "# TYPE test_events_total counter" in text
+        assert "test_events_total 3\n" in text
+
+    def test_labelled_children(self, registry):
+        """Test labelled metrics render one series per label set."""
+        counter = registry.counter("test_commands_total", "Commands", ["device"])
+        counter.labels("heater").inc()
+        counter.labels("vent_fan").inc(4)
+
+        text = registry.render()
+        assert 'test_commands_total{device="heater"} 1' in text
+        assert 'test_commands_total{device="vent_fan"} 4' in text
+
+    def test_metric_types_must_render(self):
+        """Test a metric type without child creation and rendering cannot be created."""
+        with pytest.raises(TypeError, match="_new_child"):
+            _Metric("test_untyped", "Untyped")
+
+    def test_labels_must_match(self, registry):
+        """Test the wrong number of label values is rejected."""
+        counter = registry.counter("test_commands_total", "Commands", ["device"])
+        with pytest.raises(ValueError):
+            counter.labels("heater", "extra")
+
+    def test_gauge_up_and_down(self, registry):
+        """Test gauges can be set, increased and decreased."""
+        gauge = registry.gauge("test_queue_depth", "Queue depth")
+        gauge.set(5)
+        gauge.dec(2)
+
+        assert "test_queue_depth 3\n" in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        """Test histogram buckets, sum and count."""
+        histogram = registry.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        text = registry.render()
+        assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'test_latency_seconds_bucket{le="1.0"} 3' in text
+        assert 'test_latency_seconds_bucket{le="+Inf"} 4' in text
+        assert "test_latency_seconds_sum 6.05" in text
+        assert "test_latency_seconds_count 4" in text
+
+    def test_histogram_timer(self, registry):
+        """Test the timer context manager records one observation."""
+        histogram = registry.histogram("test_tick_seconds", "Tick")
+        with histogram.time():
+            pass
+
+        assert histogram.count == 1
+
+    def test_registry_reuses_metrics(self, registry):
+        """Test registering the same name returns the existing metric."""
+        first = registry.counter("test_events_total", "Events")
+        assert registry.counter("test_events_total", "Events") is first
+        with pytest.raises(ValueError):
+            registry.gauge("test_events_total", "Events")
+
+
+class TestMetricsServer:
+    """Test cases for the manager-side metrics endpoint."""
+
+    def test_serves_metrics(self, registry):
+        """Test /metrics is served over HTTP."""
+        registry.counter("test_events_total", "Events").inc()
+        server = MetricsServer(port=0, registry=registry)
+        server.start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+                body = response.read().decode()
+        finally:
+            server.stop()
+
+        assert "test_events_total 1" in body
@@ -0,0 +1,93 @@
+"""
+Tests for greenhouse_raw_capture module.
+
+Tests per-interval aggregates, the bounded live view and spilling to the raw dataset.
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_acquisition import AcquisitionSummary, ChannelSummary
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_raw_capture import RawCaptureBuffer
+
+
+@pytest.fixture
+def clock():
+    """Simulated clock at noon."""
+    return SimulatedClock(datetime(2024, 1, 1, 12, 0))
+
+
+def reading(clock, temperature: float, spread: float = 0.0) -> AcquisitionSummary:
+    """A filtered reading of four samples stamped with the clock's time."""
+    return AcquisitionSummary(
+        timestamp=clock.now(),
+        sequence=0,
+        samples=4,
+        rejected=0,
+        channels={
+            "temperature": ChannelSummary(temperature, temperature - spread, temperature + spread, spread / 2),
+            "humidity": ChannelSummary(60.0, 60.0, 60.0, 0.0),
+            "pressure": ChannelSummary(1013.25, 1013.25, 1013.25, 0.0),
+        }
+    )
+
+
+class TestRawCaptureBuffer:
+    """Test cases for RawCaptureBuffer."""
+
+    def test_interval_aggregates(self, clock):
+        """Test an interval is logged as the mean, sample extremes and last of its readings."""
+        capture = RawCaptureBuffer(capacity=120, clock=clock)
+        for temperature, spread in ((20.0, 0.1), (21.0, 0.5), (22.0, 0.1)):
+            capture.add(reading(clock, temperature, spread))
+            clock.advance(5)
+
+        mean, fields = capture.interval()
+
+        assert mean["temperature"] == pytest.approx(21.0)
+        assert fields["temperature_celsius_min"] == pytest.approx(19.9)
+        assert fields["temperature_celsius_max"] == pytest.approx(22.1)
+        assert fields["temperature_celsius_last"] == 22.0
+        assert fields["sensor_readings"] == 3 and fields["sensor_samples"] == 12
+        assert capture.interval() is None
+
+    def test_live_view_bounded(self, clock):
+        """Test only the newest readings are kept and recent ones are returned oldest first."""
+        capture = RawCaptureBuffer(capacity=10, clock=clock)
+        for step in range(30):
+            capture.add(reading(clock, 20.0 + step))
+            clock.advance(5)
+
+        everything = capture.recent(3600)
+        recent = capture.recent(12)
+
+        assert len(everything) == 10
+        assert list(recent["temperature_celsius"]) == [48.0, 49.0]
+        assert recent["timestamp"].iloc[-1] == datetime(2024, 1, 1, 12, 2, 25)
+
+    def test_spilled_readings_kept_for_retention_window(self, tmp_path, clock):
+        """Test every reading is spilled once, as float32, and old raw files are pruned."""
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+        old_file = logger._get_log_filename(clock.now() - timedelta(days=5), "raw")
+        old_file.touch()
+        capture = RawCaptureBuffer(capacity=20, data_logger=logger, spill_interval_seconds=3600,
+                                   spill_retention_days=2, clock=clock)
+
+        for step in range(25):
+            capture.add(reading(clock, 20.0 + step))
+            clock.advance(5)
+        capture.flush()
+
+        raw = logger.get_data_for_date(clock.now(), "raw")
+        assert list(raw["temperature_celsius"]) == [20.0 + step for step in range(25)]
+        assert raw["pressure_hpa"].dtype == "float32"
+        assert raw["timestamp"].iloc[1] - raw["timestamp"].iloc[0] == timedelta(seconds=5)
+        assert not old_file.exists()
@@ -0,0 +1,182 @@
+"""
+Tests for greenhouse_retention module.
+
+Tests tiered image retention and sensor log rollups.
+"""
+
+import pytest
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+from pydantic import ValidationError
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_manager_settings import Retention, RetentionTier
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_image_catalog import GreenhouseImageCatalog
+from greenhouse_manager.greenhouse_retention import RetentionEngine
+
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+
+def write_capture(image_dir: Path, captured: datetime, subdir: str = "") -> Path:
+    """Write a noisy full resolution capture named after its capture time."""
+    path = image_dir / subdir / f"greenhouse_{captured.strftime('%Y%m%d_%H%M%S')}.jpg"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pixels = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(path, "JPEG")
+    return path
+
+
+@pytest.fixture
+def logger(tmp_path):
+    """Create a data logger writing to a temporary directory."""
+    return GreenhouseDataLogger(log_directory=str(tmp_path / "logs"))
+
+
+class TestImageRetention:
+    """Test cases for image tiers."""
+
+    def test_recent_images_untouched(self, tmp_path, logger):
+        """Test images younger than the first tier stay at full resolution."""
+        image = write_capture(tmp_path, NOW - timedelta(days=1))
+        engine = RetentionEngine(Retention(), str(tmp_path), logger)
+
+        report = engine.run_once(NOW)
+
+        assert image.exists()
+        assert report.bytes_reclaimed == 0
+
+    def test_old_images_downscaled_to_medium(self, tmp_path, logger):
+        """Test images past the medium tier are moved and resized."""
+        image = write_capture(tmp_path, NOW - timedelta(days=10))
+        engine = RetentionEngine(Retention(medium_width=160), str(tmp_path), logger)
+
+        report = engine.run_once(NOW)
+
+        medium = tmp_path / "medium" / image.name
+        assert not image.exists()
+        assert medium.exists()
+        with Image.open(medium) as img:
+            assert img.width == 160
+        assert report.images_resized == 1
+        assert report.bytes_reclaimed > 0
+
+    def test_daily_tier_keeps_one_frame_per_day(self, tmp_path, logger):
+        """Test only the frame closest to noon survives the daily tier."""
+        day = (NOW - timedelta(days=100)).replace(hour=0)
+        morning = write_capture(tmp_path, day.replace(hour=8))
+        noon = write_capture(tmp_path, day.replace(hour=12, minute=30), subdir="medium")
+        evening = write_capture(tmp_path, day.replace(hour=18))
+        engine = RetentionEngine(Retention(), str(tmp_path), logger)
+
+        report = engine.run_once(NOW)
+
+        assert not morning.exists() and not evening.exists() and not noon.exists()
+        assert (tmp_path / "thumbnails" / noon.name).exists()
+        assert report.images_deleted == 2
+
+    def test_delete_after_days(self, tmp_path, logger):
+        """Test images are deleted entirely past delete_images_after_days."""
+        image = write_capture(tmp_path, NOW - timedelta(days=40))
+        settings = Retention(image_tiers=[], delete_images_after_days=30)
+
+        RetentionEngine(settings, str(tmp_path), logger).run_once(NOW)
+
+        assert not image.exists()
+
+    def test_io_budget_leaves_work_pending(self, tmp_path, logger):
+        """Test a run stops at the I/O budget and later runs continue."""
+        for day in range(3):
+            write_capture(tmp_path, NOW - timedelta(days=10 + day))
+        engine = RetentionEngine(Retention(io_budget_mb_per_run=0.000001), str(tmp_path), logger)
+
+        report = engine.run_once(NOW)
+        assert report.pending is True
+        assert report.images_resized == 1
+
+        while engine.run_once(NOW).pending:
+            pass
+        assert len(list((tmp_path / "medium").glob("*.jpg"))) == 3
+
+    def test_catalog_updated(self, tmp_path, logger):
+        """Test the image catalog follows moved images."""
+        captured = NOW - timedelta(days=10)
+        image = write_capture(tmp_path, captured)
+        catalog = GreenhouseImageCatalog(str(tmp_path))
+        catalog.record(captured, image.name, "full", None, image)
+
+        RetentionEngine(Retention(), str(tmp_path), logger, catalog).run_once(NOW)
+
+        entries = catalog.get_entries_for_date(captured)
+        assert entries["stored_path"].iloc[0] == f"medium/{image.name}"
+
+    def test_catalog_updates_keep_concurrent_records(self, tmp_path):
+        """Test captures recorded while retention updates the same day are not lost."""
+        catalog = GreenhouseImageCatalog(str(tmp_path))
+        catalog.record(NOW, "greenhouse_first.jpg", "full")
+
+        def record_captures():
+            for index in range(50):
+                catalog.record(NOW, f"greenhouse_{index:02d}.jpg", "full")
+
+        recorder = threading.Thread(target=record_captures)
+        recorder.start()
+        for _ in range(50):
+            catalog.update_stored_paths(NOW, {"greenhouse_first.jpg": None})
+        recorder.join()
+
+        assert len(catalog.get_entries_for_date(NOW)) == 51
+
+    def test_tier_order_validated(self):
+        """Test tiers must be ordered by increasing age."""
+        with pytest.raises(ValidationError, match="strictly increasing min_age_days"):
+            Retention(image_tiers=[
+                RetentionTier(min_age_days=30, resolution="thumbnail"),
+                RetentionTier(min_age_days=7, resolution="medium"),
+            ])
+
+
+class TestLogRollups:
+    """Test cases for sensor log rollups."""
+
+    def test_raw_log_replaced_by_rollup(self, tmp_path, logger):
+        """Test old raw logs are rolled up and still readable."""
+        day = NOW - timedelta(days=100)
+        start = day.replace(hour=0, minute=0, second=0)
+        for minute in range(60):
+            logger.log_data(
+                temperature=20.0 + minute / 10, humidity=60.0, pressure=1000.0,
+                heater_state=minute < 30, vent_fan_state=False,
+                grow_lights_state=False, stand_fan_state=False,
+                timestamp=start + timedelta(minutes=minute)
+            )
+        logger.flush()
+
+        report = RetentionEngine(Retention(rollup_interval_minutes=15), str(tmp_path), logger).run_once(NOW)
+
+        assert report.logs_rolled_up == 1
+        assert not logger._get_log_filename(day).exists()
+
+        data = logger.get_data_for_date(day)
+        assert len(data) == 4
+        assert data["temperature_celsius_min"].iloc[0] == pytest.approx(20.0)
+        assert data["temperature_celsius_max"].iloc[0] == pytest.approx(21.4)
+        assert list(data["heater_state"]) == [1.0, 1.0, 0.0, 0.0]
+
+    def test_recent_logs_kept_raw(self, tmp_path, logger):
+        """Test logs newer than raw_log_days are not rolled up."""
+        day = NOW - timedelta(days=5)
+        logger.log_data(20.0, 60.0, 1000.0, False, False, False, False, timestamp=day)
+        logger.flush()
+
+        RetentionEngine(Retention(), str(tmp_path), logger).run_once(NOW)
+
+        assert logger._get_log_filename(day).exists()
@@ -0,0 +1,181 @@
+"""
+Tests for greenhouse_sensors module.
+
+Tests sensor plugins, the plugin registry, concurrent polling and the
+long-format channels dataset.
+"""
+
+import pytest
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+from greenhouse_manager.greenhouse_manager_settings import SensorPluginConfig
+from greenhouse_manager.greenhouse_sensors import (
+    SCD4xPlugin,
+    SENSOR_PLUGINS,
+    SensorPlugin,
+    SensorPoller,
+    SoilMoisturePlugin,
+    create_sensor_plugin,
+    register_sensor_plugin
+)
+
+
+START = datetime(2024, 5, 1, 12, 0)
+
+
+class BlockingPlugin(SensorPlugin):
+    """Plugin whose reads wait until released."""
+
+    channels = ("value",)
+
+    def __init__(self, name, interval_seconds=60):
+        super().__init__(name, interval_seconds, mock_mode=True)
+        self.release = threading.Event()
+        self.reads = 0
+
+    def read(self):
+        self.release.wait(5)
+        self.reads += 1
+        return {"value": float(self.reads)}
+
+
+class TestSensorPlugins:
+    """Test cases for the plugin registry and built-in plugins."""
+
+    def test_create_builtin_plugins(self):
+        """Test every built-in kind can be created in mock mode and read."""
+        for kind in ("bme280", "soil_moisture", "scd4x"):
+            plugin = create_sensor_plugin(SensorPluginConfig(name=kind, kind=kind), mock_mode=True)
+            assert set(plugin.read()) == set(plugin.channels)
+
+    def test_unknown_kind(self):
+        """Test an unregistered kind is rejected."""
+        with pytest.raises(ValueError):
+            create_sensor_plugin(SensorPluginConfig(name="x", kind="nope"), mock_mode=True)
+
+    def test_register_plugin(self):
+        """Test new kinds can be registered and receive their options."""
+        @register_sensor_plugin("test_constant")
+        class ConstantPlugin(SensorPlugin):
+            channels = ("lux",)
+
+            def __init__(self, name, interval_seconds=60, mock_mode=False, lux=0.0):
+                super().__init__(name, interval_seconds, mock_mode)
+                self.lux = lux
+
+            def read(self):
+                return {"lux": self.lux}
+
+        try:
+            config = SensorPluginConfig(name="light", kind="test_constant", options={"lux": 1200.0})
+            assert create_sensor_plugin(config).read() == {"lux": 1200.0}
+        finally:
+            del SENSOR_PLUGINS["test_constant"]
+
+    def test_plugins_must_read(self):
+        """Test a plugin without a read method cannot be created."""
+        with pytest.raises(TypeError, match="read"):
+            SensorPlugin("incomplete")
+
+    def test_soil_moisture_scaling(self):
+        """Test raw ADC readings scale between the dry and wet calibration points."""
+        plugin = SoilMoisturePlugin("soil", adc_inputs=[0, 1], dry_raw=17000, wet_raw=8000, mock_mode=True)
+        assert plugin.channels == ("moisture_percent_0", "moisture_percent_1")
+        assert plugin.to_percent(12500) == pytest.approx(50.0)
+        assert plugin.to_percent(20000) == 0.0
+
+    def test_scd4x_decode(self):
+        """Test SCD4x responses are decoded and CRC-checked."""
+        plugin = SCD4xPlugin("co2", mock_mode=True)
+        assert plugin.crc8(bytes([0xBE, 0xEF])) == 0x92
+
+        words = [800, 0x6667, 0x8000]
+        response = b"".join(w.to_bytes(2, "big") + bytes([plugin.crc8(w.to_bytes(2, "big"))]) for w in words)
+        reading = plugin.decode(response)
+        assert reading["co2_ppm"] == 800
+        assert reading["temperature_celsius"] == pytest.approx(25.0, abs=0.01)
+        assert reading["humidity_percent"] == pytest.approx(50.0, abs=0.01)
+
+        with pytest.raises(ValueError):
+            plugin.decode(response[:-1] + bytes([response[-1] ^ 0xFF]))
+
+
+class TestSensorPoller:
+    """Test cases for SensorPoller class."""
+
+    def test_slow_sensor_does_not_block(self):
+        """Test poll returns while a read is still running and other sensors are read."""
+        clock = SimulatedClock(START)
+        slow = BlockingPlugin("slow")
+        fast = BlockingPlugin("fast")
+        fast.release.set()
+        poller = SensorPoller([slow, fast], clock)
+
+        assert poller.poll() == 2
+        poller._in_flight["fast"].result()
+        assert [r[1] for r in poller.drain()] == ["fast"]
+
+        clock.advance(60)
+        assert poller.poll() == 1  # slow is still in flight
+        slow.release.set()
+        poller.shutdown()
+        assert {r[1] for r in poller.drain()} == {"slow", "fast"}
+
+    def test_per_sensor_intervals(self):
+        """Test each sensor is read on its own interval."""
+        clock = SimulatedClock(START)
+        often = BlockingPlugin("often", interval_seconds=10)
+        rarely = BlockingPlugin("rarely", interval_seconds=30)
+        often.release.set()
+        rarely.release.set()
+        poller = SensorPoller([often, rarely], clock)
+
+        for _ in range(6):
+            poller.poll()
+            poller.wait()
+            clock.advance(10)
+        poller.shutdown()
+        assert (often.reads, rarely.reads) == (6, 2)
+
+
+class TestChannelLogging:
+    """Test cases for the long-format channels dataset."""
+
+    def test_round_trip(self, tmp_path):
+        """Test channel readings are written and read back in long and wide layouts."""
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path))
+        logger.log_channel_readings([
+            (START, "soil", "moisture_percent_0", 41.0),
+            (START, "co2", "co2_ppm", 650.0),
+            (START + timedelta(minutes=5), "soil", "moisture_percent_0", 40.0),
+        ])
+        logger.flush()
+
+        assert (tmp_path / "greenhouse_channels_2024-05-01.parquet").exists()
+        long = logger.get_channel_data(START, sensors=["soil"])
+        assert list(long["value"]) == [41.0, 40.0]
+
+        wide = logger.get_channel_data(START, wide=True)
+        assert list(wide.columns) == ["co2.co2_ppm", "soil.moisture_percent_0"]
+        assert len(wide) == 2
+
+    def test_buffered_rows_visible_and_appended(self, tmp_path):
+        """Test unflushed readings are returned and later batches append to the day's file."""
+        clock = SimulatedClock(START)
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path), clock=clock)
+        logger.log_channel_readings([(START, "soil", "moisture_percent_0", 41.0)])
+        assert not (tmp_path / "greenhouse_channels_2024-05-01.parquet").exists()
+        assert len(logger.get_channel_data(START)) == 1
+
+        logger.flush()
+        logger.log_channel_readings([(START + timedelta(hours=1), "co2", "co2_ppm", 700.0)])
+        logger.flush()
+        assert len(logger.get_data_for_date(START, "channels")) == 2
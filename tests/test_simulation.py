@@ -0,0 +1,142 @@
+"""
+Tests for greenhouse_simulation module.
+
+Tests the thermal plant model, weather profiles and the simulated sensor.
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_manager_settings import DeviceConfig, SimulationConfig
+from greenhouse_manager.greenhouse_simulation import (
+    GreenhouseThermalModel,
+    OutsideWeather,
+    WEATHER_PROFILES,
+    create_simulated_sensor,
+    running_by_role,
+    saturation_vapor_density
+)
+
+
+START = datetime(2024, 1, 15, 0, 0)
+
+
+class TestOutsideWeather:
+    """Test cases for outside weather profiles."""
+
+    def test_dark_at_night(self):
+        """Test there is no solar gain outside daylight hours."""
+        weather = OutsideWeather(WEATHER_PROFILES["spring"], seed=1)
+        assert weather.conditions(START.replace(hour=2))[2] == 0.0
+        assert weather.conditions(START.replace(hour=13))[2] > 0.0
+
+    def test_afternoon_warmer_than_dawn(self):
+        """Test the daily temperature cycle peaks in the afternoon."""
+        weather = OutsideWeather(WEATHER_PROFILES["summer"], seed=1)
+        assert weather.conditions(START.replace(hour=15))[0] > weather.conditions(START.replace(hour=4))[0]
+
+    def test_seeded_weather_is_reproducible(self):
+        """Test the same seed gives the same weather."""
+        a = OutsideWeather(WEATHER_PROFILES["autumn"], seed=7)
+        b = OutsideWeather(WEATHER_PROFILES["autumn"], seed=7)
+        assert a.conditions(START) == b.conditions(START)
+
+
+class TestGreenhouseThermalModel:
+    """Test cases for GreenhouseThermalModel class."""
+
+    def test_heater_warms_greenhouse(self):
+        """Test the heater raises temperature compared to leaving it off."""
+        config = SimulationConfig(weather="winter", seed=1)
+        heated = GreenhouseThermalModel(config, START, initial_temperature=10.0)
+        unheated = GreenhouseThermalModel(config, START, initial_temperature=10.0)
+
+        heated.advance_to(START + timedelta(hours=2), {"heater": 1})
+        unheated.advance_to(START + timedelta(hours=2), {})
+
+        assert heated.temperature > unheated.temperature + 5
+
+    def test_vent_fan_pulls_towards_outside(self):
+        """Test the vent fan brings a hot greenhouse towards outside temperature."""
+        config = SimulationConfig(weather="spring", seed=1)
+        vented = GreenhouseThermalModel(config, START, initial_temperature=35.0)
+        closed = GreenhouseThermalModel(config, START, initial_temperature=35.0)
+
+        vented.advance_to(START + timedelta(minutes=30), {"vent_fan": 1})
+        closed.advance_to(START + timedelta(minutes=30), {})
+
+        assert vented.temperature < closed.temperature - 3
+
+    def test_heaters_add_up(self):
+        """Test two running heaters warm faster than one."""
+        config = SimulationConfig(weather="winter", seed=1)
+        one = GreenhouseThermalModel(config, START, initial_temperature=10.0)
+        two = GreenhouseThermalModel(config, START, initial_temperature=10.0)
+
+        one.advance_to(START + timedelta(minutes=30), {"heater": 1})
+        two.advance_to(START + timedelta(minutes=30), {"heater": 2})
+
+        assert two.temperature > one.temperature + 1
+
+    def test_heating_lowers_relative_humidity(self):
+        """Test warming the same air lowers its relative humidity."""
+        model = GreenhouseThermalModel(SimulationConfig(seed=1), START, initial_temperature=10.0)
+        humidity_before = model.relative_humidity
+
+        model.advance_to(START + timedelta(hours=1), {"heater": 1})
+
+        assert model.relative_humidity < humidity_before
+
+    def test_humidity_capped_at_saturation(self):
+        """Test moisture above saturation condenses out."""
+        model = GreenhouseThermalModel(SimulationConfig(seed=1), START, initial_temperature=5.0)
+        model.vapor_density = 2 * saturation_vapor_density(5.0)
+
+        model.advance_to(START + timedelta(minutes=1), {})
+
+        assert 99.0 < model.relative_humidity <= 100.0
+
+
+class TestRunningByRole:
+    """Test cases for counting running devices by role."""
+
+    def test_counts_devices_by_role_not_id(self):
+        """Test every switched-on device counts towards its role, whatever its id."""
+        def device(device_id, role, pin):
+            return DeviceConfig(id=device_id, role=role, name=device_id, rf_on_code=1, rf_off_code=2, led_gpio_pin=pin)
+
+        devices = [
+            device("bench_heater", "heater", 5),
+            device("floor_heater", "heater", 6),
+            device("roof_vent", "vent_fan", 13),
+            device("pump", "manual", 19),
+        ]
+        states = {"bench_heater": True, "floor_heater": True, "roof_vent": False, "pump": True}
+
+        assert running_by_role(devices, states) == {"heater": 2, "manual": 1}
+
+
+class TestSimulatedSensor:
+    """Test cases for the simulated sensor."""
+
+    def test_sensor_follows_clock_and_devices(self):
+        """Test readings advance with the clock and respond to device states."""
+        clock = SimulatedClock(START)
+        sensor = create_simulated_sensor(
+            SimulationConfig(weather="winter", seed=3, temperature_noise_celsius=0),
+            running_devices=lambda: {"heater": 1},
+            clock=clock
+        )
+        first = sensor.read_data()
+
+        clock.advance(3600)
+        second = sensor.read_data()
+
+        assert set(first) == {"temperature", "humidity", "pressure"}
+        assert second["temperature"] > first["temperature"]
+        assert sensor.model.time == clock.now()
@@ -0,0 +1,91 @@
+"""
+Tests for greenhouse_state_journal module.
+
+Tests journaled device states survive reopening, torn writes and pruning.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_state_journal import (
+    DeviceStateJournal,
+    HEADER,
+    RECORD,
+    JournalEntry,
+    read_journal
+)
+
+
+@pytest.fixture
+def clock():
+    """Simulated clock at noon."""
+    return SimulatedClock(datetime(2024, 1, 1, 12, 0))
+
+
+class TestDeviceStateJournal:
+    """Test cases for DeviceStateJournal."""
+
+    def test_states_survive_reopen(self, tmp_path, clock):
+        """Test recorded states and transition times are read back after reopening."""
+        path = tmp_path / "devices.journal"
+        journal = DeviceStateJournal(str(path), capacity=4, clock=clock)
+        journal.record("heater", True)
+        clock.advance(60)
+        journal.record("heater", False)
+        journal.record("grow_lights", True)
+        journal.close()
+
+        reopened = DeviceStateJournal(str(path), capacity=4, clock=clock)
+
+        assert reopened.get("heater") == JournalEntry(False, clock.time(), 2)
+        assert reopened.get("grow_lights").state is True
+        assert reopened.get("vent_fan") is None
+        assert path.stat().st_size == HEADER.size + 4 * 2 * RECORD.size
+        reopened.close()
+
+    def test_torn_write_keeps_previous_record(self, tmp_path, clock):
+        """Test a corrupt latest record falls back to the device's previous record."""
+        path = tmp_path / "devices.journal"
+        journal = DeviceStateJournal(str(path), capacity=2, clock=clock)
+        journal.record("heater", True)
+        journal.record("heater", False)
+        journal.close()
+
+        # The second write went to the heater's second record; damage it
+        data = bytearray(path.read_bytes())
+        data[HEADER.size + RECORD.size + 41] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        assert read_journal(path)["heater"].state is True
+
+    def test_retain_frees_slots(self, tmp_path, clock):
+        """Test removed devices are forgotten and their slots reused."""
+        path = tmp_path / "devices.journal"
+        journal = DeviceStateJournal(str(path), capacity=1, clock=clock)
+        journal.record("heater", True)
+        journal.record("vent_fan", True)
+        assert journal.get("vent_fan") is None
+
+        assert journal.retain(["vent_fan"]) == ["heater"]
+        journal.record("vent_fan", True)
+
+        assert journal.entries().keys() == {"vent_fan"}
+        journal.close()
+        assert read_journal(path).keys() == {"vent_fan"}
+
+    def test_unrecognised_file_ignored(self, tmp_path, clock):
+        """Test a file that is not a journal is replaced by an empty journal."""
+        path = tmp_path / "devices.journal"
+        path.write_bytes(b"not a journal" * 10)
+
+        journal = DeviceStateJournal(str(path), clock=clock)
+
+        assert journal.entries() == {}
+        journal.close()
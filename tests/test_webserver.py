@@ -5,13 +5,17 @@ Tests Flask API endpoints and web interface.
 """
 
 import pytest
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from webserver.app import create_app
+from greenhouse_manager.greenhouse_ipc import ControlServer
 
 
 @pytest.fixture
@@ -59,6 +63,23 @@ class TestHealthEndpoint:
         assert response.content_type == 'application/json'
 
 
+class TestMetricsEndpoint:
+    """Test cases for the metrics endpoint."""
+
+    def test_metrics_no_auth(self, client):
+        """Test metrics are exposed without authentication."""
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+
+    def test_request_latency_recorded(self, client):
+        """Test request latency is recorded per endpoint."""
+        client.get('/health')
+
+        text = client.get('/metrics').get_data(as_text=True)
+        assert 'greenhouse_api_request_seconds_count{endpoint="health",method="GET",status="200"}' in text
+
+
 class TestMainDashboard:
     """Test cases for main dashboard."""
 
@@ -137,6 +158,41 @@ class TestAPIHistoryEndpoint:
         data = response.get_json()
         assert 'error' in data
 
+    def test_history_invalid_dataset(self, client, auth_headers):
+        """Test history endpoint rejects unknown datasets."""
+        response = client.get('/api/v1/history?dataset=unknown', headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_history_image_metrics_dataset(self, tmp_path, auth_headers):
+        """Test image metrics are queryable through the history endpoint."""
+        from datetime import datetime
+        from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+
+        GreenhouseDataLogger(log_directory=str(tmp_path)).log_image_metrics(
+            filename='greenhouse_20240115_120000.jpg',
+            canopy_fraction=0.25,
+            mean_luminance=0.5,
+            histogram_red=[0.5, 0.5],
+            histogram_green=[0.5, 0.5],
+            histogram_blue=[1.0, 0.0],
+            timestamp=datetime(2024, 1, 15, 12, 0, 0)
+        )
+        client = create_app({
+            'TESTING': True,
+            'BASIC_AUTH_USERNAME': 'test',
+            'BASIC_AUTH_PASSWORD': 'password',
+            'LOG_DIRECTORY': str(tmp_path)
+        }).test_client()
+
+        response = client.get(
+            '/api/v1/history?day=2024-01-15&dataset=image_metrics', headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        record = response.get_json()['data']['records'][0]
+        assert record['canopy_fraction'] == 0.25
+        assert record['histogram_blue'] == [1.0, 0.0]
+
 
 class TestAPIHistoryRangeEndpoint:
     """Test cases for /api/v1/history/range endpoint."""
@@ -181,6 +237,83 @@ class TestAPIStatisticsEndpoint:
         assert response.status_code in [200, 404]
 
 
+class TestAPIDutyEndpoint:
+    """Test cases for /api/v1/duty endpoint."""
+
+    def test_duty_without_auth(self, client):
+        """Test duty endpoint without authentication."""
+        assert client.get('/api/v1/duty').status_code == 401
+
+    def test_duty_invalid_window(self, client, auth_headers):
+        """Test duty endpoint rejects malformed and empty windows."""
+        assert client.get('/api/v1/duty?start=yesterday', headers=auth_headers).status_code == 400
+        response = client.get(
+            '/api/v1/duty?start=2024-01-15T12:00:00&end=2024-01-15T06:00:00', headers=auth_headers
+        )
+        assert response.status_code == 400
+
+    def test_duty_from_transitions(self, tmp_path, auth_headers):
+        """Test duty cycles are computed from logged transitions."""
+        from datetime import datetime
+        from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path))
+        logger.log_transition('heater', True, 'thermostat', datetime(2024, 1, 15, 6, 0))
+        logger.log_transition('heater', False, 'thermostat', datetime(2024, 1, 15, 6, 45))
+        logger.flush()
+        client = create_app({
+            'TESTING': True,
+            'BASIC_AUTH_USERNAME': 'test',
+            'BASIC_AUTH_PASSWORD': 'password',
+            'LOG_DIRECTORY': str(tmp_path)
+        }).test_client()
+
+        response = client.get(
+            '/api/v1/duty?start=2024-01-15T06:00:00&end=2024-01-15T07:00:00&device=heater',
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        heater = response.get_json()['data']['devices']['heater']
+        assert heater['on_seconds'] == 2700
+        assert heater['duty_percent'] == 75.0
+
+
+class TestAPIEnergyEndpoint:
+    """Test cases for /api/v1/energy endpoint."""
+
+    def test_energy_without_auth(self, client):
+        """Test energy endpoint without authentication."""
+        assert client.get('/api/v1/energy').status_code == 401
+
+    def test_energy_start_after_end(self, client, auth_headers):
+        """Test energy endpoint rejects a reversed range."""
+        response = client.get('/api/v1/energy?start=2024-02-01&end=2024-01-01', headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_energy_totals(self, tmp_path, auth_headers):
+        """Test energy and cost are summed over the range per device and in total."""
+        from datetime import datetime
+        from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path))
+        logger.save_energy_totals(datetime(2024, 1, 14), {'heater': (3600.0, 1.5, 0.45), 'lights': (7200.0, 0.5, 0.15)})
+        logger.save_energy_totals(datetime(2024, 1, 15), {'heater': (1800.0, 0.75, 0.225)})
+        client = create_app({
+            'TESTING': True,
+            'BASIC_AUTH_USERNAME': 'test',
+            'BASIC_AUTH_PASSWORD': 'password',
+            'LOG_DIRECTORY': str(tmp_path)
+        }).test_client()
+
+        response = client.get('/api/v1/energy?start=2024-01-01&end=2024-01-31', headers=auth_headers)
+        assert response.status_code == 200
+
+        data = response.get_json()['data']
+        assert data['devices']['heater']['energy_kwh'] == 2.25
+        assert data['total']['energy_kwh'] == 2.75
+
+
 class TestAPICameraEndpoints:
     """Test cases for camera-related API endpoints."""
 
@@ -195,6 +328,45 @@ class TestAPICameraEndpoints:
         # Will return 404 if no images exist, which is expected
         assert response.status_code in [200, 404]
 
+    def test_camera_latest_returns_newest_original(self, tmp_path, auth_headers):
+        """Test the latest image is the newest original, not a newer downscaled copy."""
+        image_dir = tmp_path / 'images'
+        (image_dir / 'thumbnails').mkdir(parents=True)
+        (image_dir / 'greenhouse_20240114_235900.jpg').write_bytes(b'old')
+        (image_dir / 'greenhouse_20240115_000000.jpg').write_bytes(b'original')
+        (image_dir / 'thumbnails' / 'greenhouse_20240115_235959.jpg').write_bytes(b'thumb')
+
+        client = create_app({
+            'TESTING': True,
+            'BASIC_AUTH_USERNAME': 'test',
+            'BASIC_AUTH_PASSWORD': 'password',
+            'IMAGE_DIRECTORY': str(image_dir)
+        }).test_client()
+
+        response = client.get('/api/v1/camera/latest', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.data == b'original'
+
+    def test_camera_latest_with_only_old_captures(self, tmp_path, auth_headers):
+        """Test a capture older than yesterday is still returned when it is the newest."""
+        from datetime import datetime, timedelta
+
+        image_dir = tmp_path / 'images'
+        image_dir.mkdir()
+        old = datetime.now() - timedelta(days=10)
+        (image_dir / f"greenhouse_{old.strftime('%Y%m%d')}_120000.jpg").write_bytes(b'old')
+
+        client = create_app({
+            'TESTING': True,
+            'BASIC_AUTH_USERNAME': 'test',
+            'BASIC_AUTH_PASSWORD': 'password',
+            'IMAGE_DIRECTORY': str(image_dir)
+        }).test_client()
+
+        response = client.get('/api/v1/camera/latest', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.data == b'old'
+
     def test_camera_list_without_auth(self, client):
         """Test camera list endpoint without authentication."""
         response = client.get('/api/v1/camera/list')
@@ -211,12 +383,165 @@ class TestAPICameraEndpoints:
         response = client.get('/api/v1/camera/list?day=2024-01-15', headers=auth_headers)
         assert response.status_code in [200, 404]
 
+    def test_camera_list_annotated_with_conditions(self, tmp_path, auth_headers):
+        """Test listed images carry the nearest logged sensor reading."""
+        from datetime import datetime
+        from greenhouse_manager.greenhouse_data_logger import GreenhouseDataLogger
+
+        logger = GreenhouseDataLogger(log_directory=str(tmp_path / 'logs'))
+        for minute, temperature in ((0, 20.0), (10, 22.0), (20, 24.0)):
+            logger.log_data(
+                temperature=temperature, humidity=60.0, pressure=1000.0,
+                heater_state=minute == 10, vent_fan_state=False,
+                grow_lights_state=True, stand_fan_state=False,
+                timestamp=datetime(2024, 1, 15, 12, minute, 0)
+            )
+        logger.flush()
+
+        image_dir = tmp_path / 'images'
+        (image_dir / 'thumbnails').mkdir(parents=True)
+        (image_dir / 'greenhouse_20240115_120900.jpg').write_bytes(b'jpeg')
+        (image_dir / 'thumbnails' / 'greenhouse_20240115_140000.jpg').write_bytes(b'jpeg')
+
+        client = create_app({
+            'TESTING': True,
+            'BASIC_AUTH_USERNAME': 'test',
+            'BASIC_AUTH_PASSWORD': 'password',
+            'LOG_DIRECTORY': str(tmp_path / 'logs'),
+            'IMAGE_DIRECTORY': str(image_dir)
+        }).test_client()
+
+        response = client.get('/api/v1/camera/list?day=2024-01-15', headers=auth_headers)
+        assert response.status_code == 200
+
+        images = response.get_json()['data']['images']
+        assert [image['filename'] for image in images] == [
+            'greenhouse_20240115_120900.jpg', 'greenhouse_20240115_140000.jpg'
+        ]
+        assert images[0]['conditions']['temperature_celsius'] == 22.0
+        assert images[0]['conditions']['heater_state'] is True
+        assert images[1]['conditions'] is None
+
+        response = client.get('/api/v1/camera/image/greenhouse_20240115_140000.jpg', headers=auth_headers)
+        assert response.status_code == 200
+
     def test_camera_image_without_auth(self, client):
         """Test camera image endpoint without authentication."""
         response = client.get('/api/v1/camera/image/test.jpg')
         assert response.status_code == 401
 
 
+@pytest.fixture
+def manager_socket():
+    """Control server with fake manager handlers on a short socket path."""
+    directory = tempfile.mkdtemp(prefix="gh")
+    socket_path = os.path.join(directory, "manager.sock")
+
+    def override_device(device, state, duration_seconds):
+        if device != 'heater':
+            raise ValueError(f"Unknown device: {device}")
+        return {'device': device, 'state': state, 'duration_seconds': duration_seconds}
+
+    server = ControlServer(socket_path, {
+        'status': lambda: {'devices': {'heater': False}},
+        'set_setpoints': lambda **setpoints: setpoints,
+        'override_device': override_device,
+        'clear_override': lambda device: {'device': device, 'cleared': True},
+        'capture_now': lambda: {'capture_requested': True},
+        'live_readings': lambda seconds: {'read_interval_seconds': 5, 'readings': [{'seconds': seconds}]},
+    })
+    server.start()
+    yield socket_path
+    server.stop()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class TestAPIControlEndpoints:
+    """Test cases for the manager control endpoints."""
+
+    @pytest.fixture
+    def control_client(self, manager_socket):
+        """Test client connected to the fake manager."""
+        app = create_app({
+            'TESTING': True,
+            'BASIC_AUTH_USERNAME': 'test',
+            'BASIC_AUTH_PASSWORD': 'password',
+            'MANAGER_SOCKET': manager_socket
+        })
+        return app.test_client()
+
+    def test_control_without_auth(self, client):
+        """Test control endpoints require authentication."""
+        assert client.get('/api/v1/control/status').status_code == 401
+        assert client.post('/api/v1/control/capture').status_code == 401
+
+    def test_manager_unavailable(self, tmp_path, auth_headers):
+        """Test control endpoints return 503 when the manager is not running."""
+        app = create_app({
+            'TESTING': True,
+            'BASIC_AUTH_USERNAME': 'test',
+            'BASIC_AUTH_PASSWORD': 'password',
+            'MANAGER_SOCKET': str(tmp_path / 'missing.sock')
+        })
+        response = app.test_client().get('/api/v1/control/status', headers=auth_headers)
+        assert response.status_code == 503
+        assert 'error' in response.get_json()
+
+    def test_status_and_setpoints(self, control_client, auth_headers):
+        """Test status and setpoint requests are passed to the manager."""
+        response = control_client.get('/api/v1/control/status', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.get_json()['data'] == {'devices': {'heater': False}}
+
+        response = control_client.post(
+            '/api/v1/control/setpoints', json={'target_temp_celsius': 21.0}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.get_json()['data'] == {'target_temp_celsius': 21.0}
+
+        response = control_client.post('/api/v1/control/setpoints', json=[], headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_device_override(self, control_client, auth_headers):
+        """Test overrides are set and cleared, and rejected overrides return 400."""
+        response = control_client.post(
+            '/api/v1/control/devices/heater/override',
+            json={'state': True, 'duration_seconds': 900},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.get_json()['data']['duration_seconds'] == 900
+
+        response = control_client.post(
+            '/api/v1/control/devices/door/override', json={'state': True}, headers=auth_headers
+        )
+        assert response.status_code == 400
+        assert 'Unknown device' in response.get_json()['error']
+
+        response = control_client.post(
+            '/api/v1/control/devices/heater/override', json={'state': 'on'}, headers=auth_headers
+        )
+        assert response.status_code == 400
+
+        response = control_client.delete('/api/v1/control/devices/heater/override', headers=auth_headers)
+        assert response.get_json()['data']['cleared'] is True
+
+    def test_capture_now(self, control_client, auth_headers):
+        """Test a capture request is passed to the manager."""
+        response = control_client.post('/api/v1/control/capture', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.get_json()['data'] == {'capture_requested': True}
+
+    def test_live_readings(self, control_client, auth_headers):
+        """Test live readings are requested for the given number of seconds."""
+        response = control_client.get('/api/v1/control/live?seconds=60', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.get_json()['data']['readings'] == [{'seconds': 60.0}]
+
+        response = control_client.get('/api/v1/control/live?seconds=soon', headers=auth_headers)
+        assert response.status_code == 400
+
+
 class TestAppConfiguration:
     """Test cases for application configuration."""
 
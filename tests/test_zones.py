@@ -0,0 +1,150 @@
+"""
+Tests for greenhouse_zones module.
+
+Tests running several zones in one process, their isolation and memory reporting.
+"""
+
+import pytest
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from greenhouse_manager.greenhouse_clock import SimulatedClock
+from greenhouse_manager.greenhouse_zones import ZoneManager, ZONE_ERRORS
+
+
+CONFIG_TEMPLATE = Path(__file__).parent.parent / "config" / "greenhouse_manager_settings.json"
+
+
+def write_zone(tmp_path, name: str, **overrides) -> str:
+    """Write a mock-mode zone settings file with its own log and image directories."""
+    with open(CONFIG_TEMPLATE) as f:
+        config = json.load(f)
+    config.update(
+        mock_mode=True,
+        log_directory=str(tmp_path / name / "logs"),
+        image_directory=str(tmp_path / name / "images"),
+        sensors=[]
+    )
+    config["camera_schedule"]["enabled"] = False
+    config["retention"]["enabled"] = False
+    config["metrics"]["enabled"] = False
+    config["control_channel"]["socket_path"] = str(tmp_path / name / "manager.sock")
+    config.update(overrides)
+    path = tmp_path / f"{name}.json"
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+@pytest.fixture
+def clock():
+    """Simulated clock at midday."""
+    return SimulatedClock(datetime(2024, 1, 1, 12, 0))
+
+
+class TestZoneManager:
+    """Test cases for ZoneManager."""
+
+    def test_zones_log_to_their_own_directories(self, tmp_path, clock):
+        """Test every zone is controlled on the shared loop and logs separately."""
+        paths = [write_zone(tmp_path, name) for name in ("north", "south")]
+        zones = ZoneManager(paths, clock=clock, monitor_config=False)
+
+        for _ in range(3):
+            zones.run_control_loop()
+            clock.advance(60)
+        zones.shutdown()
+
+        assert list(zones.zones) == ["north", "south"]
+        for zone in zones.zones.values():
+            assert zone.manager.transmitter is zones.transmitter
+            assert zone.manager.grow_lights.get_state() is True
+            assert len(zone.manager.data_logger.get_data_for_date(clock.now())) == 3
+        assert (tmp_path / "north" / "logs").exists() and (tmp_path / "south" / "logs").exists()
+
+    def test_failing_zone_stopped_without_affecting_others(self, tmp_path, clock):
+        """Test a zone that keeps raising is stopped while the other zone keeps running."""
+        zones = ZoneManager(
+            [write_zone(tmp_path, "north"), write_zone(tmp_path, "south")],
+            clock=clock, monitor_config=False, max_consecutive_errors=3
+        )
+
+        def fail():
+            raise RuntimeError("sensor bus wedged")
+
+        zones.zones["north"].manager.run_control_loop = fail
+        errors_before = ZONE_ERRORS.labels("north").value
+        for _ in range(5):
+            zones.run_control_loop()
+            clock.advance(60)
+
+        assert [zone.name for zone in zones.running_zones()] == ["south"]
+        assert "sensor bus wedged" in zones.zones["north"].error
+        assert ZONE_ERRORS.labels("north").value - errors_before == 3
+        assert len(zones.zones["south"].manager.data_logger._current_dataframe) == 5
+        zones.shutdown()
+
+    def test_invalid_zone_skipped(self, tmp_path, clock):
+        """Test a zone with invalid settings is reported and the others still start."""
+        bad = tmp_path / "bad.json"
+        bad.write_text("{}")
+
+        zones = ZoneManager([write_zone(tmp_path, "north"), str(bad)], clock=clock, monitor_config=False)
+
+        assert [zone.name for zone in zones.running_zones()] == ["north"]
+        assert zones.zones["bad"].error.startswith("Configuration failed")
+        zones.shutdown()
+
+    def test_shared_log_directory_rejected(self, tmp_path, clock):
+        """Test two zones cannot write to the same log directory."""
+        north = write_zone(tmp_path, "north")
+        south = write_zone(tmp_path, "south", log_directory=str(tmp_path / "north" / "logs"))
+
+        with pytest.raises(ValueError):
+            ZoneManager([north, south], clock=clock, monitor_config=False)
+
+    def test_shared_control_socket_rejected(self, tmp_path, clock):
+        """Test two zones cannot listen on the same control socket."""
+        north = write_zone(tmp_path, "north")
+        with open(north) as f:
+            control_channel = json.load(f)["control_channel"]
+        south = write_zone(tmp_path, "south", control_channel=control_channel)
+
+        with pytest.raises(ValueError):
+            ZoneManager([north, south], clock=clock, monitor_config=False)
+
+    def test_shared_state_journal_rejected(self, tmp_path, clock):
+        """Test two zones cannot journal device states to the same file."""
+        journal = {"enabled": True, "path": str(tmp_path / "devices.journal")}
+        north = write_zone(tmp_path, "north", state_journal=journal)
+        south = write_zone(tmp_path, "south", state_journal=journal)
+
+        with pytest.raises(ValueError):
+            ZoneManager([north, south], clock=clock, monitor_config=False)
+
+    def test_shared_staging_directory_rejected(self, tmp_path, clock):
+        """Test two zones cannot stage their log files in the same directory."""
+        with open(CONFIG_TEMPLATE) as f:
+            data_logging = json.load(f)["data_logging"]
+        data_logging["staging_directory"] = str(tmp_path / "run")
+        north = write_zone(tmp_path, "north", data_logging=data_logging)
+        south = write_zone(tmp_path, "south", data_logging=data_logging)
+
+        with pytest.raises(ValueError):
+            ZoneManager([north, south], clock=clock, monitor_config=False)
+
+    def test_memory_reported_per_zone(self, tmp_path, clock):
+        """Test each zone reports the memory it holds."""
+        zones = ZoneManager([write_zone(tmp_path, "north"), write_zone(tmp_path, "south")],
+                            clock=clock, monitor_config=False)
+        zones.run_control_loop()
+
+        report = zones.memory_report()
+
+        assert set(report) == {"north", "south"}
+        assert all(memory > 0 for memory in report.values())
+        zones.shutdown()